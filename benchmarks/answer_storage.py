@@ -0,0 +1,162 @@
+"""
+Speicherbedarf und Ladezeit der Antworten: Zeilen (answer) gegen gepackt
+Füllt je Bestandsgröße zwei SQLite-Datenbanken mit denselben zufälligen
+Assessments – einmal mit einer Zeile je Antwort, einmal gepackt
+(ANSWER_STORAGE=packed, ein Block je Assessment in answer_archive) – und misst:
+
+- Seiten der Antworttabelle inkl. Indizes (dbstat) und Dateigröße nach VACUUM
+- Laden der Antworten eines Assessments (load_answer_rows, Median in ms)
+- Laden von 1000 Assessments am Stück
+- Laden, Filterlogik und Scoring von 1000 Assessments (scoring_engine, ohne ORM)
+
+Die Prüfsumme über die neu berechneten Ergebnisse muss in beiden Varianten
+gleich sein.
+
+Verwendung (aus dem Projektverzeichnis):
+    python benchmarks/answer_storage.py                 # 1000, 10000, 100000
+    python benchmarks/answer_storage.py 5000 --repeat 9
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+STORAGES = ("rows", "packed")
+BULK_SIZE = 1000
+# Tabellen und Indizes, in denen die Antworten liegen
+ANSWER_OBJECTS = {
+    "rows": "SELECT name FROM sqlite_master WHERE tbl_name = 'answer'",
+    "packed": "SELECT name FROM sqlite_master WHERE tbl_name = 'answer_archive'",
+}
+
+
+def _median_ms(function, repeat):
+    function()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _bulk_rows(ids):
+    """Antworten mehrerer Assessments (wie Vergleichsmatrix und Export)"""
+    from models.database import Answer
+    from services.archive_service import load_archived_answers
+    from services.scoring_engine import AnswerRow
+    from extensions import db
+
+    rows = {assessment_id: [] for assessment_id in ids}
+    for r in db.session.query(
+        Answer.assessment_id, Answer.question_id, Answer.scale_option_id,
+        Answer.numeric_value, Answer.is_applicable
+    ).filter(Answer.assessment_id.in_(ids)).order_by(Answer.assessment_id, Answer.id):
+        rows[r.assessment_id].append(
+            AnswerRow(r.question_id, r.scale_option_id, r.numeric_value, r.is_applicable))
+    rows.update(load_archived_answers([aid for aid in ids if not rows[aid]]))
+    return rows
+
+
+def _rescore(compiled, ids):
+    from services.scoring_engine import apply_filter_logic, score_assessment
+
+    return [
+        score_assessment(compiled, assessment_id, apply_filter_logic(compiled, rows))
+        for assessment_id, rows in _bulk_rows(ids).items()
+    ]
+
+
+def _checksum(scored):
+    digest = hashlib.sha256()
+    for result in scored:
+        digest.update(json.dumps(
+            [result.total_result, result.dimension_results, result.economic_metrics],
+            sort_keys=True, default=str
+        ).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def run_storage(count, storage, repeat):
+    """Misst eine Variante (im Kindprozess, DATABASE_URL ist gesetzt)"""
+    from route_latency import populate
+    from main import app, init_database
+    from models.database import QuestionnaireVersion
+    from services.questionnaire_cache import get_compiled_questionnaire
+    from services.result_service import load_answer_rows
+    from extensions import db
+
+    init_database()
+    populate(app, count, packed=storage == "packed")
+    with app.app_context():
+        connection = db.session.connection()
+        names = connection.exec_driver_sql(ANSWER_OBJECTS[storage]).scalars().all()
+        answer_bytes = sum(
+            connection.exec_driver_sql("SELECT sum(pgsize) FROM dbstat WHERE name = ?",
+                                       (name,)).scalar() or 0
+            for name in names
+        )
+        db.session.commit()
+        connection = db.session.connection()
+        connection.exec_driver_sql("VACUUM")
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        file_bytes = connection.exec_driver_sql("PRAGMA page_count").scalar() * page_size
+
+        ids = db.session.execute(db.text("SELECT id FROM assessment ORDER BY id")).scalars().all()
+        rnd = random.Random(7)
+        bulk_ids = ids[:BULK_SIZE]
+        compiled = get_compiled_questionnaire(
+            QuestionnaireVersion.query.filter_by(is_active=True).first().id)
+        result = {
+            "answer_mb": answer_bytes / 1e6,
+            "file_mb": file_bytes / 1e6,
+            "single_ms": _median_ms(lambda: load_answer_rows(rnd.choice(ids)), repeat * 20),
+            "bulk_ms": _median_ms(lambda: _bulk_rows(bulk_ids), repeat),
+            "rescore_ms": _median_ms(lambda: _rescore(compiled, bulk_ids), repeat),
+            "checksum": _checksum(_rescore(compiled, bulk_ids)),
+        }
+    json.dump(result, sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen je Vorgang (Median)")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--storage", choices=STORAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        run_storage(args.run_size, args.storage, args.repeat)
+        return
+
+    print(f"{'Assessments':>11}  {'Speicher':<8} {'Antworten':>10} {'Datei':>10} "
+          f"{'1 laden':>9} {f'{BULK_SIZE} laden':>11} {f'{BULK_SIZE} Scoring':>13}  Prüfsumme")
+    for count in args.sizes:
+        for storage in STORAGES:
+            print(f"{count} Assessments, {storage} ...", file=sys.stderr)
+            with tempfile.TemporaryDirectory() as tmp:
+                env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run-size", str(count),
+                     "--storage", storage, "--repeat", str(args.repeat)],
+                    env=env, cwd=PROJECT_DIR, stdout=subprocess.PIPE, check=True
+                ).stdout
+            r = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+            print(f"{count:>11}  {storage:<8} {r['answer_mb']:>8.2f}MB {r['file_mb']:>8.2f}MB "
+                  f"{r['single_ms']:>7.2f}ms {r['bulk_ms']:>9.1f}ms {r['rescore_ms']:>11.1f}ms  "
+                  f"{r['checksum']}")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Kaltstart des kompilierten Fragebogens: Stammdaten (ORM) gegen Snapshot-Datei
+Startet je Messung einen neuen Python-Prozess (wie ein neuer WSGI-Worker) und
+misst dort die Zeit bis zum ersten kompilierten Fragebogen
+(get_active_questionnaire) – einmal mit leerem QUESTIONNAIRE_SNAPSHOT_DIR
+(Aufbau aus den Tabellen), einmal mit Snapshot-Datei. Die Hashes der
+Definitionen müssen übereinstimmen.
+
+Verwendung (aus dem Projektverzeichnis):
+    python benchmarks/questionnaire_cold_start.py
+    python benchmarks/questionnaire_cold_start.py --repeat 21
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+MODES = ("orm", "snapshot")
+
+
+def run_mode():
+    """Eine Messung im Kindprozess (DATABASE_URL und QUESTIONNAIRE_SNAPSHOT_DIR gesetzt)"""
+    from main import app
+    from services.questionnaire_cache import get_active_questionnaire
+    from services.questionnaire_snapshot import content_hash
+
+    with app.app_context():
+        started = time.perf_counter()
+        compiled = get_active_questionnaire()
+        elapsed = (time.perf_counter() - started) * 1000
+    json.dump({"ms": elapsed, "hash": content_hash(compiled.definition())}, sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=11, help="Prozessstarts je Variante (Median)")
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_mode()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                   QUESTIONNAIRE_SNAPSHOT_DIR=tmp)
+        # Schema, Seed-Daten und Snapshot anlegen
+        subprocess.run([sys.executable, "-m", "cli", "questionnaire-snapshot"], env=env,
+                       cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, check=True)
+
+        print(f"{'Variante':<9} {'Median':>9} {'Min':>9}  Hash")
+        for mode in MODES:
+            mode_env = dict(env, QUESTIONNAIRE_SNAPSHOT_DIR=tmp if mode == "snapshot" else "")
+            timings = []
+            for _ in range(args.repeat):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run"],
+                    env=mode_env, cwd=PROJECT_DIR, stdout=subprocess.PIPE, check=True
+                ).stdout
+                r = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+                timings.append(r["ms"])
+            print(f"{mode:<9} {statistics.median(timings):>7.2f}ms {min(timings):>7.2f}ms  "
+                  f"{r['hash'][:16]}")
+
+
+if __name__ == "__main__":
+    main()
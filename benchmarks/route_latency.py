@@ -0,0 +1,176 @@
+"""
+Routen-Latenz mit und ohne die Abfrage-Indizes
+Legt je Bestandsgröße eine eigene SQLite-Datenbank an (eigener Prozess mit
+DATABASE_URL), füllt sie über den Massenimport mit zufälligen Assessments und
+misst die wichtigsten Routen zuerst ohne, dann mit den Indizes aus
+migrate_indexes (Median in ms).
+
+Verwendung (aus dem Projektverzeichnis):
+    python benchmarks/route_latency.py                 # 1000, 10000, 100000
+    python benchmarks/route_latency.py 1000 5000 --repeat 9
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from io import StringIO
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+# Die mit den Abfrage-Indizes eingeführten Indizes ("ohne" = vorher)
+QUERY_INDEXES = (
+    "ix_dimension_version_sort", "ix_question_dimension_sort", "ix_process_industry",
+    "ix_assessment_process", "ix_assessment_created_at",
+)
+INDUSTRIES = ("Handel", "Bank", "Versicherung", "IT", "Logistik", "Verwaltung")
+PROCESS_NAMES = ("Rechnungsprüfung", "Bestellabwicklung", "Reisekostenabrechnung",
+                 "Kundenanlage", "Mahnwesen", "Vertragsprüfung", "Lieferantenpflege")
+REGIONS = ("Nord", "Süd", "Ost", "West", "Zentrale")
+
+
+def _random_records(compiled, count, rnd):
+    """JSONL-Datensätze mit zufälligen Antworten auf alle Fragen"""
+    for i in range(count):
+        answers = {}
+        for question in compiled.questions:
+            options = compiled.options_for(question)
+            if question.question_type == "number":
+                answers[question.code] = rnd.randint(1, 5000)
+            elif question.question_type == "multiple_choice" and options:
+                answers[question.code] = [o.code for o in rnd.sample(options, min(2, len(options)))]
+            elif options:
+                answers[question.code] = rnd.choice(options).code
+        yield json.dumps({
+            "name": f"{rnd.choice(PROCESS_NAMES)} {rnd.choice(REGIONS)} {i}",
+            "industry": rnd.choice(INDUSTRIES),
+            "answers": answers,
+        }) + "\n"
+
+
+def populate(app, count, seed=42, packed=False):
+    """Füllt die (leere) Datenbank mit `count` Assessments"""
+    from models.database import QuestionnaireVersion
+    from services.import_service import import_assessments
+    from services.questionnaire_cache import get_compiled_questionnaire
+
+    with app.app_context():
+        qv = QuestionnaireVersion.query.filter_by(is_active=True).first()
+        compiled = get_compiled_questionnaire(qv.id)
+        started = time.perf_counter()
+        report = import_assessments(
+            StringIO("".join(_random_records(compiled, count, random.Random(seed)))),
+            "jsonl", batch_size=2000, packed=packed
+        )
+        print(f"  {report['imported']} Assessments importiert "
+              f"({time.perf_counter() - started:.1f} s)", file=sys.stderr)
+
+
+def set_query_indexes(app, enabled):
+    from main import migrate_indexes
+    from extensions import db
+
+    with app.app_context():
+        if enabled:
+            migrate_indexes()
+            db.session.commit()
+        else:
+            for name in QUERY_INDEXES:
+                db.session.execute(db.text(f"DROP INDEX IF EXISTS {name}"))
+            db.session.commit()
+
+
+def _routes(app, client):
+    """(Bezeichnung, Funktion) je gemessener Anfrage"""
+    from extensions import db
+
+    with app.app_context():
+        ids = [row[0] for row in db.session.execute(db.text("SELECT id FROM assessment ORDER BY id"))]
+    middle = ids[len(ids) // 2]
+    last_page = max(len(ids) // 25, 1)
+    deletable = iter(reversed(ids))
+    today = date.today().isoformat()
+    return [
+        ("GET /", lambda: client.get("/")),
+        ("GET /comparison", lambda: client.get("/comparison")),
+        ("GET /comparison?sort=score", lambda: client.get("/comparison?sort=score")),
+        ("GET /comparison?industry=Bank", lambda: client.get("/comparison?industry=Bank")),
+        ("GET /comparison?date_from=heute", lambda: client.get(f"/comparison?date_from={today}")),
+        ("GET /comparison?page=letzte", lambda: client.get(f"/comparison?page={last_page}")),
+        ("GET /comparison/matrix (5)",
+         lambda: client.get("/comparison/matrix?ids=" + ",".join(map(str, ids[::max(len(ids) // 5, 1)][:5])))),
+        ("GET /search?q=rechnung nord", lambda: client.get("/search?q=rechnung%20nord")),
+        ("GET /assessment/<id>", lambda: client.get(f"/assessment/{middle}")),
+        ("GET /assessment/<id>/edit", lambda: client.get(f"/assessment/{middle}/edit")),
+        ("GET /ranking", lambda: client.get("/ranking")),
+        ("POST /assessment/<id>/delete", lambda: client.post(f"/assessment/{next(deletable)}/delete")),
+    ]
+
+
+def measure(app, repeat):
+    """Median-Latenz (ms) je Route nach einem Aufwärmdurchlauf"""
+    client = app.test_client()
+    results = {}
+    for label, request in _routes(app, client):
+        request()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = request()
+            response.get_data()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[label] = statistics.median(timings)
+    return results
+
+
+def run_size(count, repeat):
+    """Misst eine Bestandsgröße (im Kindprozess, DATABASE_URL ist gesetzt)"""
+    from main import app, init_database
+
+    app.config["TESTING"] = True
+    init_database()
+    populate(app, count)
+    set_query_indexes(app, False)
+    without = measure(app, repeat)
+    set_query_indexes(app, True)
+    with_indexes = measure(app, repeat)
+    json.dump({"without": without, "with": with_indexes}, sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen je Route (Median)")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        run_size(args.run_size, args.repeat)
+        return
+
+    print(f"{'Assessments':>11}  {'Route':<34} {'ohne':>9} {'mit':>9} {'Faktor':>7}")
+    for count in args.sizes:
+        print(f"{count} Assessments ...", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-size", str(count),
+                 "--repeat", str(args.repeat)],
+                env=env, cwd=PROJECT_DIR, stdout=subprocess.PIPE, check=True
+            ).stdout
+        result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+        without, with_indexes = result["without"], result["with"]
+        for label, before in without.items():
+            after = with_indexes[label]
+            print(f"{count:>11}  {label:<34} {before:>7.1f}ms {after:>7.1f}ms {before / after:>6.1f}x")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Durchsatz gleichzeitiger Leser und Schreiber je SQLite-Profil
+Füllt eine Vorlagendatenbank über den Massenimport und lässt je Profil
+(default = Rollback-Journal, wal) auf einer Kopie mehrere Prozesse parallel
+arbeiten: Schreiber senden Fragebögen an /evaluate, Leser rufen abwechselnd
+/comparison und die Ergebnisseite auf. Gemessen werden Anfragen pro Sekunde,
+fehlgeschlagene Anfragen (z. B. "database is locked") und die Leselatenz.
+
+Verwendung (aus dem Projektverzeichnis):
+    python benchmarks/sqlite_concurrency.py
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 2 --duration 20
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+PROFILES = ("default", "wal")
+
+
+def _use_database(path, profile):
+    """Muss vor dem Import von main aufgerufen werden"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["SQLITE_PROFILE"] = profile
+
+
+def prepare_template(path, count):
+    """Vorlagendatenbank (Rollback-Journal) mit `count` Assessments"""
+    _use_database(path, "default")
+    from route_latency import populate
+    from main import app, init_database
+
+    init_database()
+    populate(app, count)
+
+
+def _form_fields(app, rnd):
+    """Zufällig ausgefülltes Fragebogen-Formular (wie im Browser)"""
+    from models.database import QuestionnaireVersion
+    from services.questionnaire_cache import get_compiled_questionnaire
+
+    with app.app_context():
+        qv = QuestionnaireVersion.query.filter_by(is_active=True).first()
+        compiled = get_compiled_questionnaire(qv.id)
+    fields = [("uc_name", f"Benchmark {rnd.randint(1, 10 ** 6)}"), ("uc_desc", ""),
+              ("industry", rnd.choice(("Handel", "Bank", "IT")))]
+    for question in compiled.questions:
+        options = compiled.options_for(question)
+        if question.question_type == "number":
+            fields.append((f"q_{question.id}", str(rnd.randint(1, 5000))))
+        elif question.question_type == "multiple_choice" and options:
+            fields.append((f"q_{question.id}[]", str(rnd.choice(options).id)))
+        elif options:
+            fields.append((f"q_{question.id}", str(rnd.choice(options).id)))
+    return fields
+
+
+def client_loop(path, profile, role, duration, seed, results):
+    """Ein Leser- oder Schreiberprozess; meldet (role, ok, failed, latenzen)"""
+    _use_database(path, profile)
+    from werkzeug.datastructures import MultiDict
+    from main import app
+
+    app.config["TESTING"] = False
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    client = app.test_client()
+    rnd = random.Random(seed)
+    with app.app_context():
+        from extensions import db
+        ids = [row[0] for row in db.session.execute(db.text("SELECT id FROM assessment"))]
+    form = MultiDict(_form_fields(app, rnd))
+
+    ok = failed = 0
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == "writer":
+                response = client.post("/evaluate", data=form)
+            elif rnd.random() < 0.5:
+                response = client.get(f"/comparison?page={rnd.randint(1, 20)}")
+            else:
+                response = client.get(f"/assessment/{rnd.choice(ids)}")
+            response.get_data()
+            success = response.status_code < 500
+        except Exception:
+            success = False
+        latencies.append((time.perf_counter() - started) * 1000)
+        if success:
+            ok += 1
+        else:
+            failed += 1
+    results.put((role, ok, failed, latencies))
+
+
+def run_profile(template, profile, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        shutil.copy(template, path)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        workers = [
+            context.Process(target=client_loop,
+                            args=(path, profile, role, args.duration, seed, results))
+            for seed, role in enumerate(["reader"] * args.readers + ["writer"] * args.writers)
+        ]
+        for worker in workers:
+            worker.start()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    summary = {}
+    for role in ("reader", "writer"):
+        rows = [r for r in collected if r[0] == role]
+        latencies = sorted(l for r in rows for l in r[3])
+        summary[role] = {
+            "ok": sum(r[1] for r in rows),
+            "failed": sum(r[2] for r in rows),
+            "median": statistics.median(latencies) if latencies else 0.0,
+            "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=2000, help="Assessments in der Vorlage")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0, help="Sekunden je Profil")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        print(f"Vorlage mit {args.size} Assessments ...", file=sys.stderr)
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(target=prepare_template, args=(template, args.size))
+        process.start()
+        process.join()
+
+        print(f"{args.readers} Leser, {args.writers} Schreiber, {args.duration:.0f} s je Profil")
+        print(f"{'Profil':<8} {'Rolle':<8} {'Anfr./s':>8} {'Fehler':>7} {'Median':>9} {'p95':>9}")
+        for profile in PROFILES:
+            summary = run_profile(template, profile, args)
+            for role, values in summary.items():
+                print(f"{profile:<8} {role:<8} {values['ok'] / args.duration:>8.1f} "
+                      f"{values['failed']:>7} {values['median']:>7.1f}ms {values['p95']:>7.1f}ms")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
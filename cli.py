@@ -0,0 +1,333 @@
+"""
+Kommandozeilenwerkzeuge für Automation Fit
+
+    python -m cli import assessments.csv
+    python -m cli import assessments.jsonl --batch-size 1000
+    cat assessments.jsonl | python -m cli import - --format jsonl
+    python -m cli portfolio-rebuild
+    python -m cli optimize --budget 250000 --objective fte --rpa-share 0.6 --csv roadmap.csv
+    python -m cli export assessments.csv --industry Handel
+    python -m cli export - --format jsonl --answers > assessments.jsonl
+    python -m cli export answers.csv --level answers
+    python -m cli checkpoint --mode truncate
+    python -m cli delete --older-than 365 --industry Handel --dry-run
+    python -m cli delete --ids 4 8 15
+    python -m cli archive --older-than 180
+    python -m cli archive --restore 42
+    python -m cli archive --repack
+    python -m cli questionnaire-snapshot --rebuild
+    python -m cli questionnaire-load questionnaires/rpa_ipa_v2.json --activate
+    python -m cli questionnaire-export 1 questionnaires/rpa_ipa_v1.json
+    python -m cli --tenant acme import assessments.csv     # Mandantenbetrieb (TENANT_MODE)
+"""
+import argparse
+import csv
+import json
+import sys
+
+from werkzeug.datastructures import MultiDict
+
+from extensions import db
+from main import app, init_database
+from services.import_service import BATCH_SIZE, detect_format, import_assessments
+from services.portfolio_service import PortfolioService
+from services.optimizer_service import OBJECTIVES, TYPE_FILTERS, Candidate, optimize_portfolio
+from services.export_service import EXPORT_FORMATS, EXPORT_LEVELS, parse_export_args, generate_export
+from services.sqlite_profile import CHECKPOINT_MODES, checkpoint_wal
+from services.archive_service import (
+    ARCHIVE_BATCH_SIZE, archive_assessments, rehydrate_assessment, repack_archive
+)
+from services.deletion_service import parse_delete_args, select_assessment_ids, delete_assessments
+from services.questionnaire_cache import refresh_questionnaire_snapshots
+from services.questionnaire_loader import (
+    export_questionnaire, format_definition, load_questionnaire, read_definition
+)
+from services.tenancy import bind_process_tenant
+from models.database import QuestionnaireSnapshot
+
+
+def cmd_import(args):
+    """Massenimport aus CSV/JSONL"""
+    fmt = detect_format(None if args.file == "-" else args.file, args.format)
+    init_database()
+    with app.app_context():
+        if args.file == "-":
+            stream = open(sys.stdin.fileno(), encoding="utf-8-sig", newline="", closefd=False)
+        else:
+            stream = open(args.file, encoding="utf-8-sig", newline="")
+        with stream:
+            report = import_assessments(stream, fmt, batch_size=args.batch_size,
+                                        packed=app.config["ANSWER_STORAGE"] == "packed")
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["failed"] == 0 else 1
+
+
+def cmd_portfolio_rebuild(args):
+    """Portfolio-Kennzahlen aus den Ergebnistabellen neu aufbauen"""
+    init_database()
+    with app.app_context():
+        PortfolioService.rebuild()
+        totals = PortfolioService.summary()["totals"]
+    print(json.dumps(totals, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_optimize(args):
+    """Budgetoptimierung; Auswahl als JSON oder CSV (Roadmap)"""
+    if args.budget <= 0:
+        raise ValueError("--budget muss positiv sein")
+    if args.rpa_share is not None and not 0 <= args.rpa_share <= 1:
+        raise ValueError("--rpa-share muss zwischen 0 und 1 liegen")
+    init_database()
+    with app.app_context():
+        result = optimize_portfolio(
+            args.budget,
+            objective=args.objective,
+            min_score=args.min_score,
+            automation_type=args.type,
+            rpa_share=args.rpa_share,
+            exclude=args.exclude,
+        )
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=Candidate._fields, delimiter=";")
+            writer.writeheader()
+            writer.writerows(result["selected"])
+        result = {key: value for key, value in result.items() if key != "selected"}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_export(args):
+    """Massenexport als CSV/JSONL in eine Datei oder nach stdout"""
+    fmt = args.format or ("jsonl" if args.file.endswith((".jsonl", ".ndjson")) else "csv")
+    query_args = MultiDict([("format", fmt), ("level", args.level),
+                            ("answers", "1" if args.answers else "")])
+    for key in ("q", "industry", "recommendation", "date_from", "date_to", "min_score", "max_score"):
+        if getattr(args, key):
+            query_args.add(key, getattr(args, key))
+    for assessment_id in args.ids:
+        query_args.add("ids", str(assessment_id))
+    params = parse_export_args(query_args)
+
+    init_database()
+    with app.app_context():
+        if args.file == "-":
+            stream = open(sys.stdout.fileno(), "w", encoding="utf-8", newline="", closefd=False)
+        else:
+            stream = open(args.file, "w", encoding="utf-8", newline="")
+        with stream:
+            for chunk in generate_export(params):
+                stream.write(chunk)
+    return 0
+
+
+def cmd_checkpoint(args):
+    """WAL in die Datenbankdatei zurückschreiben (z. B. vor einer Sicherung)"""
+    with app.app_context():
+        busy, wal_pages, checkpointed = checkpoint_wal(db.session.get_bind(), args.mode)
+    if wal_pages < 0:
+        print("Datenbank läuft nicht im WAL-Modus")
+        return 0
+    print(f"{checkpointed} von {wal_pages} WAL-Seiten zurückgeschrieben"
+          + (" (durch aktive Verbindungen blockiert)" if busy else ""))
+    return 1 if busy else 0
+
+
+def cmd_delete(args):
+    """Assessments nach IDs und/oder Filtern in einer Transaktion löschen"""
+    query_args = MultiDict()
+    for key in ("older_than", "q", "industry", "recommendation", "date_from", "date_to",
+                "min_score", "max_score"):
+        if getattr(args, key):
+            query_args.add(key, str(getattr(args, key)))
+    for assessment_id in args.ids:
+        query_args.add("ids", str(assessment_id))
+    params = parse_delete_args(query_args)
+
+    init_database()
+    with app.app_context():
+        report = delete_assessments(select_assessment_ids(params), dry_run=args.dry_run)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_archive(args):
+    """Antworten alter Assessments archivieren bzw. einzelne zurückholen"""
+    init_database()
+    with app.app_context():
+        if args.restore:
+            restored = [assessment_id for assessment_id in args.restore
+                        if rehydrate_assessment(assessment_id)]
+            print(json.dumps({"restored": restored}, ensure_ascii=False, indent=2))
+            return 0
+        if args.repack:
+            repacked = repack_archive(batch_size=args.batch_size)
+            db.session.commit()
+            print(json.dumps({"repacked": repacked}, ensure_ascii=False, indent=2))
+            return 0
+        older_than = app.config["ARCHIVE_AFTER_DAYS"] if args.older_than is None else args.older_than
+        report = archive_assessments(older_than, batch_size=args.batch_size)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_questionnaire_snapshot(args):
+    """Fragebogen-Snapshots schreiben (mit --rebuild alle, z. B. nach SQL-Änderungen)"""
+    init_database()
+    with app.app_context():
+        if not app.config["QUESTIONNAIRE_SNAPSHOT_DIR"]:
+            raise ValueError("QUESTIONNAIRE_SNAPSHOT_DIR ist leer, Snapshots sind abgeschaltet")
+        if args.rebuild:
+            db.session.query(QuestionnaireSnapshot).delete()
+        written = refresh_questionnaire_snapshots()
+        db.session.commit()
+    print(json.dumps({"written": written, "directory": app.config["QUESTIONNAIRE_SNAPSHOT_DIR"]},
+                     ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_questionnaire_load(args):
+    """Fragebogen-Definition (JSON) prüfen und als neue Version anlegen"""
+    doc = read_definition(args.file)
+    init_database()
+    with app.app_context():
+        report = load_questionnaire(doc, activate=True if args.activate else None)
+        if args.dry_run:
+            db.session.rollback()
+        else:
+            refresh_questionnaire_snapshots()
+            db.session.commit()
+    print(json.dumps({**report, "dry_run": args.dry_run}, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_questionnaire_export(args):
+    """Gespeicherte Fragebogen-Version als Definition (JSON) ausgeben"""
+    init_database()
+    with app.app_context():
+        text = format_definition(export_questionnaire(args.version_id))
+    if args.file == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.file, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0
+
+
+def main():
+    """Kommandozeilen-Einstieg"""
+    parser = argparse.ArgumentParser(description="Automation Fit Kommandozeilenwerkzeuge")
+    parser.add_argument("--tenant", help="Datenbank dieses Mandanten verwenden (TENANT_MODE)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p_import = commands.add_parser("import", help="Assessments aus CSV/JSONL importieren")
+    p_import.add_argument("file", help="Pfad zur Datei oder - für stdin")
+    p_import.add_argument("--format", choices=["csv", "jsonl"],
+                          help="Format (Standard: aus Dateiendung)")
+    p_import.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                          help="Datensätze pro Transaktion")
+    p_import.set_defaults(handler=cmd_import)
+
+    p_portfolio = commands.add_parser("portfolio-rebuild",
+                                      help="Portfolio-Kennzahlen neu berechnen")
+    p_portfolio.set_defaults(handler=cmd_portfolio_rebuild)
+
+    p_optimize = commands.add_parser("optimize",
+                                     help="Prozessauswahl mit maximalem Nutzen im Budget")
+    p_optimize.add_argument("--budget", type=float, required=True,
+                            help="Budget für Kosten im ersten Jahr (€)")
+    p_optimize.add_argument("--objective", choices=list(OBJECTIVES), default="benefit",
+                            help="Zielgröße: personeller Nutzen oder FTE-Einsparung")
+    p_optimize.add_argument("--min-score", type=float, help="Mindestwert combined_score")
+    p_optimize.add_argument("--type", choices=TYPE_FILTERS, default="any",
+                            help="Nur RPA- bzw. IPA-Kandidaten")
+    p_optimize.add_argument("--rpa-share", type=float,
+                            help="Fester Budgetanteil für RPA (0-1), Rest für IPA")
+    p_optimize.add_argument("--exclude", type=int, nargs="*", default=[],
+                            help="Auszuschließende Assessment-IDs")
+    p_optimize.add_argument("--csv", help="Auswahl zusätzlich als CSV schreiben")
+    p_optimize.set_defaults(handler=cmd_optimize)
+
+    p_export = commands.add_parser("export", help="Assessments als CSV/JSONL exportieren")
+    p_export.add_argument("file", help="Zieldatei oder - für stdout")
+    p_export.add_argument("--format", choices=list(EXPORT_FORMATS),
+                          help="Format (Standard: aus Dateiendung, sonst csv)")
+    p_export.add_argument("--level", choices=list(EXPORT_LEVELS), default="assessments",
+                          help="assessments: eine Zeile pro Assessment, answers: eine pro Antwort")
+    p_export.add_argument("--answers", action="store_true", help="Antworten mit exportieren")
+    p_export.add_argument("--ids", type=int, nargs="*", default=[], help="Nur diese Assessments")
+    p_export.add_argument("--q", help="Suchbegriff (Prozess)")
+    p_export.add_argument("--industry", help="Branche")
+    p_export.add_argument("--recommendation", help="Empfehlung")
+    p_export.add_argument("--date-from", help="Erstellt ab (YYYY-MM-DD)")
+    p_export.add_argument("--date-to", help="Erstellt bis (YYYY-MM-DD)")
+    p_export.add_argument("--min-score", help="Mindestwert combined_score")
+    p_export.add_argument("--max-score", help="Höchstwert combined_score")
+    p_export.set_defaults(handler=cmd_export)
+
+    p_checkpoint = commands.add_parser("checkpoint", help="SQLite-WAL zurückschreiben")
+    p_checkpoint.add_argument("--mode", type=str.upper, choices=CHECKPOINT_MODES,
+                              default="TRUNCATE", help="Checkpoint-Modus (Standard: TRUNCATE)")
+    p_checkpoint.set_defaults(handler=cmd_checkpoint)
+
+    p_delete = commands.add_parser("delete", help="Assessments nach IDs/Filtern löschen")
+    p_delete.add_argument("--ids", type=int, nargs="*", default=[], help="Assessment-IDs")
+    p_delete.add_argument("--older-than", type=int, metavar="TAGE",
+                          help="Nur Assessments, die älter als TAGE Tage sind")
+    p_delete.add_argument("--q", help="Suchbegriff (Prozess)")
+    p_delete.add_argument("--industry", help="Branche")
+    p_delete.add_argument("--recommendation", help="Empfehlung")
+    p_delete.add_argument("--date-from", help="Erstellt ab (YYYY-MM-DD)")
+    p_delete.add_argument("--date-to", help="Erstellt bis (YYYY-MM-DD)")
+    p_delete.add_argument("--min-score", help="Mindestwert combined_score")
+    p_delete.add_argument("--max-score", help="Höchstwert combined_score")
+    p_delete.add_argument("--dry-run", action="store_true",
+                          help="Nur zählen, nichts löschen (Transaktion wird zurückgerollt)")
+    p_delete.set_defaults(handler=cmd_delete)
+
+    p_archive = commands.add_parser("archive",
+                                    help="Antworten alter Assessments komprimiert archivieren")
+    p_archive.add_argument("--older-than", type=int, metavar="TAGE",
+                           help="Mindestalter in Tagen (Standard: ARCHIVE_AFTER_DAYS)")
+    p_archive.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                           help="Assessments pro Transaktion")
+    p_archive.add_argument("--restore", type=int, nargs="+", metavar="ID",
+                           help="Diese Assessments aus dem Archiv zurückholen")
+    p_archive.add_argument("--repack", action="store_true",
+                           help="Blöcke älterer Formate im aktuellen Format neu schreiben")
+    p_archive.set_defaults(handler=cmd_archive)
+
+    p_snapshot = commands.add_parser("questionnaire-snapshot",
+                                     help="Snapshots der kompilierten Fragebögen schreiben")
+    p_snapshot.add_argument("--rebuild", action="store_true",
+                            help="Alle Snapshots neu schreiben, auch wenn ihr Hash vorhanden ist")
+    p_snapshot.set_defaults(handler=cmd_questionnaire_snapshot)
+
+    p_qload = commands.add_parser("questionnaire-load",
+                                  help="Fragebogen aus Definitionsdatei (JSON) anlegen")
+    p_qload.add_argument("file", help="Definitionsdatei, z. B. questionnaires/rpa_ipa_v1.json")
+    p_qload.add_argument("--activate", action="store_true",
+                         help="Als aktive Version setzen (sonst is_active der Datei)")
+    p_qload.add_argument("--dry-run", action="store_true",
+                         help="Nur prüfen und zählen, nichts speichern")
+    p_qload.set_defaults(handler=cmd_questionnaire_load)
+
+    p_qexport = commands.add_parser("questionnaire-export",
+                                    help="Fragebogen-Version als Definitionsdatei (JSON) ausgeben")
+    p_qexport.add_argument("version_id", type=int, help="ID der Fragebogen-Version")
+    p_qexport.add_argument("file", help="Zieldatei oder - für stdout")
+    p_qexport.set_defaults(handler=cmd_questionnaire_export)
+
+    args = parser.parse_args()
+    try:
+        if args.tenant:
+            bind_process_tenant(app, args.tenant)
+        return args.handler(args)
+    except ValueError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
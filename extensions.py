@@ -3,4 +3,6 @@ Zentrale Extensions für Flask-App
 """
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from services.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -3,18 +3,52 @@ Automation Fit
 """
 import os
 import csv
-from io import StringIO
-from flask import Flask, render_template, request, redirect, url_for, jsonify, Response
+from io import StringIO, TextIOWrapper
+from flask import (
+    Flask, render_template, request, redirect, url_for, jsonify, Response, abort,
+    stream_with_context, g
+)
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 
 # Imports für Datenbank
 from extensions import db
 from models.database import (
-    QuestionnaireVersion, Dimension, Question, ScaleOption,
-    Process, Assessment, Answer, DimensionResult, TotalResult, Hint, QuestionCondition,
-    SharedDimensionAnswer, EconomicMetric
+    Process, Assessment, Answer, DimensionResult, TotalResult,
+    SharedDimensionAnswer, PortfolioAggregate, AnswerArchive
 )
+from models.baseline_schema import BASELINE_SCHEMA
+from models.cascade_schema import CASCADE_SCHEMA
 from services.scoring_service import ScoringService
+from services.scoring_engine import AnswerRow, apply_filter_logic as filter_answer_rows
+from services.questionnaire_cache import (
+    get_compiled_questionnaire, get_active_questionnaire, register_invalidation_hook,
+    invalidate_compiled_questionnaire
+)
+from services.questionnaire_snapshot import default_snapshot_dir
+from services.scoring_queue import ScoringQueue
+from services.job_queue import ScoringJobQueue
+from services.sqlite_profile import (
+    WalCheckpointer, configure_sqlite_engine, profile_pragmas, read_only_pragmas
+)
+from services.db_routing import READ_BIND_KEY, read_bind_options, read_only
+from services.tenancy import TENANT_ENVIRON_KEY, TenantEngines, validate_tenant
+from services.schema_migrations import Migration, apply_migrations, rebuild_sqlite_table
+from services.import_service import detect_format, import_assessments
+from services.result_service import get_result_view, delete_result_snapshot, load_answer_rows
+from services.portfolio_service import PortfolioService
+from services.search_service import PROCESS_SEARCH_DDL, MAX_RESULTS, search_processes
+from services.ranking_service import DEFAULT_WEIGHTS, parse_ranking_args, top_candidates
+from services.optimizer_service import parse_optimizer_args, optimize_portfolio
+from services.export_service import EXPORT_FORMATS, parse_export_args, generate_export
+from services.archive_service import rehydrate_assessment, pack_assessment, repack_archive
+from services.answer_packing import PackedAnswersError
+from services.deletion_service import parse_delete_args, select_assessment_ids, delete_assessments
+from services.comparison_service import (
+    parse_comparison_args, get_comparison_page, has_active_filters, list_industries,
+    parse_assessment_ids, build_comparison_matrix,
+    RECOMMENDATIONS, PER_PAGE_CHOICES, MAX_MATRIX_ASSESSMENTS
+)
 from seed_data import seed_data
 
 # App-Konfiguration
@@ -52,19 +86,122 @@ app.jinja_env.filters['question_regex'] = question_regex
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(BASE_DIR, 'data', 'decision_support.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{db_path}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Auswertung: 'sync' (im Request), 'async' (Thread-Pool mit Status-Polling)
+# oder 'queue' (persistente Job-Tabelle, abgearbeitet von python -m worker)
+app.config['SCORING_MODE'] = os.environ.get('SCORING_MODE', 'sync')
+# Standardgewichte der Rangliste (/ranking), je Anfrage per w_score, w_roi, w_fte überschreibbar
+app.config['RANKING_WEIGHTS'] = dict(DEFAULT_WEIGHTS)
+# SQLite-Profil: 'wal' (Write-Ahead-Log, Leser werden nicht blockiert) oder 'default';
+# einzelne PRAGMAs lassen sich über app.config['SQLITE_PRAGMAS'] überschreiben
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'wal')
+# Archivierung: Antworten ausgewerteter Assessments, die älter als so viele Tage
+# sind, verschiebt python -m cli archive in komprimierte Blöcke (answer_archive)
+app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+# Antwortspeicher: 'rows' (eine Zeile je Antwort in answer) oder 'packed' (nach der
+# Auswertung ein gepackter Block je Assessment in answer_archive, siehe answer_packing)
+app.config['ANSWER_STORAGE'] = os.environ.get('ANSWER_STORAGE', 'rows')
+# Snapshot-Dateien der kompilierten Fragebögen (schneller Kaltstart neuer Worker):
+# Standard ist das Verzeichnis der SQLite-Datei, ein leerer Wert schaltet sie ab
+app.config['QUESTIONNAIRE_SNAPSHOT_DIR'] = os.environ.get(
+    'QUESTIONNAIRE_SNAPSHOT_DIR',
+    default_snapshot_dir(app.config['SQLALCHEMY_DATABASE_URI'], os.path.join(BASE_DIR, 'data'))
+)
+# Mandantenbetrieb: 'off' oder Zuordnung je Anfrage über 'subdomain', 'header'
+# bzw. 'path' (/t/<mandant>/...); jeder Mandant hat eine eigene SQLite-Datei in TENANT_DIR
+app.config['TENANT_MODE'] = os.environ.get('TENANT_MODE', 'off')
+app.config['TENANT_HEADER'] = os.environ.get('TENANT_HEADER', 'X-Tenant')
+app.config['TENANT_BASE_DOMAIN'] = os.environ.get('TENANT_BASE_DOMAIN')
+app.config['TENANT_DIR'] = os.environ.get('TENANT_DIR', os.path.join(BASE_DIR, 'data', 'tenants'))
+# Eingerichtete Mandanten (kommagetrennt); Anfragen für andere Mandanten ohne
+# vorhandene Datei erhalten 404, statt eine neue Datenbank anzulegen
+app.config['TENANTS'] = [name.strip() for name in os.environ.get('TENANTS', '').split(',')
+                         if name.strip()]
+# Höchstzahl gleichzeitig geöffneter Mandanten-Datenbanken (LRU)
+app.config['TENANT_ENGINE_CACHE_SIZE'] = int(os.environ.get('TENANT_ENGINE_CACHE_SIZE', 16))
+# Lesende Routen (@read_only) nutzen eine eigene Engine mit eigenem Pool:
+# DATABASE_READ_URL (z. B. Replikat), sonst bei SQLite dieselbe Datei schreibgeschützt
+app.config['SQLALCHEMY_READ_URI'] = os.environ.get('DATABASE_READ_URL')
+app.config['SQLALCHEMY_READ_POOL_SIZE'] = 10
+read_bind = read_bind_options(app.config['SQLALCHEMY_DATABASE_URI'],
+                              app.config['SQLALCHEMY_READ_URI'],
+                              app.config['SQLALCHEMY_READ_POOL_SIZE'])
+if read_bind:
+    app.config['SQLALCHEMY_BINDS'] = {READ_BIND_KEY: read_bind}
 
 # Initialisiere Datenbank
 db.init_app(app)
+# Kompilierte Fragebögen nach ORM-Änderungen an den Stammdaten verwerfen
+register_invalidation_hook(db.session)
+with app.app_context():
+    sqlite_pragmas = profile_pragmas(app.config)
+    configure_sqlite_engine(db.engine, sqlite_pragmas)
+    if READ_BIND_KEY in db.engines:
+        configure_sqlite_engine(db.engines[READ_BIND_KEY], read_only_pragmas(sqlite_pragmas))
+scoring_queue = ScoringQueue(app)
+wal_checkpointer = WalCheckpointer(app, db)
 
 # Hilfsfunktion: Datenbank initialisieren
 def init_database():
-    """Erstellt Tabellen und lädt Testdaten"""
+    """Bringt das Schema per Migrationen auf den aktuellen Stand und lädt Testdaten"""
     with app.app_context():
-        db.create_all()
-        migrate_shared_dimension_answer_constraint()
-        seed_data()
+        migrate_database()
+
+
+def migrate_database():
+    """Migrationen für die Datenbank des aktuellen App-Kontexts (im
+    Mandantenbetrieb die des Mandanten). Ist das Schema aktuell, genügt eine
+    Abfrage; Fragebogen-Snapshots schreiben Migration 11 und
+    python -m cli questionnaire-snapshot."""
+    applied = apply_migrations(MIGRATIONS)
+    if applied:
+        print(f"Datenbankschema auf Version {applied[-1]} aktualisiert"
+              + (f" (Mandant {g.tenant})" if g.get('tenant') else ""))
+
+
+# Mandanten-Datenbanken: bei der ersten Anfrage migriert, verdrängte Engines
+# geben auch ihre kompilierten Fragebögen frei
+tenant_engines = TenantEngines(app, initializer=migrate_database)
+tenant_engines.on_evict(lambda tenant: invalidate_compiled_questionnaire(tenant=tenant))
+
+
+@app.before_request
+def select_tenant():
+    """Ordnet die Anfrage im Mandantenbetrieb ihrem Mandanten zu (g.tenant)"""
+    if not tenant_engines.enabled or request.endpoint == 'static':
+        return None
+    try:
+        tenant = validate_tenant(request.environ.get(TENANT_ENVIRON_KEY))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not tenant_engines.is_provisioned(tenant):
+        return jsonify({'success': False, 'error': f"Unbekannter Mandant '{tenant}'"}), 404
+    g.tenant = tenant
+    tenant_engines.ensure_ready(g.tenant)
+    return None
+
+
+@app.errorhandler(PackedAnswersError)
+def packed_answers_error(e):
+    """Archivierte Antworten (Format 2), deren Fragebogen seit dem Packen geändert wurde"""
+    return (f"Die archivierten Antworten lassen sich nicht lesen: {e}. "
+            "Der Fragebogen wurde nach dem Archivieren geändert; "
+            "bitte die ursprüngliche Reihenfolge wiederherstellen "
+            "und `python -m cli archive --repack` ausführen."), 409
+
+
+def create_tables():
+    """Legt die fehlenden Tabellen des Ausgangsschemas an (inkl. ihrer Indizes;
+    vorhandene Tabellen bleiben unverändert, siehe models/baseline_schema.py)."""
+    connection = db.session.connection()
+    existing = set(connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type='table'"
+    ).scalars())
+    for table, statements in BASELINE_SCHEMA:
+        if table not in existing:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
 
 
 def migrate_shared_dimension_answer_constraint():
@@ -87,9 +224,8 @@ def migrate_shared_dimension_answer_constraint():
 
     db.session.execute(text("ALTER TABLE shared_dimension_answer " \
     "RENAME TO shared_dimension_answer_old"))
-    db.session.commit()
 
-    SharedDimensionAnswer.__table__.create(bind=db.engine)
+    SharedDimensionAnswer.__table__.create(bind=db.session.connection())
 
     db.session.execute(text("""
         INSERT OR IGNORE INTO shared_dimension_answer
@@ -99,7 +235,143 @@ def migrate_shared_dimension_answer_constraint():
         FROM shared_dimension_answer_old
     """))
     db.session.execute(text("DROP TABLE shared_dimension_answer_old"))
-    db.session.commit()
+
+
+def migrate_total_result_combined_score():
+    """Ergänzt total_result.combined_score (inkl. Index) und füllt
+    die Spalte für bestehende Ergebnisse."""
+    columns = [row[1] for row in db.session.execute(text("PRAGMA table_info(total_result)"))]
+    if "combined_score" not in columns:
+        db.session.execute(text("ALTER TABLE total_result ADD COLUMN combined_score FLOAT"))
+
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_total_result_combined_score "
+        "ON total_result (combined_score)"
+    ))
+    # Gleiche Regel wie ScoringService.combined_score (0 und NULL zählen nicht)
+    db.session.execute(text("""
+        UPDATE total_result SET combined_score = CASE
+            WHEN COALESCE(total_rpa, 0) <> 0 AND COALESCE(total_ipa, 0) <> 0
+                THEN MAX(total_rpa, total_ipa)
+            WHEN COALESCE(total_rpa, 0) <> 0 THEN total_rpa
+            WHEN COALESCE(total_ipa, 0) <> 0 THEN total_ipa
+            ELSE 0
+        END
+        WHERE combined_score IS NULL
+    """))
+
+
+def migrate_portfolio_aggregate():
+    """Befüllt portfolio_aggregate einmalig aus vorhandenen Ergebnissen."""
+    has_results = db.session.query(TotalResult.id).first() is not None
+    has_aggregates = db.session.query(PortfolioAggregate.id).first() is not None
+    if has_results and not has_aggregates:
+        PortfolioService.rebuild(commit=False)
+
+
+def migrate_process_search():
+    """Legt den FTS5-Suchindex process_search samt Triggern an
+    und indiziert vorhandene Prozesse."""
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='process_search'")
+    ).first()
+    if exists:
+        return
+    try:
+        with db.session.begin_nested():
+            for statement in PROCESS_SEARCH_DDL:
+                db.session.execute(text(statement))
+    except OperationalError as e:
+        print(f"⚠️ Volltextsuche nicht verfügbar (SQLite ohne FTS5): {e}")
+
+
+def migrate_indexes():
+    """Legt die Abfrage-Indizes (Rangliste, Vergleich, Suche, Formular,
+    Job-Warteschlange) auf bestehenden Datenbanken an (create_all ergänzt
+    keine Indizes auf vorhandenen Tabellen)."""
+    for statement in (
+        'CREATE INDEX IF NOT EXISTS ix_economic_metric_key_value '
+        'ON economic_metric ("key", value, assessment_id)',
+        'CREATE INDEX IF NOT EXISTS ix_economic_metric_assessment_key '
+        'ON economic_metric (assessment_id, "key", value)',
+        'CREATE INDEX IF NOT EXISTS ix_dimension_version_sort '
+        'ON dimension (questionnaire_version_id, sort_order)',
+        'CREATE INDEX IF NOT EXISTS ix_question_dimension_sort '
+        'ON question (dimension_id, sort_order)',
+        'CREATE INDEX IF NOT EXISTS ix_process_industry ON process (industry)',
+        'CREATE INDEX IF NOT EXISTS ix_assessment_process ON assessment (process_id)',
+        'CREATE INDEX IF NOT EXISTS ix_assessment_created_at ON assessment (created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_scoring_job_status_available '
+        'ON scoring_job (status, available_at)',
+        'CREATE INDEX IF NOT EXISTS ix_scoring_job_assessment ON scoring_job (assessment_id)',
+    ):
+        db.session.execute(text(statement))
+
+
+def migrate_assessment_cascade():
+    """Baut die von assessment abhängigen Tabellen mit ON DELETE CASCADE
+    auf den Fremdschlüsseln neu auf (DDL: models/cascade_schema.py)."""
+    for table, statements in CASCADE_SCHEMA:
+        rebuild_sqlite_table(table, statements)
+
+
+def migrate_answer_archive():
+    """Legt die Tabelle answer_archive an (DDL vom Stand dieser Migration)."""
+    db.session.execute(text("""
+        CREATE TABLE IF NOT EXISTS answer_archive (
+            assessment_id INTEGER NOT NULL,
+            format_version INTEGER NOT NULL,
+            answer_count INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            archived_at DATETIME,
+            PRIMARY KEY (assessment_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE
+        )
+    """))
+
+
+def migrate_packed_answers():
+    """Schreibt Archivblöcke älterer Formate im aktuellen gepackten Format neu."""
+    repack_archive()
+
+
+def migrate_questionnaire_snapshot():
+    """Legt die Tabelle questionnaire_snapshot an (DDL vom Stand dieser Migration);
+    die Snapshot-Dateien entstehen beim ersten Laden eines Fragebogens."""
+    db.session.execute(text("""
+        CREATE TABLE IF NOT EXISTS questionnaire_snapshot (
+            questionnaire_version_id INTEGER NOT NULL,
+            content_hash VARCHAR(64) NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (questionnaire_version_id),
+            FOREIGN KEY(questionnaire_version_id) REFERENCES questionnaire_version (id)
+                ON DELETE CASCADE
+        )
+    """))
+
+
+# Schema-Migrationen in Anwendungsreihenfolge; Änderungen nur als neue Version anhängen.
+# Migration 1 legt das Schema vom Stand der Einführung von schema_version an
+# (models/baseline_schema.py). Die Versionen 2, 3, 4 und 6 holen diesen Stand auf
+# Datenbanken nach, die vorher per create_all angelegt wurden; auf neuen Datenbanken
+# ändern sie nichts (5 legt dort die Volltextsuche an, 7 die Seed-Daten). Die
+# Versionen 1-7 sind deshalb idempotent. Ab Version 8 gehört jede Änderung
+# allein ihrer Migration.
+MIGRATIONS = [
+    Migration(1, "Tabellen anlegen", create_tables),
+    Migration(2, "shared_dimension_answer: UNIQUE inkl. scale_option_id",
+              migrate_shared_dimension_answer_constraint),
+    Migration(3, "total_result.combined_score", migrate_total_result_combined_score),
+    Migration(4, "portfolio_aggregate befüllen", migrate_portfolio_aggregate),
+    Migration(5, "Volltextsuche process_search", migrate_process_search),
+    Migration(6, "Abfrage-Indizes", migrate_indexes),
+    Migration(7, "Fragebogen (Seed-Daten)", seed_data),
+    Migration(8, "ON DELETE CASCADE für Assessment-Daten", migrate_assessment_cascade),
+    Migration(9, "Antwortarchiv answer_archive", migrate_answer_archive),
+    Migration(10, "Gepackte Antworten in answer_archive", migrate_packed_answers),
+    Migration(11, "Fragebogen-Snapshots questionnaire_snapshot", migrate_questionnaire_snapshot),
+    Migration(12, "Gepackte Antworten mit Frage- und Options-IDs", migrate_packed_answers),
+]
 
 
 def build_answers_map(assessment_id: int):
@@ -109,8 +381,9 @@ def build_answers_map(assessment_id: int):
         "numeric": float|None,
         "single": int|None,
         "multi": [int, ...]   }
+    Archivierte bzw. gepackte Antworten werden gelesen, ohne sie zurückzuholen.
     """
-    rows = Answer.query.filter_by(assessment_id=assessment_id).all()
+    rows = load_answer_rows(assessment_id)
     answers_map = {}
 
     for a in rows:
@@ -130,45 +403,31 @@ def build_answers_map(assessment_id: int):
     return answers_map
 
 
-def build_hints_map(questionnaire_version_id: int):
+def build_hints_map(compiled):
     """
     Rückgabe:
       hints_map[qid][option_id] = [{"text": "...", "type": "info|warning|error"}, ...]
     """
-    hints = (
-        Hint.query
-        .join(Question, Hint.question_id == Question.id)
-        .filter(Question.questionnaire_version_id == questionnaire_version_id)
-        .all()
-    )
-
     hints_map = {}
-    for h in hints:
-        qid = h.question_id
-        opt_id = h.scale_option_id
-        if qid not in hints_map:
-            hints_map[qid] = {}
-        if opt_id is None:
-            continue
-        hints_map[qid].setdefault(opt_id, []).append({
-            "text": h.hint_text,
-            "type": h.hint_type
-        })
+    for qid, hints in compiled.hints_by_question.items():
+        hints_map[qid] = {}
+        for h in hints:
+            if h.scale_option_id is None:
+                continue
+            hints_map[qid].setdefault(h.scale_option_id, []).append({
+                "text": h.text,
+                "type": h.hint_type
+            })
     return hints_map
 
 # Gemeinsame Dimensionen - Hilfsfunktionen
 def get_shared_dimension_ids():
     """Gibt die IDs der Dimensionen zurück, die gemeinsam gespeichert werden können (Dim 1 & 2)"""
-    qv = QuestionnaireVersion.query.filter_by(is_active=True).first()
-    if not qv:
+    compiled = get_active_questionnaire()
+    if not compiled:
         return []
     # Nur Dimensionen 1 (Plattformverfügbarkeit) und 2 (Organisatorisch) shared
-    dimensions = Dimension.query.filter_by(
-        questionnaire_version_id=qv.id
-    ).filter(
-        Dimension.code.in_(['1','2'])
-    ).all()
-    return [d.id for d in dimensions]
+    return sorted(d.id for d in compiled.dimensions if d.code in ('1', '2'))
 
 
 def load_shared_dimension_answers(dimension_id):
@@ -230,23 +489,15 @@ def save_shared_dimension_answers(dimension_id, answers_data):
                 )
                 db.session.add(shared_answer)
 
-def serialize_question(question: Question, answers_map: dict, hints_map: dict):
-    """Serialisiert eine Frage mit ihren Optionen, 
+def serialize_question(compiled, question, answers_map: dict, hints_map: dict):
+    """Serialisiert eine Frage (QuestionDef) mit ihren Optionen,
     Antworten und Bedingungen für die Frontend-Darstellung."""
-    options = []
-    if question.scale_id:
-        opts = (
-            ScaleOption.query
-            .filter_by(scale_id=question.scale_id)
-            .order_by(ScaleOption.sort_order.asc())
-            .all()
-        )
-        options = [{
-            "id": o.id,
-            "code": o.code,
-            "label": o.label,
-            "is_na": bool(o.is_na),
-        } for o in opts]
+    options = [{
+        "id": o.id,
+        "code": o.code,
+        "label": o.label,
+        "is_na": o.is_na,
+    } for o in compiled.options_for(question)]
 
     # Answer aus answers_map
     ans = answers_map.get(question.id, {"numeric": None, "single": None, "multi": []})
@@ -258,20 +509,11 @@ def serialize_question(question: Question, answers_map: dict, hints_map: dict):
     else:
         answer_value = ans["single"]  # single_choice
 
-    # Conditions
-    conds = (
-        QuestionCondition.query
-        .filter_by(question_id=question.id)
-        .order_by(QuestionCondition.sort_order.asc())
-        .all()
-    )
-    conditions = [{"question_id": c.depends_on_question_id,
-                   "option_id": c.depends_on_option_id} for c in conds]
-
+    # Conditions (bereits inkl. Legacy-Abhängigkeit)
+    conditions = [{"question_id": parent_id, "option_id": option_id}
+                  for parent_id, option_id in question.conditions]
     legacy_dep_q = question.depends_on_question_id
     legacy_dep_opt = question.depends_on_option_id
-    if not conditions and legacy_dep_q and legacy_dep_opt:
-        conditions = [{"question_id": legacy_dep_q, "option_id": legacy_dep_opt}]
 
     question_dict = {
         "id": question.id,
@@ -287,7 +529,7 @@ def serialize_question(question: Question, answers_map: dict, hints_map: dict):
 
         "hints": hints_map.get(question.id, {}),
 
-        "depends_logic": getattr(question, "depends_logic", "all"),
+        "depends_logic": question.depends_logic,
         "conditions": conditions,
 
         "depends_on": legacy_dep_q,
@@ -301,111 +543,68 @@ def serialize_question(question: Question, answers_map: dict, hints_map: dict):
 def apply_filter_logic(assessment_id):
     """
     Wendet die Filterlogik an und setzt is_applicable für alle Antworten basierend auf Bedingungen.
-    
-    Die Funktion:
-    1. Lädt alle Fragen und Antworten für das Assessment
-    2. Baut eine Map der beantworteten Optionen auf
-    3. Evaluiert für jede Frage, ob sie anwendbar ist (basierend auf Bedingungen)
-    4. Setzt das is_applicable Flag entsprechend
-    5. Iteriert mehrfach, um Kaskaden-Abhängigkeiten zu behandeln
+
+    Die Bedingungen wertet scoring_engine.apply_filter_logic auf dem kompilierten
+    Fragebogen aus (inkl. Kaskaden-Abhängigkeiten); geänderte Antworten werden
+    zurückgeschrieben, nicht mehr anwendbare verlieren ihre Werte.
     """
     assessment = db.session.get(Assessment, assessment_id)
     if not assessment:
         return
 
-    # Alle Fragen für diese Questionnaire Version
-    all_questions = Question.query.filter_by(
-        questionnaire_version_id=assessment.questionnaire_version_id
-    ).order_by(Question.dimension_id, Question.sort_order).all()
-
-    def get_conditions(q):
-        """Liefert alle Bedingungen für eine Frage (neu + legacy)"""
-        if q.conditions:
-            return [(c.depends_on_question_id, c.depends_on_option_id) for c in q.conditions]
-        if q.depends_on_question_id and q.depends_on_option_id:
-            return [(q.depends_on_question_id, q.depends_on_option_id)]
-        return []
+    compiled = get_compiled_questionnaire(assessment.questionnaire_version_id)
+    answers = Answer.query.filter_by(assessment_id=assessment_id).order_by(Answer.id).all()
+    filtered = filter_answer_rows(compiled, [
+        AnswerRow(a.question_id, a.scale_option_id, a.numeric_value, a.is_applicable)
+        for a in answers
+    ])
+    for answer, row in zip(answers, filtered):
+        if answer.is_applicable != row.is_applicable:
+            answer.is_applicable = row.is_applicable
+            # Wenn Frage nicht mehr anwendbar, lösche die Antwort-Werte
+            if not row.is_applicable:
+                answer.scale_option_id = None
+                answer.numeric_value = None
+
+
+# Hilfsfunktion: Auswertung eines Assessments (synchron oder als Job)
+def run_scoring_job(assessment_id):
+    """Wendet die Filterlogik an und berechnet alle Ergebnisse eines Assessments."""
+    rehydrate_assessment(assessment_id)
+    apply_filter_logic(assessment_id)
+    db.session.commit()
+    ScoringService.calculate_assessment_results(assessment_id)
+    if app.config['ANSWER_STORAGE'] == 'packed':
+        pack_assessment(assessment_id)
 
-    def build_answer_map():
-        """
-        Baut eine Map: question_id -> set(selected_option_ids)
-        Nur für is_applicable=True Antworten
-        """
-        answers = Answer.query.filter_by(
-            assessment_id=assessment_id,
-            is_applicable=True
-        ).all()
-
-        answer_map = {}
-        for ans in answers:
-            qid = ans.question_id
-            if qid not in answer_map:
-                answer_map[qid] = set()
-            if ans.scale_option_id is not None:
-                answer_map[qid].add(ans.scale_option_id)
-
-        return answer_map
-
-    def evaluate_applicable(q, answer_map):
-        """
-        Prüft, ob eine Frage anwendbar ist basierend auf ihren Bedingungen
-        """
-        conds = get_conditions(q)
-
-        # Keine Bedingungen = immer anwendbar
-        if not conds:
-            return True
-
-        # Logik: "all" oder "any"
-        logic = getattr(q, 'depends_logic', 'all').lower()
-
-        # Prüfe jede Bedingung
-        results = []
-        for parent_q_id, required_opt_id in conds:
-            # Wurde die erforderliche Option für die parent-Frage gewählt?
-            is_met = required_opt_id in answer_map.get(parent_q_id, set())
-            results.append(is_met)
-
-        # Wende Logik an
-        if logic == "any":
-            return any(results)  # Mindestens eine Bedingung erfüllt
-        else:  # "all"
-            return all(results)  # Alle Bedingungen erfüllt
-
-    # Iterative Anwendung (für Kaskaden-Abhängigkeiten)
-    max_iterations = 10
-    iteration = 0
-    changes_made = True
-
-    while changes_made and iteration < max_iterations:
-        iteration += 1
-        changes_made = False
-
-        # Aktuelle Antwort-Map bauen
-        answer_map = build_answer_map()
-
-        # Für jede Frage prüfen
-        for question in all_questions:
-            # Ist die Frage anwendbar?
-            should_be_applicable = evaluate_applicable(question, answer_map)
-
-            # Hole alle Antworten für diese Frage
-            answers = Answer.query.filter_by(
-                assessment_id=assessment_id,
-                question_id=question.id
-            ).all()
 
-            # Update is_applicable wenn nötig
-            for answer in answers:
-                if answer.is_applicable != should_be_applicable:
-                    answer.is_applicable = should_be_applicable
-                    changes_made = True
+def schedule_scoring(assessment_id, reason="evaluate"):
+    """
+    Startet die Auswertung eines Assessments.
+
+    Im Modus 'async' wird der Job in den Thread-Pool eingereiht. Ist die
+    Warteschlange voll, wird synchron im Request gerechnet (Backpressure).
+    Im Modus 'queue' wird ein persistenter Job für die Worker-Prozesse angelegt.
+    """
+    if app.config['SCORING_MODE'] == 'queue':
+        ScoringJobQueue.enqueue(assessment_id, reason)
+        db.session.commit()
+        return
+    if scoring_queue.enabled and scoring_queue.submit(run_scoring_job, assessment_id):
+        return
+    run_scoring_job(assessment_id)
+
 
-                    # Wenn Frage nicht mehr anwendbar, lösche die Antwort-Werte
-                    if not should_be_applicable:
-                        answer.scale_option_id = None
-                        answer.numeric_value = None
+def get_scoring_status(assessment_id):
+    """
+    Status einer noch nicht abgeschlossenen Auswertung
 
+    Returns:
+        ('pending', None), ('failed', Fehlertext) oder (None, None)
+    """
+    if app.config['SCORING_MODE'] == 'queue':
+        return ScoringJobQueue.status(assessment_id)
+    return scoring_queue.status(assessment_id)
 
 
 # Hilfsfunktion: Dimension Status berechnen
@@ -419,24 +618,31 @@ def get_dimension_status(dimension_id, assessment_id=None):
         - 'complete': Alle Fragen beantwortet
     """
 
-    questions = Question.query.filter_by(dimension_id=dimension_id).all()
+    assessment = db.session.get(Assessment, assessment_id) if assessment_id else None
+    if not assessment:
+        return 'not_started'
+
+    compiled = get_compiled_questionnaire(assessment.questionnaire_version_id)
+    questions = compiled.questions_by_dimension.get(dimension_id, ())
     total_questions = len(questions)
 
     if total_questions == 0:
         return 'not_started'
 
-    if not assessment_id:
-        return 'not_started'
+    # Erste anwendbare Antwort je Frage (eine Abfrage)
+    first_answers = {}
+    for answer in Answer.query.filter(
+        Answer.assessment_id == assessment_id,
+        Answer.question_id.in_([q.id for q in questions]),
+        Answer.is_applicable.is_(True)
+    ).order_by(Answer.id):
+        first_answers.setdefault(answer.question_id, answer)
+
     # Zähle beantwortete Fragen
     answered_count = 0
 
     for question in questions:
-        answer = Answer.query.filter_by(
-            assessment_id=assessment_id,
-            question_id=question.id,
-            is_applicable=True
-        ).first()
-
+        answer = first_answers.get(question.id)
         if not answer:
             continue
 
@@ -457,79 +663,70 @@ def get_dimension_status(dimension_id, assessment_id=None):
 
 # Route: Startseite (Fragebogen)
 @app.route('/')
+@read_only
 def index():
     """Zeigt den Fragebogen an"""
 
-    qv = QuestionnaireVersion.query.filter_by(is_active=True).first()
-    if not qv:
+    compiled = get_active_questionnaire()
+    if not compiled:
         return "Keine aktive Fragebogen-Version gefunden", 500
 
-    dimensions = Dimension.query.filter_by(
-        questionnaire_version_id=qv.id
-    ).order_by(Dimension.sort_order).all()
-
-    hints_map = build_hints_map(qv.id)
+    hints_map = build_hints_map(compiled)
     shared_dim_ids = get_shared_dimension_ids()
 
-    # Für jede Dimension: Fragen laden
-    for dim in dimensions:
-        questions = Question.query.filter_by(
-            dimension_id=dim.id
-        ).order_by(Question.sort_order).all()
-
+    dimensions = []
+    for dim in compiled.dimensions:
         # Lade gemeinsame Antworten für Dimensionen 1 & 2
         if dim.id in shared_dim_ids:
             answers_map = load_shared_dimension_answers(dim.id)
         else:
             answers_map = {}
 
-        # Serialize Fragen in separates Attribut (nicht die SQLAlchemy relationship ändern)
-        dim.serialized_questions = [serialize_question(q,
-                                                       answers_map,
-                                                       hints_map)
-                                                       for q in questions]
-
-        # Markiere Dimension als "gemeinsam nutzbar"
-        dim.is_shared = dim.id in shared_dim_ids
+        dimensions.append({
+            "id": dim.id,
+            "code": dim.code,
+            "name": dim.name,
+            "serialized_questions": [
+                serialize_question(compiled, q, answers_map, hints_map)
+                for q in compiled.display_questions_by_dimension.get(dim.id, ())
+            ],
+            # Markiere Dimension als "gemeinsam nutzbar"
+            "is_shared": dim.id in shared_dim_ids,
+        })
 
     return render_template(
         'index.html',
-        questionnaire=qv,
+        questionnaire=compiled,
         dimensions=dimensions,
         edit_mode=False
     )
 
 @app.route('/assessment/<int:assessment_id>/edit')
+@read_only
 def edit_assessment(assessment_id):
     """Zeigt Fragebogen zum Bearbeiten eines Assessments"""
 
     assessment = Assessment.query.get_or_404(assessment_id)
     process = db.session.get(Process, assessment.process_id)
-    qv = db.session.get(QuestionnaireVersion, assessment.questionnaire_version_id)
-
-    dimensions = Dimension.query.filter_by(
-        questionnaire_version_id=qv.id
-    ).order_by(Dimension.sort_order).all()
+    compiled = get_compiled_questionnaire(assessment.questionnaire_version_id)
 
     # IM EDIT-MODUS: Lade IMMER die Antworten aus dem Assessment
     answers_map = build_answers_map(assessment_id)
-    hints_map = build_hints_map(qv.id)
+    hints_map = build_hints_map(compiled)
     shared_dim_ids = get_shared_dimension_ids()
 
-    # Für jede Dimension: Fragen laden
-    for dim in dimensions:
-        questions = Question.query.filter_by(
-            dimension_id=dim.id
-        ).order_by(Question.sort_order).all()
-
-        # Im Edit-Modus: Verwende immer die answers_map vom Assessment
-        dim.serialized_questions = [serialize_question(q,
-                                                       answers_map,
-                                                       hints_map)
-                                                       for q in questions]
-
+    # Im Edit-Modus: Verwende immer die answers_map vom Assessment
+    dimensions = [{
+        "id": dim.id,
+        "code": dim.code,
+        "name": dim.name,
+        "serialized_questions": [
+            serialize_question(compiled, q, answers_map, hints_map)
+            for q in compiled.display_questions_by_dimension.get(dim.id, ())
+        ],
         # Markiere Dimension als "gemeinsam nutzbar"
-        dim.is_shared = dim.id in shared_dim_ids
+        "is_shared": dim.id in shared_dim_ids,
+    } for dim in compiled.dimensions]
 
     process_data = {
         "name": process.name,
@@ -539,624 +736,12 @@ def edit_assessment(assessment_id):
 
     return render_template(
         'index.html',
-        questionnaire=qv,
+        questionnaire=compiled,
         dimensions=dimensions,
         edit_mode=True,
         process_data=process_data,
         assessment_id=assessment.id
     )
-def generate_dimension_recommendations(
-    dimension_code,
-    dimension_name,
-    rpa_score,
-    ipa_score,
-    rpa_excluded,
-    ipa_excluded
-):
-    """
-    Generiert Empfehlungen für eine Dimension basierend auf den Scores.
-
-    Returns:
-        dict mit:
-          - 'rpa_recommendation' (oder None)
-          - 'ipa_recommendation' (oder None)
-          - optional: 'overall_recommendation' (RPA vs IPA Hinweis)
-        Jede Empfehlung ist ein dict mit:
-          'type', 'icon', 'color', 'title', 'text', 'actions'
-    """
-
-
-    # 1) Feinere Score-Klassen
-    SCORE_BANDS = [
-        # max ist exklusiv
-        {"key": "critical", "max": 1.5, "type": "error",
-         "icon": "🛑", "color": "#ef4444", "title": "Kritisch"},
-        {"key": "high",     "max": 2.5, "type": "error",
-         "icon": "⚠️", "color": "#ef4444", "title": "Hohes Risiko"},
-        {"key": "medium",   "max": 3.3, "type": "warning",
-         "icon": "⚡", "color": "#f59e0b", "title": "Verbesserungsbedarf"},
-        {"key": "good",     "max": 4.2, "type": "info",
-         "icon": "✅", "color": "#3b82f6", "title": "Solide Basis"},
-        {"key": "excellent","max": 5.1, "type": "success",
-         "icon": "🌟", "color": "#22c55e", "title": "Sehr gut"},
-    ]
-
-    def classify(score):
-        for band in SCORE_BANDS:
-            if score < band["max"]:
-                return band
-        return SCORE_BANDS[-1]
-
-    # 2) Text-/Action-Bibliothek je Dimension (RPA/IPA differenziert)
-    # Prinzip: pro Dimension + Band ein Fokus + handlungsnahe Schritte.
-    REC_LIBRARY = build_recommendation_library()
-
-    def build_reco(d_code, d_name, a_type, score, band_key, band_meta):
-        # Dimension fallback (wenn nicht gemappt)
-        dim_cfg = REC_LIBRARY.get(d_code, REC_LIBRARY["_fallback"])
-        band_cfg = dim_cfg.get(band_key, dim_cfg["_fallback_band"])
-
-        # band_cfg kann entweder:
-        # - dict mit 'text'/'actions' sein
-        # - dict mit 'RPA'/'IPA' Unterscheidung sein
-        if "RPA" in band_cfg or "IPA" in band_cfg:
-            type_cfg = band_cfg.get(a_type, band_cfg.get("_fallback_type"))
-        else:
-            type_cfg = band_cfg
-
-        # Falls das Mapping doch unvollständig ist:
-        text = type_cfg.get("text") if isinstance(type_cfg, dict) else None
-        actions = type_cfg.get("actions") if isinstance(type_cfg, dict) else None
-
-        if not text:
-            text = (
-                f"{d_name}: Score {score:.1f}/5 → {band_meta['title']}. "
-                f"Bitte Antworten prüfen und gezielte Verbesserungen ableiten."
-            )
-        else:
-            # leichte Personalisierung
-            text = text.format(
-                dimension_code=d_code,
-                dimension_name=d_name,
-                automation_type=a_type,
-                score=f"{score:.1f}"
-            )
-
-        if not actions:
-            actions = default_actions_for_band(band_key, a_type)
-
-        return {
-            "type": band_meta["type"],
-            "icon": band_meta["icon"],
-            "color": band_meta["color"],
-            "title": f"{d_name}: {band_meta['title']} ({score:.1f}/5)",
-            "text": text,
-            "actions": actions,
-        }
-
-    # 3) Ergebnis zusammenbauen (RPA/IPA einzeln + optional Overall)
-    result = {
-        "rpa_recommendation": None,
-        "ipa_recommendation": None,
-        "overall_recommendation": None, 
-    }
-
-    # RPA
-    if rpa_excluded:
-        result["rpa_recommendation"] = {
-            "type": "error",
-            "icon": "❌",
-            "color": "#ef4444",
-            "title": f"{dimension_name}: RPA ausgeschlossen",
-            "text": "RPA wurde für diese Dimension ausgeschlossen. Prüfen Sie"
-            " die Ausschlusskriterien und ob Alternativen (IPA/Teilautomatisierung) sinnvoll sind.",
-            "actions": [
-                "Ausschlusskriterium(e) konkret benennen (welche Antwort triggert?)",
-                "Prüfen, ob Prozess/Plattform durch kleine Änderungen RPA-fähig wird",
-                "Falls nicht: IPA oder API-/Integrationslösung evaluieren",
-            ],
-        }
-    elif rpa_score is not None:
-        band = classify(rpa_score)
-        result["rpa_recommendation"] = build_reco(dimension_code,
-                                                  dimension_name, "RPA",
-                                                  rpa_score, band["key"],
-                                                  band)
-    else:
-        # optional: wenn Score fehlt
-        result["rpa_recommendation"] = {
-            "type": "info",
-            "icon": "ℹ️",
-            "color": "#3b82f6",
-            "title": f"{dimension_name}: RPA nicht bewertet",
-            "text": "Für RPA liegt in dieser Dimension kein Score vor "
-            "(None). Prüfen Sie, ob die Dimension beantwortet/bewertet wurde.",
-            "actions": ["Bewertungslogik prüfen (None vs. '-')", 
-                        "Fehlende Antworten nachziehen", "Seed/Skala validieren"],
-        }
-
-    # IPA
-    if ipa_excluded:
-        result["ipa_recommendation"] = {
-            "type": "error",
-            "icon": "❌",
-            "color": "#ef4444",
-            "title": f"{dimension_name}: IPA ausgeschlossen",
-            "text": "IPA wurde für diese Dimension ausgeschlossen. "
-            "Prüfen Sie die Ausschlusskriterien und ob RPA/Teilautomatisierung sinnvoll ist.",
-            "actions": [
-                "Ausschlusskriterium(e) konkret benennen (welche Antwort triggert?)",
-                "Prüfen, ob Daten/Compliance/Use-Case-Abgrenzung IPA möglich macht",
-                "Falls nicht: RPA oder Prozess-/System-Redesign evaluieren",
-            ],
-        }
-    elif ipa_score is not None:
-        band = classify(ipa_score)
-        result["ipa_recommendation"] = build_reco(dimension_code, 
-                                                  dimension_name, "IPA", 
-                                                  ipa_score, band["key"], 
-                                                  band)
-    else:
-        result["ipa_recommendation"] = {
-            "type": "info",
-            "icon": "ℹ️",
-            "color": "#3b82f6",
-            "title": f"{dimension_name}: IPA nicht bewertet",
-            "text": "Für IPA liegt in dieser Dimension kein Score "
-            "vor (None). Prüfen Sie, ob die Dimension beantwortet/bewertet wurde.",
-            "actions": ["Bewertungslogik prüfen (None vs. '-')", 
-                        "Fehlende Antworten nachziehen", "Seed/Skala validieren"],
-        }
-
-    # 4) Optional: RPA vs IPA Priorisierung (genauere Unterscheidung)
-    result["overall_recommendation"] = build_overall_preference(
-        dimension_name=dimension_name,
-        rpa_score=rpa_score, ipa_score=ipa_score,
-        rpa_excluded=rpa_excluded, ipa_excluded=ipa_excluded
-    )
-
-    return result
-
-# Helpers / Library
-def default_actions_for_band(band_key, automation_type):
-    """Fallback-Actions je Band, wenn kein spezifischer 
-    Text/Actions im REC_LIBRARY definiert ist."""
-    if band_key in ("critical", "high"):
-        return [
-            "Welche Antworten drücken den Score? Konkret benennen!",
-            "Quick Fixes definieren (2–4 Wochen) + Owner festlegen",
-            "Assessment erneut nach Umsetzung durchführen",
-        ]
-    if band_key == "medium":
-        return [
-            "Konkrete Verbesserungsmaßnahmen priorisieren (Top 3)",
-            "Pilot/PoC mit klarer Definition of Done starten",
-            "Messkriterien festlegen (Fehlerquote, Durchlaufzeit, Volumen)",
-        ]
-    if band_key == "good":
-        return [
-            "Pilotieren und dabei Standards/Guidelines dokumentieren",
-            "Betrieb/Monitoring früh mitdenken (SLAs, Logging, Alerts)",
-        ]
-    return [
-        "Skalierung planen (Roadmap, Pipeline, Governance)",
-        "Best Practices als Template für weitere Use Cases nutzen",
-    ]
-
-
-def build_overall_preference(dimension_name, rpa_score, ipa_score, rpa_excluded, ipa_excluded):
-    """
-    Liefert eine einfache, aber hilfreiche Empfehlung zur Priorisierung.
-    """
-    # Wenn beide ausgeschlossen oder beide fehlen → keine Aussage
-    if (rpa_excluded and ipa_excluded) or (rpa_score is None and ipa_score is None):
-        return None
-
-    # Wenn nur eine Option verfügbar ist
-    if rpa_excluded or rpa_score is None:
-        if not ipa_excluded and ipa_score is not None:
-            return {
-                "type": "info",
-                "icon": "➡️",
-                "color": "#3b82f6",
-                "title": f"{dimension_name}: Fokus auf IPA",
-                "text": f"RPA ist hier nicht verfügbar/bewertet. IPA ist die naheliegende Option (Score {ipa_score:.1f}/5).",
-                "actions": ["IPA-PoC scopen", "Daten-/Modellanforderungen klären", "Risiken/Compliance prüfen"],
-            }
-        return None
-
-    if ipa_excluded or ipa_score is None:
-        return {
-            "type": "info",
-            "icon": "➡️",
-            "color": "#3b82f6",
-            "title": f"{dimension_name}: Fokus auf RPA",
-            "text": f"IPA ist hier nicht verfügbar/bewertet. RPA ist die naheliegende Option (Score {rpa_score:.1f}/5).",
-            "actions": ["RPA-PoC scopen", "Prozessstandardisierung "
-            "sichern", "Betrieb/Monitoring planen"],
-        }
-
-    # Beide vorhanden → Vergleich
-    diff = rpa_score - ipa_score
-    if abs(diff) < 0.4:
-        return {
-            "type": "info",
-            "icon": "⚖️",
-            "color": "#3b82f6",
-            "title": f"{dimension_name}: RPA und IPA ähnlich geeignet",
-            "text": f"Die Eignung ist ähnlich (RPA {rpa_score:.1f}/5 vs. IPA {ipa_score:.1f}/5). Entscheide nach Nicht-Score-Kriterien (Zeit, Kosten, Risiko, Datenlage).",
-            "actions": [
-                "Entscheidungskriterien festlegen (Time-to-Value, Risiko, Wartung, Compliance)",
-                "Mini-PoC für beide Ansätze (1–2 Wochen) vergleichen",
-            ],
-        }
-
-    if diff >= 0.4:
-        return {
-            "type": "success",
-            "icon": "🏁",
-            "color": "#22c55e",
-            "title": f"{dimension_name}: RPA bevorzugen",
-            "text": f"RPA ist in dieser Dimension klar stärker (RPA {rpa_score:.1f}/5 vs. IPA {ipa_score:.1f}/5).",
-            "actions": ["RPA priorisieren", "IPA optional als "
-            "Ergänzung (z. B. Dokument-/Textanteile) prüfen"],
-        }
-
-    return {
-        "type": "success",
-        "icon": "🏁",
-        "color": "#22c55e",
-        "title": f"{dimension_name}: IPA bevorzugen",
-        "text": f"IPA ist in dieser Dimension klar stärker (IPA {ipa_score:.1f}/5 vs. RPA {rpa_score:.1f}/5).",
-        "actions": ["IPA priorisieren", "RPA optional als Orchestrierung/Backbone prüfen"],
-    }
-
-
-def build_recommendation_library():
-    """
-    Recommendation library pro Dimension und Band.
-    Keys: dimension_code -> band_key -> {RPA/IPA oder generisch}
-    """
-    return {
-        # Dimension 1: Plattformverfügbarkeit
-        "1": {
-            "critical": {
-                "text": "Plattformverfügbarkeit ist kritisch (Score {score}/5). "
-                "Ohne grundlegende Plattform-/Zugriffsfreigaben ist {automation_type} "
-                "aktuell nicht sinnvoll.",
-                "actions": [
-                    "Stabilität & Verfügbarkeit messen (Uptime, Wartungsfenster, Releases)",
-                    "Alternativen prüfen: APIs, Integration Layer, Systemanpassung",
-                ],
-            },
-            "high": {
-                "text": "Plattformverfügbarkeit ist instabil/unsicher (Score {score}/5). "
-                "{automation_type} birgt hohes Betriebsrisiko (Ausfälle, UI-Änderungen,"
-                "Zugriffsthemen).",
-                "actions": [
-                    "Technische Voraussetzungen in einem Checklist-Format fixieren",
-                    "Change-/Release-Prozess der Plattform einbinden (Regression Tests)",
-                    "Monitoring/Alerting für Automationsläufe definieren",
-                ],
-            },
-            "medium": {
-                "text": "Plattform ist grundsätzlich nutzbar, aber noch nicht "
-                "robust genug (Score {score}/5). Für {automation_type} empfehlen sich "
-                "Guardrails & Standardisierung.",
-                "actions": [
-                    "Stabile Schnittstellen priorisieren (API vor UI, wenn möglich)",
-                    "Testfälle für UI-/Release-Änderungen definieren",
-                    "Betriebskonzept (Runbook) vorbereiten",
-                ],
-            },
-            "good": {
-                "text": "Plattformverfügbarkeit ist solide (Score {score}/5). "
-                "{automation_type} ist realistisch – Fokus auf saubere Umsetzung & Betrieb.",
-            },
-            "excellent": {
-                "text": "Plattformverfügbarkeit ist sehr gut (Score {score}/5). "
-                "Gute Basis, um {automation_type} zu skalieren.",
-            },
-            "_fallback_band": {"text": "Plattformverfügbarkeit (Score {score}/5): "
-            "bitte Details prüfen."},
-        },
-
-        # Dimension 2: Organisatorisch
-        "2": {
-            "critical": {
-                "text": "Kritische organisatorische Defizite (Score {score}/5). "
-                "Ohne Ownership, Prozessverantwortung und Change-Plan scheitert "
-                "{automation_type} häufig am Betrieb.",
-                "actions": [
-                    "Owner/Process Owner + RACI definieren",
-                    "Change- & Kommunikationsplan (Betroffene, Trainings, Support) erstellen",
-                    "Governance: Intake, Priorisierung, Release/Quality Gates festlegen",
-                ],
-            },
-            "high": {
-                "text": "Organisation ist noch nicht ausreichend vorbereitet "
-                "(Score {score}/5). Für {automation_type} drohen Reibungsverluste "
-                "(Akzeptanz, Betrieb, Verantwortlichkeiten).",
-                "actions": [
-                    "Stakeholder-Map + Sponsorship sichern",
-                    "Supportmodell & Incident-Handling definieren",
-                    "Dokumentationsstandard + Übergabeprozess etablieren",
-                ],
-            },
-            "medium": {
-                "text": "Organisatorische Basis ist vorhanden, aber ausbaufähig "
-                "(Score {score}/5). {automation_type} sollte mit klaren Rollen & "
-                "Standards pilotiert werden.",
-                "actions": [
-                    "Definition of Done + Abnahmekriterien vereinbaren",
-                    "Betrieb/Monitoring/Ownership im Pilot verbindlich festlegen",
-                    "Enablement: kurze Trainings + FAQ für Fachbereich",
-                ],
-            },
-            "good": {"text": "Organisation ist gut aufgestellt (Score {score}/5). "
-            "{automation_type} kann sauber pilotiert und in Betrieb überführt werden."},
-            "excellent": {"text": "Organisation ist sehr reif (Score {score}/5)."
-            " Gute Voraussetzungen für skalierbare {automation_type}-Rollouts."},
-            "_fallback_band": {"text": "Organisatorik (Score {score}/5):"
-            " bitte gezielt verbessern."},
-        },
-
-        # Dimension 3: Prozesseignung
-        "3": {
-            "critical": {
-                "RPA": {
-                    "text": "Prozess ist für RPA nicht geeignet (Score {score}/5): "
-                    "zu viele Ausnahmen/Varianten, unklare Regeln oder instabile Inputs.",
-                    "actions": [
-                        "Prozessvarianten reduzieren (80/20) und Standardfall definieren",
-                        "Regelwerk/Entscheidungslogik dokumentieren (wenn-dann)",
-                        "Inputs standardisieren (Formulare, Pflichtfelder, Validierungen)",
-                    ],
-                },
-                "IPA": {
-                    "text": "Prozess ist für IPA kritisch (Score {score}/5): "
-                    "Zieldefinition oder Qualitätskriterien fehlen.",
-                    "actions": [
-                        "Use Case präzisieren (Inputs/Outputs, Fehlerklassen, Guardrails)",
-                        "Human-in-the-loop & Escalation-Logik definieren",
-                    ],
-                },
-                "_fallback_type": {"text": "Prozess sehr kritisch (Score {score}/5)."},
-            },
-            "high": {
-                "RPA": {
-                    "text": "RPA-Eignung ist sehr schwach (Score {score}/5). "
-                    "Fokus: Prozess stabilisieren, Ausnahmen minimieren, klare Regeln schaffen.",
-                    "actions": [
-                        "Ausnahmen kategorisieren (automatisierbar vs. manuell)",
-                        "Prozessschritte vereinheitlichen & dokumentieren",
-                        "Fehler-Quellen reduzieren",
-                    ],
-                },
-                "IPA": {
-                    "text": "IPA-Eignung ist schwach (Score {score}/5). Fokus: "
-                    "Modellanforderungen konkretisieren, Qualität absichern.",
-                    "actions": [
-                        "Trainings-/Testdaten aufbauen",
-                        "Versionierung etablieren und Qualitätskriterien definieren",
-                    ],
-                },
-                "_fallback_type": {"text": "Prozess hoch riskant (Score {score}/5)."},
-            },
-            "medium": {
-                "RPA": {
-                    "text": "RPA-Eignung ist ausbaufähig (Score {score}/5). "
-                    "Mit Standardisierung + klaren Regeln ist ein Pilot sinnvoll.",
-                    "actions": [
-                        "Standardfall priorisieren und zuerst automatisieren",
-                        "Validierungen & Exception-Handling definieren",
-                        "Prozessdoku + Testfälle aufbauen",
-                    ],
-                },
-                "IPA": {
-                    "text": "IPA-Eignung ist ausbaufähig (Score {score}/5). "
-                    "Ein Pilot ist möglich, wenn Qualitätssicherung sauber stehen.",
-                    "actions": [
-                        "Fallback auf manuelle Prüfung definieren (Human-in-the-loop)",
-                        "Sicherheits-/Compliance-Checks integrieren",
-                    ],
-                },
-                "_fallback_type": {"text": "Prozess mittelmäßig (Score {score}/5)."},
-            },
-            "good": {
-                "RPA": {"text": "Prozess ist gut RPA-geeignet (Score {score}/5). "
-                "Fokus: Robustheit, Wartbarkeit, Monitoring."},
-                "IPA": {"text": "Prozess ist gut IPA-geeignet (Score {score}/5). "
-                "Fokus: Modellqualität, Governance, sichere Grenzen."},
-                "_fallback_type": {"text": "Prozess solide (Score {score}/5)."},
-            },
-            "excellent": {
-                "RPA": {"text": "Prozess ist sehr gut für RPA (Score {score}/5). "
-                "Sehr gute Basis für Skalierung."},
-                "IPA": {"text": "Prozess ist sehr gut für IPA (Score {score}/5). "
-                "Sehr gute Basis für produktiven Einsatz."},
-                "_fallback_type": {"text": "Prozess sehr gut (Score {score}/5)."},
-            },
-            "_fallback_band": {"text": "Prozesseignung (Score {score}/5): bitte verbessern."},
-        },
-        # Dimension 4: Daten
-        "4": {
-            "critical": {
-                "RPA": {
-                    "text": "Datenbasis ist kritisch für RPA (Score {score}/5): "
-                    "Daten sind unvollständig, ungeeignet oder liegen nicht in "
-                    "verarbeitbarer Form vor.",
-                    "actions": [
-                        "Datenquellen und Pflichtfelder klären "
-                        "(Vollständigkeit/Verfügbarkeit sicherstellen)",
-                        "Strukturierte Übergabe schaffen (z. B. Tabellen, "
-                        "Formulare, standardisierte Exporte)",
-                        "Bei OCR-/Freitextbedarf prüfen, ob Teilprozess für "
-                        "RPA ungeeignet ist oder vorgelagert aufbereitet werden muss",
-                    ],
-                },
-                "IPA": {
-                    "text": "Datenbasis ist kritisch für IPA (Score {score}/5): "
-                    "Datenqualität, Verfügbarkeit oder Eignung reichen für "
-                    "robuste KI-gestützte Verarbeitung nicht aus.",
-                    "actions": [
-                        "Datenqualität und Datenabdeckung verbessern "
-                        "(fehlende/inkonsistente Inhalte bereinigen)",
-                        "Use Case eingrenzen und Trainings-/Referenzdaten für"
-                        "Pilot gezielt aufbauen",
-                        "OCR/NLP/Entscheidungslogik nur einsetzen, wenn Datenzugang, "
-                        "Qualität und Validierung gesichert sind",
-                    ],
-                },
-                "_fallback_type": {"text": "Datenbasis kritisch (Score {score}/5)."},
-            },
-            "high": {
-                "RPA": {
-                    "text": "Datenbasis ist schwach für RPA (Score {score}/5). Ohne "
-                    "Standardisierung steigt Fehleranfälligkeit und Wartungsaufwand.",
-                    "actions": [
-                        "Eingabedaten standardisieren (Formatregeln, Pflichtfelder, Validierungen)",
-                        "Ausnahmen und fehlende Angaben im Prozess explizit behandeln",
-                        "Medienbrüche reduzieren (manuelle Übertragungen, Screenshots, Freitext) ",
-                    ],
-                },
-                "IPA": {
-                    "text": "Datenbasis ist anspruchsvoll für IPA (Score {score}/5). "
-                    "Ohne Datenaufbereitung sinken Qualität und Verlässlichkeit der Ergebnisse.",
-                    "actions": [
-                        "Datenaufbereitung definieren (OCR-Qualität, Textbereinigung, "
-                        "Klassifikationsregeln)",
-                        "Menschliche Validierung für unsichere Ergebnisse einplanen",
-                        "Pilotdaten mit realistischen Fällen und Grenzfällen aufbauen",
-                    ],
-                },
-                "_fallback_type": {"text": "Datenbasis schwach (Score {score}/5)."},
-            },
-            "medium": {
-                "RPA": {
-                    "text": "Datenbasis ist gemischt (Score {score}/5). RPA ist "
-                    "machbar, wenn Datenformate, Vollständigkeit und Ausnahmen "
-                    "sauber geregelt werden."
-                },
-                "IPA": {
-                    "text": "Datenbasis ist ausbaufähig (Score {score}/5). Ein "
-                    "IPA-Pilot ist machbar, wenn OCR/Textverständnis und Validierung "
-                    "gezielt abgesichert werden."
-                },
-                "_fallback_type": {"text": "Datenbasis mittel (Score {score}/5)."},
-            },
-            "good": {
-                "text": "Datenbasis ist gut (Score {score}/5). Relevante "
-                "Daten sind überwiegend verfügbar und geeignet; Fokus auf saubere "
-                "Validierung und Betriebsfähigkeit."
-            },
-            "excellent": {
-                "text": "Datenbasis ist sehr gut (Score {score}/5). "
-                "Gute Voraussetzungen für stabile Automation und Skalierung."
-            },
-            "_fallback_band": {
-                "text": "Datenbasis (Score {score}/5): bitte Datenverfügbarkeit, "
-                "Qualität und Eignung prüfen."
-            },
-        },
-
-        # Dimension 5: Technische Komplexität
-        "5": {
-            "critical": {
-                "RPA": {
-                    "text": "Technische Komplexität ist kritisch für RPA "
-                    "(Score {score}/5): hohe UI-Volatilität, fehlende "
-                    "Stabilität oder schwierige Integrationen.",
-                    "actions": [
-                        "API-/Integration-first prüfen (statt UI-Automation)",
-                        "Systemzugriffe stabilisieren (Selectors, stabile IDs, Testumgebung)",
-                        "Architekturentscheidung: RPA nur als Übergang oder gar nicht?",
-                    ],
-                },
-                "IPA": {
-                    "text": "Technische Komplexität ist kritisch für IPA "
-                    "(Score {score}/5): fehlende Infrastruktur.",
-                    "actions": [
-                        "Security/Datenschutz/Hosting klären (Cloud vs. On-Prem)",
-                        "Technische Machbarkeit im PoC validieren (Latency, Kosten, Qualität)",
-                    ],
-                },
-                "_fallback_type": {"text": "Technik kritisch (Score {score}/5)."},
-            },
-            "high": {
-                "RPA": {
-                    "text": "RPA ist technisch riskant (Score {score}/5). "
-                    "Ohne Stabilisierung sind Wartungskosten hoch.",
-                    "actions": [
-                        "Stabile Schnittstellen priorisieren",
-                        "Regression-Tests automatisieren",
-                    ],
-                },
-                "IPA": {
-                    "text": "IPA ist technisch riskant (Score {score}/5). "
-                    "Ohne Stabilisierung sind Wartungskosten hoch.",
-                    "actions": [
-                        "Rollout-Strategie (Canary, A/B) definieren",
-                        "Rollen/Skills (Data/ML/Platform) sicherstellen",
-                    ],
-                },
-                "_fallback_type": {"text": "Technik hoch riskant (Score {score}/5)."},
-            },
-            "medium": {
-                "RPA": {"text": "Technische Komplexität ist erhöht (Score {score}/5). "
-                "Mit Standards und Tests ist RPA machbar."},
-                "IPA": {"text": "Technische Komplexität ist erhöht (Score {score}/5). "
-                "Ein IPA-Pilot ist machbar."},
-                "_fallback_type": {"text": "Technik mittel (Score {score}/5)."},
-            },
-            "good": {"text": "Technische Basis ist gut (Score {score}/5). "
-            "Fokus auf saubere Implementierung & Betrieb."},
-            "excellent": {"text": "Technische Basis ist sehr gut (Score {score}/5)."
-            " Gute Voraussetzungen für Skalierung."},
-            "_fallback_band": {"text": "Technik (Score {score}/5): bitte prüfen."},
-        },
-
-        # Dimension 6 Wirtschaftlichkeit
-        "6": {
-            "critical": {
-                "text": "Wirtschaftlichkeit ist kritisch (Score {score}/5)."
-                " Der Business Case trägt aktuell nicht (Volumen, Aufwand, Nutzen oder Risiko).",
-                "actions": [
-                    "ROI-Rechnung transparent machen (Setup + Run + Change-Kosten)",
-                    "Volumen/Automationsquote erhöhen oder Scope reduzieren",
-                    "Alternative: Prozess-/Systemverbesserung statt Automation prüfen",
-                ],
-            },
-            "high": {
-                "text": "Wirtschaftlichkeit ist schwach (Score {score}/5). "
-                "Ohne Anpassung droht niedriger ROI.",
-                "actions": [
-                    "Quick-Wins identifizieren (hohes Volumen, klare Regeln)",
-                    "Setup-Aufwand reduzieren (Templates, Reuse, Standardkomponenten)",
-                    "Benefit Tracking definieren (Zeit, Qualität, Compliance)",
-                ],
-            },
-            "medium": {
-                "text": "Wirtschaftlichkeit ist ausbaufähig (Score {score}/5). "
-                "Mit sauberem Scope und Skalierung kann sich {automation_type} lohnen.",
-                "actions": [
-                    "Pilot mit messbaren KPIs (Zeitersparnis, Fehlerquote) durchführen",
-                    "Skalierungshebel identifizieren (mehr Fälle, mehr Länder, mehr Teams)",
-                    "Betriebskosten früh berücksichtigen (Monitoring, Support, Changes)",
-                ],
-            },
-            "good": {"text": "Wirtschaftlichkeit ist solide (Score {score}/5). "
-            "Fokus: Pilot → Skalierung mit sauberem KPI-Tracking."},
-            "excellent": {"text": "Wirtschaftlichkeit ist sehr gut (Score {score}/5). "
-            "Gute Basis für schnelle Skalierung."},
-            "_fallback_band": {"text": "Wirtschaftlichkeit (Score {score}/5): bitte verbessern."},
-        },
-
-        # Fallback für unbekannte Dimensionen
-        "_fallback": {
-            "_fallback_band": {"text": "Dimension (Score {score}/5): bitte prüfen."},
-        }
-    }
 # Route: Assessment aktualisieren
 @app.route('/assessment/<int:assessment_id>/update', methods=['POST'])
 def update_assessment(assessment_id):
@@ -1164,22 +749,21 @@ def update_assessment(assessment_id):
     try:
         assessment = Assessment.query.get_or_404(assessment_id)
         process = db.session.get(Process, assessment.process_id)
-        qv = db.session.get(QuestionnaireVersion, assessment.questionnaire_version_id)
+        compiled = get_compiled_questionnaire(assessment.questionnaire_version_id)
+        # Portfolio-Beitrag vor Änderungen an Branche/Ergebnis merken
+        old_contribution = PortfolioService.load_contribution(assessment_id)
 
         # 1. Aktualisiere Process
         process.name = request.form.get('uc_name', process.name)
         process.description = request.form.get('uc_desc', process.description)
         process.industry = request.form.get('industry', process.industry)
 
-        # 2. Lösche alte Antworten
+        # 2. Lösche alte Antworten (auch archivierte)
         Answer.query.filter_by(assessment_id=assessment_id).delete()
+        AnswerArchive.query.filter_by(assessment_id=assessment_id).delete()
 
         # 3. Speichere neue Antworten
-        all_questions = Question.query.filter_by(
-            questionnaire_version_id=qv.id
-        ).all()
-
-        for question in all_questions:
+        for question in compiled.questions:
             field_single = f"q_{question.id}"
             field_multi = f"q_{question.id}[]"
 
@@ -1249,7 +833,7 @@ def update_assessment(assessment_id):
 
             for dim_id in shared_dim_ids:
                 # Sammle alle Antworten für diese Dimension
-                dim_questions = Question.query.filter_by(dimension_id=dim_id).all()
+                dim_questions = compiled.questions_by_dimension.get(dim_id, ())
                 dim_answers = {}
 
                 for q in dim_questions:
@@ -1278,17 +862,16 @@ def update_assessment(assessment_id):
 
             db.session.commit()
 
-        # 4. Filterlogik anwenden
-        apply_filter_logic(assessment_id)
-        db.session.commit()
-
-        # 5. Lösche alte Ergebnisse
+        # 4. Lösche alte Ergebnisse samt Portfolio-Beitrag
         DimensionResult.query.filter_by(assessment_id=assessment_id).delete()
         TotalResult.query.filter_by(assessment_id=assessment_id).delete()
+        delete_result_snapshot(assessment_id)
+        if old_contribution is not None:
+            PortfolioService.apply([old_contribution], sign=-1)
         db.session.commit()
 
-        # 6. Berechne neue Ergebnisse
-        total_result = ScoringService.calculate_assessment_results(assessment.id)
+        # 5. Filterlogik anwenden und neue Ergebnisse berechnen
+        schedule_scoring(assessment.id, reason="update")
 
         return redirect(url_for('view_assessment', assessment_id=assessment_id))
 
@@ -1316,25 +899,20 @@ def evaluate():
         db.session.flush()
 
         # 2. Erstelle Assessment
-        qv = QuestionnaireVersion.query.filter_by(is_active=True).first()
-        if not qv:
+        compiled = get_active_questionnaire()
+        if not compiled:
             return "Keine aktive Fragebogen-Version gefunden", 500
         assessment = Assessment(
             process_id=process.id,
-            questionnaire_version_id=qv.id
+            questionnaire_version_id=compiled.version_id
         )
         db.session.add(assessment)
         db.session.flush()
-        # 3. Hole ALLE Fragen
-        all_questions = Question.query.filter_by(
-            questionnaire_version_id=qv.id
-        ).all()
-
-        # 4. Speichere Antworten
+        # 3. Speichere Antworten (alle Fragen der aktiven Version)
         answered_count = 0
         unanswered_count = 0
 
-        for question in all_questions:
+        for question in compiled.questions:
             field_single = f"q_{question.id}"
             field_multi = f"q_{question.id}[]"
 
@@ -1418,7 +996,7 @@ def evaluate():
 
             for dim_id in shared_dim_ids:
                 # Sammle alle Antworten für diese Dimension
-                dim_questions = Question.query.filter_by(dimension_id=dim_id).all()
+                dim_questions = compiled.questions_by_dimension.get(dim_id, ())
                 dim_answers = {}
                 for q in dim_questions:
                     field_single = f"q_{q.id}"
@@ -1446,13 +1024,10 @@ def evaluate():
 
             db.session.commit()
 
-        # 5. Filterlogik anwenden
-        apply_filter_logic(assessment.id)
-        db.session.commit()
-
-        total_result = ScoringService.calculate_assessment_results(assessment.id)
+        # 4. Filterlogik anwenden und Ergebnisse berechnen
+        schedule_scoring(assessment.id)
 
-        # 7. Redirect zur Ergebnisseite
+        # 5. Redirect zur Ergebnisseite
         return redirect(url_for('view_assessment', assessment_id=assessment.id))
     except Exception as e:
         db.session.rollback()
@@ -1460,313 +1035,214 @@ def evaluate():
         traceback.print_exc()
         return f"Fehler: {str(e)}", 500
 
+# Route: Massenimport
+@app.route('/import', methods=['POST'])
+def import_assessments_upload():
+    """Importiert Assessments aus einer hochgeladenen CSV- oder JSONL-Datei"""
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'error': 'Keine Datei hochgeladen'}), 400
+
+    try:
+        fmt = detect_format(upload.filename, request.form.get('format'))
+        stream = TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        report = import_assessments(stream, fmt,
+                                    packed=app.config['ANSWER_STORAGE'] == 'packed')
+        return jsonify({'success': True, **report}), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Route: Vergleichsübersicht
 @app.route('/comparison')
+@read_only
 def comparison():
-    """Zeigt alle gespeicherten Assessments zum Vergleich"""
-    results = db.session.query(
-        TotalResult, Assessment, Process
-    ).join(
-        Assessment, TotalResult.assessment_id == Assessment.id
-    ).join(
-        Process, Assessment.process_id == Process.id
-    ).all()
-    assessments_data = []
-    for total_result, assessment, process in results:
-        if total_result.total_rpa and total_result.total_ipa:
-            combined_score = max(total_result.total_rpa, total_result.total_ipa)
-        elif total_result.total_rpa:
-            combined_score = total_result.total_rpa
-        elif total_result.total_ipa:
-            combined_score = total_result.total_ipa
-        else:
-            combined_score = 0
-
-        assessments_data.append({
-            'id': assessment.id,
-            'process_name': process.name,
-            'industry': process.industry,
-            'created_at': assessment.created_at,
-            'total_rpa': total_result.total_rpa,
-            'total_ipa': total_result.total_ipa,
-            'rpa_excluded': total_result.rpa_excluded,
-            'ipa_excluded': total_result.ipa_excluded,
-            'combined_score': combined_score
-        })
-    return render_template('comparison.html', assessments=assessments_data)
+    """Zeigt die gespeicherten Assessments seitenweise (gefiltert und sortiert)"""
+    params = parse_comparison_args(request.args)
+    pagination = get_comparison_page(params)
+    return render_template(
+        'comparison.html',
+        assessments=pagination.items,
+        pagination=pagination,
+        params=params,
+        filters_active=has_active_filters(params),
+        industries=list_industries(),
+        recommendations=RECOMMENDATIONS,
+        per_page_choices=PER_PAGE_CHOICES,
+        max_matrix_assessments=MAX_MATRIX_ASSESSMENTS,
+        portfolio=PortfolioService.summary()
+    )
 
-# Route: Assessment anzeigen
-@app.route('/assessment/<int:assessment_id>')
-def view_assessment(assessment_id):
-    """Zeigt Ergebnisse eines Assessments"""
 
-    assessment = Assessment.query.get_or_404(assessment_id)
-    process = db.session.get(Process, assessment.process_id)
+# Route: Vergleichsmatrix
+@app.route('/comparison/matrix')
+@read_only
+def comparison_matrix():
+    """Stellt mehrere Assessments dimensionsweise nebeneinander (?ids=1,2,3)"""
+    assessment_ids = parse_assessment_ids(request.args)
+    if not assessment_ids:
+        return redirect(url_for('comparison'))
 
-    # Gesamtergebnis
-    total_result = TotalResult.query.filter_by(assessment_id=assessment_id).first()
+    matrix = build_comparison_matrix(assessment_ids)
+    if request.args.get('format') == 'json':
+        return jsonify(matrix), 200
+    return render_template(
+        'matrix.html',
+        matrix=matrix,
+        max_assessments=MAX_MATRIX_ASSESSMENTS
+    )
 
-    # Dimensionsergebnisse
-    dim_results = db.session.query(
-        DimensionResult, Dimension
-    ).join(
-        Dimension, DimensionResult.dimension_id == Dimension.id
-    ).filter(
-        DimensionResult.assessment_id == assessment_id
-    ).order_by(
-        Dimension.sort_order, DimensionResult.automation_type
-    ).all()
-    # Gruppiere Ergebnisse nach Dimension (pro Dimension gibt es RPA und IPA)
-    dimensions_by_id = {}
-    for dim_result, dimension in dim_results:
-        if dimension.id not in dimensions_by_id:
-            dimensions_by_id[dimension.id] = {
-                'code': dimension.code,
-                'name': dimension.name,
-                'calc_method': dimension.calc_method,
-                'is_shared': dimension.code in ['1', '7'],
-                'rpa_score': None,
-                'ipa_score': None,
-                'rpa_excluded': False,
-                'ipa_excluded': False,
-                'answers': []
-            }
-        # Speichere Score basierend auf automation_type
-        if dim_result.automation_type == "RPA":
-            dimensions_by_id[dimension.id]['rpa_score'] = dim_result.mean_score
-            dimensions_by_id[dimension.id]['rpa_excluded'] = dim_result.is_excluded
-        elif dim_result.automation_type == "IPA":
-            dimensions_by_id[dimension.id]['ipa_score'] = dim_result.mean_score
-            dimensions_by_id[dimension.id]['ipa_excluded'] = dim_result.is_excluded
-    # Lade Antworten für jede Dimension
-    from models.database import Question, Answer, ScaleOption, OptionScore
-
-    for dimension_id, dim_data in dimensions_by_id.items():
-        # Hole alle Fragen für diese Dimension
-        questions = Question.query.filter_by(dimension_id=
-                                             dimension_id).order_by(Question.
-                                                                    sort_order).all()
-
-        for question in questions:
-            # Hole ALLE Antworten für diese Frage (wichtig für Multiple Choice)
-            answers = Answer.query.filter_by(
-                assessment_id=assessment_id,
-                question_id=question.id
-            ).all()
 
-            if not answers:
-                continue
+# Route: Volltextsuche (JSON)
+@app.route('/search')
+@read_only
+def search():
+    """Sucht Prozesse nach Name, Beschreibung und Branche (Präfixsuche, nach Relevanz)"""
+    limit = min(max(request.args.get('limit', MAX_RESULTS, type=int) or MAX_RESULTS, 1), 100)
+    results = search_processes(request.args.get('q', ''), limit=limit)
+    return jsonify({'results': results}), 200
+
+
+# Route: Rangliste der besten Automatisierungskandidaten (JSON)
+@app.route('/ranking')
+@read_only
+def ranking():
+    """Top-K Assessments nach gewichtetem Gesamtscore, ROI und FTE-Einsparung"""
+    params = parse_ranking_args(request.args, app.config['RANKING_WEIGHTS'])
+    candidates = top_candidates(
+        weights=params['weights'],
+        automation_type=params['type'],
+        limit=params['limit']
+    )
+    return jsonify({**params, 'candidates': candidates}), 200
 
-            # Formatiere Antwort(en)
-            answer_text = "Keine Antwort"
-            all_option_ids = []
 
-            if question.question_type == "number":
-                # Numerische Frage - nur eine Antwort
-                if answers[0].numeric_value is not None:
-                    answer_text = f"{answers[0].numeric_value}"
-                    if question.unit:
-                        answer_text += f" {question.unit}"
+# Route: Portfolio-Kennzahlen (JSON)
+@app.route('/portfolio')
+@read_only
+def portfolio_summary():
+    """Kennzahlen je Branche und Monat aus portfolio_aggregate"""
+    return jsonify(PortfolioService.summary()), 200
 
-            elif question.question_type == "multiple_choice":
-                # Multiple Choice - mehrere Antworten möglich
-                selected_options = []
-                for ans in answers:
-                    if ans.scale_option_id:
-                        option = db.session.get(ScaleOption, ans.scale_option_id)
-                        if option:
-                            selected_options.append(option.label)
-                            all_option_ids.append(ans.scale_option_id)
-
-                if selected_options:
-                    answer_text = ", ".join(selected_options)
-
-            else:
-                # Single Choice - nur eine Antwort
-                if answers[0].scale_option_id:
-                    option = db.session.get(ScaleOption, answers[0].scale_option_id)
-                    if option:
-                        answer_text = option.label
-                        all_option_ids.append(answers[0].scale_option_id)
-
-            # Hole Scores für diese Antwort(en)
-            rpa_score_text = "–"
-            ipa_score_text = "–"
-
-            if all_option_ids:
-                # Für Multiple Choice: Zeige den höchsten Score an
-                if question.question_type == "multiple_choice":
-                    # Hole alle OptionScores für die gewählten Optionen
-                    rpa_scores_objs = OptionScore.query.filter(
-                        OptionScore.question_id == question.id,
-                        OptionScore.scale_option_id.in_(all_option_ids),
-                        OptionScore.automation_type == "RPA"
-                    ).all()
-
-                    ipa_scores_objs = OptionScore.query.filter(
-                        OptionScore.question_id == question.id,
-                        OptionScore.scale_option_id.in_(all_option_ids),
-                        OptionScore.automation_type == "IPA"
-                    ).all()
-
-                    # RPA: Prüfe auf Ausschluss, dann höchster Score
-                    if any(s.is_exclusion for s in rpa_scores_objs):
-                        rpa_score_text = "AUSSCHLUSS"
-                    else:
-                        applicable_rpa = [s.score for s in rpa_scores_objs if
-                                          s.is_applicable and s.score is not None]
-                        if applicable_rpa:
-                            rpa_score_text = f"{max(applicable_rpa):.1f} (max)"
-
-                    # IPA: Prüfe auf Ausschluss, dann höchster Score
-                    if any(s.is_exclusion for s in ipa_scores_objs):
-                        ipa_score_text = "AUSSCHLUSS"
-                    else:
-                        applicable_ipa = [s.score for s in ipa_scores_objs if
-                                          s.is_applicable and s.score is not None]
-                        if applicable_ipa:
-                            ipa_score_text = f"{max(applicable_ipa):.1f} (max)"
+# Route: Budgetoptimierung des Portfolios (JSON)
+@app.route('/portfolio/optimize')
+@read_only
+def portfolio_optimize():
+    """Wählt Prozesse mit maximalem Nutzen bzw. FTE-Einsparung innerhalb eines Budgets"""
+    try:
+        params = parse_optimizer_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(optimize_portfolio(
+        params['budget'],
+        objective=params['objective'],
+        min_score=params['min_score'],
+        automation_type=params['type'],
+        rpa_share=params['rpa_share'],
+        exclude=params['exclude']
+    )), 200
 
-                else:
-                    # Single Choice
-                    option_id = all_option_ids[0]
+# Route: Assessment anzeigen
+@app.route('/assessment/<int:assessment_id>')
+@read_only
+def view_assessment(assessment_id):
+    """Zeigt Ergebnisse eines Assessments"""
 
-                    # RPA Score
-                    rpa_score_obj = OptionScore.query.filter_by(
-                        question_id=question.id,
-                        scale_option_id=option_id,
-                        automation_type="RPA"
-                    ).first()
-
-                    if rpa_score_obj:
-                        if rpa_score_obj.is_exclusion:
-                            rpa_score_text = "AUSSCHLUSS"
-                        elif not rpa_score_obj.is_applicable:
-                            rpa_score_text = "N/A"
-                        elif rpa_score_obj.score is not None:
-                            rpa_score_text = f"{rpa_score_obj.score:.1f}"
-
-                    # IPA Score
-                    ipa_score_obj = OptionScore.query.filter_by(
-                        question_id=question.id,
-                        scale_option_id=option_id,
-                        automation_type="IPA"
-                    ).first()
-
-                    if ipa_score_obj:
-                        if ipa_score_obj.is_exclusion:
-                            ipa_score_text = "AUSSCHLUSS"
-                        elif not ipa_score_obj.is_applicable:
-                            ipa_score_text = "N/A"
-                        elif ipa_score_obj.score is not None:
-                            ipa_score_text = f"{ipa_score_obj.score:.1f}"
-
-            dim_data['answers'].append({
-                'question_code': question.code,
-                'question_text': question.text,
-                'answer': answer_text,
-                'is_applicable': answers[0].is_applicable,
-                'rpa_score': rpa_score_text,
-                'ipa_score': ipa_score_text
-            })
+    # Fertig aufbereitetes Ergebnis (Snapshot aus der Auswertung)
+    view = get_result_view(assessment_id)
+    if view is None:
+        abort(404)
+
+    # Auswertung läuft noch (asynchroner Modus): Status-Seite mit Polling anzeigen
+    if view['total'] is None:
+        job_status, job_error = get_scoring_status(assessment_id)
+        if job_status is not None:
+            return render_template(
+                'computing.html',
+                use_case=view['process'],
+                assessment_id=assessment_id,
+                job_status=job_status,
+                job_error=job_error
+            )
 
-    # Formatiere Dimensionsergebnisse (sortiert nach Sort-Order)
-    dimensions_data = []
-    for dim_result, dimension in dim_results:
-        if dimension.id in dimensions_by_id:
-            data = dimensions_by_id.pop(dimension.id)
-            dimensions_data.append(data)
-    for dim_data in dimensions_data:
-        recommendations = generate_dimension_recommendations(
-            dimension_code=dim_data['code'],
-            dimension_name=dim_data['name'],
-            rpa_score=dim_data['rpa_score'],
-            ipa_score=dim_data['ipa_score'],
-            rpa_excluded=dim_data['rpa_excluded'],
-            ipa_excluded=dim_data['ipa_excluded']
-        )
-        # Füge Empfehlungen zu den Dimensionsdaten hinzu
-        dim_data['rpa_recommendation'] = recommendations['rpa_recommendation']
-        dim_data['ipa_recommendation'] = recommendations['ipa_recommendation']
+    dimensions_data = view['dimensions']
+    total = view['total'] or {}
     # Berechne max_score basierend auf Anzahl der Dimensionen
-    num_dimensions = len(dimensions_data)
-    max_score = num_dimensions * 5.0
-    # Extrahiere Gesamtscores
-    total_rpa = total_result.total_rpa if total_result else None
-    total_ipa = total_result.total_ipa if total_result else None
-    rpa_excluded = total_result.rpa_excluded if total_result else False
-    ipa_excluded = total_result.ipa_excluded if total_result else False
-
-    # Lade Economic Metrics
-    economic_metrics_data = {}
-    econ_metrics = EconomicMetric.query.filter_by(assessment_id=assessment_id).all()
-    for metric in econ_metrics:
-        economic_metrics_data[metric.key] = {
-            'value': metric.value,
-            'unit': metric.unit
-        }
+    max_score = len(dimensions_data) * 5.0
 
     return render_template(
         'result.html',
-        use_case=process,
-        assessment=assessment,
+        use_case=view['process'],
         assessment_id=assessment_id,
-        total_result=total_result,
-        total_rpa=total_rpa,  # Für Template-Zugriff
-        total_ipa=total_ipa,  # Für Template-Zugriff
-        rpa_excluded=rpa_excluded,  # Für Template-Zugriff
-        ipa_excluded=ipa_excluded,  # Für Template-Zugriff
+        total_rpa=total.get('total_rpa'),  # Für Template-Zugriff
+        total_ipa=total.get('total_ipa'),  # Für Template-Zugriff
+        rpa_excluded=total.get('rpa_excluded', False),  # Für Template-Zugriff
+        ipa_excluded=total.get('ipa_excluded', False),  # Für Template-Zugriff
         max_score=max_score,  # Für Balkendiagramme
         dimensions=dimensions_data,
         breakdown=dimensions_data,  # Für Dimensionsdetails-Dropdown
-        economic_metrics=economic_metrics_data if economic_metrics_data else None,
+        economic_metrics=view['economic_metrics'] or None,
         run_id=assessment_id,
-        recommendation=total_result.recommendation if total_result else None,
+        recommendation=total.get('recommendation'),
     )
 
+# Route: Auswertungsstatus (für Polling im asynchronen Modus)
+@app.route('/assessment/<int:assessment_id>/status')
+@read_only
+def assessment_status(assessment_id):
+    """Liefert den Auswertungsstatus eines Assessments als JSON"""
+    done = db.session.query(TotalResult.id).filter_by(assessment_id=assessment_id).first()
+    if done:
+        return jsonify({'status': 'done'}), 200
+
+    job_status, job_error = get_scoring_status(assessment_id)
+    if job_status == 'pending':
+        return jsonify({'status': 'pending'}), 200
+    if job_status == 'failed':
+        return jsonify({'status': 'failed', 'error': job_error}), 200
+
+    if not db.session.query(Assessment.id).filter_by(id=assessment_id).first():
+        return jsonify({'status': 'not_found'}), 404
+    return jsonify({'status': 'missing'}), 200
+
 # Route: Assessment löschen
 @app.route('/assessment/<int:assessment_id>/delete', methods=['POST'])
 def delete_assessment(assessment_id):
     """Löscht ein Assessment und alle zugehörigen Daten"""
+    Assessment.query.get_or_404(assessment_id)
     try:
-        assessment = Assessment.query.get_or_404(assessment_id)
-        process_id = assessment.process_id
-        # 1. Lösche Antworten
-        Answer.query.filter_by(assessment_id=assessment_id).delete()
-
-        # 2. Lösche Dimensionsergebnisse
-        DimensionResult.query.filter_by(assessment_id=assessment_id).delete()
-
-        # 3. Lösche Gesamtergebnis
-        TotalResult.query.filter_by(assessment_id=assessment_id).delete()
-
-        # 4. Lösche Economic Metrics
-        EconomicMetric.query.filter_by(assessment_id=assessment_id).delete()
-
-        # 5. Lösche Assessment selbst
-        db.session.delete(assessment)
-
-        # 6. Prüfe ob Process noch weitere Assessments hat
-        db.session.flush()  # Stelle sicher dass das Assessment gelöscht ist
-        remaining = Assessment.query.filter_by(process_id=process_id).count()
-
-        if remaining == 0:
-            # Lösche Process wenn keine weiteren Assessments vorhanden
-            process = db.session.get(Process, process_id)
-            if process:
-                db.session.delete(process)
-
-        db.session.commit()
+        # Abhängige Daten per ON DELETE CASCADE, verwaiste Prozesse mengenbasiert
+        delete_assessments([assessment_id])
 
         # Redirect mit Erfolgsmeldung
         return redirect(url_for('comparison', deleted='true'))
 
     except Exception as e:
-        db.session.rollback()
         import traceback
         traceback.print_exc()
         return f"Fehler beim Löschen: {str(e)}", 500
 
+# Route: Massenlöschen nach IDs und/oder Filtern
+@app.route('/assessments/delete', methods=['POST'])
+def delete_assessments_bulk():
+    """Löscht alle Assessments der Auswahl (ids, older_than, Filter) in einer Transaktion"""
+    try:
+        params = parse_delete_args(request.form)
+        dry_run = request.form.get('dry_run', '').lower() in ('1', 'true', 'yes', 'ja')
+        report = delete_assessments(select_assessment_ids(params), dry_run=dry_run)
+        return jsonify({'success': True, **report}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Route: Gemeinsame Dimensionen zurücksetzen
 @app.route('/reset_shared_dimensions', methods=['POST'])
 def reset_shared_dimensions():
@@ -1787,61 +1263,40 @@ def reset_shared_dimensions():
 
 # Route: CSV Export
 @app.route('/assessment/<int:assessment_id>/export')
+@read_only
 def export_assessment(assessment_id):
     """Exportiert Assessment als CSV"""
-    assessment = Assessment.query.get_or_404(assessment_id)
-    process = db.session.get(Process, assessment.process_id)
-    total_result = TotalResult.query.filter_by(assessment_id=assessment_id).first()
-    dim_results = db.session.query(
-        DimensionResult, Dimension
-    ).join(
-        Dimension, DimensionResult.dimension_id == Dimension.id
-    ).filter(
-        DimensionResult.assessment_id == assessment_id
-    ).order_by(
-        Dimension.sort_order
-    ).all()
+    view = get_result_view(assessment_id)
+    if view is None:
+        abort(404)
+    process = view['process']
+    total = view['total'] or {}
     # CSV erstellen
     output = StringIO()
     writer = csv.writer(output)
     # Header
     writer.writerow(['Assessment Export'])
-    writer.writerow(['Prozess', process.name])
-    writer.writerow(['Branche', process.industry or '-'])
-    writer.writerow(['Beschreibung', process.description or '-'])
+    writer.writerow(['Prozess', process['name']])
+    writer.writerow(['Branche', process['industry'] or '-'])
+    writer.writerow(['Beschreibung', process['description'] or '-'])
     writer.writerow([])
     # Gesamtergebnis
     writer.writerow(['Gesamtergebnis'])
     writer.writerow(['Typ', 'Score', 'Status'])
-    writer.writerow(['RPA', total_result.total_rpa or '-',
-                     'Ausgeschlossen' if total_result.rpa_excluded else 'Bewertet'])
-    writer.writerow(['IPA', total_result.total_ipa or '-',
-                     'Ausgeschlossen' if total_result.ipa_excluded else 'Bewertet'])
+    writer.writerow(['RPA', total.get('total_rpa') or '-',
+                     'Ausgeschlossen' if total.get('rpa_excluded') else 'Bewertet'])
+    writer.writerow(['IPA', total.get('total_ipa') or '-',
+                     'Ausgeschlossen' if total.get('ipa_excluded') else 'Bewertet'])
     writer.writerow([])
     # Dimensionsergebnisse
     writer.writerow(['Dimensionsergebnisse'])
     writer.writerow(['Code', 'Dimension', 'RPA Score', 'IPA Score'])
-    # Gruppiere Dimensionsergebnisse nach Dimension
-    dims_by_id = {}
-    for dim_result, dimension in dim_results:
-        if dimension.id not in dims_by_id:
-            dims_by_id[dimension.id] = {
-                'code': dimension.code,
-                'name': dimension.name,
-                'rpa': None,
-                'ipa': None
-            }
-        if dim_result.automation_type == 'RPA':
-            dims_by_id[dimension.id]['rpa'] = dim_result.mean_score
-        elif dim_result.automation_type == 'IPA':
-            dims_by_id[dimension.id]['ipa'] = dim_result.mean_score
-    # Schreibe Zeilen
-    for dim_id, dim_data in dims_by_id.items():
+    for dim_data in view['dimensions']:
         writer.writerow([
             dim_data['code'],
             dim_data['name'],
-            dim_data['rpa'] if dim_data['rpa'] is not None else '-',
-            dim_data['ipa'] if dim_data['ipa'] is not None else '-'
+            dim_data['rpa_score'] if dim_data['rpa_score'] is not None else '-',
+            dim_data['ipa_score'] if dim_data['ipa_score'] is not None else '-'
         ])
     # Response
     output.seek(0)
@@ -1852,6 +1307,23 @@ def export_assessment(assessment_id):
     )
 
 
+# Route: Massenexport (CSV/JSONL, gestreamt)
+@app.route('/export')
+@read_only
+def export_assessments_bulk():
+    """Exportiert alle bzw. die gefilterten Assessments (Filter wie in der Vergleichsübersicht)"""
+    try:
+        params = parse_export_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    filename = f"{params['level']}.{params['format']}"
+    return Response(
+        stream_with_context(generate_export(params)),
+        mimetype=EXPORT_FORMATS[params['format']],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
 # Main
 if __name__ == '__main__':
     init_database()
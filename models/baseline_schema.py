@@ -0,0 +1,322 @@
+"""
+Ausgangsschema der versionierten Migrationen (Migration 1)
+Eingefroren auf den Stand bei Einführung von schema_version: die Tabellen und
+Indizes, die db.create_all() damals angelegt hat (ohne schema_version, die der
+Migrationslauf selbst anlegt). Spätere Schemaänderungen gehören in neue
+Migrationen, nicht hierher – so hängt Migration 1 nicht von den aktuellen
+Modellen ab.
+
+Enthalten sind damit auch combined_score, portfolio_aggregate und die
+Abfrage-Indizes. Die Migrationen 2, 3, 4 und 6 ergänzen diese nur auf
+Datenbanken, die vor schema_version angelegt wurden; auf neuen Datenbanken
+ändern sie nichts (siehe MIGRATIONS in main.py).
+
+Je Tabelle (in Reihenfolge der Fremdschlüssel) CREATE TABLE und ihre Indizes.
+"""
+
+BASELINE_SCHEMA = (
+    ("questionnaire_version", (
+        """
+        CREATE TABLE questionnaire_version (
+            id INTEGER NOT NULL,
+            name VARCHAR(120) NOT NULL,
+            version VARCHAR(50) NOT NULL,
+            is_active BOOLEAN,
+            created_at DATETIME,
+            PRIMARY KEY (id)
+        )
+        """,
+    )),
+    ("scale", (
+        """
+        CREATE TABLE scale (
+            id INTEGER NOT NULL,
+            "key" VARCHAR(50) NOT NULL,
+            label VARCHAR(120) NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE ("key")
+        )
+        """,
+    )),
+    ("process", (
+        """
+        CREATE TABLE process (
+            id INTEGER NOT NULL,
+            name VARCHAR(120) NOT NULL,
+            description TEXT,
+            industry VARCHAR(80),
+            created_at DATETIME,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX ix_process_industry ON process (industry)',
+    )),
+    ("portfolio_aggregate", (
+        """
+        CREATE TABLE portfolio_aggregate (
+            id INTEGER NOT NULL,
+            industry VARCHAR(80) NOT NULL,
+            month VARCHAR(7) NOT NULL,
+            recommendation VARCHAR(30) NOT NULL,
+            assessment_count INTEGER NOT NULL,
+            rpa_score_sum FLOAT NOT NULL,
+            rpa_score_count INTEGER NOT NULL,
+            ipa_score_sum FLOAT NOT NULL,
+            ipa_score_count INTEGER NOT NULL,
+            rpa_excluded_count INTEGER NOT NULL,
+            ipa_excluded_count INTEGER NOT NULL,
+            fte_savings_sum FLOAT NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_portfolio_aggregate UNIQUE (industry, month, recommendation)
+        )
+        """,
+    )),
+    ("dimension", (
+        """
+        CREATE TABLE dimension (
+            id INTEGER NOT NULL,
+            questionnaire_version_id INTEGER NOT NULL,
+            code VARCHAR(10) NOT NULL,
+            name VARCHAR(120) NOT NULL,
+            sort_order INTEGER NOT NULL,
+            calc_method VARCHAR(30) NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(questionnaire_version_id) REFERENCES questionnaire_version (id)
+        )
+        """,
+        'CREATE INDEX ix_dimension_version_sort '
+        'ON dimension (questionnaire_version_id, sort_order)',
+    )),
+    ("scale_option", (
+        """
+        CREATE TABLE scale_option (
+            id INTEGER NOT NULL,
+            scale_id INTEGER NOT NULL,
+            code VARCHAR(20) NOT NULL,
+            label VARCHAR(255) NOT NULL,
+            sort_order INTEGER NOT NULL,
+            is_na BOOLEAN,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_scale_option UNIQUE (scale_id, code),
+            FOREIGN KEY(scale_id) REFERENCES scale (id)
+        )
+        """,
+    )),
+    ("assessment", (
+        """
+        CREATE TABLE assessment (
+            id INTEGER NOT NULL,
+            process_id INTEGER NOT NULL,
+            questionnaire_version_id INTEGER NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(process_id) REFERENCES process (id),
+            FOREIGN KEY(questionnaire_version_id) REFERENCES questionnaire_version (id)
+        )
+        """,
+        'CREATE INDEX ix_assessment_process ON assessment (process_id)',
+        'CREATE INDEX ix_assessment_created_at ON assessment (created_at)',
+    )),
+    ("question", (
+        """
+        CREATE TABLE question (
+            id INTEGER NOT NULL,
+            questionnaire_version_id INTEGER NOT NULL,
+            dimension_id INTEGER NOT NULL,
+            code VARCHAR(20) NOT NULL,
+            text TEXT NOT NULL,
+            question_type VARCHAR(20) NOT NULL,
+            unit VARCHAR(20),
+            scale_id INTEGER,
+            sort_order INTEGER NOT NULL,
+            is_filter_question BOOLEAN,
+            depends_on_question_id INTEGER,
+            depends_on_option_id INTEGER,
+            filter_description TEXT,
+            depends_logic VARCHAR(10) NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_question_code UNIQUE (questionnaire_version_id, code),
+            FOREIGN KEY(questionnaire_version_id) REFERENCES questionnaire_version (id),
+            FOREIGN KEY(dimension_id) REFERENCES dimension (id),
+            FOREIGN KEY(scale_id) REFERENCES scale (id),
+            FOREIGN KEY(depends_on_question_id) REFERENCES question (id),
+            FOREIGN KEY(depends_on_option_id) REFERENCES scale_option (id)
+        )
+        """,
+        'CREATE INDEX ix_question_dimension_sort ON question (dimension_id, sort_order)',
+    )),
+    ("total_result", (
+        """
+        CREATE TABLE total_result (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            total_rpa FLOAT,
+            total_ipa FLOAT,
+            rpa_excluded BOOLEAN,
+            ipa_excluded BOOLEAN,
+            recommendation VARCHAR(20),
+            combined_score FLOAT,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (assessment_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id)
+        )
+        """,
+        'CREATE INDEX ix_total_result_combined_score ON total_result (combined_score)',
+    )),
+    ("economic_metric", (
+        """
+        CREATE TABLE economic_metric (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            automation_type VARCHAR(10),
+            "key" VARCHAR(50) NOT NULL,
+            value FLOAT NOT NULL,
+            unit VARCHAR(20),
+            PRIMARY KEY (id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id)
+        )
+        """,
+        'CREATE INDEX ix_economic_metric_key_value '
+        'ON economic_metric ("key", value, assessment_id)',
+        'CREATE INDEX ix_economic_metric_assessment_key '
+        'ON economic_metric (assessment_id, "key", value)',
+    )),
+    ("result_snapshot", (
+        """
+        CREATE TABLE result_snapshot (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            format_version INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (assessment_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id)
+        )
+        """,
+    )),
+    ("scoring_job", (
+        """
+        CREATE TABLE scoring_job (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            reason VARCHAR(30) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            attempts INTEGER NOT NULL,
+            max_attempts INTEGER NOT NULL,
+            lease_owner VARCHAR(64),
+            lease_expires_at DATETIME,
+            available_at DATETIME NOT NULL,
+            last_error TEXT,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id)
+        )
+        """,
+        'CREATE INDEX ix_scoring_job_status_available ON scoring_job (status, available_at)',
+        'CREATE INDEX ix_scoring_job_assessment ON scoring_job (assessment_id)',
+    )),
+    ("question_condition", (
+        """
+        CREATE TABLE question_condition (
+            id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            depends_on_question_id INTEGER NOT NULL,
+            depends_on_option_id INTEGER NOT NULL,
+            sort_order INTEGER,
+            PRIMARY KEY (id),
+            FOREIGN KEY(question_id) REFERENCES question (id),
+            FOREIGN KEY(depends_on_question_id) REFERENCES question (id),
+            FOREIGN KEY(depends_on_option_id) REFERENCES scale_option (id)
+        )
+        """,
+    )),
+    ("option_score", (
+        """
+        CREATE TABLE option_score (
+            id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            scale_option_id INTEGER NOT NULL,
+            automation_type VARCHAR(10) NOT NULL,
+            score FLOAT,
+            is_exclusion BOOLEAN,
+            is_applicable BOOLEAN,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_option_score UNIQUE (question_id, scale_option_id, automation_type),
+            FOREIGN KEY(question_id) REFERENCES question (id),
+            FOREIGN KEY(scale_option_id) REFERENCES scale_option (id)
+        )
+        """,
+    )),
+    ("answer", (
+        """
+        CREATE TABLE answer (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            scale_option_id INTEGER,
+            numeric_value FLOAT,
+            is_applicable BOOLEAN NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_answer_assessment_question_option
+                UNIQUE (assessment_id, question_id, scale_option_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id),
+            FOREIGN KEY(question_id) REFERENCES question (id),
+            FOREIGN KEY(scale_option_id) REFERENCES scale_option (id)
+        )
+        """,
+    )),
+    ("dimension_result", (
+        """
+        CREATE TABLE dimension_result (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            dimension_id INTEGER NOT NULL,
+            automation_type VARCHAR(10) NOT NULL,
+            mean_score FLOAT,
+            is_excluded BOOLEAN,
+            excluded_by_question_id INTEGER,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_dim_result UNIQUE (assessment_id, dimension_id, automation_type),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id),
+            FOREIGN KEY(dimension_id) REFERENCES dimension (id),
+            FOREIGN KEY(excluded_by_question_id) REFERENCES question (id)
+        )
+        """,
+    )),
+    ("hint", (
+        """
+        CREATE TABLE hint (
+            id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            scale_option_id INTEGER,
+            automation_type VARCHAR(10),
+            hint_text TEXT NOT NULL,
+            hint_type VARCHAR(20),
+            PRIMARY KEY (id),
+            FOREIGN KEY(question_id) REFERENCES question (id),
+            FOREIGN KEY(scale_option_id) REFERENCES scale_option (id)
+        )
+        """,
+    )),
+    ("shared_dimension_answer", (
+        """
+        CREATE TABLE shared_dimension_answer (
+            id INTEGER NOT NULL,
+            dimension_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            scale_option_id INTEGER,
+            numeric_value FLOAT,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_shared_dimension_answer_dim_question_option
+                UNIQUE (dimension_id, question_id, scale_option_id),
+            FOREIGN KEY(dimension_id) REFERENCES dimension (id),
+            FOREIGN KEY(question_id) REFERENCES question (id),
+            FOREIGN KEY(scale_option_id) REFERENCES scale_option (id)
+        )
+        """,
+    )),
+)
@@ -0,0 +1,120 @@
+"""
+Von assessment abhängige Tabellen mit ON DELETE CASCADE (Migration 8)
+Eingefroren auf den Stand dieser Migration, damit spätere Änderungen an den
+Modellen nicht schon beim Neuaufbau der Tabellen entstehen (sie gehören in
+eigene Migrationen, siehe models/baseline_schema.py).
+
+Je Tabelle CREATE TABLE und ihre Indizes, Format wie BASELINE_SCHEMA.
+"""
+
+CASCADE_SCHEMA = (
+    ("answer", (
+        """
+        CREATE TABLE answer (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            scale_option_id INTEGER,
+            numeric_value FLOAT,
+            is_applicable BOOLEAN NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_answer_assessment_question_option
+                UNIQUE (assessment_id, question_id, scale_option_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE,
+            FOREIGN KEY(question_id) REFERENCES question (id),
+            FOREIGN KEY(scale_option_id) REFERENCES scale_option (id)
+        )
+        """,
+    )),
+    ("dimension_result", (
+        """
+        CREATE TABLE dimension_result (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            dimension_id INTEGER NOT NULL,
+            automation_type VARCHAR(10) NOT NULL,
+            mean_score FLOAT,
+            is_excluded BOOLEAN,
+            excluded_by_question_id INTEGER,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_dim_result UNIQUE (assessment_id, dimension_id, automation_type),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE,
+            FOREIGN KEY(dimension_id) REFERENCES dimension (id),
+            FOREIGN KEY(excluded_by_question_id) REFERENCES question (id)
+        )
+        """,
+    )),
+    ("total_result", (
+        """
+        CREATE TABLE total_result (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            total_rpa FLOAT,
+            total_ipa FLOAT,
+            rpa_excluded BOOLEAN,
+            ipa_excluded BOOLEAN,
+            recommendation VARCHAR(20),
+            combined_score FLOAT,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (assessment_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE
+        )
+        """,
+        'CREATE INDEX ix_total_result_combined_score ON total_result (combined_score)',
+    )),
+    ("economic_metric", (
+        """
+        CREATE TABLE economic_metric (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            automation_type VARCHAR(10),
+            "key" VARCHAR(50) NOT NULL,
+            value FLOAT NOT NULL,
+            unit VARCHAR(20),
+            PRIMARY KEY (id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE
+        )
+        """,
+        'CREATE INDEX ix_economic_metric_key_value '
+        'ON economic_metric ("key", value, assessment_id)',
+        'CREATE INDEX ix_economic_metric_assessment_key '
+        'ON economic_metric (assessment_id, "key", value)',
+    )),
+    ("result_snapshot", (
+        """
+        CREATE TABLE result_snapshot (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            format_version INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (assessment_id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE
+        )
+        """,
+    )),
+    ("scoring_job", (
+        """
+        CREATE TABLE scoring_job (
+            id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            reason VARCHAR(30) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            attempts INTEGER NOT NULL,
+            max_attempts INTEGER NOT NULL,
+            lease_owner VARCHAR(64),
+            lease_expires_at DATETIME,
+            available_at DATETIME NOT NULL,
+            last_error TEXT,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(assessment_id) REFERENCES assessment (id) ON DELETE CASCADE
+        )
+        """,
+        'CREATE INDEX ix_scoring_job_status_available ON scoring_job (status, available_at)',
+        'CREATE INDEX ix_scoring_job_assessment ON scoring_job (assessment_id)',
+    )),
+)
@@ -31,6 +31,10 @@ class Dimension(db.Model):
     name = db.Column(db.String(120), nullable=False)
     sort_order = db.Column(db.Integer, nullable=False, default=0)
     calc_method = db.Column(db.String(30), nullable=False, default="mean")
+    __table_args__ = (
+        # Fragebogen: Dimensionen einer Version in Anzeige-Reihenfolge
+        db.Index("ix_dimension_version_sort", "questionnaire_version_id", "sort_order"),
+    )
 
     # Beziehungen
     questions = db.relationship('Question', backref='dimension', lazy=True)
@@ -99,6 +103,8 @@ class Question(db.Model):
     depends_logic = db.Column(db.String(10), default="all", nullable=False)
     __table_args__ = (
         db.UniqueConstraint("questionnaire_version_id", "code", name="uq_question_code"),
+        # Fragebogen: Fragen einer Dimension in Anzeige-Reihenfolge
+        db.Index("ix_question_dimension_sort", "dimension_id", "sort_order"),
     )
 
     # Beziehungen
@@ -143,6 +149,10 @@ class Process(db.Model):
     description = db.Column(db.Text)
     industry = db.Column(db.String(80))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        # Vergleichsübersicht: Branchenfilter und Branchenliste (DISTINCT)
+        db.Index("ix_process_industry", "industry"),
+    )
 
     # Beziehungen
     assessments = db.relationship('Assessment', backref='process', lazy=True)
@@ -156,10 +166,17 @@ class Assessment(db.Model):
     questionnaire_version_id = db.Column(db.Integer,
                                          db.ForeignKey("questionnaire_version.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        # Suche und Löschen: Assessments eines Prozesses
+        db.Index("ix_assessment_process", "process_id"),
+        # Vergleichsübersicht: Standardsortierung und Datumsfilter
+        db.Index("ix_assessment_created_at", "created_at"),
+    )
 
-    # Beziehungen
-    answers = db.relationship('Answer', backref='assessment', lazy=True)
-    dimension_results = db.relationship('DimensionResult', backref='assessment', lazy=True)
+    # Beziehungen (abhängige Zeilen löscht die Datenbank per ON DELETE CASCADE)
+    answers = db.relationship('Answer', backref='assessment', lazy=True, passive_deletes=True)
+    dimension_results = db.relationship('DimensionResult', backref='assessment', lazy=True,
+                                        passive_deletes=True)
 
 
 class Answer(db.Model):
@@ -167,7 +184,8 @@ class Answer(db.Model):
     """
     __tablename__ = "answer"
     id = db.Column(db.Integer, primary_key=True)
-    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id"), nullable=False)
+    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id", ondelete="CASCADE"),
+                              nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey("question.id"), nullable=False)
     scale_option_id = db.Column(db.Integer, db.ForeignKey("scale_option.id"), nullable=True)
     numeric_value = db.Column(db.Float, nullable=True)
@@ -183,13 +201,30 @@ class Answer(db.Model):
     question_obj = db.relationship('Question', backref='answers')
     scale_option = db.relationship('ScaleOption', backref='answers')
 
+class AnswerArchive(db.Model):
+    """
+    Antworten eines archivierten bzw. gepackt gespeicherten Assessments als ein
+    Block (services/archive_service.py, Format 2: services/answer_packing.py).
+    Solange ein Assessment hier liegt, hat es keine Zeilen in answer; Ergebnisse
+    und Kennzahlen bleiben unverändert.
+    """
+    __tablename__ = "answer_archive"
+    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id", ondelete="CASCADE"),
+                              primary_key=True, autoincrement=False)
+    format_version = db.Column(db.Integer, nullable=False)
+    answer_count = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 # ERGEBNISSE
 class DimensionResult(db.Model):
     """Ergebnis einer Dimension innerhalb eines Assessments, 
     inklusive Durchschnittswert und Ausschlussinformationen."""
     __tablename__ = "dimension_result"
     id = db.Column(db.Integer, primary_key=True)
-    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id"), nullable=False)
+    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id", ondelete="CASCADE"),
+                              nullable=False)
     dimension_id = db.Column(db.Integer, db.ForeignKey("dimension.id"), nullable=False)
     automation_type = db.Column(db.String(10), nullable=False)
     mean_score = db.Column(db.Float, nullable=True)
@@ -211,17 +246,21 @@ class TotalResult(db.Model):
     __tablename__ = "total_result"
     id = db.Column(db.Integer, primary_key=True)
     assessment_id = db.Column(db.Integer,
-                              db.ForeignKey("assessment.id"),
+                              db.ForeignKey("assessment.id", ondelete="CASCADE"),
                               nullable=False, unique=True)
     total_rpa = db.Column(db.Float, nullable=True)
     total_ipa = db.Column(db.Float, nullable=True)
     rpa_excluded = db.Column(db.Boolean, default=False)
     ipa_excluded = db.Column(db.Boolean, default=False)
     recommendation = db.Column(db.String(20), nullable=True)
+    # Höherer der beiden Gesamtscores (0, wenn keiner vorliegt); für Sortierung/Filter im Vergleich
+    combined_score = db.Column(db.Float, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Beziehungen
-    assessment_obj = db.relationship('Assessment', backref='total_result', uselist=False)
+    assessment_obj = db.relationship(
+        'Assessment', backref=db.backref('total_result', uselist=False, passive_deletes=True)
+    )
 
 
 class EconomicMetric(db.Model):
@@ -229,14 +268,64 @@ class EconomicMetric(db.Model):
     Automatisierungspotenzialen, Kosten oder Einsparungen."""
     __tablename__ = "economic_metric"
     id = db.Column(db.Integer, primary_key=True)
-    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id"), nullable=False)
+    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id", ondelete="CASCADE"),
+                              nullable=False)
     automation_type = db.Column(db.String(10), nullable=True)
     key = db.Column(db.String(50), nullable=False)
     value = db.Column(db.Float, nullable=False)
     unit = db.Column(db.String(20), nullable=True)
 
+    __table_args__ = (
+        # Rangliste: absteigend je Kennzahl bzw. Nachschlagen je Assessment
+        db.Index("ix_economic_metric_key_value", "key", "value", "assessment_id"),
+        db.Index("ix_economic_metric_assessment_key", "assessment_id", "key", "value"),
+    )
+
     # Beziehungen
-    assessment_obj = db.relationship('Assessment', backref='economic_metrics')
+    assessment_obj = db.relationship(
+        'Assessment', backref=db.backref('economic_metrics', passive_deletes=True)
+    )
+
+
+class ResultSnapshot(db.Model):
+    """
+    Fertig aufbereitetes Ergebnis eines Assessments (zlib-komprimiertes JSON)
+    für Ergebnisseite und Export. Wird bei jeder Auswertung neu geschrieben;
+    Snapshots mit abweichender format_version werden beim Lesen neu erzeugt.
+    """
+    __tablename__ = "result_snapshot"
+    id = db.Column(db.Integer, primary_key=True)
+    assessment_id = db.Column(db.Integer,
+                              db.ForeignKey("assessment.id", ondelete="CASCADE"),
+                              nullable=False, unique=True)
+    format_version = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PortfolioAggregate(db.Model):
+    """
+    Laufend gepflegte Summen über alle ausgewerteten Assessments je Branche,
+    Monat (Erstellungsdatum) und Empfehlung. Mittelwerte und Quoten werden
+    beim Lesen aus Summen und Zählern gebildet.
+    """
+    __tablename__ = "portfolio_aggregate"
+    id = db.Column(db.Integer, primary_key=True)
+    industry = db.Column(db.String(80), nullable=False, default="")
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    recommendation = db.Column(db.String(30), nullable=False, default="")
+    assessment_count = db.Column(db.Integer, nullable=False, default=0)
+    rpa_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    rpa_score_count = db.Column(db.Integer, nullable=False, default=0)
+    ipa_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    ipa_score_count = db.Column(db.Integer, nullable=False, default=0)
+    rpa_excluded_count = db.Column(db.Integer, nullable=False, default=0)
+    ipa_excluded_count = db.Column(db.Integer, nullable=False, default=0)
+    fte_savings_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.UniqueConstraint("industry", "month", "recommendation", name="uq_portfolio_aggregate"),
+    )
 
 
 class Hint(db.Model):
@@ -253,6 +342,22 @@ class Hint(db.Model):
     scale_option = db.relationship('ScaleOption', backref='hints')
 
 
+class QuestionnaireSnapshot(db.Model):
+    """
+    Inhalts-Hash des kompilierten Fragebogens einer Version, dessen Snapshot-Datei
+    aktuell ist (services/questionnaire_snapshot.py). Ändern sich Stammdaten
+    über das ORM, werden alle Zeilen gelöscht; fehlt die Zeile, wird der
+    Fragebogen aus den Tabellen geladen.
+    """
+    __tablename__ = "questionnaire_snapshot"
+    questionnaire_version_id = db.Column(
+        db.Integer, db.ForeignKey("questionnaire_version.id", ondelete="CASCADE"),
+        primary_key=True, autoincrement=False
+    )
+    content_hash = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class SharedDimensionAnswer(db.Model):
     """
     Gemeinsame Antworten für Dimensionen (Plattform & Organisation)
@@ -280,3 +385,42 @@ class SharedDimensionAnswer(db.Model):
     dimension_obj = db.relationship('Dimension', backref='shared_answers')
     question_obj = db.relationship('Question', backref='shared_answers')
     scale_option = db.relationship('ScaleOption', backref='shared_answers')
+
+
+# JOBS
+class ScoringJob(db.Model):
+    """
+    Persistenter Auftrag zur (Neu-)Berechnung eines Assessments.
+    Wird von separaten Worker-Prozessen (python -m worker) per Lease abgearbeitet.
+    """
+    __tablename__ = "scoring_job"
+    id = db.Column(db.Integer, primary_key=True)
+    assessment_id = db.Column(db.Integer, db.ForeignKey("assessment.id", ondelete="CASCADE"),
+                              nullable=False)
+    reason = db.Column(db.String(30), nullable=False, default="evaluate")  # evaluate, update, questionnaire, economic
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    lease_owner = db.Column(db.String(64), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_scoring_job_status_available", "status", "available_at"),
+        db.Index("ix_scoring_job_assessment", "assessment_id"),
+    )
+
+
+# SCHEMA
+class SchemaVersion(db.Model):
+    """
+    Angewendete Schema-Migrationen (siehe services/schema_migrations.py).
+    Die höchste version ist der aktuelle Stand der Datenbank.
+    """
+    __tablename__ = "schema_version"
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,180 @@
+"""
+Gepackte Antworten eines Assessments
+Statt einer Zeile je Antwort (bzw. je gewählter Multiple-Choice-Option) werden
+alle Antworten eines Assessments als ein Array fester Einträge gespeichert,
+gefolgt von den IDs der gewählten Optionen:
+
+    uint32  Anzahl der Einträge (Kopf)
+    je Eintrag:
+        uint32  ID der Frage
+        uint8   Flags (anwendbar, Zahlenwert vorhanden)
+        uint8   Anzahl gewählter Optionen
+        float64 Zahlenwert
+    danach uint32 je gewählter Option (scale_option.id, in Eintragsreihenfolge)
+
+Gespeichert werden die IDs selbst, nicht Positionen im kompilierten
+Fragebogen: ein Block bleibt lesbar, wenn Fragen oder Optionen später
+umsortiert werden. Der Fragebogen wird nur beim Packen gebraucht (Prüfung,
+Reihenfolge). Das Array wird zlib-komprimiert; Entpacken sind zwei
+struct-Aufrufe und liefert AnswerRows für Filterlogik, Scoring und Anzeige
+(ohne ORM-Objekte).
+
+Je Frage bleibt ein Eintrag: Optionen erscheinen beim Entpacken in der
+Sortierreihenfolge beim Packen, von mehreren Zahlenwerten bleibt der letzte
+(wie bei der Auswertung).
+
+Das ältere Format mit Bitmasken über die Optionspositionen (Archivformat 2)
+liest unpack_indexed_answers, solange der Fragebogen unverändert ist.
+"""
+import struct
+import weakref
+import zlib
+from typing import NamedTuple
+
+from services.scoring_engine import AnswerRow
+
+HEADER = struct.Struct("<I")
+ENTRY = struct.Struct("<IBBd")
+FLAG_APPLICABLE = 1
+FLAG_HAS_VALUE = 2
+MAX_OPTIONS = 64
+
+# Archivformat 2: Prüfsumme, dann (Index der Frage, Flags, Bitmaske, Zahlenwert)
+INDEXED_HEADER = struct.Struct("<I")
+INDEXED_ENTRY = struct.Struct("<HBQd")
+
+_layouts = weakref.WeakKeyDictionary()
+
+
+class PackedAnswersError(ValueError):
+    """Ein Block lässt sich gegen den aktuellen Fragebogen nicht entpacken"""
+
+
+class PackingLayout(NamedTuple):
+    checksum: int
+    index_by_question: dict  # question_id -> Index in compiled.questions
+    bit_by_option: dict  # (question_id, option_id) -> Bit
+    options_by_index: tuple  # Index -> Option-IDs in Bit-Reihenfolge
+
+
+def packing_layout(compiled):
+    """Indizes und Prüfsumme eines kompilierten Fragebogens (einmal je Objekt berechnet)"""
+    layout = _layouts.get(compiled)
+    if layout is not None:
+        return layout
+    if len(compiled.questions) > 0xFFFF:
+        raise ValueError("Zu viele Fragen für das gepackte Format")
+
+    index_by_question = {}
+    bit_by_option = {}
+    options_by_index = []
+    checksum = 0
+    for index, question in enumerate(compiled.questions):
+        option_ids = tuple(option.id for option in compiled.options_for(question))
+        if len(option_ids) > MAX_OPTIONS:
+            raise ValueError(
+                f"Frage {question.code}: mehr als {MAX_OPTIONS} Optionen lassen sich nicht packen"
+            )
+        index_by_question[question.id] = index
+        for bit, option_id in enumerate(option_ids):
+            bit_by_option[(question.id, option_id)] = bit
+        options_by_index.append(option_ids)
+        checksum = zlib.crc32(repr((question.id, option_ids)).encode("ascii"), checksum)
+
+    layout = PackingLayout(checksum, index_by_question, bit_by_option, tuple(options_by_index))
+    _layouts[compiled] = layout
+    return layout
+
+
+def pack_answers(compiled, rows):
+    """
+    Packt AnswerRows eines Assessments
+
+    Raises:
+        ValueError: bei Fragen oder Optionen, die nicht zum Fragebogen gehören
+    """
+    layout = packing_layout(compiled)
+    entries = {}
+    for row in rows:
+        index = layout.index_by_question.get(row.question_id)
+        if index is None:
+            raise ValueError(f"Frage {row.question_id} gehört nicht zur Fragebogen-Version")
+        mask, flags, value = entries.get(index, (0, 0, 0.0))
+        if row.scale_option_id is not None:
+            bit = layout.bit_by_option.get((row.question_id, row.scale_option_id))
+            if bit is None:
+                raise ValueError(
+                    f"Option {row.scale_option_id} gehört nicht zu Frage {row.question_id}"
+                )
+            mask |= 1 << bit
+        if row.numeric_value is not None:
+            flags |= FLAG_HAS_VALUE
+            value = row.numeric_value
+        if row.is_applicable:
+            flags |= FLAG_APPLICABLE
+        entries[index] = (mask, flags, value)
+
+    option_ids = []
+    buffer = bytearray(HEADER.size + ENTRY.size * len(entries))
+    HEADER.pack_into(buffer, 0, len(entries))
+    for position, index in enumerate(sorted(entries)):
+        mask, flags, value = entries[index]
+        selected = [option_id for bit, option_id in enumerate(layout.options_by_index[index])
+                    if mask >> bit & 1]
+        option_ids.extend(selected)
+        ENTRY.pack_into(buffer, HEADER.size + position * ENTRY.size,
+                        compiled.questions[index].id, flags, len(selected), value)
+    buffer += struct.pack(f"<{len(option_ids)}I", *option_ids)
+    return zlib.compress(bytes(buffer))
+
+
+def unpack_answers(payload):
+    """Entpackt einen Block zu AnswerRows (Fragen in Reihenfolge des Fragebogens beim Packen)"""
+    data = zlib.decompress(payload)
+    (count,) = HEADER.unpack_from(data)
+    options_offset = HEADER.size + count * ENTRY.size
+    option_ids = struct.unpack_from(f"<{(len(data) - options_offset) // 4}I", data, options_offset)
+
+    rows = []
+    position = 0
+    for question_id, flags, selected, value in ENTRY.iter_unpack(
+            memoryview(data)[HEADER.size:options_offset]):
+        applicable = bool(flags & FLAG_APPLICABLE)
+        numeric_value = value if flags & FLAG_HAS_VALUE else None
+        if not selected:
+            rows.append(AnswerRow(question_id, None, numeric_value, applicable))
+            continue
+        for option_id in option_ids[position:position + selected]:
+            rows.append(AnswerRow(question_id, option_id, numeric_value, applicable))
+        position += selected
+    return rows
+
+
+def unpack_indexed_answers(compiled, payload):
+    """
+    Entpackt einen Block im Archivformat 2 (Positionen im kompilierten Fragebogen)
+
+    Raises:
+        PackedAnswersError: wenn Fragen oder Optionen seit dem Packen geändert
+            oder umsortiert wurden
+    """
+    layout = packing_layout(compiled)
+    data = zlib.decompress(payload)
+    (checksum,) = INDEXED_HEADER.unpack_from(data)
+    if checksum != layout.checksum:
+        raise PackedAnswersError("Gepackte Antworten passen nicht zur Fragebogen-Version")
+
+    questions = compiled.questions
+    rows = []
+    for index, flags, mask, value in INDEXED_ENTRY.iter_unpack(
+            memoryview(data)[INDEXED_HEADER.size:]):
+        question_id = questions[index].id
+        applicable = bool(flags & FLAG_APPLICABLE)
+        numeric_value = value if flags & FLAG_HAS_VALUE else None
+        if not mask:
+            rows.append(AnswerRow(question_id, None, numeric_value, applicable))
+            continue
+        for bit, option_id in enumerate(layout.options_by_index[index]):
+            if mask >> bit & 1:
+                rows.append(AnswerRow(question_id, option_id, numeric_value, applicable))
+    return rows
@@ -0,0 +1,245 @@
+"""
+Archiv für die Antworten älterer Assessments
+Die Tabelle answer wächst um rund 60 Zeilen je Assessment. Ausgewertete
+Assessments, die älter als ARCHIVE_AFTER_DAYS sind, werden deshalb blockweise
+archiviert: ihre Antworten landen gepackt (services/answer_packing.py) als ein
+Block in answer_archive und werden aus answer gelöscht. Mit
+ANSWER_STORAGE=packed wird jedes Assessment direkt nach der Auswertung so
+gespeichert. Ergebnisse (total_result inkl.
+combined_score, dimension_result, economic_metric) und Snapshots bleiben in den
+Arbeitstabellen; Vergleich, Rangliste und Portfolio sind nicht betroffen.
+
+Lesende Zugriffe (Ergebnisseite, Vergleichsmatrix, Antwortexport) entpacken
+den Block im Speicher. Vor dem Bearbeiten oder Neuberechnen holt
+rehydrate_assessment die Antworten zurück nach answer.
+"""
+import json
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, delete, exists, insert, select, update
+
+from models.database import Assessment, Answer, AnswerArchive, TotalResult, ScoringJob
+from services.answer_packing import (
+    PackedAnswersError, pack_answers, unpack_answers, unpack_indexed_answers
+)
+from services.questionnaire_cache import get_compiled_questionnaire
+from services.scoring_engine import AnswerRow
+from extensions import db
+
+# Erhöhen, wenn sich der Aufbau des Blocks ändert (decode_answers muss ältere lesen können)
+# 1: zlib-komprimiertes JSON der AnswerRows, 2: gepackt mit Positionen im Fragebogen,
+# 3: gepackt mit Frage- und Options-IDs (answer_packing)
+ARCHIVE_FORMAT_VERSION = 3
+ARCHIVE_BATCH_SIZE = 500
+
+
+def encode_answers(compiled, rows):
+    """Antworten eines Assessments als Block im aktuellen Format"""
+    return pack_answers(compiled, rows)
+
+
+def decode_answers(compiled, format_version, payload):
+    """
+    Antworten eines Blocks beliebigen Formats
+
+    Raises:
+        PackedAnswersError: Block im Format 2, dessen Fragebogen seitdem geändert wurde
+    """
+    if format_version == 1:
+        return [AnswerRow(*row) for row in json.loads(zlib.decompress(payload))]
+    if format_version == 2:
+        return unpack_indexed_answers(compiled, payload)
+    return unpack_answers(payload)
+
+
+def archive_row(assessment_id, compiled, rows, archived_at):
+    """Zeile für answer_archive (z. B. für Bulk-INSERTs im Massenimport)"""
+    return {
+        "assessment_id": assessment_id,
+        "format_version": ARCHIVE_FORMAT_VERSION,
+        "answer_count": len(rows),
+        "payload": encode_answers(compiled, rows),
+        "archived_at": archived_at,
+    }
+
+
+def load_archived_answers(assessment_ids):
+    """
+    Archivierte Antworten mehrerer Assessments, ohne sie zurückzuholen
+
+    Returns:
+        dict assessment_id -> Liste von AnswerRow (nur archivierte Assessments)
+    """
+    if not assessment_ids:
+        return {}
+    return {
+        row.assessment_id: decode_answers(
+            get_compiled_questionnaire(row.questionnaire_version_id),
+            row.format_version, row.payload
+        )
+        for row in db.session.query(
+            AnswerArchive.assessment_id, Assessment.questionnaire_version_id,
+            AnswerArchive.format_version, AnswerArchive.payload
+        ).join(
+            Assessment, AnswerArchive.assessment_id == Assessment.id
+        ).filter(AnswerArchive.assessment_id.in_(assessment_ids))
+    }
+
+
+def select_archivable(older_than_days):
+    """
+    SELECT der Assessments, die archiviert werden können: älter als
+    older_than_days, ausgewertet, ohne offenen Scoring-Job und noch nicht archiviert
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    open_job = exists().where(
+        ScoringJob.assessment_id == Assessment.id, ScoringJob.status.in_(("pending", "running"))
+    )
+    archived = exists().where(AnswerArchive.assessment_id == Assessment.id)
+    return select(Assessment.id).join(
+        TotalResult, TotalResult.assessment_id == Assessment.id
+    ).where(
+        Assessment.created_at < cutoff, ~open_job, ~archived
+    ).order_by(Assessment.id)
+
+
+def archive_assessments(older_than_days, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Archiviert alle passenden Assessments in Blöcken von batch_size
+    (eine Transaktion je Block).
+
+    Returns:
+        dict mit assessments und answers (Anzahl archiviert)
+    """
+    if older_than_days < 0:
+        raise ValueError("older_than_days darf nicht negativ sein")
+    report = {"assessments": 0, "answers": 0}
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select_archivable(older_than_days).where(Assessment.id > last_id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return report
+        last_id = ids[-1]
+
+        report["answers"] += _move_to_archive(ids)
+        db.session.commit()
+        report["assessments"] += len(ids)
+
+
+def _move_to_archive(assessment_ids):
+    """
+    Schreibt die Antworten der Assessments als Blöcke nach answer_archive und
+    löscht sie aus answer (ohne Commit).
+
+    Returns:
+        Anzahl der verschobenen Antwortzeilen
+    """
+    versions = dict(db.session.query(Assessment.id, Assessment.questionnaire_version_id)
+                    .filter(Assessment.id.in_(assessment_ids)))
+    rows_by_assessment = {assessment_id: [] for assessment_id in versions}
+    for r in db.session.query(
+        Answer.assessment_id, Answer.question_id, Answer.scale_option_id,
+        Answer.numeric_value, Answer.is_applicable
+    ).filter(Answer.assessment_id.in_(assessment_ids)).order_by(Answer.assessment_id, Answer.id):
+        rows_by_assessment[r.assessment_id].append(
+            AnswerRow(r.question_id, r.scale_option_id, r.numeric_value, r.is_applicable))
+    if not rows_by_assessment:
+        return 0
+
+    now = datetime.utcnow()
+    db.session.execute(insert(AnswerArchive), [
+        archive_row(assessment_id, get_compiled_questionnaire(versions[assessment_id]), rows, now)
+        for assessment_id, rows in rows_by_assessment.items()
+    ])
+    db.session.execute(delete(Answer).where(Answer.assessment_id.in_(assessment_ids)))
+    return sum(len(rows) for rows in rows_by_assessment.values())
+
+
+def pack_assessment(assessment_id):
+    """
+    Speichert die Antworten eines (gerade ausgewerteten) Assessments gepackt
+    (ANSWER_STORAGE=packed); ein bereits gepacktes Assessment bleibt unverändert.
+    """
+    if db.session.query(exists().where(AnswerArchive.assessment_id == assessment_id)).scalar():
+        return
+    _move_to_archive([assessment_id])
+    db.session.commit()
+
+
+def repack_archive(batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Schreibt Blöcke älterer Formate im aktuellen Format neu (ohne Commit,
+    z. B. innerhalb einer Migration). Blöcke, die sich nicht mehr entpacken
+    lassen (PackedAnswersError), bleiben unverändert.
+
+    Returns:
+        Anzahl der neu geschriebenen Blöcke
+    """
+    repacked = 0
+    last_id = 0
+    while True:
+        batch = db.session.query(
+            AnswerArchive.assessment_id, Assessment.questionnaire_version_id,
+            AnswerArchive.format_version, AnswerArchive.payload
+        ).join(
+            Assessment, AnswerArchive.assessment_id == Assessment.id
+        ).filter(
+            AnswerArchive.format_version < ARCHIVE_FORMAT_VERSION,
+            AnswerArchive.assessment_id > last_id
+        ).order_by(AnswerArchive.assessment_id).limit(batch_size).all()
+        if not batch:
+            return repacked
+        last_id = batch[-1].assessment_id
+
+        updates = []
+        for row in batch:
+            compiled = get_compiled_questionnaire(row.questionnaire_version_id)
+            try:
+                rows = decode_answers(compiled, row.format_version, row.payload)
+            except PackedAnswersError as e:
+                print(f"Archivblock von Assessment {row.assessment_id} übersprungen: {e}")
+                continue
+            updates.append({
+                "b_assessment_id": row.assessment_id,
+                "format_version": ARCHIVE_FORMAT_VERSION,
+                "payload": encode_answers(compiled, rows),
+            })
+        if not updates:
+            continue
+        db.session.connection().execute(
+            update(AnswerArchive.__table__).where(
+                AnswerArchive.__table__.c.assessment_id == bindparam("b_assessment_id")
+            ).values(format_version=bindparam("format_version"), payload=bindparam("payload")),
+            updates
+        )
+        repacked += len(updates)
+
+
+def rehydrate_assessment(assessment_id):
+    """
+    Holt die archivierten Antworten eines Assessments zurück nach answer
+    und löscht den Archivblock. Blöcke im Format 1 behalten die ursprüngliche
+    Reihenfolge, gepackte liefern je Frage einen Eintrag (Optionen sortiert).
+
+    Returns:
+        True, wenn das Assessment archiviert war
+    """
+    archived = db.session.query(
+        Assessment.questionnaire_version_id, AnswerArchive.format_version, AnswerArchive.payload
+    ).join(
+        Assessment, AnswerArchive.assessment_id == Assessment.id
+    ).filter(AnswerArchive.assessment_id == assessment_id).first()
+    if archived is None:
+        return False
+    rows = decode_answers(get_compiled_questionnaire(archived.questionnaire_version_id),
+                          archived.format_version, archived.payload)
+    if rows:
+        db.session.execute(insert(Answer), [
+            {"assessment_id": assessment_id, **row._asdict()} for row in rows
+        ])
+    db.session.execute(delete(AnswerArchive).where(AnswerArchive.assessment_id == assessment_id))
+    db.session.commit()
+    return True
@@ -0,0 +1,389 @@
+"""
+Vergleichsübersicht: Filter, Sortierung und Seitenaufteilung in der Datenbank
+Sortiert und gefiltert wird auf gespeicherten Spalten (u. a. dem indizierten
+total_result.combined_score), sodass pro Seite nur die angezeigten Zeilen
+geladen werden.
+
+Die Vergleichsmatrix stellt mehrere Assessments nebeneinander; alle Scores,
+Ausschlüsse und Wirtschaftlichkeitskennzahlen stammen aus einer einzigen
+pivotierten Abfrage über dimension_result und economic_metric.
+"""
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, false, func, literal, or_, select, union_all
+
+from models.database import (
+    Process, Assessment, Answer, Dimension, DimensionResult, TotalResult, EconomicMetric
+)
+from services.archive_service import load_archived_answers
+from services.questionnaire_cache import get_compiled_questionnaire
+from services.result_service import build_answer_details, group_answers
+from services.scoring_engine import AnswerRow
+from services.scoring_service import ScoringService
+from services.search_service import build_match_query, matching_process_ids, search_available
+from extensions import db
+
+PER_PAGE_CHOICES = (25, 50, 100)
+DEFAULT_PER_PAGE = 25
+SORT_KEYS = ("date", "rpa", "ipa", "score")
+RECOMMENDATIONS = ("RPA", "IPA", "Neutral", "Keine Automatisierung", "Unvollständig")
+
+MAX_MATRIX_ASSESSMENTS = 20
+AUTOMATION_TYPES = ("RPA", "IPA")
+ECONOMIC_LABELS = {
+    "roi": "ROI",
+    "personeller_nutzen": "Personeller Nutzen",
+    "fte_einsparung": "FTE-Einsparung",
+    "initiale_fixkosten": "Initiale Fixkosten",
+    "variable_kosten_jahr": "Variable Kosten (Jahr)",
+    "haeufigkeit_jahr": "Häufigkeit (Jahr)",
+    "zeitersparnis_h_jahr": "Zeitersparnis (h/Jahr)",
+}
+
+
+def _score_sort_value(score_column, excluded_column):
+    """Wie bisher im Browser: ausgeschlossen -1, ohne Score -2, sonst der Score"""
+    return case(
+        (excluded_column.is_(True), -1),
+        (or_(score_column.is_(None), score_column == 0), -2),
+        else_=score_column,
+    )
+
+
+SORT_COLUMNS = {
+    "date": Assessment.created_at,
+    "rpa": _score_sort_value(TotalResult.total_rpa, TotalResult.rpa_excluded),
+    "ipa": _score_sort_value(TotalResult.total_ipa, TotalResult.ipa_excluded),
+    "score": TotalResult.combined_score,
+}
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_float(value):
+    try:
+        return float(str(value).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_comparison_args(args):
+    """
+    Liest Filter, Sortierung und Seite aus den Query-Parametern.
+    Ungültige Werte werden ignoriert (Standardwerte).
+
+    Returns:
+        dict mit q, industry, recommendation, date_from, date_to, min_score,
+        max_score, sort, dir, page, per_page (Werte als Strings für die URL)
+    """
+    sort = args.get("sort", "date")
+    if sort not in SORT_KEYS:
+        sort = "date"
+    direction = args.get("dir", "desc")
+    if direction not in ("asc", "desc"):
+        direction = "desc"
+
+    per_page = args.get("per_page", DEFAULT_PER_PAGE, type=int)
+    if per_page not in PER_PAGE_CHOICES:
+        per_page = DEFAULT_PER_PAGE
+
+    recommendation = args.get("recommendation", "")
+    if recommendation not in RECOMMENDATIONS:
+        recommendation = ""
+
+    return {
+        "q": args.get("q", "").strip()[:100],
+        "industry": args.get("industry", "").strip(),
+        "recommendation": recommendation,
+        "date_from": args.get("date_from", "") if _parse_date(args.get("date_from")) else "",
+        "date_to": args.get("date_to", "") if _parse_date(args.get("date_to")) else "",
+        "min_score": args.get("min_score", "") if _parse_float(args.get("min_score")) is not None else "",
+        "max_score": args.get("max_score", "") if _parse_float(args.get("max_score")) is not None else "",
+        "sort": sort,
+        "dir": direction,
+        "page": max(args.get("page", 1, type=int) or 1, 1),
+        "per_page": per_page,
+    }
+
+
+def has_active_filters(params):
+    return any(params[key] for key in
+               ("q", "industry", "recommendation", "date_from", "date_to", "min_score", "max_score"))
+
+
+def build_comparison_query(params):
+    """Gefilterte und sortierte Abfrage über TotalResult ⋈ Assessment ⋈ Process"""
+    query = db.session.query(
+        Assessment.id.label("id"),
+        Process.name.label("process_name"),
+        Process.industry.label("industry"),
+        Assessment.created_at.label("created_at"),
+        TotalResult.total_rpa.label("total_rpa"),
+        TotalResult.total_ipa.label("total_ipa"),
+        TotalResult.rpa_excluded.label("rpa_excluded"),
+        TotalResult.ipa_excluded.label("ipa_excluded"),
+        TotalResult.recommendation.label("recommendation"),
+        TotalResult.combined_score.label("combined_score"),
+    ).join(
+        Assessment, TotalResult.assessment_id == Assessment.id
+    ).join(
+        Process, Assessment.process_id == Process.id
+    )
+    query = apply_comparison_filters(query, params)
+
+    sort_column = SORT_COLUMNS[params["sort"]]
+    if params["dir"] == "asc":
+        return query.order_by(sort_column.asc(), Assessment.id.asc())
+    return query.order_by(sort_column.desc(), Assessment.id.desc())
+
+
+def apply_comparison_filters(query, params):
+    """Filter der Vergleichsübersicht auf eine Abfrage über Assessment, Process und TotalResult"""
+    match_query = build_match_query(params["q"])
+    if match_query:
+        if search_available():
+            query = query.filter(Process.id.in_(matching_process_ids(match_query)))
+        else:
+            query = query.filter(Process.name.ilike(f"%{params['q']}%"))
+    if params["industry"]:
+        query = query.filter(Process.industry == params["industry"])
+    if params["recommendation"]:
+        query = query.filter(TotalResult.recommendation == params["recommendation"])
+    if params["date_from"]:
+        query = query.filter(Assessment.created_at >= _parse_date(params["date_from"]))
+    if params["date_to"]:
+        # Bis-Datum einschließlich des ganzen Tages
+        query = query.filter(
+            Assessment.created_at < _parse_date(params["date_to"]) + timedelta(days=1)
+        )
+    if params["min_score"]:
+        query = query.filter(TotalResult.combined_score >= _parse_float(params["min_score"]))
+    if params["max_score"]:
+        query = query.filter(TotalResult.combined_score <= _parse_float(params["max_score"]))
+    return query
+
+
+def get_comparison_page(params):
+    """Eine Seite der Vergleichsübersicht (Flask-SQLAlchemy Pagination)"""
+    return build_comparison_query(params).paginate(
+        page=params["page"], per_page=params["per_page"], error_out=False
+    )
+
+
+def list_industries():
+    """Alle vorkommenden Branchen (für den Filter)"""
+    return [
+        industry for (industry,) in
+        db.session.query(Process.industry).filter(
+            Process.industry.isnot(None), Process.industry != ""
+        ).distinct().order_by(Process.industry)
+    ]
+
+
+def parse_assessment_ids(args, limit=MAX_MATRIX_ASSESSMENTS):
+    """
+    Assessment-IDs aus ?ids=1,2,3 bzw. ?ids=1&ids=2 (Reihenfolge bleibt
+    erhalten, Duplikate und ungültige Werte werden ignoriert; limit=None
+    für beliebig viele)
+    """
+    ids = {}
+    for value in args.getlist("ids"):
+        for part in re.split(r"[,\s]+", value):
+            if part.isdigit():
+                ids.setdefault(int(part), None)
+    return list(ids)[:limit]
+
+
+def _pivot_column(key_match, value):
+    return func.max(case((key_match, value)))
+
+
+def build_comparison_matrix(assessment_ids):
+    """
+    Stellt Assessments nebeneinander: Gesamtergebnis, Dimension × Typ
+    (Score, Ausschluss), Wirtschaftlichkeitskennzahlen und Antwortunterschiede.
+
+    Returns:
+        dict mit assessments, totals, dimensions, economic_metrics, answers
+        (Listen mit einem Wert pro Assessment in Reihenfolge von assessments)
+    """
+    version_ids = [v for (v,) in db.session.query(
+        Assessment.questionnaire_version_id
+    ).filter(Assessment.id.in_(assessment_ids)).distinct()]
+    compiled_by_version = {v: get_compiled_questionnaire(v) for v in version_ids}
+
+    # Dimensionen aller beteiligten Versionen (nach Code zusammengeführt)
+    dimension_names = {}
+    for compiled in compiled_by_version.values():
+        for dimension in compiled.dimensions:
+            dimension_names.setdefault(dimension.code, dimension.name)
+
+    # Langform: (assessment, code, typ/kennzahl, wert, ausschluss) aus beiden Tabellen
+    long_rows = union_all(
+        select(
+            DimensionResult.assessment_id.label("assessment_id"),
+            Dimension.code.label("code"),
+            DimensionResult.automation_type.label("item"),
+            DimensionResult.mean_score.label("value"),
+            DimensionResult.is_excluded.label("is_excluded"),
+        ).join(
+            Dimension, DimensionResult.dimension_id == Dimension.id
+        ).where(DimensionResult.assessment_id.in_(assessment_ids)),
+        select(
+            EconomicMetric.assessment_id,
+            literal("economic"),
+            EconomicMetric.key,
+            EconomicMetric.value,
+            false(),
+        ).where(EconomicMetric.assessment_id.in_(assessment_ids)),
+    ).subquery()
+
+    pivot_columns = []
+    for code in dimension_names:
+        for automation_type in AUTOMATION_TYPES:
+            match = and_(long_rows.c.code == code, long_rows.c.item == automation_type)
+            pivot_columns.append(
+                _pivot_column(match, long_rows.c.value).label(f"score|{code}|{automation_type}"))
+            pivot_columns.append(
+                _pivot_column(match, long_rows.c.is_excluded).label(f"excluded|{code}|{automation_type}"))
+    for key, _ in ScoringService.ECONOMIC_METRICS:
+        match = and_(long_rows.c.code == "economic", long_rows.c.item == key)
+        pivot_columns.append(_pivot_column(match, long_rows.c.value).label(f"economic|{key}"))
+
+    rows = db.session.execute(
+        select(
+            Assessment.id, Assessment.questionnaire_version_id, Assessment.created_at,
+            Process.name, Process.industry,
+            TotalResult.total_rpa, TotalResult.total_ipa,
+            TotalResult.rpa_excluded, TotalResult.ipa_excluded, TotalResult.recommendation,
+            *pivot_columns
+        ).select_from(Assessment).join(
+            Process, Assessment.process_id == Process.id
+        ).outerjoin(
+            TotalResult, TotalResult.assessment_id == Assessment.id
+        ).outerjoin(
+            long_rows, long_rows.c.assessment_id == Assessment.id
+        ).where(
+            Assessment.id.in_(assessment_ids)
+        ).group_by(Assessment.id, Process.id, TotalResult.id)
+    ).all()
+
+    # Reihenfolge wie angefragt; nicht vorhandene IDs entfallen
+    by_id = {row.id: row._mapping for row in rows}
+    pivot = [by_id[aid] for aid in assessment_ids if aid in by_id]
+
+    assessments = [{
+        "id": row["id"],
+        "name": row["name"],
+        "industry": row["industry"],
+        "created_at": row["created_at"],
+        "total_rpa": row["total_rpa"],
+        "total_ipa": row["total_ipa"],
+        "rpa_excluded": bool(row["rpa_excluded"]),
+        "ipa_excluded": bool(row["ipa_excluded"]),
+        "recommendation": row["recommendation"],
+    } for row in pivot]
+
+    dimensions = []
+    for code, name in dimension_names.items():
+        cells = [{
+            automation_type: {
+                "score": row[f"score|{code}|{automation_type}"],
+                "excluded": bool(row[f"excluded|{code}|{automation_type}"]),
+            } for automation_type in AUTOMATION_TYPES
+        } for row in pivot]
+        if any(cell[t]["score"] is not None or cell[t]["excluded"]
+               for cell in cells for t in AUTOMATION_TYPES):
+            for automation_type in AUTOMATION_TYPES:
+                _mark_best([cell[automation_type] for cell in cells])
+            dimensions.append({"code": code, "name": name, "cells": cells})
+
+    economic_metrics = [{
+        "key": key,
+        "label": ECONOMIC_LABELS.get(key, key),
+        "unit": unit,
+        "values": [row[f"economic|{key}"] for row in pivot],
+    } for key, unit in ScoringService.ECONOMIC_METRICS
+        if any(row[f"economic|{key}"] is not None for row in pivot)]
+
+    answers = _answer_differences(compiled_by_version, pivot)
+
+    totals = {
+        automation_type: [{
+            "score": a[f"total_{automation_type.lower()}"],
+            "excluded": a[f"{automation_type.lower()}_excluded"],
+        } for a in assessments]
+        for automation_type in AUTOMATION_TYPES
+    }
+    for cells in totals.values():
+        _mark_best(cells)
+
+    return {
+        "assessments": assessments,
+        "totals": totals,
+        "dimensions": dimensions,
+        "economic_metrics": economic_metrics,
+        "answers": answers,
+    }
+
+
+def _mark_best(cells):
+    """Markiert den höchsten (nicht ausgeschlossenen) Score, sofern es etwas zu vergleichen gibt"""
+    scores = [c["score"] for c in cells if c["score"] is not None and not c["excluded"]]
+    best = max(scores) if len(scores) > 1 else None
+    for cell in cells:
+        cell["best"] = best is not None and not cell["excluded"] and cell["score"] == best
+
+
+def _answer_differences(compiled_by_version, pivot):
+    """
+    Antworttexte je Frage und Assessment (eine Abfrage über answer);
+    differs markiert Fragen mit unterschiedlichen Antworten.
+    """
+    ids = [row["id"] for row in pivot]
+    answer_rows = {aid: [] for aid in ids}
+    for r in db.session.query(
+        Answer.assessment_id, Answer.question_id, Answer.scale_option_id,
+        Answer.numeric_value, Answer.is_applicable
+    ).filter(Answer.assessment_id.in_(ids)).order_by(Answer.id):
+        answer_rows[r.assessment_id].append(
+            AnswerRow(r.question_id, r.scale_option_id, r.numeric_value, r.is_applicable))
+    # Archivierte Assessments haben keine Zeilen in answer
+    answer_rows.update(load_archived_answers([aid for aid in ids if not answer_rows[aid]]))
+
+    # Fragecode -> Antworttext je Assessment (Anzeige wie auf der Ergebnisseite)
+    texts = []
+    questions = {}
+    for row in pivot:
+        compiled = compiled_by_version[row["questionnaire_version_id"]]
+        answers_by_q = group_answers(answer_rows[row["id"]])
+        by_code = {}
+        for dimension in compiled.dimensions:
+            for detail in build_answer_details(compiled, dimension.id, answers_by_q):
+                text = detail["answer"] if detail["is_applicable"] else "nicht relevant"
+                by_code[detail["question_code"]] = text
+                question = compiled.question_by_code[detail["question_code"]]
+                questions.setdefault(question.code, (
+                    (dimension.sort_order, question.sort_order, question.id),
+                    dimension.code, question.text))
+        texts.append(by_code)
+
+    result = []
+    for question_code, (_, dimension_code, question_text) in sorted(
+        questions.items(), key=lambda item: item[1][0]
+    ):
+        values = [by_code.get(question_code, "–") for by_code in texts]
+        result.append({
+            "dimension_code": dimension_code,
+            "question_code": question_code,
+            "question_text": question_text,
+            "values": values,
+            "differs": len(set(values)) > 1,
+        })
+    return result
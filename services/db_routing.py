@@ -0,0 +1,80 @@
+"""
+Lese-/Schreib-Routing der Datenbank-Session
+Mit @read_only markierte Routen lesen über eine eigene Engine mit eigenem
+Verbindungspool (Bind READ_BIND_KEY): bei SQLite dieselbe Datei
+schreibgeschützt (mode=ro, im WAL-Betrieb ohne Sperren gegenüber Schreibern),
+bei anderen Datenbanken z. B. ein Replikat (SQLALCHEMY_READ_URI).
+Nur SELECT-Statements werden umgeleitet; Flush, INSERT/UPDATE/DELETE, Text-SQL
+und Verbindungen ohne Statement (z. B. ORM-Bulk-Insert) laufen auch in diesen
+Routen immer über die primäre Engine.
+
+Ist ein Mandant gesetzt (g.tenant, services/tenancy.py), laufen alle Zugriffe
+über dessen Engine; ein eigener Lese-Bind je Mandant entfällt (WAL-Leser
+blockieren nicht, die Zahl offener Dateien bleibt begrenzt).
+"""
+from functools import wraps
+from urllib.parse import quote
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+READ_BIND_KEY = "readonly"
+
+
+def read_bind_options(primary_uri, read_uri=None, pool_size=10):
+    """
+    Engine-Optionen für den Lese-Bind (SQLALCHEMY_BINDS[READ_BIND_KEY]).
+
+    Returns:
+        dict mit url und pool_size oder None, wenn weder read_uri gesetzt
+        noch die primäre Datenbank eine SQLite-Datei ist
+    """
+    if not read_uri:
+        url = make_url(primary_uri)
+        if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+            return None
+        path = quote(url.database.replace("\\", "/"), safe="/:")
+        read_uri = f"sqlite:///file:{path}?mode=ro&uri=true"
+    return {"url": read_uri, "pool_size": pool_size}
+
+
+def read_only(view):
+    """Markiert eine Route als lesend: Abfragen laufen über den Lese-Bind"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def current_tenant():
+    """Mandant des aktuellen App-Kontexts oder None (Einzelbetrieb)"""
+    return g.get("tenant") if has_app_context() else None
+
+
+def _read_only_requested():
+    return has_app_context() and g.get("db_read_only", False)
+
+
+class RoutingSession(Session):
+    """
+    Session, die Zugriffe an die Engine des Mandanten und Lesezugriffe in
+    @read_only-Routen an den Lese-Bind leitet
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        tenant = current_tenant()
+        if bind is None and tenant is not None:
+            # Für die Dauer des App-Kontexts festhalten: verdrängt ein anderer Thread
+            # die Engine, bleibt die laufende Transaktion auf ihrer Verbindung
+            engine = g.get("tenant_engine")
+            if engine is None:
+                engine = g.tenant_engine = current_app.extensions["tenant_engines"].get_engine(tenant)
+            return engine
+        if (bind is None and not self._flushing and _read_only_requested()
+                and getattr(clause, "is_select", False)):
+            engine = self._db.engines.get(READ_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,85 @@
+"""
+Löschen von Assessments – einzeln oder mengenbasiert
+Antworten, Ergebnisse, Kennzahlen, Snapshots und Scoring-Jobs löscht die
+Datenbank per ON DELETE CASCADE mit; Prozesse ohne Assessment entfernt danach
+ein einzelnes Statement. Portfolio-Kennzahlen, Assessments und Prozesse werden
+in einer Transaktion bereinigt.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, select
+
+from models.database import Assessment, Process, TotalResult
+from services.comparison_service import (
+    parse_comparison_args, has_active_filters, apply_comparison_filters, parse_assessment_ids
+)
+from services.portfolio_service import PortfolioService
+from extensions import db
+
+
+def parse_delete_args(args):
+    """
+    Auswahl für das Massenlöschen: IDs (ids=1,2,3), older_than (Tage seit der
+    Erstellung) und die Filter der Vergleichsübersicht; alle Angaben müssen
+    zutreffen.
+
+    Raises:
+        ValueError: bei ungültigem older_than oder ganz ohne Auswahl
+    """
+    older_than = args.get("older_than", "").strip()
+    if older_than and (not older_than.isdigit() or int(older_than) < 1):
+        raise ValueError("older_than muss eine positive Anzahl Tage sein")
+    params = {
+        **parse_comparison_args(args),
+        "ids": parse_assessment_ids(args, limit=None),
+        "older_than": int(older_than) if older_than else None,
+    }
+    if not params["ids"] and not params["older_than"] and not has_active_filters(params):
+        raise ValueError("Keine Auswahl: IDs, older_than oder mindestens ein Filter erforderlich")
+    return params
+
+
+def select_assessment_ids(params):
+    """SELECT der Assessment-IDs, die zur Auswahl aus parse_delete_args passen"""
+    query = select(Assessment.id).join(
+        Process, Assessment.process_id == Process.id
+    ).outerjoin(
+        TotalResult, TotalResult.assessment_id == Assessment.id
+    )
+    query = apply_comparison_filters(query, params)
+    if params["ids"]:
+        query = query.filter(Assessment.id.in_(params["ids"]))
+    if params["older_than"]:
+        query = query.filter(
+            Assessment.created_at < datetime.utcnow() - timedelta(days=params["older_than"])
+        )
+    return query
+
+
+def delete_assessments(assessment_ids, dry_run=False):
+    """
+    Löscht die Assessments (ID-Liste oder SELECT über IDs) samt abhängigen Daten
+    und danach alle Prozesse ohne Assessment. Mit dry_run wird die Transaktion
+    zurückgerollt und nur gezählt.
+
+    Returns:
+        dict mit assessments und processes (Anzahl gelöschter Zeilen)
+    """
+    try:
+        PortfolioService.retract_assessments(assessment_ids)
+        deleted = db.session.execute(
+            delete(Assessment).where(Assessment.id.in_(assessment_ids)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        orphans = db.session.execute(
+            delete(Process).where(~exists().where(Assessment.process_id == Process.id)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"assessments": deleted, "processes": orphans, "dry_run": dry_run}
@@ -0,0 +1,313 @@
+"""
+Massenexport von Assessments als CSV oder JSON Lines
+Alle (bzw. die gefilterten) Assessments werden in einer Abfrage mit yield_per
+gelesen und Datensatz für Datensatz ausgegeben; die Ergebnisdaten stammen aus
+den Ergebnis-Snapshots. Der Speicherbedarf hängt damit nicht von der Anzahl
+der Assessments ab.
+
+CSV:   eine Zeile pro Assessment (Prozess, Gesamtergebnis, dim_<code>_rpa/_ipa,
+       Wirtschaftlichkeitskennzahlen, optional eine Spalte pro Fragecode)
+JSONL: ein Objekt pro Assessment mit process, total, dimensions,
+       economic_metrics (optional mit den Antworten je Dimension)
+
+Mit level=answers entsteht stattdessen ein Antwortexport im Langformat (eine
+Zeile bzw. ein Objekt pro beantworteter Frage, ANSWER_COLUMNS). Er wird aus
+einer einzigen, nach Assessment sortierten Antwortabfrage (zusammengeführt mit
+den archivierten Antworten) und dem gecachten kompilierten Fragebogen aufgebaut.
+"""
+import csv
+import heapq
+import json
+from io import StringIO
+from itertools import groupby
+from operator import attrgetter, itemgetter
+
+from sqlalchemy import func
+
+from models.database import (
+    Process, Assessment, Dimension, Question, Answer, AnswerArchive, TotalResult, ResultSnapshot
+)
+from services.archive_service import decode_answers
+from services.comparison_service import (
+    apply_comparison_filters, parse_assessment_ids, parse_comparison_args
+)
+from services.questionnaire_cache import get_compiled_questionnaire
+from services.result_service import (
+    SNAPSHOT_FORMAT_VERSION, TOTAL_FIELDS, build_answer_details, build_result_view_from_db,
+    decode_snapshot, group_answers
+)
+from services.scoring_engine import AnswerRow
+from services.scoring_service import ScoringService
+from extensions import db
+
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+EXPORT_LEVELS = ("assessments", "answers")
+YIELD_PER = 500
+CHUNK_SIZE = 64 * 1024
+PROCESS_COLUMNS = ("assessment_id", "created_at", "name", "description", "industry")
+DIMENSION_FIELDS = ("code", "name", "rpa_score", "ipa_score", "rpa_excluded", "ipa_excluded")
+ANSWER_COLUMNS = (
+    "assessment_id", "process_name", "industry", "dimension_code", "dimension_name",
+    "question_code", "question_text", "answer", "is_applicable", "rpa_score", "ipa_score",
+)
+
+
+def parse_export_args(args):
+    """
+    Format, Ebene, Antwortoption, IDs und die Filter der Vergleichsübersicht.
+
+    Raises:
+        ValueError: bei unbekanntem Format oder unbekannter Ebene
+
+    Returns:
+        dict mit format, level, include_answers, ids und den Filtern aus
+        parse_comparison_args
+    """
+    fmt = args.get("format", "csv").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError("Unbekanntes Exportformat (erwartet: csv oder jsonl)")
+    level = args.get("level", "assessments").strip().lower()
+    if level not in EXPORT_LEVELS:
+        raise ValueError("Unbekannte Exportebene (erwartet: assessments oder answers)")
+    return {
+        **parse_comparison_args(args),
+        "format": fmt,
+        "level": level,
+        "include_answers": args.get("answers", "").lower() in ("1", "true", "yes", "ja"),
+        "ids": parse_assessment_ids(args, limit=None),
+    }
+
+
+def _export_query(params):
+    """Assessments mit Prozess und Snapshot, gestreamt in Blöcken von YIELD_PER"""
+    query = db.session.query(
+        Assessment.id, Assessment.created_at,
+        Process.name, Process.description, Process.industry,
+        TotalResult.id.label("total_id"),
+        ResultSnapshot.format_version, ResultSnapshot.payload,
+    ).join(
+        Process, Assessment.process_id == Process.id
+    ).outerjoin(
+        TotalResult, TotalResult.assessment_id == Assessment.id
+    ).outerjoin(
+        ResultSnapshot, ResultSnapshot.assessment_id == Assessment.id
+    )
+    query = apply_comparison_filters(query, params)
+    if params["ids"]:
+        query = query.filter(Assessment.id.in_(params["ids"]))
+    return query.order_by(Assessment.id).yield_per(YIELD_PER)
+
+
+def iter_export_records(params):
+    """
+    Exportdatensätze in ID-Reihenfolge. Fehlt der Snapshot eines ausgewerteten
+    Assessments (oder ist er veraltet), wird die Ansicht aus den
+    Ergebnistabellen aufgebaut, ohne sie zu speichern.
+
+    Yields:
+        dicts mit assessment_id, created_at, process, total, dimensions, economic_metrics
+    """
+    for row in _export_query(params):
+        if row.payload is not None and row.format_version == SNAPSHOT_FORMAT_VERSION:
+            view = decode_snapshot(row.payload)
+        elif row.total_id is not None:
+            view, _ = build_result_view_from_db(row.id)
+        else:
+            view = {"total": None, "dimensions": [], "economic_metrics": {}}
+
+        dimensions = []
+        for dim in view["dimensions"]:
+            entry = {field: dim[field] for field in DIMENSION_FIELDS}
+            if params["include_answers"]:
+                entry["answers"] = dim["answers"]
+            dimensions.append(entry)
+
+        yield {
+            "assessment_id": row.id,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "process": {"name": row.name, "description": row.description,
+                        "industry": row.industry},
+            "total": view["total"],
+            "dimensions": dimensions,
+            "economic_metrics": view["economic_metrics"],
+        }
+
+
+def _answer_query(params):
+    """Antworten der gefilterten Assessments, nach Assessment sortiert und gestreamt"""
+    query = db.session.query(
+        Answer.assessment_id, Assessment.questionnaire_version_id,
+        Process.name, Process.industry,
+        Answer.question_id, Answer.scale_option_id, Answer.numeric_value, Answer.is_applicable,
+    ).join(
+        Assessment, Answer.assessment_id == Assessment.id
+    ).join(
+        Process, Assessment.process_id == Process.id
+    ).outerjoin(
+        TotalResult, TotalResult.assessment_id == Assessment.id
+    )
+    query = apply_comparison_filters(query, params)
+    if params["ids"]:
+        query = query.filter(Assessment.id.in_(params["ids"]))
+    return query.order_by(Answer.assessment_id, Answer.id).yield_per(YIELD_PER)
+
+
+def _archive_query(params):
+    """Archivierte Antworten der gefilterten Assessments (ein Block je Assessment)"""
+    query = db.session.query(
+        AnswerArchive.assessment_id, Assessment.questionnaire_version_id,
+        Process.name, Process.industry, AnswerArchive.format_version, AnswerArchive.payload,
+    ).join(
+        Assessment, AnswerArchive.assessment_id == Assessment.id
+    ).join(
+        Process, Assessment.process_id == Process.id
+    ).outerjoin(
+        TotalResult, TotalResult.assessment_id == Assessment.id
+    )
+    query = apply_comparison_filters(query, params)
+    if params["ids"]:
+        query = query.filter(Assessment.id.in_(params["ids"]))
+    return query.order_by(AnswerArchive.assessment_id).yield_per(YIELD_PER)
+
+
+def _iter_answer_groups(params):
+    """
+    (assessment_id, questionnaire_version_id, Prozessname, Branche, Antworten)
+    je Assessment in ID-Reihenfolge – aus answer und answer_archive zusammengeführt
+    """
+    def hot():
+        for assessment_id, rows in groupby(_answer_query(params), key=attrgetter("assessment_id")):
+            rows = list(rows)
+            first = rows[0]
+            yield (assessment_id, first.questionnaire_version_id, first.name, first.industry, [
+                AnswerRow(r.question_id, r.scale_option_id, r.numeric_value, r.is_applicable)
+                for r in rows
+            ])
+
+    archived = (
+        (r.assessment_id, r.questionnaire_version_id, r.name, r.industry, decode_answers(
+            get_compiled_questionnaire(r.questionnaire_version_id), r.format_version, r.payload))
+        for r in _archive_query(params)
+    )
+    return heapq.merge(hot(), archived, key=itemgetter(0))
+
+
+def iter_answer_records(params):
+    """
+    Antwortdetails aller gefilterten Assessments (Langformat). Die Antworten
+    eines Assessments folgen in der Abfrage aufeinander und werden gruppiert an
+    build_answer_details übergeben – wie auf der Ergebnisseite, aber ohne
+    weitere Abfragen je Assessment. Archivierte Assessments werden aus ihrem
+    Archivblock gelesen.
+
+    Yields:
+        dicts mit den Feldern aus ANSWER_COLUMNS
+    """
+    for assessment_id, version_id, name, industry, answers in _iter_answer_groups(params):
+        compiled = get_compiled_questionnaire(version_id)
+        answers_by_q = group_answers(answers)
+        for dimension in compiled.dimensions:
+            for detail in build_answer_details(compiled, dimension.id, answers_by_q):
+                yield {
+                    "assessment_id": assessment_id,
+                    "process_name": name,
+                    "industry": industry,
+                    "dimension_code": dimension.code,
+                    "dimension_name": dimension.name,
+                    **detail,
+                }
+
+
+def _dimension_codes():
+    """Dimensionscodes aller Fragebogenversionen in Fragebogen-Reihenfolge"""
+    return [code for (code,) in db.session.query(Dimension.code).group_by(
+        Dimension.code
+    ).order_by(func.min(Dimension.sort_order), Dimension.code)]
+
+
+def _question_codes():
+    """Fragecodes aller Fragebogenversionen in Fragebogen-Reihenfolge"""
+    return [code for (code,) in db.session.query(Question.code).join(
+        Dimension, Question.dimension_id == Dimension.id
+    ).group_by(Question.code).order_by(
+        func.min(Dimension.sort_order), func.min(Question.sort_order), Question.code
+    )]
+
+
+def csv_columns(include_answers=False):
+    """Spaltenliste des CSV-Exports"""
+    columns = list(PROCESS_COLUMNS) + list(TOTAL_FIELDS)
+    for code in _dimension_codes():
+        columns += [f"dim_{code}_rpa", f"dim_{code}_ipa"]
+    columns += [key for key, _ in ScoringService.ECONOMIC_METRICS]
+    if include_answers:
+        columns += _question_codes()
+    return columns
+
+
+def _csv_row(record):
+    """Flache CSV-Zeile (dict) zu einem Exportdatensatz"""
+    total = record["total"] or {}
+    row = {
+        "assessment_id": record["assessment_id"],
+        "created_at": record["created_at"],
+        **record["process"],
+        **{field: total.get(field) for field in TOTAL_FIELDS},
+    }
+    for dim in record["dimensions"]:
+        row[f"dim_{dim['code']}_rpa"] = "X" if dim["rpa_excluded"] else dim["rpa_score"]
+        row[f"dim_{dim['code']}_ipa"] = "X" if dim["ipa_excluded"] else dim["ipa_score"]
+        for answer in dim.get("answers", ()):
+            row[answer["question_code"]] = answer["answer"]
+    for key, metric in record["economic_metrics"].items():
+        row[key] = metric["value"]
+    return row
+
+
+def _chunked(lines):
+    """Fasst Zeilen zu Blöcken von etwa CHUNK_SIZE Zeichen zusammen"""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _iter_csv(rows, columns):
+    output = StringIO()
+    writer = csv.DictWriter(output, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+    yield output.getvalue()
+
+
+def _iter_jsonl(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def generate_export(params):
+    """
+    Exportdatei als Generator von Textblöcken (für Streaming-Responses)
+
+    Args:
+        params: Ergebnis von parse_export_args
+    """
+    answer_level = params["level"] == "answers"
+    records = iter_answer_records(params) if answer_level else iter_export_records(params)
+    if params["format"] == "jsonl":
+        lines = _iter_jsonl(records)
+    elif answer_level:
+        lines = _iter_csv(records, ANSWER_COLUMNS)
+    else:
+        lines = _iter_csv(map(_csv_row, records), csv_columns(params["include_answers"]))
+    return _chunked(lines)
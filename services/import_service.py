@@ -0,0 +1,244 @@
+"""
+Massenimport von Assessments aus CSV oder JSON Lines
+Die Datei wird zeilenweise gelesen, gegen den kompilierten Fragebogen validiert,
+in Batches eingefügt und mit der speicherbasierten Auswertung bewertet.
+Der Speicherbedarf hängt nur von der Batch-Größe ab, nicht von der Dateigröße.
+
+CSV:   Spalten name, description, industry + eine Spalte pro Fragecode.
+       Mehrfachauswahl mit "|" trennen. Optionen per Code oder Label.
+JSONL: {"name": ..., "description": ..., "industry": ...,
+        "answers": {"3.1": "4", "2.1": ["RPA", "KI"], "7.1": 5000}}
+"""
+import csv
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from models.database import (
+    Process, Assessment, Answer, AnswerArchive, QuestionnaireVersion, ResultSnapshot
+)
+from services.questionnaire_cache import get_compiled_questionnaire
+from services.archive_service import archive_row
+from services.result_service import build_result_view, snapshot_row
+from services.portfolio_service import PortfolioService, FTE_METRIC_KEY
+from services.scoring_engine import (
+    AnswerRow, apply_filter_logic, score_assessment, bulk_insert_results
+)
+from extensions import db
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+PROCESS_FIELDS = ("name", "description", "industry")
+MULTI_VALUE_SEPARATOR = "|"
+
+
+def detect_format(filename, explicit=None):
+    """Bestimmt das Importformat ('csv' oder 'jsonl') aus Parameter oder Dateiendung"""
+    fmt = (explicit or "").strip().lower()
+    if not fmt and filename:
+        fmt = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if fmt in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    if fmt == "csv":
+        return "csv"
+    raise ValueError("Unbekanntes Importformat (erwartet: csv oder jsonl)")
+
+
+def iter_records(text_stream, fmt, compiled):
+    """
+    Liest Datensätze zeilenweise.
+
+    Yields:
+        (zeilennummer, datensatz) mit datensatz = {name, description, industry, answers}
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(text_stream)
+        unknown = [c for c in (reader.fieldnames or [])
+                   if c not in PROCESS_FIELDS and c not in compiled.question_by_code]
+        if unknown:
+            raise ValueError(f"Unbekannte Spalten: {', '.join(unknown)}")
+        for row in reader:
+            answers = {code: value for code, value in row.items()
+                       if code not in PROCESS_FIELDS and value not in (None, "")}
+            record = {field: row.get(field) for field in PROCESS_FIELDS}
+            record["answers"] = answers
+            yield reader.line_num, record
+    else:
+        for line_no, line in enumerate(text_stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"Ungültiges JSON: {e.msg}")
+                continue
+            if not isinstance(record, dict):
+                yield line_no, ValueError("Datensatz muss ein JSON-Objekt sein")
+                continue
+            yield line_no, record
+
+
+def build_answer_rows(compiled, record):
+    """
+    Validiert einen Datensatz und erzeugt Antwortzeilen für alle Fragen
+    (wie das Formular: unbeantwortete Fragen erhalten eine leere Antwort).
+
+    Raises:
+        ValueError bei unbekannten Fragen oder ungültigen Werten
+    """
+    for field in PROCESS_FIELDS:
+        if not isinstance(record.get(field), (str, type(None))):
+            raise ValueError(f"{field} muss Text sein")
+    if not str(record.get("name") or "").strip():
+        raise ValueError("Prozessname (name) fehlt")
+    answers = record.get("answers") or {}
+    if not isinstance(answers, dict):
+        raise ValueError("answers muss ein Objekt (Fragecode -> Wert) sein")
+
+    unknown = [code for code in answers if code not in compiled.question_by_code]
+    if unknown:
+        raise ValueError(f"Unbekannte Fragecodes: {', '.join(map(str, unknown))}")
+
+    rows = []
+    for question in compiled.questions:
+        value = answers.get(question.code)
+        if value in (None, "", []):
+            rows.append(AnswerRow(question.id, None, None))
+            continue
+
+        if question.question_type == "number":
+            try:
+                number = float(str(value).replace(",", ".")) if isinstance(value, str) else float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Frage {question.code}: '{value}' ist keine Zahl") from None
+            rows.append(AnswerRow(question.id, None, number))
+
+        elif question.question_type == "multiple_choice":
+            values = value if isinstance(value, list) else str(value).split(MULTI_VALUE_SEPARATOR)
+            option_ids = []
+            for v in values:
+                option = compiled.resolve_option(question, v)
+                if option is None:
+                    raise ValueError(f"Frage {question.code}: unbekannte Option '{v}'")
+                if option.id not in option_ids:
+                    option_ids.append(option.id)
+            rows.extend(AnswerRow(question.id, option_id, None) for option_id in option_ids)
+
+        else:
+            option = compiled.resolve_option(question, value)
+            if option is None:
+                raise ValueError(f"Frage {question.code}: unbekannte Option '{value}'")
+            rows.append(AnswerRow(question.id, option.id, None))
+    return rows
+
+
+def _flush_batch(compiled, batch, packed=False):
+    """Fügt Prozesse, Assessments, Antworten, Ergebnisse und Snapshots eines Batches ein
+    und ergänzt die Portfolio-Kennzahlen (mit packed die Antworten als ein Block je
+    Assessment in answer_archive)"""
+    now = datetime.utcnow()
+    processes = [{
+        "name": str(record["name"]).strip(),
+        "description": record.get("description") or "",
+        "industry": record.get("industry") or "",
+        "created_at": now,
+    } for record, _ in batch]
+    process_ids = db.session.execute(
+        insert(Process).returning(Process.id, sort_by_parameter_order=True),
+        processes
+    ).scalars().all()
+
+    assessment_ids = db.session.execute(
+        insert(Assessment).returning(Assessment.id, sort_by_parameter_order=True),
+        [{
+            "process_id": process_id,
+            "questionnaire_version_id": compiled.version_id,
+            "created_at": now,
+        } for process_id in process_ids]
+    ).scalars().all()
+
+    answer_rows = []
+    scored = []
+    snapshots = []
+    contributions = []
+    for assessment_id, process, (_, rows) in zip(assessment_ids, processes, batch):
+        filtered = apply_filter_logic(compiled, rows)
+        if packed:
+            answer_rows.append(archive_row(assessment_id, compiled, filtered, now))
+        else:
+            answer_rows.extend({
+                "assessment_id": assessment_id,
+                "question_id": row.question_id,
+                "scale_option_id": row.scale_option_id,
+                "numeric_value": row.numeric_value,
+                "is_applicable": row.is_applicable,
+            } for row in filtered)
+        result = score_assessment(compiled, assessment_id, filtered)
+        scored.append(result)
+        view = build_result_view(compiled, process, result.total_result, result.dimension_results,
+                                 filtered, result.economic_metrics)
+        snapshots.append(snapshot_row(assessment_id, view, now))
+        fte_savings = next((m["value"] for m in result.economic_metrics
+                            if m["key"] == FTE_METRIC_KEY), None)
+        contributions.append(PortfolioService.contribution(
+            process["industry"], now, result.total_result, fte_savings))
+
+    db.session.execute(insert(AnswerArchive if packed else Answer), answer_rows)
+    bulk_insert_results(scored)
+    db.session.execute(insert(ResultSnapshot), snapshots)
+    PortfolioService.apply(contributions)
+    db.session.commit()
+    return assessment_ids
+
+
+def import_assessments(text_stream, fmt, questionnaire_version_id=None, batch_size=BATCH_SIZE,
+                       packed=False):
+    """
+    Importiert Assessments aus einem Text-Stream.
+    Ungültige Datensätze werden übersprungen und im Bericht aufgeführt;
+    jeder Batch wird in einer eigenen Transaktion gespeichert. Mit packed
+    werden die Antworten gepackt gespeichert (ANSWER_STORAGE=packed).
+
+    Returns:
+        dict mit imported, failed, errors, seconds
+    """
+    started = time.perf_counter()
+    if questionnaire_version_id is None:
+        qv = QuestionnaireVersion.query.filter_by(is_active=True).first()
+        if not qv:
+            raise ValueError("Keine aktive Fragebogen-Version gefunden")
+        questionnaire_version_id = qv.id
+    compiled = get_compiled_questionnaire(questionnaire_version_id)
+
+    imported = 0
+    failed = 0
+    errors = []
+    batch = []
+
+    for line_no, record in iter_records(text_stream, fmt, compiled):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append((record, build_answer_rows(compiled, record)))
+        except ValueError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(e)})
+            continue
+
+        if len(batch) >= batch_size:
+            imported += len(_flush_batch(compiled, batch, packed))
+            batch = []
+
+    if batch:
+        imported += len(_flush_batch(compiled, batch, packed))
+
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,187 @@
+"""
+Persistente Scoring-Warteschlange in der SQLite-Datenbank
+Jobs werden per atomarem UPDATE geleast, bei Fehlern mit Backoff
+wiederholt und nach Ablauf der Lease von anderen Workern übernommen.
+"""
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, insert, literal, or_, select, update
+from models.database import Assessment, ScoringJob
+from extensions import db
+
+
+class ScoringJobQueue:
+    """Zugriff auf die Tabelle scoring_job"""
+    DEFAULT_LEASE_SECONDS = 120
+    MAX_ATTEMPTS = 3
+    RETRY_BACKOFF_SECONDS = 10
+
+    @staticmethod
+    def _insert_pending(select_assessment_ids, reason):
+        """INSERT ... SELECT für alle Assessments ohne bereits wartenden Job"""
+        now = datetime.utcnow()
+        pending = (
+            select(ScoringJob.id)
+            .where(ScoringJob.assessment_id == Assessment.id, ScoringJob.status == "pending")
+            .exists()
+        )
+        rows = select_assessment_ids.add_columns(
+            literal(reason), literal("pending"), literal(0),
+            literal(ScoringJobQueue.MAX_ATTEMPTS), literal(now), literal(now), literal(now)
+        ).where(~pending)
+        stmt = insert(ScoringJob).from_select(
+            ["assessment_id", "reason", "status", "attempts", "max_attempts",
+             "available_at", "created_at", "updated_at"],
+            rows
+        )
+        return db.session.execute(stmt).rowcount
+
+    @staticmethod
+    def enqueue(assessment_id, reason="evaluate"):
+        """
+        Legt einen Job für ein Assessment an. Ein bereits wartender Job für
+        dasselbe Assessment wird wiederverwendet (keine doppelte Berechnung).
+        """
+        return ScoringJobQueue._insert_pending(
+            select(Assessment.id).where(Assessment.id == assessment_id), reason
+        )
+
+    @staticmethod
+    def enqueue_all(reason, questionnaire_version_id=None):
+        """
+        Legt mengenbasiert Jobs für alle Assessments an, z. B. nach Änderungen
+        am Fragebogen oder an den Wirtschaftlichkeitsparametern.
+
+        Returns:
+            Anzahl neu angelegter Jobs
+        """
+        assessments = select(Assessment.id)
+        if questionnaire_version_id is not None:
+            assessments = assessments.where(
+                Assessment.questionnaire_version_id == questionnaire_version_id
+            )
+        return ScoringJobQueue._insert_pending(assessments, reason)
+
+    @staticmethod
+    def claim(worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        Least den ältesten verfügbaren Job. Verfügbar sind wartende Jobs und
+        laufende Jobs, deren Lease abgelaufen ist (abgestürzter Worker).
+
+        Returns:
+            ScoringJob oder None
+        """
+        now = datetime.utcnow()
+        expired = and_(ScoringJob.status == "running", ScoringJob.lease_expires_at < now)
+
+        # Abgelaufene Leases ohne verbleibende Versuche endgültig abbrechen
+        db.session.execute(
+            update(ScoringJob)
+            .where(expired, ScoringJob.attempts >= ScoringJob.max_attempts)
+            .values(status="failed", lease_owner=None, updated_at=now,
+                    last_error=func.coalesce(ScoringJob.last_error, "Lease abgelaufen"))
+        )
+
+        # Ein einzelnes UPDATE ist atomar: nur ein Worker erhält die Lease
+        next_job = (
+            select(ScoringJob.id)
+            .where(or_(
+                and_(ScoringJob.status == "pending", ScoringJob.available_at <= now),
+                expired,
+            ))
+            .order_by(ScoringJob.available_at, ScoringJob.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+        claimed = db.session.execute(
+            update(ScoringJob)
+            .where(ScoringJob.id == next_job)
+            .values(status="running", lease_owner=token,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=ScoringJob.attempts + 1, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+
+        if not claimed:
+            return None
+        return ScoringJob.query.filter_by(lease_owner=token, status="running").first()
+
+    @staticmethod
+    def complete(job_id, token):
+        """
+        Markiert einen Job als erledigt, sofern die Lease noch dem Aufrufer gehört
+
+        Returns:
+            False, wenn die Lease inzwischen abgelaufen und neu vergeben ist
+        """
+        done = db.session.execute(
+            update(ScoringJob)
+            .where(ScoringJob.id == job_id, ScoringJob.lease_owner == token)
+            .values(status="done", lease_owner=None, lease_expires_at=None, last_error=None,
+                    updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return bool(done)
+
+    @staticmethod
+    def fail(job_id, token, error):
+        """
+        Gibt einen Job nach einem Fehler zur Wiederholung frei oder bricht ihn ab,
+        sofern die Lease noch dem Aufrufer gehört
+
+        Returns:
+            False, wenn die Lease inzwischen abgelaufen und neu vergeben ist
+        """
+        leased = and_(ScoringJob.id == job_id, ScoringJob.lease_owner == token)
+        row = db.session.execute(
+            select(ScoringJob.attempts, ScoringJob.max_attempts).where(leased)
+        ).first()
+        if row is None:
+            db.session.commit()
+            return False
+        now = datetime.utcnow()
+        values = dict(last_error=str(error), lease_owner=None, lease_expires_at=None, updated_at=now)
+        if row.attempts >= row.max_attempts:
+            values["status"] = "failed"
+        else:
+            backoff = ScoringJobQueue.RETRY_BACKOFF_SECONDS * (2 ** (row.attempts - 1))
+            values.update(status="pending", available_at=now + timedelta(seconds=backoff))
+        failed = db.session.execute(
+            update(ScoringJob).where(leased).values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return bool(failed)
+
+    @staticmethod
+    def status(assessment_id):
+        """
+        Status des jüngsten Jobs eines Assessments
+
+        Returns:
+            ('pending', None), ('failed', Fehlertext) oder (None, None)
+        """
+        job = (
+            ScoringJob.query
+            .filter_by(assessment_id=assessment_id)
+            .order_by(ScoringJob.id.desc())
+            .first()
+        )
+        if job is None or job.status == "done":
+            return None, None
+        if job.status == "failed":
+            return "failed", job.last_error
+        return "pending", None
+
+    @staticmethod
+    def purge_assessment(assessment_id):
+        """Entfernt alle Jobs eines Assessments (z. B. beim Löschen)"""
+        ScoringJob.query.filter_by(assessment_id=assessment_id).delete()
+
+    @staticmethod
+    def assessment_exists(assessment_id):
+        """Prüft, ob das Assessment eines Jobs noch existiert"""
+        return db.session.query(Assessment.id).filter_by(id=assessment_id).first() is not None
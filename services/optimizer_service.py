@@ -0,0 +1,257 @@
+"""
+Budgetoptimierung des Automatisierungsportfolios
+Wählt aus den ausgewerteten Assessments die Teilmenge, die bei gegebenem
+Budget den personellen Nutzen bzw. die FTE-Einsparung maximiert
+(0/1-Rucksackproblem). Kosten eines Kandidaten sind die Kosten des ersten
+Jahres (initiale Fixkosten + variable Kosten), also dieselbe Basis wie beim ROI.
+
+Gelöst wird per dynamischer Programmierung über BUDGET_BUCKETS
+Budgetstufen, beschränkt auf die Kandidaten um die Greedy-Budgetgrenze
+(Kern). Kosten werden dabei aufgerundet, die Auswahl hält das Budget also
+immer ein; verbleibendes Restbudget wird anschließend greedy aufgefüllt.
+"""
+import math
+from operator import gt
+from typing import NamedTuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import aliased
+
+from models.database import Process, Assessment, TotalResult, EconomicMetric
+from extensions import db
+
+OBJECTIVES = {"benefit": "personeller_nutzen", "fte": "fte_einsparung"}
+COST_KEYS = ("initiale_fixkosten", "variable_kosten_jahr")
+TYPE_FILTERS = ("any", "RPA", "IPA")
+BUDGET_BUCKETS = 1000
+CORE_SIZE = 150
+
+
+class Candidate(NamedTuple):
+    """Ein auswählbarer Prozess (ausgewertetes Assessment)"""
+    assessment_id: int
+    process_id: int
+    process_name: str
+    industry: str
+    automation_type: str
+    combined_score: float
+    cost: float
+    benefit: float
+    fte: float
+
+
+def _parse_ids(value):
+    ids = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if part.isdigit():
+            ids.add(int(part))
+    return ids
+
+
+def parse_optimizer_args(args):
+    """
+    Liest Budget und Nebenbedingungen aus den Query-Parametern.
+
+    Raises:
+        ValueError: bei fehlendem oder ungültigem Budget bzw. Anteil
+
+    Returns:
+        dict mit budget, objective, min_score, type, rpa_share, exclude
+    """
+    budget = args.get("budget", type=float)
+    if budget is None or not math.isfinite(budget) or budget <= 0:
+        raise ValueError("Parameter 'budget' muss eine positive Zahl sein")
+
+    objective = args.get("objective", "benefit")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unbekanntes Ziel '{objective}' (erlaubt: {', '.join(OBJECTIVES)})")
+
+    automation_type = args.get("type", "any")
+    if automation_type not in TYPE_FILTERS:
+        automation_type = "any"
+
+    rpa_share = args.get("rpa_share", type=float)
+    if rpa_share is not None and not 0 <= rpa_share <= 1:
+        raise ValueError("Parameter 'rpa_share' muss zwischen 0 und 1 liegen")
+
+    return {
+        "budget": budget,
+        "objective": objective,
+        "min_score": args.get("min_score", type=float),
+        "type": automation_type,
+        "rpa_share": rpa_share,
+        "exclude": sorted(_parse_ids(args.get("exclude"))),
+    }
+
+
+def _automation_type(row):
+    """Empfohlener Typ; bei 'Neutral' der höhere nicht ausgeschlossene Score"""
+    if row.recommendation in ("RPA", "IPA"):
+        return row.recommendation
+    if row.recommendation != "Neutral":
+        return None
+    options = [(score or 0, automation_type) for score, excluded, automation_type in (
+        (row.total_rpa, row.rpa_excluded, "RPA"),
+        (row.total_ipa, row.ipa_excluded, "IPA"),
+    ) if not excluded]
+    return max(options)[1] if options else None
+
+
+def load_candidates(objective="benefit", min_score=None, automation_type="any", exclude=()):
+    """
+    Ausgewertete Assessments mit vollständigen Kosten- und Nutzenkennzahlen.
+    Kandidaten ohne positiven Zielwert oder ohne automatisierbaren Typ entfallen.
+    """
+    metrics = {key: aliased(EconomicMetric) for key in
+               (*COST_KEYS, *OBJECTIVES.values())}
+    query = select(
+        TotalResult.assessment_id, Assessment.process_id,
+        Process.name.label("process_name"), Process.industry,
+        TotalResult.recommendation, TotalResult.combined_score,
+        TotalResult.total_rpa, TotalResult.total_ipa,
+        TotalResult.rpa_excluded, TotalResult.ipa_excluded,
+        *(metric.value.label(key) for key, metric in metrics.items())
+    ).join(
+        Assessment, TotalResult.assessment_id == Assessment.id
+    ).join(
+        Process, Assessment.process_id == Process.id
+    )
+    for key, metric in metrics.items():
+        query = query.join(metric, and_(
+            metric.assessment_id == TotalResult.assessment_id, metric.key == key
+        ))
+    query = query.where(
+        TotalResult.recommendation.in_(("RPA", "IPA", "Neutral")),
+        metrics[OBJECTIVES[objective]].value > 0,
+    )
+    if min_score is not None:
+        query = query.where(TotalResult.combined_score >= min_score)
+    if exclude:
+        query = query.where(TotalResult.assessment_id.notin_(list(exclude)))
+
+    candidates = []
+    for row in db.session.execute(query):
+        candidate_type = _automation_type(row)
+        if candidate_type is None or automation_type not in ("any", candidate_type):
+            continue
+        candidates.append(Candidate(
+            row.assessment_id, row.process_id, row.process_name, row.industry,
+            candidate_type, row.combined_score,
+            max(sum(getattr(row, key) for key in COST_KEYS), 0.0),
+            row.personeller_nutzen, row.fte_einsparung,
+        ))
+    return candidates
+
+
+def _knapsack(candidates, budget, value_field):
+    """
+    0/1-Rucksack mit Kern-Ansatz: nach Nutzen je Euro sortiert, werden die
+    Kandidaten weit vor der Budgetgrenze fest gewählt, die weit dahinter
+    verworfen. Nur die CORE_SIZE Kandidaten beiderseits der Grenze gehen in
+    die DP über (mindestens) BUDGET_BUCKETS Stufen des Restbudgets
+    (Kosten aufgerundet).
+
+    Returns:
+        Liste der gewählten Kandidaten
+    """
+    free = [c for c in candidates if c.cost <= 0]
+    items = sorted(
+        (c for c in candidates if 0 < c.cost <= budget),
+        key=lambda c: (-getattr(c, value_field) / c.cost, c.assessment_id)
+    )
+
+    # Greedy-Grenze: erster Kandidat, der nicht mehr ins Budget passt
+    spent = 0.0
+    split = len(items)
+    for index, candidate in enumerate(items):
+        if spent + candidate.cost > budget:
+            split = index
+            break
+        spent += candidate.cost
+    if split == len(items):
+        return free + items
+
+    fixed = items[:max(split - CORE_SIZE, 0)]
+    core = items[len(fixed):split + CORE_SIZE]
+    core_budget = budget - sum(c.cost for c in fixed)
+
+    # Kleiner Kern: feinere Budgetstufen bei gleichem Aufwand
+    capacity = max(BUDGET_BUCKETS, 2 * CORE_SIZE * BUDGET_BUCKETS // len(core))
+    weights = [math.ceil(c.cost / core_budget * capacity) for c in core]
+    best = [0.0] * (capacity + 1)
+    taken = []
+    for weight, candidate in zip(weights, core):
+        if weight > capacity:
+            taken.append(b"")
+            continue
+        value = getattr(candidate, value_field)
+        with_item = [v + value for v in best[:capacity + 1 - weight]]
+        without_item = best[weight:]
+        taken.append(bytes(map(gt, with_item, without_item)))
+        best[weight:] = map(max, without_item, with_item)
+
+    selected = list(fixed)
+    remaining = capacity
+    for weight, candidate, flags in zip(reversed(weights), reversed(core), reversed(taken)):
+        if flags and remaining >= weight and flags[remaining - weight]:
+            selected.append(candidate)
+            remaining -= weight
+
+    # Restbudget (durch das Aufrunden) greedy nach Nutzen je Euro auffüllen
+    spent = sum(c.cost for c in selected)
+    chosen = {c.assessment_id for c in selected}
+    for candidate in items[len(fixed):]:
+        if candidate.assessment_id not in chosen and spent + candidate.cost <= budget:
+            selected.append(candidate)
+            spent += candidate.cost
+    return free + selected
+
+
+def optimize_portfolio(budget, objective="benefit", min_score=None, automation_type="any",
+                       rpa_share=None, exclude=()):
+    """
+    Wählt Prozesse so, dass der Zielwert (personeller Nutzen bzw.
+    FTE-Einsparung) bei Kosten im ersten Jahr <= budget maximal wird.
+    Mit rpa_share wird das Budget fest auf RPA (Anteil) und IPA (Rest) aufgeteilt.
+
+    Returns:
+        dict mit Parametern, selected (nach Zielwert absteigend), totals
+        und candidates (Anzahl geprüfter Kandidaten)
+    """
+    value_field = "benefit" if objective == "benefit" else "fte"
+    candidates = load_candidates(objective, min_score, automation_type, exclude)
+
+    if rpa_share is None:
+        selected = _knapsack(candidates, budget, value_field)
+    else:
+        selected = []
+        for candidate_type, share in (("RPA", rpa_share), ("IPA", 1 - rpa_share)):
+            if share > 0:
+                selected += _knapsack(
+                    [c for c in candidates if c.automation_type == candidate_type],
+                    budget * share, value_field
+                )
+    selected.sort(key=lambda c: (-getattr(c, value_field), c.assessment_id))
+
+    totals = {
+        "count": len(selected),
+        "cost": round(sum(c.cost for c in selected), 2),
+        "benefit": round(sum(c.benefit for c in selected), 2),
+        "fte": round(sum(c.fte for c in selected), 4),
+    }
+    for candidate_type in ("RPA", "IPA"):
+        totals[f"{candidate_type.lower()}_cost"] = round(
+            sum(c.cost for c in selected if c.automation_type == candidate_type), 2
+        )
+    return {
+        "budget": budget,
+        "objective": objective,
+        "min_score": min_score,
+        "type": automation_type,
+        "rpa_share": rpa_share,
+        "exclude": list(exclude),
+        "candidates": len(candidates),
+        "selected": [c._asdict() for c in selected],
+        "totals": totals,
+    }
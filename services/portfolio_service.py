@@ -0,0 +1,240 @@
+"""
+Portfolio-Kennzahlen je Branche und Monat
+Jedes ausgewertete Assessment trägt einmal zu portfolio_aggregate bei. Der
+Beitrag wird beim Auswerten addiert und vor dem Löschen oder Neuberechnen der
+Ergebnisse wieder abgezogen, sodass das Dashboard nur die (wenigen)
+Aggregatzeilen lesen muss.
+"""
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from models.database import (
+    Process, Assessment, TotalResult, EconomicMetric, PortfolioAggregate
+)
+from extensions import db
+
+FTE_METRIC_KEY = "fte_einsparung"
+KEY_COLUMNS = ("industry", "month", "recommendation")
+SUM_COLUMNS = (
+    "assessment_count",
+    "rpa_score_sum", "rpa_score_count",
+    "ipa_score_sum", "ipa_score_count",
+    "rpa_excluded_count", "ipa_excluded_count",
+    "fte_savings_sum",
+)
+
+
+class Contribution(NamedTuple):
+    """Beitrag eines Assessments zu portfolio_aggregate"""
+    industry: str
+    month: str
+    recommendation: str
+    total_rpa: Optional[float]
+    total_ipa: Optional[float]
+    rpa_excluded: bool
+    ipa_excluded: bool
+    fte_savings: Optional[float]
+
+
+class PortfolioService:
+    """Pflege und Auswertung der Tabelle portfolio_aggregate"""
+
+    @staticmethod
+    def contribution(industry, created_at, total_result, fte_savings=None):
+        """Beitrag aus bereits geladenen Werten (z. B. im Massenimport)"""
+        return Contribution(
+            industry or "",
+            created_at.strftime("%Y-%m"),
+            total_result["recommendation"] or "",
+            total_result["total_rpa"],
+            total_result["total_ipa"],
+            bool(total_result["rpa_excluded"]),
+            bool(total_result["ipa_excluded"]),
+            fte_savings,
+        )
+
+    @staticmethod
+    def _contribution_rows():
+        return db.session.query(
+            Process.industry, Assessment.created_at,
+            TotalResult.recommendation, TotalResult.total_rpa, TotalResult.total_ipa,
+            TotalResult.rpa_excluded, TotalResult.ipa_excluded,
+            EconomicMetric.value.label("fte_savings")
+        ).join(
+            Assessment, TotalResult.assessment_id == Assessment.id
+        ).join(
+            Process, Assessment.process_id == Process.id
+        ).outerjoin(
+            EconomicMetric,
+            (EconomicMetric.assessment_id == Assessment.id) & (EconomicMetric.key == FTE_METRIC_KEY)
+        )
+
+    @staticmethod
+    def load_contribution(assessment_id):
+        """Aktueller Beitrag eines Assessments oder None (nicht ausgewertet)"""
+        row = PortfolioService._contribution_rows().filter(
+            TotalResult.assessment_id == assessment_id
+        ).first()
+        if row is None:
+            return None
+        return PortfolioService.contribution(
+            row.industry, row.created_at, row._asdict(), row.fte_savings
+        )
+
+    @staticmethod
+    def apply(contributions, sign=1):
+        """
+        Addiert (sign=1) oder entfernt (sign=-1) Beiträge. Beiträge mit gleichem
+        Schlüssel werden vorher zusammengefasst; pro Schlüssel ein UPSERT.
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(SUM_COLUMNS, 0))
+        for c in contributions:
+            delta = deltas[(c.industry, c.month, c.recommendation)]
+            delta["assessment_count"] += sign
+            if c.total_rpa is not None:
+                delta["rpa_score_sum"] += sign * c.total_rpa
+                delta["rpa_score_count"] += sign
+            if c.total_ipa is not None:
+                delta["ipa_score_sum"] += sign * c.total_ipa
+                delta["ipa_score_count"] += sign
+            delta["rpa_excluded_count"] += sign * int(c.rpa_excluded)
+            delta["ipa_excluded_count"] += sign * int(c.ipa_excluded)
+            delta["fte_savings_sum"] += sign * (c.fte_savings or 0.0)
+        if not deltas:
+            return
+
+        stmt = insert(PortfolioAggregate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={
+                column: getattr(PortfolioAggregate, column) + getattr(stmt.excluded, column)
+                for column in SUM_COLUMNS
+            },
+        )
+        db.session.execute(stmt, [
+            dict(zip(KEY_COLUMNS, key), **delta) for key, delta in deltas.items()
+        ])
+        if sign < 0:
+            db.session.execute(
+                delete(PortfolioAggregate).where(PortfolioAggregate.assessment_count <= 0)
+            )
+
+    @staticmethod
+    def add_assessment(assessment_id):
+        contribution = PortfolioService.load_contribution(assessment_id)
+        if contribution is not None:
+            PortfolioService.apply([contribution])
+
+    @staticmethod
+    def retract_assessment(assessment_id):
+        """Vor dem Löschen der Ergebnisse bzw. vor Änderungen am Prozess aufrufen"""
+        contribution = PortfolioService.load_contribution(assessment_id)
+        if contribution is not None:
+            PortfolioService.apply([contribution], sign=-1)
+        return contribution
+
+    @staticmethod
+    def retract_assessments(assessment_ids):
+        """
+        Mengenbasiertes retract_assessment für eine ID-Liste bzw. ein
+        SELECT über Assessment-IDs (z. B. vor dem Massenlöschen)
+
+        Returns:
+            Anzahl der entfernten Beiträge
+        """
+        contributions = [
+            PortfolioService.contribution(row.industry, row.created_at, row._asdict(), row.fte_savings)
+            for row in PortfolioService._contribution_rows().filter(
+                TotalResult.assessment_id.in_(assessment_ids)
+            )
+        ]
+        PortfolioService.apply(contributions, sign=-1)
+        return len(contributions)
+
+    @staticmethod
+    def rebuild(commit=True):
+        """
+        Baut die Tabelle mengenbasiert aus den Ergebnistabellen neu auf
+        (Erstbefüllung bzw. Korrektur von Rundungsdrift). Mit commit=False
+        bleibt die Transaktion offen (z. B. innerhalb einer Migration).
+        """
+        fte = select(
+            EconomicMetric.assessment_id, EconomicMetric.value
+        ).where(EconomicMetric.key == FTE_METRIC_KEY).subquery()
+        industry = func.coalesce(Process.industry, "")
+        month = func.strftime("%Y-%m", Assessment.created_at)
+        recommendation = func.coalesce(TotalResult.recommendation, "")
+        rows = select(
+            industry, month, recommendation,
+            func.count(),
+            func.coalesce(func.sum(TotalResult.total_rpa), 0.0),
+            func.count(TotalResult.total_rpa),
+            func.coalesce(func.sum(TotalResult.total_ipa), 0.0),
+            func.count(TotalResult.total_ipa),
+            func.sum(case((TotalResult.rpa_excluded.is_(True), 1), else_=0)),
+            func.sum(case((TotalResult.ipa_excluded.is_(True), 1), else_=0)),
+            func.coalesce(func.sum(fte.c.value), 0.0),
+        ).select_from(TotalResult).join(
+            Assessment, TotalResult.assessment_id == Assessment.id
+        ).join(
+            Process, Assessment.process_id == Process.id
+        ).outerjoin(
+            fte, fte.c.assessment_id == Assessment.id
+        ).group_by(industry, month, recommendation)
+
+        db.session.execute(delete(PortfolioAggregate))
+        db.session.execute(
+            insert(PortfolioAggregate).from_select(list(KEY_COLUMNS + SUM_COLUMNS), rows)
+        )
+        if commit:
+            db.session.commit()
+
+    @staticmethod
+    def summary():
+        """
+        Kennzahlen gesamt, je Branche und je Monat (liest nur portfolio_aggregate)
+
+        Returns:
+            dict mit totals, by_industry, by_month
+        """
+        totals = defaultdict(lambda: dict.fromkeys(SUM_COLUMNS, 0))
+        totals_recommendations = defaultdict(lambda: defaultdict(int))
+        for row in PortfolioAggregate.query:
+            for group in (("total", ""), ("industry", row.industry), ("month", row.month)):
+                for column in SUM_COLUMNS:
+                    totals[group][column] += getattr(row, column)
+                totals_recommendations[group][row.recommendation or "Unvollständig"] += \
+                    row.assessment_count
+
+        def entry(group):
+            sums = totals[group]
+            count = sums["assessment_count"]
+            return {
+                "assessments": count,
+                "avg_rpa": _ratio(sums["rpa_score_sum"], sums["rpa_score_count"]),
+                "avg_ipa": _ratio(sums["ipa_score_sum"], sums["ipa_score_count"]),
+                "rpa_exclusion_rate": _ratio(sums["rpa_excluded_count"], count),
+                "ipa_exclusion_rate": _ratio(sums["ipa_excluded_count"], count),
+                "recommendations": dict(totals_recommendations[group]),
+                "fte_savings": round(sums["fte_savings_sum"], 4),
+            }
+
+        groups = sorted(totals)
+        return {
+            "totals": entry(("total", "")),
+            "by_industry": [
+                {"industry": key or None, **entry((kind, key))}
+                for kind, key in groups if kind == "industry"
+            ],
+            "by_month": [
+                {"month": key, **entry((kind, key))}
+                for kind, key in groups if kind == "month"
+            ],
+        }
+
+
+def _ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
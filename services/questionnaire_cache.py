@@ -0,0 +1,524 @@
+"""
+Kompilierter Fragebogen
+Lädt die Stammdaten einer Fragebogenversion (Dimensionen, Fragen, Optionen,
+Bedingungen, Option-Scores, Hinweise) einmal pro Prozess in schlanke,
+unveränderliche Strukturen mit vorberechneten Indizes. Fragebogen-Routen,
+Filterlogik, Scoring und Massenverarbeitung arbeiten darauf ohne ORM-Abfragen.
+
+Im Mandantenbetrieb (services/tenancy.py) gilt der Cache je Mandant; die
+Snapshot-Dateien sind über ihren Inhalts-Hash benannt und werden von Mandanten
+mit gleichem Fragebogen gemeinsam genutzt.
+
+Ist QUESTIONNAIRE_SNAPSHOT_DIR gesetzt, lädt ein frisch gestarteter Prozess
+den Fragebogen aus einer Snapshot-Datei (services/questionnaire_snapshot.py),
+sofern deren Hash dem in questionnaire_snapshot gespeicherten entspricht.
+Fehlt die Datei, passt sie nicht zum Hash oder fehlt der Hash, baut der erste
+Zugriff den Fragebogen aus den Stammdaten und schreibt Datei und Hash neu;
+refresh_questionnaire_snapshots erledigt das vorab für alle Versionen
+(python -m cli questionnaire-snapshot).
+
+Die Stammdaten gelten zur Laufzeit als unveränderlich. Ändert eine Session sie
+doch (Seed-Daten, Admin-Änderungen über das ORM), löscht der Hook aus
+register_invalidation_hook die gespeicherten Hashes in derselben Transaktion
+und verwirft nach dem Commit den Cache dieses Prozesses. Andere Prozesse
+prüfen je Anfrage mit einer Abfrage die aktive Version samt gespeichertem
+Hash und laden bei Abweichung neu (Aktivierung per CLI oder anderem Worker,
+gelöschte Hashes). Reine Core-Änderungen ohne Snapshots erfordern weiterhin
+invalidate_compiled_questionnaire() bzw. einen Neustart.
+"""
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.exc import OperationalError
+
+from models.database import (
+    QuestionnaireVersion, Dimension, Question, QuestionCondition, Scale, ScaleOption,
+    OptionScore, Hint, QuestionnaireSnapshot
+)
+from services.questionnaire_snapshot import (
+    content_hash, read_snapshot, snapshot_path, write_snapshot
+)
+from services.db_routing import current_tenant
+from extensions import db
+
+# Tabellen, deren Änderung den kompilierten Fragebogen ungültig macht
+MASTER_DATA_MODELS = (
+    QuestionnaireVersion, Dimension, Question, QuestionCondition, Scale, ScaleOption,
+    OptionScore, Hint
+)
+
+
+class DimensionDef(NamedTuple):
+    id: int
+    code: str
+    name: str
+    sort_order: int
+    calc_method: str
+
+
+class QuestionDef(NamedTuple):
+    id: int
+    code: str
+    text: str
+    question_type: str
+    unit: Optional[str]
+    scale_id: Optional[int]
+    dimension_id: int
+    sort_order: int
+    depends_logic: str
+    # (depends_on_question_id, depends_on_option_id) nach sort_order, inkl. Legacy-Abhängigkeit
+    conditions: Tuple[Tuple[int, int], ...]
+    # Legacy-Abhängigkeit (Spalten von Question, für die Darstellung)
+    depends_on_question_id: Optional[int]
+    depends_on_option_id: Optional[int]
+
+
+class OptionDef(NamedTuple):
+    id: int
+    scale_id: int
+    code: str
+    label: str
+    sort_order: int
+    is_na: bool
+
+
+class ScoreDef(NamedTuple):
+    score: Optional[float]
+    is_exclusion: bool
+    is_applicable: bool
+
+
+class HintDef(NamedTuple):
+    id: int
+    question_id: int
+    scale_option_id: Optional[int]
+    automation_type: Optional[str]
+    text: str
+    hint_type: str
+
+
+def _frozen(mapping):
+    return MappingProxyType(mapping)
+
+
+def _group(items, key):
+    grouped = defaultdict(list)
+    for item in items:
+        grouped[key(item)].append(item)
+    return _frozen({k: tuple(v) for k, v in grouped.items()})
+
+
+class CompiledQuestionnaire:
+    """
+    Unveränderliche In-Memory-Sicht auf eine Fragebogenversion
+    (Attribute nach dem Aufbau schreibgeschützt, Indizes als MappingProxyType)
+    """
+
+    __slots__ = (
+        "version_id", "name", "version",
+        "dimensions", "dimension_by_id", "dimension_by_code",
+        "questions", "question_by_id", "question_by_code",
+        "questions_by_dimension", "display_questions_by_dimension", "dependents_by_question",
+        "option_by_id", "options_by_scale", "scores", "hints_by_question",
+        "__weakref__",
+    )
+
+    def __init__(self, version_id, dimensions, questions, options, scores,
+                 name="", version="", hints=()):
+        def set_(attribute, value):
+            object.__setattr__(self, attribute, value)
+
+        set_("version_id", version_id)
+        set_("name", name)
+        set_("version", version)
+        # Dimensionen nach sort_order
+        dimensions = tuple(sorted(dimensions, key=lambda d: (d.sort_order, d.id)))
+        set_("dimensions", dimensions)
+        set_("dimension_by_id", _frozen({d.id: d for d in dimensions}))
+        set_("dimension_by_code", _frozen({d.code: d for d in dimensions}))
+        # Fragen in ID-Reihenfolge (entspricht der Reihenfolge der Auswertung)
+        questions = tuple(sorted(questions, key=lambda q: q.id))
+        set_("questions", questions)
+        set_("question_by_id", _frozen({q.id: q for q in questions}))
+        set_("question_by_code", _frozen({q.code: q for q in questions}))
+
+        set_("questions_by_dimension", _group(questions, lambda q: q.dimension_id))
+        # Anzeige-Reihenfolge innerhalb einer Dimension
+        set_("display_questions_by_dimension", _group(
+            sorted(questions, key=lambda q: (q.sort_order, q.id)), lambda q: q.dimension_id
+        ))
+        # Eltern-Frage -> abhängige Fragen (über conditions)
+        dependents = defaultdict(list)
+        for q in questions:
+            for parent_id in dict.fromkeys(parent for parent, _ in q.conditions):
+                dependents[parent_id].append(q)
+        set_("dependents_by_question", _frozen({k: tuple(v) for k, v in dependents.items()}))
+
+        set_("option_by_id", _frozen({o.id: o for o in options}))
+        set_("options_by_scale", _group(
+            sorted(options, key=lambda o: (o.sort_order, o.id)), lambda o: o.scale_id
+        ))
+
+        # (question_id, scale_option_id, automation_type) -> ScoreDef
+        set_("scores", _frozen(dict(scores)))
+        set_("hints_by_question", _group(
+            sorted(hints, key=lambda h: h.id), lambda h: h.question_id
+        ))
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError(f"{type(self).__name__} ist unveränderlich")
+
+    def __delattr__(self, attribute):
+        raise AttributeError(f"{type(self).__name__} ist unveränderlich")
+
+    def definition(self):
+        """
+        Kanonische Form aus Tupeln und Grundtypen (Snapshot-Datei, Inhalts-Hash);
+        from_definition baut daraus einen gleichwertigen Fragebogen.
+        """
+        return (
+            self.version_id, self.name, self.version,
+            tuple(tuple(d) for d in self.dimensions),
+            tuple(tuple(q) for q in self.questions),
+            tuple(tuple(o) for o in sorted(self.option_by_id.values(), key=lambda o: o.id)),
+            tuple(sorted(((tuple(key), tuple(score)) for key, score in self.scores.items()),
+                         key=repr)),
+            tuple(tuple(h) for hints in self.hints_by_question.values() for h in hints),
+        )
+
+    @classmethod
+    def from_definition(cls, definition):
+        version_id, name, version, dimensions, questions, options, scores, hints = definition
+        return cls(
+            version_id,
+            [DimensionDef(*d) for d in dimensions],
+            [QuestionDef(*q) for q in questions],
+            [OptionDef(*o) for o in options],
+            {key: ScoreDef(*score) for key, score in scores},
+            name=name, version=version,
+            hints=[HintDef(*h) for h in hints],
+        )
+
+    def options_for(self, question):
+        """Antwortoptionen einer Frage (sortiert)"""
+        if not question.scale_id:
+            return ()
+        return self.options_by_scale.get(question.scale_id, ())
+
+    def resolve_option(self, question, value):
+        """
+        Findet eine Option einer Frage anhand ihres Codes oder Labels
+        (Code hat Vorrang, Label ohne Beachtung der Groß-/Kleinschreibung).
+
+        Returns:
+            OptionDef oder None
+        """
+        value = str(value).strip()
+        options = self.options_for(question)
+        for option in options:
+            if option.code == value:
+                return option
+        lowered = value.lower()
+        for option in options:
+            if option.label.lower() == lowered:
+                return option
+        return None
+
+    def score_for(self, question_id, option_id, automation_type):
+        """OptionScore-Eintrag oder None"""
+        return self.scores.get((question_id, option_id, automation_type))
+
+
+def _load(version_id):
+    qv = db.session.query(QuestionnaireVersion.name, QuestionnaireVersion.version).filter(
+        QuestionnaireVersion.id == version_id
+    ).first()
+    if qv is None:
+        raise ValueError(f"Fragebogen-Version {version_id} nicht gefunden")
+    dimensions = [
+        DimensionDef(d.id, d.code, d.name, d.sort_order, d.calc_method)
+        for d in db.session.query(
+            Dimension.id, Dimension.code, Dimension.name,
+            Dimension.sort_order, Dimension.calc_method
+        ).filter(Dimension.questionnaire_version_id == version_id)
+    ]
+
+    question_rows = db.session.query(
+        Question.id, Question.code, Question.text, Question.question_type, Question.unit,
+        Question.scale_id, Question.dimension_id, Question.sort_order, Question.depends_logic,
+        Question.depends_on_question_id, Question.depends_on_option_id
+    ).filter(Question.questionnaire_version_id == version_id).all()
+    question_ids = [r.id for r in question_rows]
+
+    conditions = defaultdict(list)
+    for c in (
+        db.session.query(QuestionCondition)
+        .filter(QuestionCondition.question_id.in_(question_ids))
+        .order_by(QuestionCondition.sort_order, QuestionCondition.id)
+    ):
+        conditions[c.question_id].append((c.depends_on_question_id, c.depends_on_option_id))
+
+    questions = []
+    scale_ids = set()
+    for r in question_rows:
+        conds = conditions.get(r.id)
+        if not conds and r.depends_on_question_id and r.depends_on_option_id:
+            conds = [(r.depends_on_question_id, r.depends_on_option_id)]
+        if r.scale_id:
+            scale_ids.add(r.scale_id)
+        questions.append(QuestionDef(
+            r.id, r.code, r.text, r.question_type, r.unit, r.scale_id, r.dimension_id,
+            r.sort_order, (r.depends_logic or "all").lower(), tuple(conds or ()),
+            r.depends_on_question_id, r.depends_on_option_id
+        ))
+
+    options = [
+        OptionDef(o.id, o.scale_id, o.code, o.label, o.sort_order, bool(o.is_na))
+        for o in db.session.query(
+            ScaleOption.id, ScaleOption.scale_id, ScaleOption.code, ScaleOption.label,
+            ScaleOption.sort_order, ScaleOption.is_na
+        ).filter(ScaleOption.scale_id.in_(scale_ids))
+    ]
+
+    scores = {
+        (s.question_id, s.scale_option_id, s.automation_type):
+            ScoreDef(s.score, bool(s.is_exclusion), bool(s.is_applicable))
+        for s in db.session.query(
+            OptionScore.question_id, OptionScore.scale_option_id, OptionScore.automation_type,
+            OptionScore.score, OptionScore.is_exclusion, OptionScore.is_applicable
+        ).filter(OptionScore.question_id.in_(question_ids))
+    }
+
+    hints = [
+        HintDef(h.id, h.question_id, h.scale_option_id, h.automation_type, h.hint_text,
+                h.hint_type)
+        for h in db.session.query(
+            Hint.id, Hint.question_id, Hint.scale_option_id, Hint.automation_type,
+            Hint.hint_text, Hint.hint_type
+        ).filter(Hint.question_id.in_(question_ids))
+    ]
+
+    return CompiledQuestionnaire(version_id, dimensions, questions, options, scores,
+                                 name=qv.name, version=qv.version, hints=hints)
+
+
+def _stored_hash(version_id):
+    # Abfrage über die Tabelle: der Weg über den Snapshot braucht keine ORM-Mapper
+    table = QuestionnaireSnapshot.__table__
+    try:
+        return db.session.execute(
+            select(table.c.content_hash).where(table.c.questionnaire_version_id == version_id)
+        ).scalar()
+    except OperationalError:
+        # Tabelle fehlt noch (Migrationen vor Version 11)
+        return None
+
+
+def _store_hash(version_id, digest):
+    """
+    Speichert den Hash einer neu geschriebenen Snapshot-Datei über eine eigene
+    Verbindung der schreibenden Engine – unabhängig von der Transaktion der
+    Anfrage, auch in @read_only-Routen. Hält die Anfrage selbst gerade die
+    Schreibsperre (SQLite), wird nicht gewartet; der nächste Kaltstart
+    versucht es erneut.
+
+    Returns:
+        True, wenn der Hash gespeichert wurde
+    """
+    table = QuestionnaireSnapshot.__table__
+    with db.session.get_bind().connect() as connection:
+        sqlite = connection.dialect.name == "sqlite"
+        if sqlite:
+            busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            connection.exec_driver_sql("PRAGMA busy_timeout = 0")
+        try:
+            connection.execute(delete(table).where(table.c.questionnaire_version_id == version_id))
+            connection.execute(insert(table).values(
+                questionnaire_version_id=version_id, content_hash=digest,
+                created_at=datetime.utcnow()
+            ))
+            connection.commit()
+        except OperationalError:
+            # Gesperrt oder Tabelle fehlt noch (Migrationen vor Version 11)
+            connection.rollback()
+            return False
+        finally:
+            if sqlite:
+                connection.exec_driver_sql(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+    return True
+
+
+def _load_version(version_id):
+    """
+    Aus der Snapshot-Datei, wenn ihr Hash aktuell ist, sonst aus den Stammdaten;
+    im zweiten Fall werden Datei und Hash neu geschrieben
+
+    Returns:
+        (CompiledQuestionnaire, gespeicherter Hash nach dem Laden oder None)
+    """
+    directory = current_app.config.get("QUESTIONNAIRE_SNAPSHOT_DIR")
+    if not directory:
+        return _load(version_id), None
+    digest = _stored_hash(version_id)
+    if digest:
+        definition = read_snapshot(directory, version_id, digest)
+        if definition is not None:
+            return CompiledQuestionnaire.from_definition(definition), digest
+
+    compiled = _load(version_id)
+    definition = compiled.definition()
+    current = content_hash(definition)
+    try:
+        write_snapshot(directory, version_id, current, definition)
+    except OSError:
+        # Verzeichnis nicht beschreibbar: ohne Snapshot weiterarbeiten
+        return compiled, digest
+    if current != digest and _store_hash(version_id, current):
+        digest = current
+    return compiled, digest
+
+
+def refresh_questionnaire_snapshots():
+    """
+    Schreibt Snapshot-Dateien und Hashes für alle Versionen, deren Hash fehlt
+    (neu oder nach Änderung der Stammdaten) oder deren Datei fehlt (ohne Commit).
+    Ohne QUESTIONNAIRE_SNAPSHOT_DIR passiert nichts.
+
+    Returns:
+        Liste der neu geschriebenen Versions-IDs
+    """
+    directory = current_app.config.get("QUESTIONNAIRE_SNAPSHOT_DIR")
+    if not directory:
+        return []
+    stored = dict(db.session.query(
+        QuestionnaireSnapshot.questionnaire_version_id, QuestionnaireSnapshot.content_hash
+    ))
+    written = []
+    version_ids = db.session.execute(
+        select(QuestionnaireVersion.id).order_by(QuestionnaireVersion.id)
+    ).scalars().all()
+    for version_id in version_ids:
+        digest = stored.get(version_id)
+        if digest and os.path.exists(snapshot_path(directory, version_id, digest)):
+            continue
+        definition = _load(version_id).definition()
+        digest = content_hash(definition)
+        write_snapshot(directory, version_id, digest, definition)
+        table = QuestionnaireSnapshot.__table__
+        db.session.execute(delete(table).where(table.c.questionnaire_version_id == version_id))
+        db.session.execute(insert(table).values(
+            questionnaire_version_id=version_id, content_hash=digest, created_at=datetime.utcnow()
+        ))
+        written.append(version_id)
+    return written
+
+
+# Schlüssel (Mandant, version_id) -> (CompiledQuestionnaire, Hash beim Laden);
+# Mandant None im Einzelbetrieb
+_cache = {}
+_cache_lock = threading.Lock()
+_UNSET = object()
+
+
+def get_compiled_questionnaire(version_id):
+    """Liefert den kompilierten Fragebogen einer Version (pro Prozess und Mandant gecacht)"""
+    key = (current_tenant(), version_id)
+    entry = _cache.get(key)
+    if entry is None:
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry is None:
+                entry = _cache[key] = _load_version(version_id)
+    return entry[0]
+
+
+def _active_marker():
+    """
+    (ID, gespeicherter Inhalts-Hash) der aktiven Version – eine Abfrage je
+    App-Kontext (Anfrage), damit Aktivierungen und Snapshot-Hashes aus anderen
+    Prozessen (CLI, weitere Worker) ohne Neustart ankommen
+    """
+    marker = g.get("active_questionnaire_marker")
+    if marker is not None:
+        return marker
+    version_table, snapshot_table = QuestionnaireVersion.__table__, QuestionnaireSnapshot.__table__
+    active = select(version_table.c.id).where(
+        version_table.c.is_active.is_(True)
+    ).order_by(version_table.c.id).limit(1)
+    try:
+        row = db.session.execute(
+            active.add_columns(snapshot_table.c.content_hash).outerjoin(
+                snapshot_table, snapshot_table.c.questionnaire_version_id == version_table.c.id
+            )
+        ).first()
+    except OperationalError:
+        # questionnaire_snapshot fehlt noch (Migrationen vor Version 11)
+        row = db.session.execute(active.add_columns(None)).first()
+    marker = g.active_questionnaire_marker = tuple(row) if row else (None, None)
+    return marker
+
+
+def get_active_questionnaire():
+    """
+    Kompilierter Fragebogen der aktiven Version oder None. Weicht der
+    gespeicherte Hash vom Stand beim Laden ab (Stammdaten in einem anderen
+    Prozess geändert bzw. Snapshot neu geschrieben), wird die Version neu geladen.
+    """
+    version_id, digest = _active_marker()
+    if version_id is None:
+        return None
+    entry = _cache.get((current_tenant(), version_id))
+    if entry is not None and entry[1] != digest:
+        invalidate_compiled_questionnaire(version_id)
+    return get_compiled_questionnaire(version_id)
+
+
+def invalidate_compiled_questionnaire(version_id=None, tenant=_UNSET):
+    """
+    Verwirft gecachte Fragebögen (z. B. nach Änderungen an den Stammdaten),
+    standardmäßig die des aktuellen Mandanten
+    """
+    if tenant is _UNSET:
+        tenant = current_tenant()
+    with _cache_lock:
+        for key in [key for key in _cache
+                    if key[0] == tenant and version_id in (None, key[1])]:
+            del _cache[key]
+    if has_app_context():
+        g.pop("active_questionnaire_marker", None)
+
+
+def mark_master_data_changed(session):
+    """
+    Verwirft die Caches mit dem nächsten Commit (für Stammdaten, die per Core
+    statt über das ORM geschrieben werden, z. B. questionnaire_loader)
+    """
+    session.info["questionnaire_changed"] = True
+
+
+def _track_master_data_changes(session, flush_context):
+    if any(isinstance(obj, MASTER_DATA_MODELS)
+           for obj in (*session.new, *session.dirty, *session.deleted)):
+        mark_master_data_changed(session)
+        # Snapshots sind ab jetzt veraltet (gilt mit dem Commit auch für andere Prozesse)
+        session.connection().execute(delete(QuestionnaireSnapshot.__table__))
+
+
+def _invalidate_after_commit(session):
+    if session.info.pop("questionnaire_changed", False):
+        invalidate_compiled_questionnaire()
+
+
+def register_invalidation_hook(session):
+    """
+    Verwirft Cache und Snapshot-Hashes, wenn ein Commit Stammdaten über das ORM
+    geändert hat (session: Session-Klasse, sessionmaker oder scoped_session).
+    """
+    event.listen(session, "after_flush", _track_master_data_changes)
+    event.listen(session, "after_commit", _invalidate_after_commit)
@@ -0,0 +1,481 @@
+"""
+Deklarative Fragebogen-Definition (JSON)
+Ein Fragebogen wird als Datei beschrieben (questionnaires/*.json) statt als
+ORM-Code: Skalen mit Optionen, Dimensionen mit Fragen, Bedingungen,
+Option-Scores und Hinweisen. Verweise laufen über Codes (Skalen-Key,
+Options-Code, Fragen-Code). load_questionnaire prüft die Datei vollständig
+(validate_definition), vergibt die IDs im Speicher und schreibt alles mit je
+einem Bulk-INSERT pro Tabelle in der laufenden Transaktion.
+
+    {
+      "format": 1, "name": "...", "version": "1.0", "is_active": true,
+      "scales": [{"key": "yes_no", "label": "Ja/Nein", "options": [
+        {"code": "JA", "label": "Ja"}, {"code": "KA", "label": "Keine Angabe", "is_na": true}]}],
+      "dimensions": [{"code": "1", "name": "...", "calc_method": "filter", "questions": [
+        {"code": "1.1", "text": "...", "type": "single_choice", "scale": "yes_no",
+         "filter": true, "filter_description": "...", "depends_logic": "any",
+         "depends_on": {"question": "1.0", "option": "JA"},
+         "conditions": [{"question": "1.0", "option": "NEIN"}],
+         "scores": {"RPA": {"JA": 5, "NEIN": "A", "KA": "-"}},
+         "hints": [{"option": "NEIN", "type": "info", "text": "..."}]}]}]
+    }
+
+Scores: Zahl = Punktwert, "A" = Ausschluss, "-" = nicht anwendbar.
+sort_order ergibt sich aus der Position (ab 1) und kann je Eintrag
+überschrieben werden. Skalen sind versionsübergreifend: eine vorhandene Skala
+gleichen Keys wird wiederverwendet und muss dieselben Options-Codes haben.
+"""
+import json
+import re
+from collections import Counter
+
+from sqlalchemy import func, insert, select, update
+
+from models.database import (
+    QuestionnaireVersion, Dimension, Question, QuestionCondition, Scale, ScaleOption,
+    OptionScore, Hint
+)
+from services.questionnaire_cache import mark_master_data_changed
+from services.scoring_engine import AUTOMATION_TYPES
+from extensions import db
+
+FORMAT_VERSION = 1
+QUESTION_TYPES = ("single_choice", "multiple_choice", "number")
+CALC_METHODS = ("filter", "mean", "economic_score")
+DEPENDS_LOGIC = ("all", "any")
+HINT_TYPES = ("info", "warning", "error")
+EXCLUSION = "A"
+NOT_APPLICABLE = "-"
+
+
+def read_definition(path):
+    """
+    Liest eine Definitionsdatei
+
+    Raises:
+        ValueError: bei ungültigem JSON
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: kein gültiges JSON ({e})") from e
+
+
+def _existing_scales():
+    """Skalen-Key -> (scale_id, {Options-Code: option_id}) der gespeicherten Skalen"""
+    scale_table, option_table = Scale.__table__, ScaleOption.__table__
+    scales = {}
+    for row in db.session.execute(
+        select(scale_table.c.key, scale_table.c.id, option_table.c.code, option_table.c.id)
+        .join(option_table, option_table.c.scale_id == scale_table.c.id)
+        .order_by(option_table.c.id)
+    ):
+        scales.setdefault(row[0], (row[1], {}))[1][row[2]] = row[3]
+    return scales
+
+
+def validate_definition(doc, existing_scales=None):
+    """
+    Prüft eine Definition vollständig, bevor etwas geschrieben wird
+
+    Args:
+        existing_scales: Skalen-Key -> Options-Codes bereits gespeicherter Skalen
+            (dürfen referenziert werden; gleichnamige Skalen der Datei müssen
+            dieselben Codes haben)
+
+    Raises:
+        ValueError: mit allen gefundenen Fehlern
+    """
+    existing_scales = existing_scales or {}
+    errors = []
+
+    def check(condition, message):
+        if not condition:
+            errors.append(message)
+        return condition
+
+    def is_text(value):
+        return isinstance(value, str) and value.strip() != ""
+
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    if not check(isinstance(doc, dict), "Definition muss ein JSON-Objekt sein"):
+        raise ValueError(errors[0])
+    check(doc.get("format") == FORMAT_VERSION, f"format muss {FORMAT_VERSION} sein")
+    check(is_text(doc.get("name")), "name fehlt")
+    check(is_text(doc.get("version")), "version fehlt")
+    check(isinstance(doc.get("is_active", True), bool), "is_active muss true/false sein")
+
+    # Skalen
+    scale_codes = {key: set(codes) for key, codes in existing_scales.items()}
+    scales = doc.get("scales", [])
+    if check(isinstance(scales, list), "scales muss eine Liste sein"):
+        for key, count in Counter(s.get("key") for s in scales if isinstance(s, dict)).items():
+            check(count == 1, f"Skala {key}: mehrfach definiert")
+        for i, scale in enumerate(scales):
+            if not check(isinstance(scale, dict) and is_text(scale.get("key")),
+                         f"scales[{i}]: key fehlt"):
+                continue
+            where = f"Skala {scale['key']}"
+            check(is_text(scale.get("label")), f"{where}: label fehlt")
+            options = scale.get("options")
+            if not check(isinstance(options, list) and options, f"{where}: options fehlen"):
+                continue
+            codes = []
+            for j, option in enumerate(options):
+                if not check(isinstance(option, dict) and is_text(option.get("code")),
+                             f"{where}: options[{j}]: code fehlt"):
+                    continue
+                codes.append(option["code"])
+                check(is_text(option.get("label")), f"{where}, Option {option['code']}: label fehlt")
+                check(isinstance(option.get("is_na", False), bool),
+                      f"{where}, Option {option['code']}: is_na muss true/false sein")
+                check(is_int(option.get("sort_order", 0)),
+                      f"{where}, Option {option['code']}: sort_order muss eine Zahl sein")
+            for code, count in Counter(codes).items():
+                check(count == 1, f"{where}: Option {code} mehrfach definiert")
+            if scale["key"] in existing_scales:
+                check(set(codes) == set(existing_scales[scale["key"]]),
+                      f"{where}: existiert bereits mit anderen Optionen")
+            scale_codes[scale["key"]] = set(codes)
+
+    # Dimensionen und Fragen
+    questions = []
+    dimensions = doc.get("dimensions")
+    if check(isinstance(dimensions, list) and dimensions, "dimensions fehlen"):
+        for code, count in Counter(d.get("code") for d in dimensions if isinstance(d, dict)).items():
+            check(count == 1, f"Dimension {code}: mehrfach definiert")
+        for i, dimension in enumerate(dimensions):
+            if not check(isinstance(dimension, dict) and is_text(dimension.get("code")),
+                         f"dimensions[{i}]: code fehlt"):
+                continue
+            where = f"Dimension {dimension['code']}"
+            check(is_text(dimension.get("name")), f"{where}: name fehlt")
+            check(dimension.get("calc_method", "mean") in CALC_METHODS,
+                  f"{where}: calc_method muss {', '.join(CALC_METHODS)} sein")
+            check(is_int(dimension.get("sort_order", 0)), f"{where}: sort_order muss eine Zahl sein")
+            if check(isinstance(dimension.get("questions", []), list),
+                     f"{where}: questions muss eine Liste sein"):
+                for j, question in enumerate(dimension.get("questions", [])):
+                    if check(isinstance(question, dict) and is_text(question.get("code")),
+                             f"{where}: questions[{j}]: code fehlt"):
+                        questions.append(question)
+
+    for code, count in Counter(q["code"] for q in questions).items():
+        check(count == 1, f"Frage {code}: mehrfach definiert")
+    scale_of = {q["code"]: q.get("scale") for q in questions}
+    position = {q["code"]: i for i, q in enumerate(questions)}
+
+    def check_reference(where, reference, own_code, earlier=False):
+        if not check(isinstance(reference, dict), f"{where}: muss question und option enthalten"):
+            return
+        parent = reference.get("question")
+        if not check(parent in scale_of, f"{where}: Frage {parent} unbekannt"):
+            return
+        check(parent != own_code, f"{where}: Frage hängt von sich selbst ab")
+        if earlier:
+            check(position[parent] < position[own_code], f"{where}: Frage {parent} muss davor stehen")
+        check(reference.get("option") in scale_codes.get(scale_of[parent], ()),
+              f"{where}: Option {reference.get('option')} gehört nicht zur Skala von Frage {parent}")
+        check(is_int(reference.get("sort_order", 0)), f"{where}: sort_order muss eine Zahl sein")
+
+    for question in questions:
+        where = f"Frage {question['code']}"
+        check(is_text(question.get("text")), f"{where}: text fehlt")
+        question_type = question.get("type")
+        check(question_type in QUESTION_TYPES, f"{where}: type muss {', '.join(QUESTION_TYPES)} sein")
+        scale = question.get("scale")
+        if scale is not None:
+            check(scale in scale_codes, f"{where}: Skala {scale} unbekannt")
+        elif question_type != "number":
+            errors.append(f"{where}: Auswahlfragen brauchen eine Skala")
+        options = scale_codes.get(scale, set())
+        check(question.get("unit") is None or is_text(question.get("unit")),
+              f"{where}: unit muss Text sein")
+        check(isinstance(question.get("filter", False), bool), f"{where}: filter muss true/false sein")
+        check(question.get("depends_logic", "all") in DEPENDS_LOGIC,
+              f"{where}: depends_logic muss all oder any sein")
+        check(is_int(question.get("sort_order", 0)), f"{where}: sort_order muss eine Zahl sein")
+        if "depends_on" in question:
+            check_reference(f"{where}, depends_on", question["depends_on"], question["code"],
+                            earlier=True)
+        conditions = question.get("conditions", [])
+        if check(isinstance(conditions, list), f"{where}: conditions muss eine Liste sein"):
+            for j, condition in enumerate(conditions):
+                check_reference(f"{where}, conditions[{j}]", condition, question["code"])
+
+        scores = question.get("scores", {})
+        if check(isinstance(scores, dict), f"{where}: scores muss ein Objekt sein"):
+            for automation_type, values in scores.items():
+                if not check(automation_type in AUTOMATION_TYPES,
+                             f"{where}: Scores für unbekannten Typ {automation_type}"):
+                    continue
+                if not check(isinstance(values, dict), f"{where}: scores.{automation_type} muss ein Objekt sein"):
+                    continue
+                for option, value in values.items():
+                    check(option in options,
+                          f"{where}: Score für Option {option} außerhalb der Skala")
+                    check(value in (EXCLUSION, NOT_APPLICABLE)
+                          or (isinstance(value, (int, float)) and not isinstance(value, bool)),
+                          f"{where}: Score {option}/{automation_type} muss Zahl, "
+                          f"\"{EXCLUSION}\" oder \"{NOT_APPLICABLE}\" sein")
+
+        hints = question.get("hints", [])
+        if check(isinstance(hints, list), f"{where}: hints muss eine Liste sein"):
+            for j, hint in enumerate(hints):
+                if not check(isinstance(hint, dict) and is_text(hint.get("text")),
+                             f"{where}: hints[{j}]: text fehlt"):
+                    continue
+                check(hint.get("type", "info") in HINT_TYPES,
+                      f"{where}: hints[{j}]: type muss {', '.join(HINT_TYPES)} sein")
+                check(hint.get("option") is None or hint["option"] in options,
+                      f"{where}: hints[{j}]: Option {hint.get('option')} außerhalb der Skala")
+                check(hint.get("automation_type") in (None, *AUTOMATION_TYPES),
+                      f"{where}: hints[{j}]: unbekannter automation_type")
+
+    if errors:
+        raise ValueError("Ungültige Fragebogen-Definition:\n- " + "\n- ".join(errors))
+
+
+def _score_row(value):
+    if value == EXCLUSION:
+        return {"score": None, "is_exclusion": True, "is_applicable": True}
+    if value == NOT_APPLICABLE:
+        return {"score": None, "is_exclusion": False, "is_applicable": False}
+    return {"score": float(value), "is_exclusion": False, "is_applicable": True}
+
+
+def load_questionnaire(doc, activate=None):
+    """
+    Prüft eine Definition und legt sie als neue Fragebogen-Version an (ohne
+    Commit; Caches werden mit dem Commit verworfen). Mit activate (Standard:
+    is_active der Datei) werden alle anderen Versionen deaktiviert.
+
+    Returns:
+        dict mit version_id und Anzahl je Tabelle
+
+    Raises:
+        ValueError: wenn die Definition ungültig ist
+    """
+    existing = _existing_scales()
+    validate_definition(doc, {key: codes for key, (_, codes) in existing.items()})
+    if activate is None:
+        activate = doc.get("is_active", True)
+
+    # Nächste freie ID je Tabelle: alle Verweise werden im Speicher aufgelöst
+    next_id = {
+        model: (db.session.execute(select(func.max(model.__table__.c.id))).scalar() or 0) + 1
+        for model in (QuestionnaireVersion, Dimension, Scale, ScaleOption, Question,
+                      QuestionCondition, OptionScore, Hint)
+    }
+    rows = {model: [] for model in next_id}
+
+    def add(model, **values):
+        values["id"] = next_id[model]
+        next_id[model] += 1
+        rows[model].append(values)
+        return values["id"]
+
+    version_id = add(QuestionnaireVersion, name=doc["name"], version=doc["version"],
+                     is_active=bool(activate))
+
+    scale_ids = {key: scale_id for key, (scale_id, _) in existing.items()}
+    option_ids = {key: codes for key, (_, codes) in existing.items()}  # Key -> {Code: ID}
+    for scale in doc.get("scales", []):
+        if scale["key"] in existing:
+            continue
+        scale_id = scale_ids[scale["key"]] = add(Scale, key=scale["key"], label=scale["label"])
+        option_ids[scale["key"]] = {
+            option["code"]: add(ScaleOption, scale_id=scale_id, code=option["code"],
+                                label=option["label"],
+                                sort_order=option.get("sort_order", position),
+                                is_na=option.get("is_na", False))
+            for position, option in enumerate(scale["options"], start=1)
+        }
+
+    questions = []
+    question_ids = {}
+    question_scales = {}  # Fragen-Code -> Skalen-Key
+    for position, dimension in enumerate(doc["dimensions"], start=1):
+        dimension_id = add(Dimension, questionnaire_version_id=version_id, code=dimension["code"],
+                           name=dimension["name"], sort_order=dimension.get("sort_order", position),
+                           calc_method=dimension.get("calc_method", "mean"))
+        for question_position, question in enumerate(dimension.get("questions", []), start=1):
+            depends_on = question.get("depends_on")
+            parent_options = depends_on and option_ids[question_scales[depends_on["question"]]]
+            question_ids[question["code"]] = add(
+                Question, questionnaire_version_id=version_id, dimension_id=dimension_id,
+                code=question["code"], text=question["text"], question_type=question["type"],
+                unit=question.get("unit"),
+                scale_id=scale_ids.get(question.get("scale")),
+                sort_order=question.get("sort_order", question_position),
+                is_filter_question=question.get("filter", False),
+                depends_on_question_id=question_ids[depends_on["question"]] if depends_on else None,
+                depends_on_option_id=parent_options[depends_on["option"]] if depends_on else None,
+                filter_description=question.get("filter_description"),
+                depends_logic=question.get("depends_logic", "all"),
+            )
+            question_scales[question["code"]] = question.get("scale")
+            questions.append(question)
+
+    for question in questions:
+        question_id = question_ids[question["code"]]
+        options = option_ids.get(question.get("scale"), {})
+        for position, condition in enumerate(question.get("conditions", []), start=1):
+            parent_options = option_ids[question_scales[condition["question"]]]
+            add(QuestionCondition, question_id=question_id,
+                depends_on_question_id=question_ids[condition["question"]],
+                depends_on_option_id=parent_options[condition["option"]],
+                sort_order=condition.get("sort_order", position))
+        for automation_type, values in question.get("scores", {}).items():
+            for option, value in values.items():
+                add(OptionScore, question_id=question_id, scale_option_id=options[option],
+                    automation_type=automation_type, **_score_row(value))
+        for hint in question.get("hints", []):
+            add(Hint, question_id=question_id,
+                scale_option_id=options[hint["option"]] if hint.get("option") else None,
+                automation_type=hint.get("automation_type"), hint_text=hint["text"],
+                hint_type=hint.get("type", "info"))
+
+    if activate:
+        table = QuestionnaireVersion.__table__
+        db.session.execute(update(table).where(table.c.is_active.is_(True)).values(is_active=False))
+    # Reihenfolge der Fremdschlüssel
+    for model, model_rows in rows.items():
+        if model_rows:
+            db.session.execute(insert(model.__table__), model_rows)
+    mark_master_data_changed(db.session)
+
+    return {
+        "version_id": version_id,
+        **{model.__tablename__: len(model_rows) for model, model_rows in rows.items()
+           if model is not QuestionnaireVersion},
+    }
+
+
+def export_questionnaire(version_id):
+    """
+    Definition einer gespeicherten Fragebogen-Version (Gegenstück zu
+    load_questionnaire, z. B. als Vorlage für eine neue Version)
+
+    Raises:
+        ValueError: wenn die Version nicht existiert
+    """
+    t = {model: model.__table__ for model in (QuestionnaireVersion, Dimension, Scale, ScaleOption,
+                                               Question, QuestionCondition, OptionScore, Hint)}
+
+    def fetch(model, *where, order_by=None):
+        table = t[model]
+        return db.session.execute(
+            select(table).where(*where).order_by(order_by if order_by is not None else table.c.id)
+        ).mappings().all()
+
+    version = fetch(QuestionnaireVersion, t[QuestionnaireVersion].c.id == version_id)
+    if not version:
+        raise ValueError(f"Fragebogen-Version {version_id} nicht gefunden")
+    version = version[0]
+    questions = fetch(Question, t[Question].c.questionnaire_version_id == version_id)
+    question_ids = [q["id"] for q in questions]
+    scale_ids = sorted({q["scale_id"] for q in questions if q["scale_id"]})
+    scales = fetch(Scale, t[Scale].c.id.in_(scale_ids))
+    options = fetch(ScaleOption, t[ScaleOption].c.scale_id.in_(scale_ids))
+    scale_key = {s["id"]: s["key"] for s in scales}
+    option_code = {o["id"]: o["code"] for o in options}
+    question_code = {q["id"]: q["code"] for q in questions}
+
+    def with_sort_order(entry, sort_order, position):
+        if sort_order != position:
+            entry["sort_order"] = sort_order
+        return entry
+
+    def reference(question_id, option_id):
+        return {"question": question_code[question_id], "option": option_code[option_id]}
+
+    conditions, scores, hints = {}, {}, {}
+    for c in fetch(QuestionCondition, t[QuestionCondition].c.question_id.in_(question_ids)):
+        conditions.setdefault(c["question_id"], []).append(c)
+    for s in fetch(OptionScore, t[OptionScore].c.question_id.in_(question_ids)):
+        if s["is_exclusion"]:
+            value = EXCLUSION
+        elif not s["is_applicable"]:
+            value = NOT_APPLICABLE
+        else:
+            value = s["score"]
+            value = int(value) if float(value).is_integer() else value
+        scores.setdefault(s["question_id"], {}).setdefault(
+            s["automation_type"], {})[option_code[s["scale_option_id"]]] = value
+    for h in fetch(Hint, t[Hint].c.question_id.in_(question_ids)):
+        hint = {}
+        if h["scale_option_id"]:
+            hint["option"] = option_code[h["scale_option_id"]]
+        if h["automation_type"]:
+            hint["automation_type"] = h["automation_type"]
+        hint["type"] = h["hint_type"]
+        hint["text"] = h["hint_text"]
+        hints.setdefault(h["question_id"], []).append(hint)
+
+    def export_question(q, position):
+        entry = {"code": q["code"], "text": q["text"], "type": q["question_type"]}
+        if q["scale_id"]:
+            entry["scale"] = scale_key[q["scale_id"]]
+        if q["unit"]:
+            entry["unit"] = q["unit"]
+        if q["is_filter_question"]:
+            entry["filter"] = True
+        if q["filter_description"]:
+            entry["filter_description"] = q["filter_description"]
+        if q["depends_logic"] and q["depends_logic"] != "all":
+            entry["depends_logic"] = q["depends_logic"]
+        if q["depends_on_question_id"] and q["depends_on_option_id"]:
+            entry["depends_on"] = reference(q["depends_on_question_id"], q["depends_on_option_id"])
+        if q["id"] in conditions:
+            entry["conditions"] = [
+                with_sort_order(reference(c["depends_on_question_id"], c["depends_on_option_id"]),
+                                c["sort_order"], i)
+                for i, c in enumerate(conditions[q["id"]], start=1)
+            ]
+        if q["id"] in scores:
+            entry["scores"] = scores[q["id"]]
+        if q["id"] in hints:
+            entry["hints"] = hints[q["id"]]
+        return with_sort_order(entry, q["sort_order"], position)
+
+    dimensions = []
+    for i, d in enumerate(fetch(Dimension, t[Dimension].c.questionnaire_version_id == version_id),
+                          start=1):
+        dimension_questions = [q for q in questions if q["dimension_id"] == d["id"]]
+        dimensions.append(with_sort_order({
+            "code": d["code"], "name": d["name"], "calc_method": d["calc_method"],
+            "questions": [export_question(q, j) for j, q in enumerate(dimension_questions, start=1)],
+        }, d["sort_order"], i))
+
+    return {
+        "format": FORMAT_VERSION,
+        "name": version["name"],
+        "version": version["version"],
+        "is_active": bool(version["is_active"]),
+        "scales": [{
+            "key": s["key"], "label": s["label"],
+            "options": [
+                with_sort_order(
+                    {"code": o["code"], "label": o["label"], **({"is_na": True} if o["is_na"] else {})},
+                    o["sort_order"], j)
+                for j, o in enumerate([o for o in options if o["scale_id"] == s["id"]], start=1)
+            ],
+        } for s in scales],
+        "dimensions": dimensions,
+    }
+
+
+# Objekte ohne verschachtelte Objekte/Listen (Optionen, Scores, Bedingungen, Hinweise)
+_LEAF_OBJECT = re.compile(r"\{\n\s+([^{}\[\]]*?)\n\s*\}")
+
+
+def format_definition(doc):
+    """JSON-Text einer Definition: eingerückt, kleine Objekte je eine Zeile"""
+    text = json.dumps(doc, ensure_ascii=False, indent=2)
+    return _LEAF_OBJECT.sub(
+        lambda m: "{" + re.sub(r",\n\s+", ", ", m.group(1)) + "}", text
+    ) + "\n"
@@ -0,0 +1,76 @@
+"""
+Snapshot-Dateien des kompilierten Fragebogens
+Ein neuer Worker müsste den Fragebogen sonst mit acht ORM-Abfragen aus den
+Stammdaten aufbauen, bevor er schnell antworten kann. Stattdessen liegt die
+kanonische Definition (CompiledQuestionnaire.definition) je Version als
+marshal-Datei neben der Datenbank; ihr Inhalts-Hash steht in
+questionnaire_snapshot. Stimmt der Hash der Datei mit dem der Datenbank
+überein, genügt beim Kaltstart eine Abfrage und das Einlesen der Datei.
+
+marshal kennt nur Grundtypen (Tupel, Zahlen, Strings, None) und führt beim
+Laden keinen Code aus; die Datei wird zusätzlich gegen den Hash geprüft.
+Dateien mit abweichendem Format oder Hash werden ignoriert.
+"""
+import hashlib
+import marshal
+import os
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+# Erhöhen, wenn sich der Aufbau von CompiledQuestionnaire.definition ändert
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+def content_hash(definition):
+    """SHA-256 über die kanonische Definition (deterministisch über Prozesse hinweg)"""
+    return hashlib.sha256(
+        repr((SNAPSHOT_FORMAT_VERSION, definition)).encode("utf-8")
+    ).hexdigest()
+
+
+def snapshot_path(directory, version_id, digest):
+    return os.path.join(directory, f"questionnaire-{version_id}-{digest[:16]}{SNAPSHOT_SUFFIX}")
+
+
+def default_snapshot_dir(database_uri, fallback):
+    """Verzeichnis der SQLite-Datei, bei anderen Datenbanken fallback"""
+    url = make_url(database_uri)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        return os.path.dirname(os.path.abspath(url.database))
+    return fallback
+
+
+def write_snapshot(directory, version_id, digest, definition):
+    """Schreibt die Datei atomar (parallel startende Worker lesen nie eine halbe Datei)"""
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(directory, version_id, digest)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".questionnaire-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump((SNAPSHOT_FORMAT_VERSION, digest, definition), f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def read_snapshot(directory, version_id, digest):
+    """
+    Definition aus der Snapshot-Datei
+
+    Returns:
+        Definition oder None (Datei fehlt, ist beschädigt oder passt nicht zum Hash)
+    """
+    try:
+        with open(snapshot_path(directory, version_id, digest), "rb") as f:
+            format_version, stored_digest, definition = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if format_version != SNAPSHOT_FORMAT_VERSION or stored_digest != digest:
+        return None
+    if content_hash(definition) != digest:
+        return None
+    return definition
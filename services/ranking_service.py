@@ -0,0 +1,226 @@
+"""
+Rangliste der besten Automatisierungskandidaten (Top-K)
+Jedes gewichtete Kriterium (Gesamtscore, ROI, FTE-Einsparung) wird über einen
+Index absteigend gelesen. Die sortierten Listen werden blockweise
+zusammengeführt (Threshold-Algorithmus): neu gesehene Assessments werden
+vollständig bewertet und in einem Heap der K Besten gehalten, bis kein noch
+ungesehenes Assessment mehr besser sein kann. Bei großen Beständen wird so nur
+der Anfang der Indizes gelesen.
+"""
+import heapq
+
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.orm import aliased
+
+from models.database import Process, Assessment, TotalResult, EconomicMetric
+from services.portfolio_service import FTE_METRIC_KEY
+from extensions import db
+
+CRITERIA = ("score", "roi", "fte")
+METRIC_KEYS = {"roi": "roi", "fte": FTE_METRIC_KEY}
+DEFAULT_WEIGHTS = {"score": 0.5, "roi": 0.25, "fte": 0.25}
+TYPE_FILTERS = ("any", "RPA", "IPA")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+BATCH_SIZE = 200
+MAX_BATCH_SIZE = 5000
+
+
+def parse_ranking_args(args, default_weights=None):
+    """
+    Liest Gewichte (w_score, w_roi, w_fte), Typfilter und Anzahl aus den
+    Query-Parametern. Negative oder ungültige Gewichte zählen als Standardwert.
+
+    Returns:
+        dict mit weights, type, limit
+    """
+    default_weights = default_weights or DEFAULT_WEIGHTS
+    weights = {}
+    for criterion in CRITERIA:
+        weight = args.get(f"w_{criterion}", type=float)
+        if weight is None or weight < 0:
+            weight = default_weights.get(criterion, 0.0)
+        weights[criterion] = weight
+
+    automation_type = args.get("type", "any")
+    if automation_type not in TYPE_FILTERS:
+        automation_type = "any"
+
+    limit = args.get("limit", DEFAULT_LIMIT, type=int) or DEFAULT_LIMIT
+    return {
+        "weights": weights,
+        "type": automation_type,
+        "limit": min(max(limit, 1), MAX_LIMIT),
+    }
+
+
+def _type_condition(automation_type):
+    """RPA/IPA: dieser Typ darf nicht ausgeschlossen sein; any: mindestens einer"""
+    rpa_open = TotalResult.rpa_excluded.isnot(True)
+    ipa_open = TotalResult.ipa_excluded.isnot(True)
+    if automation_type == "RPA":
+        return rpa_open
+    if automation_type == "IPA":
+        return ipa_open
+    return or_(rpa_open, ipa_open)
+
+
+def _sorted_access(criterion, condition):
+    """Absteigend sortierte Liste (assessment_id, value) eines Kriteriums"""
+    if criterion == "score":
+        return select(
+            TotalResult.assessment_id, TotalResult.combined_score.label("value")
+        ).where(
+            condition, TotalResult.combined_score.isnot(None)
+        ).order_by(TotalResult.combined_score.desc())
+
+    return select(
+        EconomicMetric.assessment_id, EconomicMetric.value
+    ).join(
+        TotalResult, TotalResult.assessment_id == EconomicMetric.assessment_id
+    ).where(
+        EconomicMetric.key == METRIC_KEYS[criterion], condition
+    ).order_by(EconomicMetric.value.desc())
+
+
+def _criteria_query():
+    """TotalResult mit einer Spalte je Kriterium (fehlende Kennzahl: NULL)"""
+    metrics = {criterion: aliased(EconomicMetric) for criterion in METRIC_KEYS}
+    columns = {"score": TotalResult.combined_score}
+    query = select(TotalResult.assessment_id)
+    for criterion, metric in metrics.items():
+        query = query.outerjoin(metric, and_(
+            metric.assessment_id == TotalResult.assessment_id,
+            metric.key == METRIC_KEYS[criterion],
+        ))
+        columns[criterion] = metric.value
+    return query, columns
+
+
+def top_candidates(weights=None, automation_type="any", limit=DEFAULT_LIMIT):
+    """
+    Die `limit` besten Assessments nach gewichteter Summe der Kriterien.
+    Jedes Kriterium wird auf seinen Höchstwert normiert (negative und fehlende
+    Werte zählen 0), der Rang-Score liegt damit zwischen 0 und 1. Kandidaten
+    sind Assessments mit einem Wert in mindestens einem gewichteten Kriterium.
+
+    Returns:
+        Liste von dicts mit rank, assessment_id, process_name, industry,
+        recommendation, total_rpa, total_ipa, combined_score, roi,
+        fte_einsparung, rank_score
+    """
+    weights = {c: w for c, w in (weights or DEFAULT_WEIGHTS).items()
+               if c in CRITERIA and w > 0}
+    if not weights:
+        return []
+    weight_sum = sum(weights.values())
+    condition = _type_condition(automation_type)
+    criteria_query, criteria_columns = _criteria_query()
+
+    results = {
+        criterion: db.session.execute(
+            _sorted_access(criterion, condition).execution_options(yield_per=BATCH_SIZE)
+        )
+        for criterion in weights
+    }
+    factors = None   # Gewicht / (Gewichtssumme * Höchstwert) je Kriterium
+    rank_score = None
+    maxima = {}
+    bounds = {}
+    batch_size = BATCH_SIZE
+    seen = set()
+    top = []  # Min-Heap (rank_score, -assessment_id)
+    try:
+        while results:
+            # Sortierter Zugriff: je Kriterium ein Block
+            new_ids = set()
+            for criterion in list(results):
+                batch = results[criterion].fetchmany(batch_size)
+                if not batch:
+                    results.pop(criterion).close()
+                    bounds[criterion] = 0.0
+                    continue
+                bounds[criterion] = batch[-1].value
+                new_ids.update(row.assessment_id for row in batch)
+                if factors is None:
+                    maxima[criterion] = batch[0].value
+            new_ids -= seen
+            seen |= new_ids
+            batch_size = min(batch_size * 2, MAX_BATCH_SIZE)
+
+            if factors is None:
+                # Höchstwerte stehen nach dem ersten Block fest
+                factors = {
+                    criterion: weight / (weight_sum * maxima[criterion])
+                    for criterion, weight in weights.items() if maxima.get(criterion, 0) > 0
+                }
+                terms = [
+                    literal(factor) * func.max(func.coalesce(criteria_columns[criterion], 0.0), 0.0)
+                    for criterion, factor in factors.items()
+                ]
+                rank_score = sum(terms[1:], terms[0]) if terms else literal(0.0)
+
+            # Wahlfreier Zugriff: Rang-Score der neu gesehenen Assessments in SQL,
+            # sobald der Heap voll ist nur noch für Kandidaten vor dem K-ten Eintrag
+            # (Reihenfolge wie ORDER BY rank_score DESC, id: Gleichstand -> kleinere ID)
+            new_ids = list(new_ids)
+            for start in range(0, len(new_ids), 500):
+                query = criteria_query.add_columns(rank_score.label("rank_score")).where(
+                    TotalResult.assessment_id.in_(new_ids[start:start + 500])
+                )
+                if len(top) == limit:
+                    kth_score, kth_neg_id = top[0]
+                    query = query.where(or_(
+                        rank_score > kth_score,
+                        and_(rank_score == kth_score, TotalResult.assessment_id < -kth_neg_id),
+                    ))
+                for assessment_id, score in db.session.execute(query):
+                    entry = (score, -assessment_id)
+                    if len(top) < limit:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heappushpop(top, entry)
+
+            # Kein ungesehenes Assessment kann die Schwelle überschreiten; bei
+            # Gleichstand mit ihr könnte es noch eine kleinere ID haben (-id < 0)
+            threshold = sum(factor * max(bounds[criterion], 0.0)
+                            for criterion, factor in factors.items())
+            if len(top) == limit and top[0] > (threshold, 0):
+                break
+    finally:
+        for result in results.values():
+            result.close()
+
+    ranked = sorted(top, reverse=True)
+    details = {
+        row.assessment_id: row for row in db.session.execute(
+            criteria_query.add_columns(
+                Process.name.label("process_name"), Process.industry,
+                TotalResult.recommendation, TotalResult.total_rpa, TotalResult.total_ipa,
+                *(column.label(criterion) for criterion, column in criteria_columns.items())
+            ).join(
+                Assessment, TotalResult.assessment_id == Assessment.id
+            ).join(
+                Process, Assessment.process_id == Process.id
+            ).where(TotalResult.assessment_id.in_([-neg_id for _, neg_id in ranked]))
+        )
+    }
+
+    candidates = []
+    for position, (score, neg_id) in enumerate(ranked, start=1):
+        assessment_id = -neg_id
+        row = details[assessment_id]
+        candidates.append({
+            "rank": position,
+            "assessment_id": assessment_id,
+            "process_name": row.process_name,
+            "industry": row.industry,
+            "recommendation": row.recommendation,
+            "total_rpa": row.total_rpa,
+            "total_ipa": row.total_ipa,
+            "combined_score": row.score,
+            "roi": row.roi,
+            "fte_einsparung": row.fte,
+            "rank_score": round(score, 4),
+        })
+    return candidates
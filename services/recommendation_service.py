@@ -0,0 +1,650 @@
+"""
+Empfehlungen pro Dimension auf Basis der RPA-/IPA-Scores
+Die Textbibliothek wird beim Import einmal in Vorlagen pro
+(Dimension, Band, Automatisierungstyp) übersetzt; fertige Empfehlungen
+werden pro (Dimension, Band, Typ, gerundeter Score) zwischengespeichert.
+"""
+from bisect import bisect_right
+from functools import lru_cache, partial
+from typing import Callable, NamedTuple, Optional, Tuple
+
+AUTOMATION_TYPES = ("RPA", "IPA")
+RENDER_CACHE_SIZE = 4096
+
+# Feinere Score-Klassen (max ist exklusiv)
+SCORE_BANDS = (
+    {"key": "critical", "max": 1.5, "type": "error",
+     "icon": "🛑", "color": "#ef4444", "title": "Kritisch"},
+    {"key": "high",     "max": 2.5, "type": "error",
+     "icon": "⚠️", "color": "#ef4444", "title": "Hohes Risiko"},
+    {"key": "medium",   "max": 3.3, "type": "warning",
+     "icon": "⚡", "color": "#f59e0b", "title": "Verbesserungsbedarf"},
+    {"key": "good",     "max": 4.2, "type": "info",
+     "icon": "✅", "color": "#3b82f6", "title": "Solide Basis"},
+    {"key": "excellent","max": 5.1, "type": "success",
+     "icon": "🌟", "color": "#22c55e", "title": "Sehr gut"},
+)
+_BAND_LIMITS = tuple(band["max"] for band in SCORE_BANDS)
+_BANDS_BY_KEY = {band["key"]: band for band in SCORE_BANDS}
+
+
+class RecommendationTemplate(NamedTuple):
+    """Vorlage für eine (Dimension, Band, Typ)-Kombination"""
+    text: Optional[Callable[..., str]]  # str.format mit gebundenem automation_type
+    actions: Optional[Tuple[str, ...]]
+
+
+def classify_score(score):
+    """Score-Band per Binärsuche über die (exklusiven) Obergrenzen"""
+    index = bisect_right(_BAND_LIMITS, score)
+    return SCORE_BANDS[min(index, len(SCORE_BANDS) - 1)]
+
+
+def generate_dimension_recommendations(
+    dimension_code,
+    dimension_name,
+    rpa_score,
+    ipa_score,
+    rpa_excluded,
+    ipa_excluded
+):
+    """
+    Generiert Empfehlungen für eine Dimension basierend auf den Scores.
+
+    Returns:
+        dict mit:
+          - 'rpa_recommendation' (oder None)
+          - 'ipa_recommendation' (oder None)
+          - optional: 'overall_recommendation' (RPA vs IPA Hinweis)
+        Jede Empfehlung ist ein dict mit:
+          'type', 'icon', 'color', 'title', 'text', 'actions'
+    """
+    # Ergebnis zusammenbauen (RPA/IPA einzeln + optional Overall)
+    result = {
+        "rpa_recommendation": None,
+        "ipa_recommendation": None,
+        "overall_recommendation": None, 
+    }
+
+    # RPA
+    if rpa_excluded:
+        result["rpa_recommendation"] = {
+            "type": "error",
+            "icon": "❌",
+            "color": "#ef4444",
+            "title": f"{dimension_name}: RPA ausgeschlossen",
+            "text": "RPA wurde für diese Dimension ausgeschlossen. Prüfen Sie"
+            " die Ausschlusskriterien und ob Alternativen (IPA/Teilautomatisierung) sinnvoll sind.",
+            "actions": [
+                "Ausschlusskriterium(e) konkret benennen (welche Antwort triggert?)",
+                "Prüfen, ob Prozess/Plattform durch kleine Änderungen RPA-fähig wird",
+                "Falls nicht: IPA oder API-/Integrationslösung evaluieren",
+            ],
+        }
+    elif rpa_score is not None:
+        result["rpa_recommendation"] = _band_recommendation(
+            dimension_code, dimension_name, "RPA", rpa_score)
+    else:
+        # optional: wenn Score fehlt
+        result["rpa_recommendation"] = {
+            "type": "info",
+            "icon": "ℹ️",
+            "color": "#3b82f6",
+            "title": f"{dimension_name}: RPA nicht bewertet",
+            "text": "Für RPA liegt in dieser Dimension kein Score vor "
+            "(None). Prüfen Sie, ob die Dimension beantwortet/bewertet wurde.",
+            "actions": ["Bewertungslogik prüfen (None vs. '-')", 
+                        "Fehlende Antworten nachziehen", "Seed/Skala validieren"],
+        }
+
+    # IPA
+    if ipa_excluded:
+        result["ipa_recommendation"] = {
+            "type": "error",
+            "icon": "❌",
+            "color": "#ef4444",
+            "title": f"{dimension_name}: IPA ausgeschlossen",
+            "text": "IPA wurde für diese Dimension ausgeschlossen. "
+            "Prüfen Sie die Ausschlusskriterien und ob RPA/Teilautomatisierung sinnvoll ist.",
+            "actions": [
+                "Ausschlusskriterium(e) konkret benennen (welche Antwort triggert?)",
+                "Prüfen, ob Daten/Compliance/Use-Case-Abgrenzung IPA möglich macht",
+                "Falls nicht: RPA oder Prozess-/System-Redesign evaluieren",
+            ],
+        }
+    elif ipa_score is not None:
+        result["ipa_recommendation"] = _band_recommendation(
+            dimension_code, dimension_name, "IPA", ipa_score)
+    else:
+        result["ipa_recommendation"] = {
+            "type": "info",
+            "icon": "ℹ️",
+            "color": "#3b82f6",
+            "title": f"{dimension_name}: IPA nicht bewertet",
+            "text": "Für IPA liegt in dieser Dimension kein Score "
+            "vor (None). Prüfen Sie, ob die Dimension beantwortet/bewertet wurde.",
+            "actions": ["Bewertungslogik prüfen (None vs. '-')", 
+                        "Fehlende Antworten nachziehen", "Seed/Skala validieren"],
+        }
+
+    # Optional: RPA vs IPA Priorisierung (genauere Unterscheidung)
+    result["overall_recommendation"] = build_overall_preference(
+        dimension_name=dimension_name,
+        rpa_score=rpa_score, ipa_score=ipa_score,
+        rpa_excluded=rpa_excluded, ipa_excluded=ipa_excluded
+    )
+
+    return result
+
+
+def _band_recommendation(d_code, d_name, a_type, score):
+    """Empfehlung für einen bewerteten Score (Kopie des gecachten Eintrags)"""
+    band = classify_score(score)
+    cached = _render_band_recommendation(d_code, d_name, a_type, band["key"], f"{score:.1f}")
+    return {**cached, "actions": list(cached["actions"])}
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_band_recommendation(d_code, d_name, a_type, band_key, score_text):
+    """
+    Rendert eine Empfehlung. Der Score geht nur gerundet (eine Nachkommastelle)
+    in Text und Titel ein, daher ist das Ergebnis pro Schlüssel eindeutig.
+    """
+    band_meta = _BANDS_BY_KEY[band_key]
+    template = _TEMPLATES.get((d_code, band_key, a_type))
+    if template is None:
+        template = _TEMPLATES[("_fallback", band_key, a_type)]
+
+    if template.text is None:
+        text = (
+            f"{d_name}: Score {score_text}/5 → {band_meta['title']}. "
+            f"Bitte Antworten prüfen und gezielte Verbesserungen ableiten."
+        )
+    else:
+        # leichte Personalisierung
+        text = template.text(dimension_code=d_code, dimension_name=d_name, score=score_text)
+
+    actions = template.actions
+    if not actions:
+        actions = tuple(default_actions_for_band(band_key, a_type))
+
+    return {
+        "type": band_meta["type"],
+        "icon": band_meta["icon"],
+        "color": band_meta["color"],
+        "title": f"{d_name}: {band_meta['title']} ({score_text}/5)",
+        "text": text,
+        "actions": actions,
+    }
+
+
+def compile_recommendation_templates(library):
+    """
+    Löst die Bibliothek einmalig in Vorlagen pro (Dimension, Band, Typ) auf.
+    band_cfg ist entweder ein dict mit 'text'/'actions' oder unterscheidet
+    zusätzlich nach 'RPA'/'IPA' (mit '_fallback_type').
+    """
+    templates = {}
+    for d_code, dim_cfg in library.items():
+        for band_key in _BANDS_BY_KEY:
+            band_cfg = dim_cfg.get(band_key, dim_cfg["_fallback_band"])
+            for a_type in AUTOMATION_TYPES:
+                if "RPA" in band_cfg or "IPA" in band_cfg:
+                    type_cfg = band_cfg.get(a_type, band_cfg.get("_fallback_type"))
+                else:
+                    type_cfg = band_cfg
+
+                # Falls das Mapping doch unvollständig ist:
+                text = type_cfg.get("text") if isinstance(type_cfg, dict) else None
+                actions = type_cfg.get("actions") if isinstance(type_cfg, dict) else None
+                templates[(d_code, band_key, a_type)] = RecommendationTemplate(
+                    partial(text.format, automation_type=a_type) if text else None,
+                    tuple(actions) if actions else None,
+                )
+    return templates
+
+# Helpers / Library
+def default_actions_for_band(band_key, automation_type):
+    """Fallback-Actions je Band, wenn kein spezifischer 
+    Text/Actions im REC_LIBRARY definiert ist."""
+    if band_key in ("critical", "high"):
+        return [
+            "Welche Antworten drücken den Score? Konkret benennen!",
+            "Quick Fixes definieren (2–4 Wochen) + Owner festlegen",
+            "Assessment erneut nach Umsetzung durchführen",
+        ]
+    if band_key == "medium":
+        return [
+            "Konkrete Verbesserungsmaßnahmen priorisieren (Top 3)",
+            "Pilot/PoC mit klarer Definition of Done starten",
+            "Messkriterien festlegen (Fehlerquote, Durchlaufzeit, Volumen)",
+        ]
+    if band_key == "good":
+        return [
+            "Pilotieren und dabei Standards/Guidelines dokumentieren",
+            "Betrieb/Monitoring früh mitdenken (SLAs, Logging, Alerts)",
+        ]
+    return [
+        "Skalierung planen (Roadmap, Pipeline, Governance)",
+        "Best Practices als Template für weitere Use Cases nutzen",
+    ]
+
+
+def build_overall_preference(dimension_name, rpa_score, ipa_score, rpa_excluded, ipa_excluded):
+    """
+    Liefert eine einfache, aber hilfreiche Empfehlung zur Priorisierung.
+    """
+    # Wenn beide ausgeschlossen oder beide fehlen → keine Aussage
+    if (rpa_excluded and ipa_excluded) or (rpa_score is None and ipa_score is None):
+        return None
+
+    # Wenn nur eine Option verfügbar ist
+    if rpa_excluded or rpa_score is None:
+        if not ipa_excluded and ipa_score is not None:
+            return {
+                "type": "info",
+                "icon": "➡️",
+                "color": "#3b82f6",
+                "title": f"{dimension_name}: Fokus auf IPA",
+                "text": f"RPA ist hier nicht verfügbar/bewertet. IPA ist die naheliegende Option (Score {ipa_score:.1f}/5).",
+                "actions": ["IPA-PoC scopen", "Daten-/Modellanforderungen klären", "Risiken/Compliance prüfen"],
+            }
+        return None
+
+    if ipa_excluded or ipa_score is None:
+        return {
+            "type": "info",
+            "icon": "➡️",
+            "color": "#3b82f6",
+            "title": f"{dimension_name}: Fokus auf RPA",
+            "text": f"IPA ist hier nicht verfügbar/bewertet. RPA ist die naheliegende Option (Score {rpa_score:.1f}/5).",
+            "actions": ["RPA-PoC scopen", "Prozessstandardisierung "
+            "sichern", "Betrieb/Monitoring planen"],
+        }
+
+    # Beide vorhanden → Vergleich
+    diff = rpa_score - ipa_score
+    if abs(diff) < 0.4:
+        return {
+            "type": "info",
+            "icon": "⚖️",
+            "color": "#3b82f6",
+            "title": f"{dimension_name}: RPA und IPA ähnlich geeignet",
+            "text": f"Die Eignung ist ähnlich (RPA {rpa_score:.1f}/5 vs. IPA {ipa_score:.1f}/5). Entscheide nach Nicht-Score-Kriterien (Zeit, Kosten, Risiko, Datenlage).",
+            "actions": [
+                "Entscheidungskriterien festlegen (Time-to-Value, Risiko, Wartung, Compliance)",
+                "Mini-PoC für beide Ansätze (1–2 Wochen) vergleichen",
+            ],
+        }
+
+    if diff >= 0.4:
+        return {
+            "type": "success",
+            "icon": "🏁",
+            "color": "#22c55e",
+            "title": f"{dimension_name}: RPA bevorzugen",
+            "text": f"RPA ist in dieser Dimension klar stärker (RPA {rpa_score:.1f}/5 vs. IPA {ipa_score:.1f}/5).",
+            "actions": ["RPA priorisieren", "IPA optional als "
+            "Ergänzung (z. B. Dokument-/Textanteile) prüfen"],
+        }
+
+    return {
+        "type": "success",
+        "icon": "🏁",
+        "color": "#22c55e",
+        "title": f"{dimension_name}: IPA bevorzugen",
+        "text": f"IPA ist in dieser Dimension klar stärker (IPA {ipa_score:.1f}/5 vs. RPA {rpa_score:.1f}/5).",
+        "actions": ["IPA priorisieren", "RPA optional als Orchestrierung/Backbone prüfen"],
+    }
+
+
+def build_recommendation_library():
+    """
+    Recommendation library pro Dimension und Band.
+    Keys: dimension_code -> band_key -> {RPA/IPA oder generisch}
+    """
+    return {
+        # Dimension 1: Plattformverfügbarkeit
+        "1": {
+            "critical": {
+                "text": "Plattformverfügbarkeit ist kritisch (Score {score}/5). "
+                "Ohne grundlegende Plattform-/Zugriffsfreigaben ist {automation_type} "
+                "aktuell nicht sinnvoll.",
+                "actions": [
+                    "Stabilität & Verfügbarkeit messen (Uptime, Wartungsfenster, Releases)",
+                    "Alternativen prüfen: APIs, Integration Layer, Systemanpassung",
+                ],
+            },
+            "high": {
+                "text": "Plattformverfügbarkeit ist instabil/unsicher (Score {score}/5). "
+                "{automation_type} birgt hohes Betriebsrisiko (Ausfälle, UI-Änderungen,"
+                "Zugriffsthemen).",
+                "actions": [
+                    "Technische Voraussetzungen in einem Checklist-Format fixieren",
+                    "Change-/Release-Prozess der Plattform einbinden (Regression Tests)",
+                    "Monitoring/Alerting für Automationsläufe definieren",
+                ],
+            },
+            "medium": {
+                "text": "Plattform ist grundsätzlich nutzbar, aber noch nicht "
+                "robust genug (Score {score}/5). Für {automation_type} empfehlen sich "
+                "Guardrails & Standardisierung.",
+                "actions": [
+                    "Stabile Schnittstellen priorisieren (API vor UI, wenn möglich)",
+                    "Testfälle für UI-/Release-Änderungen definieren",
+                    "Betriebskonzept (Runbook) vorbereiten",
+                ],
+            },
+            "good": {
+                "text": "Plattformverfügbarkeit ist solide (Score {score}/5). "
+                "{automation_type} ist realistisch – Fokus auf saubere Umsetzung & Betrieb.",
+            },
+            "excellent": {
+                "text": "Plattformverfügbarkeit ist sehr gut (Score {score}/5). "
+                "Gute Basis, um {automation_type} zu skalieren.",
+            },
+            "_fallback_band": {"text": "Plattformverfügbarkeit (Score {score}/5): "
+            "bitte Details prüfen."},
+        },
+
+        # Dimension 2: Organisatorisch
+        "2": {
+            "critical": {
+                "text": "Kritische organisatorische Defizite (Score {score}/5). "
+                "Ohne Ownership, Prozessverantwortung und Change-Plan scheitert "
+                "{automation_type} häufig am Betrieb.",
+                "actions": [
+                    "Owner/Process Owner + RACI definieren",
+                    "Change- & Kommunikationsplan (Betroffene, Trainings, Support) erstellen",
+                    "Governance: Intake, Priorisierung, Release/Quality Gates festlegen",
+                ],
+            },
+            "high": {
+                "text": "Organisation ist noch nicht ausreichend vorbereitet "
+                "(Score {score}/5). Für {automation_type} drohen Reibungsverluste "
+                "(Akzeptanz, Betrieb, Verantwortlichkeiten).",
+                "actions": [
+                    "Stakeholder-Map + Sponsorship sichern",
+                    "Supportmodell & Incident-Handling definieren",
+                    "Dokumentationsstandard + Übergabeprozess etablieren",
+                ],
+            },
+            "medium": {
+                "text": "Organisatorische Basis ist vorhanden, aber ausbaufähig "
+                "(Score {score}/5). {automation_type} sollte mit klaren Rollen & "
+                "Standards pilotiert werden.",
+                "actions": [
+                    "Definition of Done + Abnahmekriterien vereinbaren",
+                    "Betrieb/Monitoring/Ownership im Pilot verbindlich festlegen",
+                    "Enablement: kurze Trainings + FAQ für Fachbereich",
+                ],
+            },
+            "good": {"text": "Organisation ist gut aufgestellt (Score {score}/5). "
+            "{automation_type} kann sauber pilotiert und in Betrieb überführt werden."},
+            "excellent": {"text": "Organisation ist sehr reif (Score {score}/5)."
+            " Gute Voraussetzungen für skalierbare {automation_type}-Rollouts."},
+            "_fallback_band": {"text": "Organisatorik (Score {score}/5):"
+            " bitte gezielt verbessern."},
+        },
+
+        # Dimension 3: Prozesseignung
+        "3": {
+            "critical": {
+                "RPA": {
+                    "text": "Prozess ist für RPA nicht geeignet (Score {score}/5): "
+                    "zu viele Ausnahmen/Varianten, unklare Regeln oder instabile Inputs.",
+                    "actions": [
+                        "Prozessvarianten reduzieren (80/20) und Standardfall definieren",
+                        "Regelwerk/Entscheidungslogik dokumentieren (wenn-dann)",
+                        "Inputs standardisieren (Formulare, Pflichtfelder, Validierungen)",
+                    ],
+                },
+                "IPA": {
+                    "text": "Prozess ist für IPA kritisch (Score {score}/5): "
+                    "Zieldefinition oder Qualitätskriterien fehlen.",
+                    "actions": [
+                        "Use Case präzisieren (Inputs/Outputs, Fehlerklassen, Guardrails)",
+                        "Human-in-the-loop & Escalation-Logik definieren",
+                    ],
+                },
+                "_fallback_type": {"text": "Prozess sehr kritisch (Score {score}/5)."},
+            },
+            "high": {
+                "RPA": {
+                    "text": "RPA-Eignung ist sehr schwach (Score {score}/5). "
+                    "Fokus: Prozess stabilisieren, Ausnahmen minimieren, klare Regeln schaffen.",
+                    "actions": [
+                        "Ausnahmen kategorisieren (automatisierbar vs. manuell)",
+                        "Prozessschritte vereinheitlichen & dokumentieren",
+                        "Fehler-Quellen reduzieren",
+                    ],
+                },
+                "IPA": {
+                    "text": "IPA-Eignung ist schwach (Score {score}/5). Fokus: "
+                    "Modellanforderungen konkretisieren, Qualität absichern.",
+                    "actions": [
+                        "Trainings-/Testdaten aufbauen",
+                        "Versionierung etablieren und Qualitätskriterien definieren",
+                    ],
+                },
+                "_fallback_type": {"text": "Prozess hoch riskant (Score {score}/5)."},
+            },
+            "medium": {
+                "RPA": {
+                    "text": "RPA-Eignung ist ausbaufähig (Score {score}/5). "
+                    "Mit Standardisierung + klaren Regeln ist ein Pilot sinnvoll.",
+                    "actions": [
+                        "Standardfall priorisieren und zuerst automatisieren",
+                        "Validierungen & Exception-Handling definieren",
+                        "Prozessdoku + Testfälle aufbauen",
+                    ],
+                },
+                "IPA": {
+                    "text": "IPA-Eignung ist ausbaufähig (Score {score}/5). "
+                    "Ein Pilot ist möglich, wenn Qualitätssicherung sauber stehen.",
+                    "actions": [
+                        "Fallback auf manuelle Prüfung definieren (Human-in-the-loop)",
+                        "Sicherheits-/Compliance-Checks integrieren",
+                    ],
+                },
+                "_fallback_type": {"text": "Prozess mittelmäßig (Score {score}/5)."},
+            },
+            "good": {
+                "RPA": {"text": "Prozess ist gut RPA-geeignet (Score {score}/5). "
+                "Fokus: Robustheit, Wartbarkeit, Monitoring."},
+                "IPA": {"text": "Prozess ist gut IPA-geeignet (Score {score}/5). "
+                "Fokus: Modellqualität, Governance, sichere Grenzen."},
+                "_fallback_type": {"text": "Prozess solide (Score {score}/5)."},
+            },
+            "excellent": {
+                "RPA": {"text": "Prozess ist sehr gut für RPA (Score {score}/5). "
+                "Sehr gute Basis für Skalierung."},
+                "IPA": {"text": "Prozess ist sehr gut für IPA (Score {score}/5). "
+                "Sehr gute Basis für produktiven Einsatz."},
+                "_fallback_type": {"text": "Prozess sehr gut (Score {score}/5)."},
+            },
+            "_fallback_band": {"text": "Prozesseignung (Score {score}/5): bitte verbessern."},
+        },
+        # Dimension 4: Daten
+        "4": {
+            "critical": {
+                "RPA": {
+                    "text": "Datenbasis ist kritisch für RPA (Score {score}/5): "
+                    "Daten sind unvollständig, ungeeignet oder liegen nicht in "
+                    "verarbeitbarer Form vor.",
+                    "actions": [
+                        "Datenquellen und Pflichtfelder klären "
+                        "(Vollständigkeit/Verfügbarkeit sicherstellen)",
+                        "Strukturierte Übergabe schaffen (z. B. Tabellen, "
+                        "Formulare, standardisierte Exporte)",
+                        "Bei OCR-/Freitextbedarf prüfen, ob Teilprozess für "
+                        "RPA ungeeignet ist oder vorgelagert aufbereitet werden muss",
+                    ],
+                },
+                "IPA": {
+                    "text": "Datenbasis ist kritisch für IPA (Score {score}/5): "
+                    "Datenqualität, Verfügbarkeit oder Eignung reichen für "
+                    "robuste KI-gestützte Verarbeitung nicht aus.",
+                    "actions": [
+                        "Datenqualität und Datenabdeckung verbessern "
+                        "(fehlende/inkonsistente Inhalte bereinigen)",
+                        "Use Case eingrenzen und Trainings-/Referenzdaten für"
+                        "Pilot gezielt aufbauen",
+                        "OCR/NLP/Entscheidungslogik nur einsetzen, wenn Datenzugang, "
+                        "Qualität und Validierung gesichert sind",
+                    ],
+                },
+                "_fallback_type": {"text": "Datenbasis kritisch (Score {score}/5)."},
+            },
+            "high": {
+                "RPA": {
+                    "text": "Datenbasis ist schwach für RPA (Score {score}/5). Ohne "
+                    "Standardisierung steigt Fehleranfälligkeit und Wartungsaufwand.",
+                    "actions": [
+                        "Eingabedaten standardisieren (Formatregeln, Pflichtfelder, Validierungen)",
+                        "Ausnahmen und fehlende Angaben im Prozess explizit behandeln",
+                        "Medienbrüche reduzieren (manuelle Übertragungen, Screenshots, Freitext) ",
+                    ],
+                },
+                "IPA": {
+                    "text": "Datenbasis ist anspruchsvoll für IPA (Score {score}/5). "
+                    "Ohne Datenaufbereitung sinken Qualität und Verlässlichkeit der Ergebnisse.",
+                    "actions": [
+                        "Datenaufbereitung definieren (OCR-Qualität, Textbereinigung, "
+                        "Klassifikationsregeln)",
+                        "Menschliche Validierung für unsichere Ergebnisse einplanen",
+                        "Pilotdaten mit realistischen Fällen und Grenzfällen aufbauen",
+                    ],
+                },
+                "_fallback_type": {"text": "Datenbasis schwach (Score {score}/5)."},
+            },
+            "medium": {
+                "RPA": {
+                    "text": "Datenbasis ist gemischt (Score {score}/5). RPA ist "
+                    "machbar, wenn Datenformate, Vollständigkeit und Ausnahmen "
+                    "sauber geregelt werden."
+                },
+                "IPA": {
+                    "text": "Datenbasis ist ausbaufähig (Score {score}/5). Ein "
+                    "IPA-Pilot ist machbar, wenn OCR/Textverständnis und Validierung "
+                    "gezielt abgesichert werden."
+                },
+                "_fallback_type": {"text": "Datenbasis mittel (Score {score}/5)."},
+            },
+            "good": {
+                "text": "Datenbasis ist gut (Score {score}/5). Relevante "
+                "Daten sind überwiegend verfügbar und geeignet; Fokus auf saubere "
+                "Validierung und Betriebsfähigkeit."
+            },
+            "excellent": {
+                "text": "Datenbasis ist sehr gut (Score {score}/5). "
+                "Gute Voraussetzungen für stabile Automation und Skalierung."
+            },
+            "_fallback_band": {
+                "text": "Datenbasis (Score {score}/5): bitte Datenverfügbarkeit, "
+                "Qualität und Eignung prüfen."
+            },
+        },
+
+        # Dimension 5: Technische Komplexität
+        "5": {
+            "critical": {
+                "RPA": {
+                    "text": "Technische Komplexität ist kritisch für RPA "
+                    "(Score {score}/5): hohe UI-Volatilität, fehlende "
+                    "Stabilität oder schwierige Integrationen.",
+                    "actions": [
+                        "API-/Integration-first prüfen (statt UI-Automation)",
+                        "Systemzugriffe stabilisieren (Selectors, stabile IDs, Testumgebung)",
+                        "Architekturentscheidung: RPA nur als Übergang oder gar nicht?",
+                    ],
+                },
+                "IPA": {
+                    "text": "Technische Komplexität ist kritisch für IPA "
+                    "(Score {score}/5): fehlende Infrastruktur.",
+                    "actions": [
+                        "Security/Datenschutz/Hosting klären (Cloud vs. On-Prem)",
+                        "Technische Machbarkeit im PoC validieren (Latency, Kosten, Qualität)",
+                    ],
+                },
+                "_fallback_type": {"text": "Technik kritisch (Score {score}/5)."},
+            },
+            "high": {
+                "RPA": {
+                    "text": "RPA ist technisch riskant (Score {score}/5). "
+                    "Ohne Stabilisierung sind Wartungskosten hoch.",
+                    "actions": [
+                        "Stabile Schnittstellen priorisieren",
+                        "Regression-Tests automatisieren",
+                    ],
+                },
+                "IPA": {
+                    "text": "IPA ist technisch riskant (Score {score}/5). "
+                    "Ohne Stabilisierung sind Wartungskosten hoch.",
+                    "actions": [
+                        "Rollout-Strategie (Canary, A/B) definieren",
+                        "Rollen/Skills (Data/ML/Platform) sicherstellen",
+                    ],
+                },
+                "_fallback_type": {"text": "Technik hoch riskant (Score {score}/5)."},
+            },
+            "medium": {
+                "RPA": {"text": "Technische Komplexität ist erhöht (Score {score}/5). "
+                "Mit Standards und Tests ist RPA machbar."},
+                "IPA": {"text": "Technische Komplexität ist erhöht (Score {score}/5). "
+                "Ein IPA-Pilot ist machbar."},
+                "_fallback_type": {"text": "Technik mittel (Score {score}/5)."},
+            },
+            "good": {"text": "Technische Basis ist gut (Score {score}/5). "
+            "Fokus auf saubere Implementierung & Betrieb."},
+            "excellent": {"text": "Technische Basis ist sehr gut (Score {score}/5)."
+            " Gute Voraussetzungen für Skalierung."},
+            "_fallback_band": {"text": "Technik (Score {score}/5): bitte prüfen."},
+        },
+
+        # Dimension 6 Wirtschaftlichkeit
+        "6": {
+            "critical": {
+                "text": "Wirtschaftlichkeit ist kritisch (Score {score}/5)."
+                " Der Business Case trägt aktuell nicht (Volumen, Aufwand, Nutzen oder Risiko).",
+                "actions": [
+                    "ROI-Rechnung transparent machen (Setup + Run + Change-Kosten)",
+                    "Volumen/Automationsquote erhöhen oder Scope reduzieren",
+                    "Alternative: Prozess-/Systemverbesserung statt Automation prüfen",
+                ],
+            },
+            "high": {
+                "text": "Wirtschaftlichkeit ist schwach (Score {score}/5). "
+                "Ohne Anpassung droht niedriger ROI.",
+                "actions": [
+                    "Quick-Wins identifizieren (hohes Volumen, klare Regeln)",
+                    "Setup-Aufwand reduzieren (Templates, Reuse, Standardkomponenten)",
+                    "Benefit Tracking definieren (Zeit, Qualität, Compliance)",
+                ],
+            },
+            "medium": {
+                "text": "Wirtschaftlichkeit ist ausbaufähig (Score {score}/5). "
+                "Mit sauberem Scope und Skalierung kann sich {automation_type} lohnen.",
+                "actions": [
+                    "Pilot mit messbaren KPIs (Zeitersparnis, Fehlerquote) durchführen",
+                    "Skalierungshebel identifizieren (mehr Fälle, mehr Länder, mehr Teams)",
+                    "Betriebskosten früh berücksichtigen (Monitoring, Support, Changes)",
+                ],
+            },
+            "good": {"text": "Wirtschaftlichkeit ist solide (Score {score}/5). "
+            "Fokus: Pilot → Skalierung mit sauberem KPI-Tracking."},
+            "excellent": {"text": "Wirtschaftlichkeit ist sehr gut (Score {score}/5). "
+            "Gute Basis für schnelle Skalierung."},
+            "_fallback_band": {"text": "Wirtschaftlichkeit (Score {score}/5): bitte verbessern."},
+        },
+
+        # Fallback für unbekannte Dimensionen
+        "_fallback": {
+            "_fallback_band": {"text": "Dimension (Score {score}/5): bitte prüfen."},
+        }
+    }
+
+
+# Einmalig beim Import kompiliert
+REC_LIBRARY = build_recommendation_library()
+_TEMPLATES = compile_recommendation_templates(REC_LIBRARY)
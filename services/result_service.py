@@ -0,0 +1,321 @@
+"""
+Aufbereitung von Assessment-Ergebnissen für Ergebnisseite und Export
+Arbeitet auf dem kompilierten Fragebogen und einer einzigen Antwortabfrage,
+statt pro Frage, Option und Automatisierungstyp die Datenbank abzufragen.
+
+Das aufbereitete Ergebnis wird bei der Auswertung als Snapshot
+(result_snapshot, zlib-komprimiertes JSON) gespeichert; Ergebnisseite und
+Export lesen danach nur noch diese eine Zeile.
+"""
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from models.database import (
+    Assessment, Process, Answer, DimensionResult, TotalResult, EconomicMetric, ResultSnapshot
+)
+from services.archive_service import load_archived_answers
+from services.questionnaire_cache import get_compiled_questionnaire
+from services.recommendation_service import generate_dimension_recommendations
+from services.scoring_engine import AnswerRow
+from extensions import db
+
+# Erhöhen, wenn sich Aufbau oder Inhalt des Snapshots ändern
+# (ältere Snapshots werden dann beim nächsten Lesen neu erzeugt)
+SNAPSHOT_FORMAT_VERSION = 1
+TOTAL_FIELDS = ("total_rpa", "total_ipa", "rpa_excluded", "ipa_excluded", "recommendation")
+
+
+def load_answer_rows(assessment_id):
+    """Alle Antworten eines Assessments in Einfügereihenfolge (eine Abfrage;
+    bei archivierten Assessments aus dem Archivblock)"""
+    rows = [
+        AnswerRow(r.question_id, r.scale_option_id, r.numeric_value, r.is_applicable)
+        for r in db.session.query(
+            Answer.question_id, Answer.scale_option_id, Answer.numeric_value, Answer.is_applicable
+        ).filter(Answer.assessment_id == assessment_id).order_by(Answer.id)
+    ]
+    if rows:
+        return rows
+    return load_archived_answers([assessment_id]).get(assessment_id, [])
+
+
+def _score_text(compiled, question, option_ids, automation_type):
+    """Score-Anzeige einer Antwort für einen Automatisierungstyp"""
+    if question.question_type == "multiple_choice":
+        # Für Multiple Choice: Ausschluss oder höchster Score
+        scores = [compiled.score_for(question.id, option_id, automation_type)
+                  for option_id in set(option_ids)]
+        scores = [s for s in scores if s is not None]
+        if any(s.is_exclusion for s in scores):
+            return "AUSSCHLUSS"
+        applicable = [s.score for s in scores if s.is_applicable and s.score is not None]
+        if applicable:
+            return f"{max(applicable):.1f} (max)"
+        return "–"
+
+    score = compiled.score_for(question.id, option_ids[0], automation_type)
+    if score is None:
+        return "–"
+    if score.is_exclusion:
+        return "AUSSCHLUSS"
+    if not score.is_applicable:
+        return "N/A"
+    if score.score is not None:
+        return f"{score.score:.1f}"
+    return "–"
+
+
+def build_answer_details(compiled, dimension_id, answers_by_q):
+    """
+    Antwortdetails einer Dimension in Anzeige-Reihenfolge
+
+    Returns:
+        Liste von dicts mit question_code, question_text, answer,
+        is_applicable, rpa_score, ipa_score
+    """
+    details = []
+    for question in compiled.display_questions_by_dimension.get(dimension_id, ()):
+        answers = answers_by_q.get(question.id)
+        if not answers:
+            continue
+
+        answer_text = "Keine Antwort"
+        option_ids = []
+
+        if question.question_type == "number":
+            if answers[0].numeric_value is not None:
+                answer_text = f"{answers[0].numeric_value}"
+                if question.unit:
+                    answer_text += f" {question.unit}"
+
+        elif question.question_type == "multiple_choice":
+            labels = []
+            # Optionen in ID-Reihenfolge anzeigen
+            for answer in sorted(answers, key=lambda a: a.scale_option_id or 0):
+                option = compiled.option_by_id.get(answer.scale_option_id)
+                if option:
+                    labels.append(option.label)
+                    option_ids.append(option.id)
+            if labels:
+                answer_text = ", ".join(labels)
+
+        else:
+            option = compiled.option_by_id.get(answers[0].scale_option_id)
+            if option:
+                answer_text = option.label
+                option_ids.append(option.id)
+
+        rpa_score_text = "–"
+        ipa_score_text = "–"
+        if option_ids:
+            rpa_score_text = _score_text(compiled, question, option_ids, "RPA")
+            ipa_score_text = _score_text(compiled, question, option_ids, "IPA")
+
+        details.append({
+            'question_code': question.code,
+            'question_text': question.text,
+            'answer': answer_text,
+            'is_applicable': answers[0].is_applicable,
+            'rpa_score': rpa_score_text,
+            'ipa_score': ipa_score_text
+        })
+    return details
+
+
+def group_answers(answer_rows):
+    """Gruppiert Antwortzeilen nach question_id (Reihenfolge bleibt erhalten)"""
+    answers_by_q = defaultdict(list)
+    for row in answer_rows:
+        answers_by_q[row.question_id].append(row)
+    return answers_by_q
+
+
+def build_result_view(compiled, process, total, dimension_results, answer_rows, economic_metrics):
+    """
+    Baut alle Daten der Ergebnisseite auf (ohne Datenbankzugriff).
+
+    Args:
+        compiled: CompiledQuestionnaire der Assessment-Version
+        process: dict mit name, description, industry
+        total: dict mit Spalten von TotalResult oder None (noch nicht ausgewertet)
+        dimension_results: dicts mit dimension_id, automation_type, mean_score, is_excluded
+        answer_rows: AnswerRows des Assessments
+        economic_metrics: dicts mit key, value, unit
+
+    Returns:
+        dict mit process, total, dimensions, economic_metrics
+    """
+    answers_by_q = group_answers(answer_rows)
+
+    # Gruppiere Ergebnisse nach Dimension (pro Dimension gibt es RPA und IPA)
+    results_by_dim = defaultdict(dict)
+    for dim_result in dimension_results:
+        results_by_dim[dim_result["dimension_id"]][dim_result["automation_type"]] = dim_result
+
+    dimensions_data = []
+    for dimension in compiled.dimensions:
+        if dimension.id not in results_by_dim:
+            continue
+        rpa_result = results_by_dim[dimension.id].get("RPA")
+        ipa_result = results_by_dim[dimension.id].get("IPA")
+        dim_data = {
+            'code': dimension.code,
+            'name': dimension.name,
+            'calc_method': dimension.calc_method,
+            'is_shared': dimension.code in ['1', '7'],
+            'rpa_score': rpa_result["mean_score"] if rpa_result else None,
+            'ipa_score': ipa_result["mean_score"] if ipa_result else None,
+            'rpa_excluded': bool(rpa_result["is_excluded"]) if rpa_result else False,
+            'ipa_excluded': bool(ipa_result["is_excluded"]) if ipa_result else False,
+            'answers': build_answer_details(compiled, dimension.id, answers_by_q)
+        }
+        recommendations = generate_dimension_recommendations(
+            dimension_code=dim_data['code'],
+            dimension_name=dim_data['name'],
+            rpa_score=dim_data['rpa_score'],
+            ipa_score=dim_data['ipa_score'],
+            rpa_excluded=dim_data['rpa_excluded'],
+            ipa_excluded=dim_data['ipa_excluded']
+        )
+        dim_data['rpa_recommendation'] = recommendations['rpa_recommendation']
+        dim_data['ipa_recommendation'] = recommendations['ipa_recommendation']
+        dimensions_data.append(dim_data)
+
+    return {
+        'process': {
+            'name': process["name"],
+            'description': process["description"],
+            'industry': process["industry"],
+        },
+        'total': {field: total[field] for field in TOTAL_FIELDS} if total else None,
+        'dimensions': dimensions_data,
+        'economic_metrics': {
+            metric["key"]: {'value': metric["value"], 'unit': metric["unit"]}
+            for metric in economic_metrics
+        },
+    }
+
+
+def encode_snapshot(view):
+    """Serialisiert eine Ergebnisansicht kompakt (JSON + zlib)"""
+    return zlib.compress(json.dumps(view, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_snapshot(payload):
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def snapshot_row(assessment_id, view, now=None):
+    """Spalten einer result_snapshot-Zeile (für Bulk-INSERTs)"""
+    return {
+        "assessment_id": assessment_id,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "payload": encode_snapshot(view),
+        "created_at": now or datetime.utcnow(),
+    }
+
+
+def build_result_view_from_db(assessment_id):
+    """
+    Baut die Ergebnisansicht aus den gespeicherten Ergebnistabellen auf.
+
+    Returns:
+        (view, is_scored) oder (None, False), wenn das Assessment nicht existiert
+    """
+    row = db.session.query(
+        Assessment.questionnaire_version_id, Process.name, Process.description, Process.industry
+    ).join(
+        Process, Assessment.process_id == Process.id
+    ).filter(Assessment.id == assessment_id).first()
+    if row is None:
+        return None, False
+
+    total = db.session.query(
+        *(getattr(TotalResult, field) for field in TOTAL_FIELDS)
+    ).filter(TotalResult.assessment_id == assessment_id).first()
+    dimension_results = db.session.query(
+        DimensionResult.dimension_id, DimensionResult.automation_type,
+        DimensionResult.mean_score, DimensionResult.is_excluded
+    ).filter(DimensionResult.assessment_id == assessment_id).all()
+    metrics = db.session.query(
+        EconomicMetric.key, EconomicMetric.value, EconomicMetric.unit
+    ).filter(EconomicMetric.assessment_id == assessment_id).order_by(EconomicMetric.id).all()
+
+    view = build_result_view(
+        get_compiled_questionnaire(row.questionnaire_version_id),
+        row._asdict(),
+        total._asdict() if total else None,
+        [r._asdict() for r in dimension_results],
+        load_answer_rows(assessment_id),
+        [m._asdict() for m in metrics],
+    )
+    return view, total is not None
+
+
+def store_result_snapshot(assessment_id):
+    """
+    Erzeugt den Snapshot eines ausgewerteten Assessments neu (ohne Commit).
+    Wird nach jeder Auswertung aufgerufen.
+
+    Returns:
+        Ergebnisansicht oder None, wenn (noch) kein Gesamtergebnis existiert
+    """
+    delete_result_snapshot(assessment_id)
+    view, is_scored = build_result_view_from_db(assessment_id)
+    if not is_scored:
+        return view
+    db.session.execute(insert(ResultSnapshot), [snapshot_row(assessment_id, view)])
+    return view
+
+
+def delete_result_snapshot(assessment_id):
+    ResultSnapshot.query.filter_by(assessment_id=assessment_id).delete()
+
+
+def load_result_snapshot(assessment_id):
+    """Gespeicherte Ergebnisansicht oder None (fehlt oder veraltetes Format)"""
+    row = db.session.query(
+        ResultSnapshot.format_version, ResultSnapshot.payload
+    ).filter(ResultSnapshot.assessment_id == assessment_id).first()
+    if row is None or row.format_version != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return decode_snapshot(row.payload)
+
+
+def get_result_view(assessment_id):
+    """
+    Ergebnisansicht für Ergebnisseite und Export: aus dem Snapshot, sonst aus den
+    Ergebnistabellen (fehlende oder veraltete Snapshots werden dabei nachgeholt).
+
+    Returns:
+        Ergebnisansicht (total ist None, solange nicht ausgewertet) oder None,
+        wenn das Assessment nicht existiert
+    """
+    view = load_result_snapshot(assessment_id)
+    if view is not None:
+        return view
+
+    view, is_scored = build_result_view_from_db(assessment_id)
+    if is_scored:
+        # Snapshot im veralteten Format ersetzen; einen parallel (z. B. vom Worker
+        # nach neuer Auswertung) geschriebenen aktuellen Snapshot nicht überschreiben
+        stmt = sqlite_insert(ResultSnapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["assessment_id"],
+            set_={column: getattr(stmt.excluded, column)
+                  for column in ("format_version", "payload", "created_at")},
+            where=ResultSnapshot.format_version != SNAPSHOT_FORMAT_VERSION,
+        )
+        try:
+            db.session.execute(stmt, [snapshot_row(assessment_id, view)])
+            db.session.commit()
+        except IntegrityError:
+            # Assessment wurde parallel gelöscht
+            db.session.rollback()
+    return view
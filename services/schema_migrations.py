@@ -0,0 +1,123 @@
+"""
+Versionierte Schema-Migrationen
+Jede Migration hat eine fortlaufende Versionsnummer und läuft in einer eigenen
+Transaktion, in der auch ihr Eintrag in schema_version geschrieben wird –
+bricht sie ab, bleibt die Datenbank auf dem vorherigen Stand. Ist die Datenbank
+aktuell, kostet der Start nur eine Abfrage (MAX über den Primärschlüssel).
+
+Neue Tabellen, Spalten oder Indizes werden als weitere Migration am Ende der
+Liste ergänzt; bereits ausgelieferte Migrationen werden nicht mehr geändert.
+"""
+from collections import namedtuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from models.database import SchemaVersion
+
+# apply: Funktion ohne Argumente; schreibt über db.session und committet nicht
+Migration = namedtuple("Migration", ["version", "name", "apply"])
+
+
+def current_version():
+    """Höchste angewendete Version (0, wenn schema_version noch fehlt)"""
+    try:
+        return db.session.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+    except OperationalError:
+        db.session.rollback()
+        return 0
+
+
+def rebuild_sqlite_table(name, statements):
+    """
+    Legt eine Tabelle nach eingefrorener DDL neu an und übernimmt die Daten
+    (SQLite kann Constraints wie Fremdschlüssel nicht per ALTER TABLE ändern).
+    Zeilen, deren Elternzeile fehlt, werden nicht übernommen.
+
+    Args:
+        name: Tabellenname
+        statements: CREATE TABLE und die Indizes der Tabelle (wie in
+            models/baseline_schema.py), unabhängig von den aktuellen Modellen
+    """
+    connection = db.session.connection()
+    existing = {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({name})")}
+    if not existing:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+        return
+    # Indexnamen freigeben; die Indizes entstehen mit der neuen Tabelle wieder
+    indexes = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+        (name,)
+    ).scalars().all()
+    for index in indexes:
+        connection.exec_driver_sql(f'DROP INDEX "{index}"')
+
+    old_name = f"{name}_old"
+    connection.exec_driver_sql(f"ALTER TABLE {name} RENAME TO {old_name}")
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+    columns = ", ".join(
+        f'"{row[1]}"' for row in connection.exec_driver_sql(f"PRAGMA table_info({name})")
+        if row[1] in existing
+    )
+    # foreign_key_list: (id, seq, Elterntabelle, Spalte, Elternspalte, ...)
+    conditions = [
+        f'("{column}" IS NULL OR "{column}" IN (SELECT "{parent_column or "rowid"}" FROM {parent}))'
+        for _, _, parent, column, parent_column, *_ in
+        connection.exec_driver_sql(f"PRAGMA foreign_key_list({name})")
+    ]
+    connection.exec_driver_sql(
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {old_name}"
+        + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+    )
+    connection.exec_driver_sql(f"DROP TABLE {old_name}")
+
+
+def _begin_exclusive():
+    """
+    Startet die Transaktion einer Migration. Bei SQLite sofort mit Schreibsperre
+    (BEGIN IMMEDIATE), damit gleichzeitig startende Prozesse nacheinander
+    migrieren; außerdem laufen so auch CREATE/ALTER in der Transaktion.
+    """
+    if db.session.get_bind().dialect.name == "sqlite":
+        db.session.execute(text("BEGIN IMMEDIATE"))
+
+
+def apply_migrations(migrations):
+    """
+    Wendet alle noch fehlenden Migrationen in Versionsreihenfolge an.
+
+    Returns:
+        Liste der angewendeten Versionen (leer, wenn die Datenbank aktuell ist)
+
+    Raises:
+        ValueError: bei doppelten oder nicht aufsteigenden Versionsnummern
+    """
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError(f"Migrationsversionen müssen eindeutig und aufsteigend sein: {versions}")
+    if not migrations or current_version() >= versions[-1]:
+        db.session.rollback()
+        return []
+
+    # get_bind: Engine der Session (bei Mandanten die Datei des Mandanten)
+    SchemaVersion.__table__.create(db.session.get_bind(), checkfirst=True)
+    applied = []
+    for migration in migrations:
+        _begin_exclusive()
+        try:
+            # Erneut prüfen: ein anderer Prozess kann die Migration inzwischen angewendet haben
+            if current_version() >= migration.version:
+                db.session.rollback()
+                continue
+            print(f"Migration {migration.version}: {migration.name}")
+            migration.apply()
+            db.session.add(SchemaVersion(version=migration.version, name=migration.name))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,238 @@
+"""
+Speicherbasierte Auswertung
+Wendet Filterlogik und Scoring auf Antworten im Speicher an (ohne ORM-Objekte)
+und liefert Zeilen für Bulk-INSERTs in dimension_result, total_result und
+economic_metric. Genutzt vom Massenimport, von ScoringService (einzelnes
+Assessment) und von apply_filter_logic() in main.py.
+"""
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import insert
+
+from models.database import DimensionResult, TotalResult, EconomicMetric
+from services.scoring_service import ScoringService
+from extensions import db
+
+AUTOMATION_TYPES = ("RPA", "IPA")
+TOTAL_DIMENSION_CODES = ("2", "3", "4", "5", "6")
+MAX_FILTER_ITERATIONS = 10
+
+
+class AnswerRow(NamedTuple):
+    question_id: int
+    scale_option_id: Optional[int]
+    numeric_value: Optional[float]
+    is_applicable: bool = True
+
+
+class ScoredAssessment(NamedTuple):
+    dimension_results: list  # dicts mit Spalten von DimensionResult
+    total_result: dict  # Spalten von TotalResult
+    economic_metrics: list  # dicts mit Spalten von EconomicMetric
+
+
+def apply_filter_logic(compiled, answers):
+    """
+    Setzt is_applicable für alle Antworten anhand der Fragebedingungen.
+    Nicht anwendbare Antworten verlieren ihre Werte (wie apply_filter_logic in main.py).
+
+    Returns:
+        Neue Liste von AnswerRow in unveränderter Reihenfolge
+    """
+    rows = list(answers)
+    indices_by_question = defaultdict(list)
+    for i, row in enumerate(rows):
+        indices_by_question[row.question_id].append(i)
+
+    conditional = [q for q in compiled.questions if q.conditions]
+    unconditional = [q for q in compiled.questions if not q.conditions]
+
+    for _ in range(MAX_FILTER_ITERATIONS):
+        changes_made = False
+
+        answer_map = defaultdict(set)
+        for row in rows:
+            if row.is_applicable and row.scale_option_id is not None:
+                answer_map[row.question_id].add(row.scale_option_id)
+
+        for question, should_be_applicable in (
+            [(q, True) for q in unconditional]
+            + [(q, _is_applicable(q, answer_map)) for q in conditional]
+        ):
+            for i in indices_by_question.get(question.id, ()):
+                row = rows[i]
+                if row.is_applicable != should_be_applicable:
+                    changes_made = True
+                    if should_be_applicable:
+                        rows[i] = row._replace(is_applicable=True)
+                    else:
+                        rows[i] = AnswerRow(row.question_id, None, None, False)
+
+        if not changes_made:
+            break
+
+    return rows
+
+
+def _is_applicable(question, answer_map):
+    results = [
+        required_option in answer_map.get(parent_id, ())
+        for parent_id, required_option in question.conditions
+    ]
+    if question.depends_logic == "any":
+        return any(results)
+    return all(results)
+
+
+def score_assessment(compiled, assessment_id, answers):
+    """
+    Berechnet Dimensions-, Gesamtergebnis und Wirtschaftlichkeitskennzahlen.
+
+    Args:
+        compiled: CompiledQuestionnaire der Assessment-Version
+        assessment_id: ID für die erzeugten Zeilen
+        answers: AnswerRows nach Anwendung der Filterlogik
+    """
+    answers_by_q = defaultdict(list)
+    for row in answers:
+        answers_by_q[row.question_id].append(row)
+
+    dimension_results = []
+    economic_metrics = []
+
+    for dimension in compiled.dimensions:
+        questions = compiled.questions_by_dimension.get(dimension.id, ())
+        if dimension.calc_method == "economic_score":
+            metrics, score, is_excluded = _economic_dimension(compiled, questions, answers_by_q)
+            economic_metrics.extend(
+                {"assessment_id": assessment_id, "automation_type": None,
+                 "key": key, "value": value, "unit": unit}
+                for key, value, unit in metrics
+            )
+            for automation_type in AUTOMATION_TYPES:
+                dimension_results.append({
+                    "assessment_id": assessment_id,
+                    "dimension_id": dimension.id,
+                    "automation_type": automation_type,
+                    "mean_score": score,
+                    "is_excluded": is_excluded,
+                    "excluded_by_question_id": None,
+                })
+        else:
+            for automation_type in AUTOMATION_TYPES:
+                mean_score, excluded_by = _score_dimension(compiled, questions,
+                                                           answers_by_q, automation_type)
+                dimension_results.append({
+                    "assessment_id": assessment_id,
+                    "dimension_id": dimension.id,
+                    "automation_type": automation_type,
+                    "mean_score": mean_score,
+                    "is_excluded": excluded_by is not None,
+                    "excluded_by_question_id": excluded_by,
+                })
+
+    total_result = _total_result(compiled, assessment_id, dimension_results)
+    return ScoredAssessment(dimension_results, total_result, economic_metrics)
+
+
+def _score_dimension(compiled, questions, answers_by_q, automation_type):
+    """Mittelwert einer Dimension (multiple_choice: Best-of); Ausschluss bricht ab"""
+    scores = []
+    for question in questions:
+        q_answers = answers_by_q.get(question.id)
+        if not q_answers:
+            continue
+
+        if question.question_type == "single_choice":
+            option_id = q_answers[0].scale_option_id
+            if not option_id:
+                continue
+            option_score = compiled.score_for(question.id, option_id, automation_type)
+            if option_score is None:
+                continue
+            if option_score.is_exclusion:
+                return None, question.id
+            if option_score.is_applicable and option_score.score is not None:
+                scores.append(option_score.score)
+
+        elif question.question_type == "multiple_choice":
+            option_scores = [
+                compiled.score_for(question.id, option_id, automation_type)
+                for option_id in {a.scale_option_id for a in q_answers if a.scale_option_id}
+            ]
+            option_scores = [s for s in option_scores if s is not None]
+            if not option_scores:
+                continue
+            if any(s.is_exclusion for s in option_scores):
+                return None, question.id
+            applicable = [s.score for s in option_scores
+                          if s.is_applicable and s.score is not None]
+            if applicable:
+                scores.append(max(applicable))
+
+    mean_score = sum(scores) / len(scores) if scores else None
+    return mean_score, None
+
+
+def _economic_dimension(compiled, questions, answers_by_q):
+    values = {}
+    for question in questions:
+        for row in answers_by_q.get(question.id, ()):
+            if row.numeric_value is not None:
+                values[question.code] = row.numeric_value
+
+    # 1.6 liegt nicht in Dimension 7: jüngste anwendbare Antwort bevorzugen
+    q_1_6 = compiled.question_by_code.get("1.6")
+    if q_1_6:
+        candidates = [r for r in answers_by_q.get(q_1_6.id, ()) if r.numeric_value is not None]
+        applicable = [r for r in candidates if r.is_applicable]
+        chosen = (applicable or candidates or [None])[-1]
+        if chosen is not None:
+            values["1.6"] = chosen.numeric_value
+
+    economic = ScoringService.compute_economic_metrics(values)
+    if economic is None:
+        return [], None, False
+    return economic
+
+
+def _total_result(compiled, assessment_id, dimension_results):
+    total_dim_ids = {d.id for d in compiled.dimensions if d.code in TOTAL_DIMENSION_CODES}
+    totals = {}
+    for automation_type in AUTOMATION_TYPES:
+        rows = [r for r in dimension_results
+                if r["automation_type"] == automation_type and r["dimension_id"] in total_dim_ids]
+        excluded = any(r["is_excluded"] and r["excluded_by_question_id"] is not None for r in rows)
+        scores = [r["mean_score"] for r in rows
+                  if not r["is_excluded"] and r["mean_score"] is not None]
+        totals[automation_type] = (sum(scores) / len(scores) if scores else None, excluded)
+
+    total_rpa, rpa_excluded = totals["RPA"]
+    total_ipa, ipa_excluded = totals["IPA"]
+    return {
+        "assessment_id": assessment_id,
+        "total_rpa": total_rpa,
+        "total_ipa": total_ipa,
+        "rpa_excluded": rpa_excluded,
+        "ipa_excluded": ipa_excluded,
+        "recommendation": ScoringService._determine_recommendation(
+            total_rpa, total_ipa, rpa_excluded, ipa_excluded
+        ),
+        "combined_score": ScoringService.combined_score(total_rpa, total_ipa),
+    }
+
+
+def bulk_insert_results(scored_assessments):
+    """Schreibt die Ergebnisse vieler Assessments mit je einem INSERT pro Tabelle"""
+    dimension_rows, total_rows, metric_rows = [], [], []
+    for scored in scored_assessments:
+        dimension_rows.extend(scored.dimension_results)
+        total_rows.append(scored.total_result)
+        metric_rows.extend(scored.economic_metrics)
+
+    for model, rows in ((DimensionResult, dimension_rows),
+                        (TotalResult, total_rows),
+                        (EconomicMetric, metric_rows)):
+        if rows:
+            db.session.execute(insert(model), rows)
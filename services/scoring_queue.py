@@ -0,0 +1,110 @@
+"""
+Asynchrone Auswertung von Assessments über einen begrenzten Thread-Pool
+"""
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g
+
+from services.db_routing import current_tenant
+
+
+class ScoringQueue:
+    """In-Process-Warteschlange für Scoring-Jobs mit begrenzter Kapazität.
+
+    Jobs laufen in einem eigenen App-Kontext (mit dem Mandanten des Aufrufers).
+    Ist die Warteschlange voll, lehnt submit() den Job ab und der Aufrufer
+    berechnet synchron (Backpressure).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._failed = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registriert die Standardkonfiguration an der Flask-App"""
+        app.config.setdefault('SCORING_MODE', 'sync')  # sync | async
+        app.config.setdefault('SCORING_WORKERS', 2)
+        app.config.setdefault('SCORING_QUEUE_SIZE', 32)
+        self.app = app
+
+    @property
+    def enabled(self):
+        """True, wenn Assessments asynchron ausgewertet werden sollen"""
+        return self.app is not None and self.app.config['SCORING_MODE'] == 'async'
+
+    def _ensure_executor(self):
+        # Lazy, damit beim Import (bzw. vor einem Fork) keine Threads entstehen
+        with self._lock:
+            if self._executor is None:
+                workers = self.app.config['SCORING_WORKERS']
+                self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                    thread_name_prefix='scoring')
+                # Laufende + wartende Jobs sind durch die Queue-Größe begrenzt
+                self._slots = threading.BoundedSemaphore(
+                    workers + self.app.config['SCORING_QUEUE_SIZE']
+                )
+
+    def submit(self, job, assessment_id):
+        """
+        Reiht einen Scoring-Job ein.
+
+        Returns:
+            True wenn eingereiht, False wenn die Warteschlange voll ist
+        """
+        self._ensure_executor()
+        if not self._slots.acquire(blocking=False):
+            return False
+
+        # Assessment-IDs sind nur je Mandant eindeutig
+        key = (current_tenant(), assessment_id)
+        with self._lock:
+            self._pending.add(key)
+            self._failed.pop(key, None)
+        self._executor.submit(self._run, job, key)
+        return True
+
+    def _run(self, job, key):
+        tenant, assessment_id = key
+        try:
+            with self.app.app_context():
+                if tenant is not None:
+                    g.tenant = tenant
+                job(assessment_id)
+        except Exception as e:
+            traceback.print_exc()
+            with self._lock:
+                self._failed[key] = str(e)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+            self._slots.release()
+
+    def status(self, assessment_id):
+        """
+        Status eines Jobs in dieser Prozessinstanz
+
+        Returns:
+            ('pending', None), ('failed', Fehlertext) oder (None, None) wenn unbekannt
+        """
+        key = (current_tenant(), assessment_id)
+        with self._lock:
+            if key in self._pending:
+                return 'pending', None
+            if key in self._failed:
+                return 'failed', self._failed[key]
+        return None, None
+
+    def shutdown(self, wait=True):
+        """Beendet den Thread-Pool (z. B. in Tests oder beim Herunterfahren)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -3,11 +3,11 @@ Service für die Berechnung von Assessment-Ergebnissen
 Inkl. vollständiger Wirtschaftlichkeitsberechnung mit ROI, 
 personellem Nutzen, FTE-Einsparung, Kosten etc.
 """
-from collections import defaultdict
 from models.database import (
-    Assessment, Answer, DimensionResult, TotalResult,
-    Question, OptionScore, Dimension, EconomicMetric
+    Assessment, Answer, DimensionResult, TotalResult, EconomicMetric
 )
+from services.portfolio_service import PortfolioService
+from services.questionnaire_cache import get_compiled_questionnaire
 from extensions import db
 
 class ScoringService:
@@ -15,208 +15,80 @@ class ScoringService:
     # Konstanten für Wirtschaftlichkeitsberechnung
     ANNUAL_WORK_HOURS_PER_FTE = 1700  # Jahresarbeitsstunden pro FTE
     COST_PER_FTE_YEAR = 55000  # Kosten pro FTE/Jahr in Euro
+    # Fragecodes, die für die Wirtschaftlichkeitsberechnung benötigt werden
+    ECONOMIC_INPUT_CODES = ("1.6", "7.1", "7.2", "7.3", "7.4", "7.5", "7.6", "7.7")
+    # Kennzahlen der Wirtschaftlichkeitsberechnung (Schlüssel, Einheit) in Ausgabereihenfolge
+    ECONOMIC_METRICS = (
+        ("roi", "%"),
+        ("personeller_nutzen", "€"),
+        ("fte_einsparung", "FTE"),
+        ("initiale_fixkosten", "€"),
+        ("variable_kosten_jahr", "€"),
+        ("haeufigkeit_jahr", "Anzahl"),
+        ("zeitersparnis_h_jahr", "Stunden"),
+    )
 
     @staticmethod
     def calculate_assessment_results(assessment_id):
         """
-        Berechnet alle Ergebnisse für ein Assessment
-        
+        Berechnet alle Ergebnisse für ein Assessment auf dem kompilierten
+        Fragebogen (scoring_engine, eine Antwortabfrage) und speichert sie.
+
         Returns:
-            TotalResult-Objekt
+            dict mit den Spalten von TotalResult
         """
+        # lokale Importe: scoring_engine und result_service importieren scoring_service
+        from services.scoring_engine import AnswerRow, score_assessment, bulk_insert_results
+        from services.result_service import store_result_snapshot
+
         assessment = db.session.get(Assessment, assessment_id)
         if not assessment:
             raise ValueError(f"Assessment {assessment_id} nicht gefunden")
 
-        # 1. Lösche alte Ergebnisse (falls vorhanden)
+        compiled = get_compiled_questionnaire(assessment.questionnaire_version_id)
+        answers = [
+            AnswerRow(r.question_id, r.scale_option_id, r.numeric_value, r.is_applicable)
+            for r in db.session.query(
+                Answer.question_id, Answer.scale_option_id, Answer.numeric_value,
+                Answer.is_applicable
+            ).filter(Answer.assessment_id == assessment_id).order_by(Answer.id)
+        ]
+        scored = score_assessment(compiled, assessment_id, answers)
+
+        # 1. Lösche alte Ergebnisse (falls vorhanden) samt Portfolio-Beitrag
+        PortfolioService.retract_assessment(assessment_id)
         DimensionResult.query.filter_by(assessment_id=assessment_id).delete()
         TotalResult.query.filter_by(assessment_id=assessment_id).delete()
         EconomicMetric.query.filter_by(assessment_id=assessment_id).delete()
 
-        # 2. Berechne Dimension-Ergebnisse
-        dimensions = Dimension.query.filter_by(
-            questionnaire_version_id=assessment.questionnaire_version_id
-        ).order_by(Dimension.sort_order).all()
+        # 2. Dimensions-, Gesamtergebnis und Kennzahlen speichern
+        bulk_insert_results([scored])
 
-        for dimension in dimensions:
-            if dimension.calc_method == "economic_score":
-                # Spezielle Behandlung für wirtschaftliche Dimension
-                ScoringService._calculate_economic_dimension(assessment_id, dimension)
-            else:
-             # Für alle anderen Dimensionen (inkl. organisatorisch) beide Automation-Typen berechnen
-                for automation_type in ["RPA", "IPA"]:
-                    ScoringService._calculate_dimension_result(
-                        assessment_id, dimension, automation_type
-                    )
-        # 3. Berechne Gesamt-Ergebnis
-        total_result = ScoringService._calculate_total_result(assessment_id)
+        # 3. Ergebnis-Snapshot und Portfolio-Kennzahlen aktualisieren
+        store_result_snapshot(assessment_id)
+        PortfolioService.add_assessment(assessment_id)
         db.session.commit()
-        return total_result
-
-    @staticmethod
-    def _calculate_dimension_result(assessment_id, dimension, automation_type):
-        """Berechnet das Ergebnis für eine Dimension (inkl. multiple_choice Best-of)"""
-
-        questions = Question.query.filter_by(dimension_id=dimension.id).all()
-        question_ids = [q.id for q in questions]
-
-        answers = Answer.query.filter(
-            Answer.assessment_id == assessment_id,
-            Answer.question_id.in_(question_ids)
-        ).all()
-
-        # Antworten nach question_id gruppieren (wichtig für multiple_choice)
-        answers_by_q = defaultdict(list)
-        for a in answers:
-            answers_by_q[a.question_id].append(a)
-
-        scores = []
-        is_excluded = False
-        excluded_by_question_id = None
-
-        for question in questions:
-            q_answers = answers_by_q.get(question.id, [])
-            if not q_answers:
-                continue
-
-            # SINGLE CHOICE
-            if question.question_type == "single_choice":
-                a = q_answers[0]
-                if not a.scale_option_id:
-                    continue
-
-                option_score = OptionScore.query.filter_by(
-                    question_id=question.id,
-                    scale_option_id=a.scale_option_id,
-                    automation_type=automation_type
-                ).first()
-
-                if not option_score:
-                    continue
-
-                if option_score.is_exclusion:
-                    is_excluded = True
-                    excluded_by_question_id = question.id
-                    break
-
-                if option_score.is_applicable and option_score.score is not None:
-                    scores.append(option_score.score)
-
-            # MULTIPLE CHOICE (Best-of)
-            elif question.question_type == "multiple_choice":
-                option_ids = [a.scale_option_id for a in q_answers if a.scale_option_id]
-                if not option_ids:
-                    continue
-
-                option_scores = OptionScore.query.filter(
-                    OptionScore.question_id == question.id,
-                    OptionScore.automation_type == automation_type,
-                    OptionScore.scale_option_id.in_(option_ids)
-                ).all()
-
-                if not option_scores:
-                    continue
-
-                # Ausschluss schlägt alles
-                if any(os.is_exclusion for os in option_scores):
-                    is_excluded = True
-                    excluded_by_question_id = question.id
-                    break
-
-                # nur anwendbare Scores berücksichtigen
-                applicable = [
-                    os.score for os in option_scores
-                    if os.is_applicable and os.score is not None
-                ]
-
-                if applicable:
-                    scores.append(max(applicable))
-            else:
-                continue
-
-        mean_score = None
-        if not is_excluded and scores:
-            mean_score = sum(scores) / len(scores)
-
-        dim_result = DimensionResult(
-            assessment_id=assessment_id,
-            dimension_id=dimension.id,
-            automation_type=automation_type,
-            mean_score=mean_score,
-            is_excluded=is_excluded,
-            excluded_by_question_id=excluded_by_question_id
-        )
-        db.session.add(dim_result)
+        return scored.total_result
 
     @staticmethod
-    def _calculate_economic_dimension(assessment_id, dimension):
-        """Berechnet Dimension 7 (Wirtschaftlichkeit) + speichert Kennzahlen & Score."""
-
-        assessment = db.session.get(Assessment, assessment_id)
-        if not assessment:
-            raise ValueError(f"Assessment {assessment_id} nicht gefunden")
+    def compute_economic_metrics(values):
+        """
+        Berechnet die Wirtschaftlichkeitskennzahlen aus den Antworten
+        (Fragecode -> Zahlenwert, inkl. 1.6).
 
-        # Antworten aus Dimension 7 laden
-        q7_questions = Question.query.filter_by(dimension_id=dimension.id).all()
-        q7_ids = [q.id for q in q7_questions]
-
-        answers = Answer.query.filter(
-            Answer.assessment_id == assessment_id,
-            Answer.question_id.in_(q7_ids)
-        ).all()
-
-        q_code_by_id = {q.id: q.code for q in q7_questions}
-
-        values = {}
-        for a in answers:
-            if a.numeric_value is None:
-                continue
-            q_code = q_code_by_id.get(a.question_id)
-            if q_code:
-                values[q_code] = a.numeric_value
-
-        # 1.6 separat holen (liegt nicht in Dimension 7)
-        q_1_6 = Question.query.filter_by(
-            questionnaire_version_id=assessment.questionnaire_version_id,
-            code="1.6"
-        ).first()
-        if q_1_6:
-            a_1_6 = Answer.query.filter(
-                Answer.assessment_id == assessment_id,
-                Answer.question_id == q_1_6.id,
-                Answer.numeric_value.isnot(None),
-                Answer.is_applicable.is_(True)
-            ).order_by(Answer.id.desc()).first()
-
-            if not a_1_6:
-                a_1_6 = Answer.query.filter(
-                    Answer.assessment_id == assessment_id,
-                    Answer.question_id == q_1_6.id,
-                    Answer.numeric_value.isnot(None)
-                ).order_by(Answer.id.desc()).first()
-
-            if a_1_6 and a_1_6.numeric_value is not None:
-                values["1.6"] = a_1_6.numeric_value
-
-        required = ["1.6", "7.1", "7.2", "7.3", "7.4", "7.5", "7.6", "7.7"]
+        Returns:
+            (metrics, economic_score, is_excluded) mit metrics als Liste von
+            (key, value, unit) oder None, wenn Werte fehlen
+        """
+        values = dict(values)
+        required = ScoringService.ECONOMIC_INPUT_CODES
         missing = [c for c in required if c not in values]
         if "1.6" in missing:
             values["1.6"] = 1
             missing = [c for c in required if c not in values]
 
         if missing:
-            print(f"Wirtschaftlichkeit: Werte fehlen: {missing} - Keine Berechnung möglich")
-            # Erstelle leere DimensionResults ohne Score
-            for auto in ["RPA", "IPA"]:
-                db.session.add(DimensionResult(
-                    assessment_id=assessment_id,
-                    dimension_id=dimension.id,
-                    automation_type=auto,
-                    mean_score=None,
-                    is_excluded=False,
-                    excluded_by_question_id=None
-                ))
-            return
+            return None
 
         # Inputs
         anzahl_prozesse = max(float(values["1.6"]), 1.0)  # Schutz vor Division durch 0
@@ -254,25 +126,17 @@ class ScoringService:
         gesamtkosten = initiale_fixkosten + variable_kosten_jahr
         roi = (personeller_nutzen - gesamtkosten) / gesamtkosten if gesamtkosten > 0 else 0.0
 
-        # Kennzahlen speichern
-        metrics = [
-            ("roi", roi, "%"),
-            ("personeller_nutzen", personeller_nutzen, "€"),
-            ("fte_einsparung", fte_einsparung, "FTE"),
-            ("initiale_fixkosten", initiale_fixkosten, "€"),
-            ("variable_kosten_jahr", variable_kosten_jahr, "€"),
-            ("haeufigkeit_jahr", haeufigkeit_jahr, "Anzahl"),
-            ("zeitersparnis_h_jahr", zeitersparnis_h, "Stunden"),
-        ]
-        for key, val, unit in metrics:
-            db.session.add(EconomicMetric(
-                assessment_id=assessment_id,
-                automation_type=None,
-                key=key,
-                value=val,
-                unit=unit
-            ))
-
+        # Kennzahlen
+        values = {
+            "roi": roi,
+            "personeller_nutzen": personeller_nutzen,
+            "fte_einsparung": fte_einsparung,
+            "initiale_fixkosten": initiale_fixkosten,
+            "variable_kosten_jahr": variable_kosten_jahr,
+            "haeufigkeit_jahr": haeufigkeit_jahr,
+            "zeitersparnis_h_jahr": zeitersparnis_h,
+        }
+        metrics = [(key, values[key], unit) for key, unit in ScoringService.ECONOMIC_METRICS]
         # ROI -> Score (kein Ausschluss bei negativem ROI)
         if roi < 0:
             economic_score, is_excluded = 1.0, False
@@ -287,64 +151,13 @@ class ScoringService:
         else:
             economic_score, is_excluded = 5.0, False
 
-        # DimensionResult für RPA & IPA (gleich)
-        for auto in ["RPA", "IPA"]:
-            db.session.add(DimensionResult(
-                assessment_id=assessment_id,
-                dimension_id=dimension.id,
-                automation_type=auto,
-                mean_score=economic_score,
-                is_excluded=is_excluded,
-                excluded_by_question_id=None
-            ))
+        return metrics, economic_score, is_excluded
 
     @staticmethod
-    def _calculate_total_result(assessment_id):
-        """Berechnet das Gesamt-Ergebnis (nur Dimensionen 2-6 werden gemittelt)"""
-        # Hole alle Dimension-Ergebnisse
-        dim_results_rpa = DimensionResult.query.filter_by(
-            assessment_id=assessment_id,
-            automation_type="RPA"
-        ).all()
-        dim_results_ipa = DimensionResult.query.filter_by(
-            assessment_id=assessment_id,
-            automation_type="IPA"
-        ).all()
-
-        # Nur Dimensionen 2-6 berücksichtigen
-        dim_ids_2_6 = [d.id for d in Dimension.query.filter
-                       (Dimension.code.in_(["2","3","4","5","6"])).all()]
-
-        rpa_excluded = any(dr.is_excluded and dr.excluded_by_question_id is not None
-                            and dr.dimension_id in dim_ids_2_6 for dr in dim_results_rpa)
-        rpa_scores = [dr.mean_score for dr in dim_results_rpa
-                      if not dr.is_excluded and dr.mean_score is not None and
-                        dr.dimension_id in dim_ids_2_6]
-        total_rpa = sum(rpa_scores) / len(rpa_scores) if rpa_scores else None
-
-        ipa_excluded = any(dr.is_excluded and dr.excluded_by_question_id is not None
-                            and dr.dimension_id in dim_ids_2_6 for dr in dim_results_ipa)
-        ipa_scores = [dr.mean_score for dr in dim_results_ipa
-                      if not dr.is_excluded and dr.mean_score is not None and
-                        dr.dimension_id in dim_ids_2_6]
-        total_ipa = sum(ipa_scores) / len(ipa_scores) if ipa_scores else None
-
-        # Empfehlung bestimmen
-        recommendation = ScoringService._determine_recommendation(
-            total_rpa, total_ipa, rpa_excluded, ipa_excluded
-        )
-
-        # Speichere Gesamt-Ergebnis
-        total_result = TotalResult(
-            assessment_id=assessment_id,
-            total_rpa=total_rpa,
-            total_ipa=total_ipa,
-            rpa_excluded=rpa_excluded,
-            ipa_excluded=ipa_excluded,
-            recommendation=recommendation
-        )
-        db.session.add(total_result)
-        return total_result
+    def combined_score(total_rpa, total_ipa):
+        """Höherer der beiden Gesamtscores (0, wenn keiner vorliegt)"""
+        scores = [s for s in (total_rpa, total_ipa) if s]
+        return max(scores) if scores else 0
 
     @staticmethod
     def _determine_recommendation(total_rpa, total_ipa, rpa_excluded, ipa_excluded):
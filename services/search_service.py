@@ -0,0 +1,115 @@
+"""
+Volltextsuche über Prozesse (SQLite FTS5)
+Die virtuelle Tabelle process_search indiziert name, description und industry
+der Tabelle process (external content) und wird per Trigger synchron gehalten.
+Jeder Suchbegriff wird als Präfix gesucht, sortiert wird nach bm25.
+"""
+import re
+
+from sqlalchemy import column, select, table, text
+
+from extensions import db
+
+MAX_RESULTS = 20
+MAX_TERMS = 8
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Gewichtung der Spalten im Ranking: name, description, industry
+RANK_FUNCTION = "bm25(10.0, 1.0, 5.0)"
+
+PROCESS_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE process_search USING fts5(
+        name, description, industry,
+        content='process', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS process_search_ai AFTER INSERT ON process BEGIN
+        INSERT INTO process_search(rowid, name, description, industry)
+        VALUES (new.id, new.name, new.description, new.industry);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS process_search_ad AFTER DELETE ON process BEGIN
+        INSERT INTO process_search(process_search, rowid, name, description, industry)
+        VALUES ('delete', old.id, old.name, old.description, old.industry);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS process_search_au AFTER UPDATE ON process BEGIN
+        INSERT INTO process_search(process_search, rowid, name, description, industry)
+        VALUES ('delete', old.id, old.name, old.description, old.industry);
+        INSERT INTO process_search(rowid, name, description, industry)
+        VALUES (new.id, new.name, new.description, new.industry);
+    END
+    """,
+    f"INSERT INTO process_search(process_search, rank) VALUES ('rank', '{RANK_FUNCTION}')",
+    "INSERT INTO process_search(process_search) VALUES ('rebuild')",
+)
+
+process_search = table("process_search", column("rowid"), column("rank"))
+
+_available = None
+
+
+def search_available():
+    """True, wenn der Suchindex existiert (SQLite mit FTS5)"""
+    global _available
+    if _available is None:
+        _available = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='process_search'"
+        )).first() is not None
+    return _available
+
+
+def build_match_query(query_text):
+    """
+    Übersetzt eine Benutzereingabe in eine FTS5-Abfrage: jedes Wort als
+    Präfix, alle Wörter müssen vorkommen. Sonderzeichen werden ignoriert.
+
+    Returns:
+        MATCH-Ausdruck oder None, wenn die Eingabe keine Wörter enthält
+    """
+    tokens = TOKEN_RE.findall(query_text or "")[:MAX_TERMS]
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def matching_process_ids(match_query):
+    """Subquery der Prozess-IDs zu einem MATCH-Ausdruck (z. B. für IN-Filter)"""
+    return select(process_search.c.rowid).where(
+        text("process_search MATCH :match_query").bindparams(match_query=match_query)
+    )
+
+
+def search_processes(query_text, limit=MAX_RESULTS):
+    """
+    Sucht Prozesse und liefert deren Assessments in Ranking-Reihenfolge.
+
+    Returns:
+        Liste von dicts mit process_id, name, industry, assessment_id,
+        created_at, total_rpa, total_ipa, recommendation
+    """
+    match_query = build_match_query(query_text)
+    if match_query is None or not search_available():
+        return []
+
+    # Ranking und LIMIT direkt auf der FTS-Tabelle, danach erst der Join
+    rows = db.session.execute(text("""
+        SELECT p.id AS process_id, p.name, p.industry,
+               a.id AS assessment_id, a.created_at,
+               t.total_rpa, t.total_ipa, t.recommendation
+        FROM (
+            SELECT rowid, rank FROM process_search
+            WHERE process_search MATCH :match_query
+            ORDER BY rank LIMIT :limit
+        ) AS hit
+        JOIN process p ON p.id = hit.rowid
+        JOIN assessment a ON a.process_id = p.id
+        LEFT JOIN total_result t ON t.assessment_id = a.id
+        ORDER BY hit.rank, a.id DESC
+    """), {"match_query": match_query, "limit": limit})
+    return [dict(row._mapping) for row in rows]
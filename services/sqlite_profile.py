@@ -0,0 +1,137 @@
+"""
+SQLite-Engine-Profil: PRAGMAs je Verbindung und periodischer WAL-Checkpoint
+
+Im Profil 'wal' schreibt SQLite Änderungen zuerst in ein Write-Ahead-Log.
+Schreibende Transaktionen (z. B. /evaluate) blockieren damit keine lesenden
+Anfragen mehr, und gleichzeitige Schreiber warten per busy_timeout auf die
+Sperre, statt mit "database is locked" abzubrechen. SQLite schreibt das WAL
+selbst zurück (wal_autocheckpoint); bei dauerhaft aktiven Lesern gelingt das
+nicht immer vollständig, deshalb schreibt WalCheckpointer es zusätzlich in
+festen Abständen zurück.
+"""
+import threading
+import time
+import traceback
+
+from sqlalchemy import event
+
+# Gelten in jedem Profil: Fremdschlüssel prüfen und ON DELETE CASCADE ausführen
+# (SQLite schaltet das je Verbindung standardmäßig ab)
+BASE_PRAGMAS = {"foreign_keys": "ON"}
+SQLITE_PROFILES = {
+    # SQLite-Standard: Rollback-Journal, ein Schreiber sperrt alle Leser
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negativ: Größe in KiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+# Betreffen nur Schreibvorgänge (journal_mode lässt sich schreibgeschützt nicht setzen)
+WRITE_PRAGMAS = ("journal_mode", "synchronous")
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+
+def profile_pragmas(config):
+    """
+    BASE_PRAGMAS und PRAGMAs des Profils SQLITE_PROFILE, ergänzt bzw.
+    überschrieben durch SQLITE_PRAGMAS (z. B. {"mmap_size": 0}).
+
+    Raises:
+        ValueError: bei unbekanntem Profil
+    """
+    name = config.get("SQLITE_PROFILE", "wal")
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Unbekanntes SQLite-Profil '{name}' (erlaubt: {', '.join(SQLITE_PROFILES)})")
+    return {**BASE_PRAGMAS, **SQLITE_PROFILES[name], **config.get("SQLITE_PRAGMAS", {})}
+
+
+def read_only_pragmas(pragmas):
+    """PRAGMAs für schreibgeschützte Verbindungen (Lese-Engine)"""
+    return {name: value for name, value in pragmas.items() if name not in WRITE_PRAGMAS}
+
+
+def uses_wal(pragmas):
+    return str(pragmas.get("journal_mode", "")).upper() == "WAL"
+
+
+def configure_sqlite_engine(engine, pragmas):
+    """Setzt die PRAGMAs bei jeder neuen Verbindung der Engine (nur SQLite)"""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def checkpoint_wal(engine, mode="PASSIVE"):
+    """
+    Schreibt das WAL in die Datenbankdatei zurück. PASSIVE wartet auf keine
+    Leser oder Schreiber; TRUNCATE wartet (busy_timeout) und leert die WAL-Datei.
+
+    Returns:
+        (busy, wal_pages, checkpointed_pages); ohne WAL (0, -1, -1)
+    """
+    mode = mode.upper()
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Unbekannter Checkpoint-Modus '{mode}' (erlaubt: {', '.join(CHECKPOINT_MODES)})")
+    with engine.connect() as connection:
+        row = connection.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").first()
+    return tuple(row)
+
+
+class WalCheckpointer:
+    """Führt im WAL-Betrieb alle SQLITE_CHECKPOINT_INTERVAL Sekunden einen
+    PASSIVE-Checkpoint in einem Hintergrund-Thread aus.
+
+    Der Thread startet erst mit der ersten Anfrage bzw. per start(), damit beim
+    Import (bzw. vor einem Fork) keine Threads entstehen.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.app = None
+        self.db = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        """Registriert die Standardkonfiguration und den Start beim ersten Request"""
+        app.config.setdefault('SQLITE_CHECKPOINT_INTERVAL', 60)
+        self.app = app
+        self.db = db
+        app.before_request(self.start)
+
+    @property
+    def enabled(self):
+        return (self.app is not None and self.app.config['SQLITE_CHECKPOINT_INTERVAL'] > 0
+                and uses_wal(profile_pragmas(self.app.config)))
+
+    def start(self):
+        if self._thread is not None or not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='wal-checkpoint',
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.app.config['SQLITE_CHECKPOINT_INTERVAL'])
+            try:
+                with self.app.app_context():
+                    checkpoint_wal(self.db.engine)
+            except Exception:
+                traceback.print_exc()
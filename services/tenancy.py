@@ -0,0 +1,216 @@
+"""
+Mandantenbetrieb: eine SQLite-Datei je Kunde
+Mit TENANT_MODE ('subdomain', 'header' oder 'path') wird jede Anfrage einem
+Mandanten zugeordnet (g.tenant) und arbeitet auf TENANT_DIR/<mandant>.db.
+Große Mandanten sperren so nur ihre eigene Datei, gemeinsame Dimensionen
+(shared_dimension_answer) gelten je Mandant.
+
+    subdomain  acme.automationfit.example   (TENANT_BASE_DOMAIN=automationfit.example)
+    header     X-Tenant: acme               (TENANT_HEADER)
+    path       /t/acme/compare              (Präfix wird Teil von SCRIPT_NAME, url_for
+                                             erzeugt Links innerhalb des Mandanten)
+
+Engines werden bei Bedarf angelegt und in einem LRU-Cache gehalten
+(TENANT_ENGINE_CACHE_SIZE Engines mit je höchstens TENANT_POOL_SIZE
+Verbindungen); die am längsten unbenutzte wird verworfen, ihre Dateien
+geschlossen. Anfragen sind nur für eingerichtete Mandanten erlaubt (in TENANTS
+konfiguriert oder Datei vorhanden), alle anderen erhalten 404 – ein frei
+gewählter Host oder Header legt so keine neue Datei an. Die erste Anfrage
+eines konfigurierten Mandanten legt seine Datenbank per Migrationen an (inkl.
+Seed-Daten). Außerhalb von Anfragen (CLI, Worker) wählt bind_process_tenant
+den Mandanten für alle App-Kontexte des Prozesses und richtet ihn bei Bedarf ein.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from flask import appcontext_pushed, g
+from sqlalchemy import create_engine
+
+from services.sqlite_profile import configure_sqlite_engine, profile_pragmas
+
+TENANT_MODES = ("off", "subdomain", "header", "path")
+TENANT_PATH_PREFIX = "/t/"
+# Roh-Angabe des Mandanten aus TenantMiddleware (vor der Prüfung)
+TENANT_ENVIRON_KEY = "automationfit.tenant"
+TENANT_NAME = re.compile(r"[a-z0-9][a-z0-9_-]{0,62}")
+
+
+def validate_tenant(name):
+    """
+    Prüft einen Mandantennamen (wird Teil des Dateinamens)
+
+    Raises:
+        ValueError: bei fehlendem oder ungültigem Namen
+    """
+    if not name:
+        raise ValueError("Kein Mandant angegeben")
+    name = name.lower()
+    if not TENANT_NAME.fullmatch(name):
+        raise ValueError(f"Ungültiger Mandant '{name}' (erlaubt: a-z, 0-9, - und _)")
+    return name
+
+
+class TenantMiddleware:
+    """
+    WSGI-Middleware: liest den Mandanten aus Host, Header oder Pfad
+    (environ[TENANT_ENVIRON_KEY]); im Modus 'path' wird /t/<mandant> an
+    SCRIPT_NAME angehängt und aus PATH_INFO entfernt.
+    """
+
+    def __init__(self, wsgi_app, config):
+        self.wsgi_app = wsgi_app
+        self.config = config
+
+    def __call__(self, environ, start_response):
+        mode = self.config["TENANT_MODE"]
+        if mode == "subdomain":
+            environ[TENANT_ENVIRON_KEY] = self._from_host(environ)
+        elif mode == "header":
+            key = "HTTP_" + self.config["TENANT_HEADER"].upper().replace("-", "_")
+            environ[TENANT_ENVIRON_KEY] = environ.get(key)
+        elif mode == "path":
+            path = environ.get("PATH_INFO", "")
+            if path.startswith(TENANT_PATH_PREFIX):
+                tenant, _, rest = path[len(TENANT_PATH_PREFIX):].partition("/")
+                environ[TENANT_ENVIRON_KEY] = tenant
+                environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + TENANT_PATH_PREFIX + tenant
+                environ["PATH_INFO"] = "/" + rest
+        return self.wsgi_app(environ, start_response)
+
+    def _from_host(self, environ):
+        base = (self.config.get("TENANT_BASE_DOMAIN") or "").lower()
+        host = environ.get("HTTP_HOST", "").split(":", 1)[0].lower()
+        if base and host.endswith("." + base):
+            return host[:-len(base) - 1]
+        return None
+
+
+class TenantEngines:
+    """LRU-Cache der Engines je Mandant (thread-sicher, begrenzte Dateizugriffe)"""
+
+    def __init__(self, app=None, initializer=None):
+        self.app = None
+        self.initializer = initializer
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready = set()
+        self._init_locks = {}
+        self._evict_callbacks = []
+        if app is not None:
+            self.init_app(app, initializer)
+
+    def init_app(self, app, initializer=None):
+        """Registriert die Standardkonfiguration an der Flask-App"""
+        app.config.setdefault("TENANT_MODE", "off")
+        app.config.setdefault("TENANT_HEADER", "X-Tenant")
+        app.config.setdefault("TENANT_BASE_DOMAIN", None)
+        app.config.setdefault("TENANT_DIR", os.path.join(app.root_path, "data", "tenants"))
+        app.config.setdefault("TENANT_ENGINE_CACHE_SIZE", 16)
+        app.config.setdefault("TENANT_POOL_SIZE", 4)
+        app.config.setdefault("TENANTS", ())
+        if app.config["TENANT_MODE"] not in TENANT_MODES:
+            raise ValueError(f"Unbekannter TENANT_MODE '{app.config['TENANT_MODE']}' "
+                             f"(erlaubt: {', '.join(TENANT_MODES)})")
+        app.config["TENANTS"] = frozenset(validate_tenant(name) for name in app.config["TENANTS"])
+        if initializer is not None:
+            self.initializer = initializer
+        self.app = app
+        app.extensions["tenant_engines"] = self
+        app.wsgi_app = TenantMiddleware(app.wsgi_app, app.config)
+
+    @property
+    def enabled(self):
+        return self.app is not None and self.app.config["TENANT_MODE"] != "off"
+
+    def on_evict(self, callback):
+        """callback(tenant) läuft, nachdem die Engine eines Mandanten verworfen wurde"""
+        self._evict_callbacks.append(callback)
+        return callback
+
+    def database_path(self, tenant):
+        return os.path.join(self.app.config["TENANT_DIR"], f"{tenant}.db")
+
+    def is_provisioned(self, tenant):
+        """Mandant ist eingerichtet: in TENANTS konfiguriert oder seine Datei existiert"""
+        return (tenant in self._ready or tenant in self.app.config["TENANTS"]
+                or os.path.exists(self.database_path(tenant)))
+
+    def get_engine(self, tenant):
+        """Engine des Mandanten (legt sie bei Bedarf an, verdrängt die älteste)"""
+        evicted = []
+        with self._lock:
+            engine = self._engines.get(tenant)
+            if engine is not None:
+                self._engines.move_to_end(tenant)
+                return engine
+            engine = self._create_engine(tenant)
+            self._engines[tenant] = engine
+            while len(self._engines) > self.app.config["TENANT_ENGINE_CACHE_SIZE"]:
+                evicted.append(self._engines.popitem(last=False))
+        for name, old_engine in evicted:
+            # Laufende App-Kontexte halten ihre Engine (g.tenant_engine) weiter; deren
+            # Verbindungen werden geschlossen, sobald die Engine nicht mehr referenziert ist
+            old_engine.dispose()
+            for callback in self._evict_callbacks:
+                callback(name)
+        return engine
+
+    def _create_engine(self, tenant):
+        os.makedirs(self.app.config["TENANT_DIR"], exist_ok=True)
+        engine = create_engine(
+            f"sqlite:///{self.database_path(tenant)}",
+            pool_size=self.app.config["TENANT_POOL_SIZE"], max_overflow=0,
+        )
+        configure_sqlite_engine(engine, profile_pragmas(self.app.config))
+        return engine
+
+    def ensure_ready(self, tenant):
+        """
+        Bringt die Datenbank des Mandanten einmal je Prozess auf den aktuellen
+        Stand (initializer im App-Kontext mit g.tenant, z. B. Migrationen und Seed).
+        """
+        if tenant in self._ready:
+            return
+        with self._lock:
+            init_lock = self._init_locks.setdefault(tenant, threading.Lock())
+        with init_lock:
+            if tenant in self._ready:
+                return
+            if self.initializer is not None:
+                self.initializer()
+            self._ready.add(tenant)
+        with self._lock:
+            # Wartende Threads halten das Lock selbst; danach genügt _ready
+            self._init_locks.pop(tenant, None)
+
+    def open_engines(self):
+        """Mandanten mit geöffneter Engine (älteste zuerst)"""
+        with self._lock:
+            return list(self._engines)
+
+    def dispose(self):
+        """Schließt alle Engines (z. B. in Tests oder beim Herunterfahren)"""
+        with self._lock:
+            engines, self._engines = self._engines, OrderedDict()
+        for engine in engines.values():
+            engine.dispose()
+
+
+def bind_process_tenant(app, tenant):
+    """
+    Setzt g.tenant in jedem App-Kontext dieses Prozesses (CLI, Worker)
+
+    Raises:
+        ValueError: bei ungültigem Namen oder ohne TENANT_MODE
+    """
+    tenant = validate_tenant(tenant)
+    if app.config["TENANT_MODE"] == "off":
+        raise ValueError("Mandanten sind abgeschaltet (TENANT_MODE=off)")
+
+    def set_tenant(sender, **kwargs):
+        g.tenant = tenant
+
+    appcontext_pushed.connect(set_tenant, app, weak=False)
+    return tenant
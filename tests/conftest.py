@@ -0,0 +1,112 @@
+"""
+Gemeinsame Fixtures: die App läuft gegen eine eigene SQLite-Datei je Testlauf
+(Schema und Fragebogen über die regulären Migrationen).
+"""
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.datastructures import MultiDict
+
+# Vor dem Import von main setzen: main liest die Konfiguration beim Import
+TEST_DIR = tempfile.mkdtemp(prefix="automationfit-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["QUESTIONNAIRE_SNAPSHOT_DIR"] = TEST_DIR
+os.environ["SCORING_MODE"] = "sync"
+os.environ["TENANT_MODE"] = "off"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app, init_database
+    app.config["TESTING"] = True
+    init_database()
+    yield app
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries():
+    """Zählt alle SQL-Statements (alle Engines) innerhalb des with-Blocks"""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+    return counter
+
+
+def _answer_form(app, name="Testprozess", option_index=0, industry="Handel"):
+    """Formular mit allen Fragen beantwortet (Auswahl je Frage über option_index)"""
+    from services.questionnaire_cache import get_active_questionnaire
+    with app.app_context():
+        compiled = get_active_questionnaire()
+    form = MultiDict([("uc_name", name), ("uc_desc", "Test"), ("industry", industry)])
+    for question in compiled.questions:
+        options = compiled.options_for(question)
+        if question.question_type == "number":
+            form.add(f"q_{question.id}", "100")
+        elif question.question_type == "multiple_choice" and options:
+            form.add(f"q_{question.id}[]", str(options[0].id))
+        elif options:
+            form.add(f"q_{question.id}", str(options[option_index % len(options)].id))
+    return form
+
+
+def _assessment_factory(app, client):
+    def create(name="Testprozess", option_index=0, industry="Handel"):
+        response = client.post("/evaluate", data=_answer_form(app, name, option_index, industry))
+        assert response.status_code == 302, response.data[:500]
+        return int(response.headers["Location"].rstrip("/").split("/")[-1])
+    return create
+
+
+@pytest.fixture
+def answer_form(app):
+    """Baut Formulardaten wie create_assessment (z. B. für /assessment/<id>/update)"""
+    return lambda **kwargs: _answer_form(app, **kwargs)
+
+
+@pytest.fixture
+def create_assessment(app, client):
+    """Legt über /evaluate ein vollständig beantwortetes Assessment an und liefert die ID"""
+    return _assessment_factory(app, client)
+
+
+@pytest.fixture(scope="module")
+def create_assessment_module(app):
+    """Wie create_assessment, für Testdaten mehrerer Tests eines Moduls"""
+    return _assessment_factory(app, app.test_client())
+
+
+@pytest.fixture
+def empty_database(app, tmp_path, monkeypatch):
+    """
+    App-Kontext auf einer leeren SQLite-Datei: db.session läuft über die
+    Mandanten-Engine (g.tenant), die übrigen Tests bleiben unberührt.
+    """
+    from flask import g
+    tenant_engines = app.extensions["tenant_engines"]
+    monkeypatch.setitem(app.config, "TENANT_DIR", str(tmp_path))
+    with app.app_context():
+        g.tenant = f"empty-{tmp_path.name}".lower()[:60]
+        yield tenant_engines.database_path(g.tenant)
+    tenant_engines.dispose()
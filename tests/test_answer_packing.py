@@ -0,0 +1,109 @@
+"""Gepackte Antworten: Round-Trip, stabile IDs, ältere Blöcke und verständliche Fehler"""
+import struct
+import zlib
+
+import pytest
+
+from extensions import db
+from models.database import AnswerArchive
+from services.answer_packing import (
+    ENTRY, HEADER, INDEXED_ENTRY, INDEXED_HEADER, PackedAnswersError, pack_answers,
+    packing_layout, unpack_answers
+)
+from services.archive_service import decode_answers, pack_assessment, repack_archive
+from services.questionnaire_cache import get_active_questionnaire
+from services.result_service import delete_result_snapshot
+from services.scoring_engine import AnswerRow
+
+
+def _rows(compiled):
+    """Antworten auf alle Fragen: zwei Optionen bei Mehrfachauswahl, Zahlenwerte, nicht anwendbar"""
+    rows = []
+    for position, question in enumerate(compiled.questions):
+        options = compiled.options_for(question)
+        if question.question_type == "number" or not options:
+            rows.append(AnswerRow(question.id, None, 1234.5, True))
+        elif question.question_type == "multiple_choice":
+            rows += [AnswerRow(question.id, option.id, None, True) for option in options[:2]]
+        else:
+            rows.append(AnswerRow(question.id, options[position % len(options)].id, None,
+                                  position % 5 != 0))
+    return rows
+
+
+def _indexed_block(compiled, rows, checksum=None):
+    """Block im Archivformat 2 (Positionen im Fragebogen, wie vor Format 3 geschrieben)"""
+    layout = packing_layout(compiled)
+    entries = {}
+    for row in rows:
+        index = layout.index_by_question[row.question_id]
+        mask, flags, value = entries.get(index, (0, 0, 0.0))
+        if row.scale_option_id is not None:
+            mask |= 1 << layout.bit_by_option[(row.question_id, row.scale_option_id)]
+        if row.numeric_value is not None:
+            flags, value = flags | 2, row.numeric_value
+        entries[index] = (mask, flags | row.is_applicable, value)
+    data = INDEXED_HEADER.pack(layout.checksum if checksum is None else checksum) + b"".join(
+        INDEXED_ENTRY.pack(index, flags, mask, value)
+        for index, (mask, flags, value) in sorted(entries.items()))
+    return zlib.compress(data)
+
+
+def test_round_trip(app):
+    with app.app_context():
+        compiled = get_active_questionnaire()
+    rows = _rows(compiled)
+    assert unpack_answers(pack_answers(compiled, rows)) == rows
+    assert decode_answers(compiled, 2, _indexed_block(compiled, rows)) == rows
+    with pytest.raises(ValueError, match="gehört nicht"):
+        pack_answers(compiled, [AnswerRow(-1, None, None, True)])
+
+
+def test_block_stores_ids_not_positions(app):
+    with app.app_context():
+        compiled = get_active_questionnaire()
+    rows = _rows(compiled)
+    data = zlib.decompress(pack_answers(compiled, rows))
+    (count,) = HEADER.unpack_from(data)
+    offset = HEADER.size + count * ENTRY.size
+    option_ids = struct.unpack_from(f"<{(len(data) - offset) // 4}I", data, offset)
+    assert count == len(compiled.questions)
+    assert list(option_ids) == [r.scale_option_id for r in rows if r.scale_option_id]
+
+
+def test_repack_converts_indexed_blocks(app, create_assessment):
+    assessment_id = create_assessment("Packtest Format 2")
+    with app.app_context():
+        compiled = get_active_questionnaire()
+        pack_assessment(assessment_id)
+        archive = db.session.get(AnswerArchive, assessment_id)
+        rows = unpack_answers(archive.payload)
+        archive.format_version, archive.payload = 2, _indexed_block(compiled, rows)
+        db.session.commit()
+
+        assert repack_archive() >= 1
+        db.session.commit()
+        archive = db.session.get(AnswerArchive, assessment_id)
+        assert archive.format_version == 3
+        assert unpack_answers(archive.payload) == rows
+
+
+def test_unreadable_indexed_block_gives_clear_error(app, client, create_assessment):
+    assessment_id = create_assessment("Packtest geänderter Fragebogen")
+    with app.app_context():
+        compiled = get_active_questionnaire()
+        pack_assessment(assessment_id)
+        archive = db.session.get(AnswerArchive, assessment_id)
+        stale = _indexed_block(compiled, unpack_answers(archive.payload), checksum=1)
+        archive.format_version, archive.payload = 2, stale
+        delete_result_snapshot(assessment_id)
+        db.session.commit()
+        with pytest.raises(PackedAnswersError):
+            decode_answers(compiled, 2, stale)
+        assert repack_archive() == 0  # bleibt unverändert statt die Migration abzubrechen
+
+    for url in (f"/assessment/{assessment_id}", f"/assessment/{assessment_id}/edit"):
+        response = client.get(url)
+        assert response.status_code == 409
+        assert "archivierten Antworten" in response.get_data(as_text=True)
+    client.post(f"/assessment/{assessment_id}/delete")
@@ -0,0 +1,63 @@
+"""Vergleichsübersicht: Filter, Sortierung und Seiten aus der Datenbank"""
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from models.database import Assessment, Process, TotalResult
+from services.comparison_service import build_comparison_query, parse_comparison_args
+
+INDUSTRY = "Vergleichstest"
+
+
+@pytest.fixture(scope="module")
+def assessment_ids(create_assessment_module):
+    return [create_assessment_module(f"Vergleich {i}", option_index=i, industry=INDUSTRY)
+            for i in range(7)]
+
+
+def _params(**args):
+    return parse_comparison_args(MultiDict({"industry": INDUSTRY, **args}))
+
+
+def _expected(key, reverse, keep=lambda row: True):
+    """Dieselbe Auswahl und Reihenfolge, in Python bestimmt"""
+    rows = [row for row in TotalResult.query.join(
+        Assessment, TotalResult.assessment_id == Assessment.id
+    ).join(Process, Assessment.process_id == Process.id).filter(
+        Process.industry == INDUSTRY
+    ) if keep(row)]
+    rows.sort(key=lambda row: (key(row), row.assessment_id), reverse=reverse)
+    return [row.assessment_id for row in rows]
+
+
+def test_pages_follow_database_sort(app, assessment_ids):
+    with app.app_context():
+        params = _params(sort="score", dir="desc")
+        ids = []
+        for page in (1, 2, 3):
+            pagination = build_comparison_query(params).paginate(
+                page=page, per_page=3, error_out=False)
+            ids.extend(row.id for row in pagination.items)
+        assert pagination.total == len(assessment_ids)
+        assert ids == _expected(lambda row: (row.combined_score is not None,
+                                             row.combined_score or 0), reverse=True)
+
+
+def test_filters_and_ascending_date_sort(app, assessment_ids):
+    with app.app_context():
+        scores = sorted(TotalResult.query.filter(
+            TotalResult.assessment_id.in_(assessment_ids)).with_entities(
+            TotalResult.combined_score))
+        threshold = scores[len(scores) // 2][0]
+        params = _params(sort="date", dir="asc", min_score=str(threshold))
+        ids = [row.id for row in build_comparison_query(params)]
+        assert ids == _expected(
+            lambda row: row.assessment_id, reverse=False,
+            keep=lambda row: row.combined_score is not None and row.combined_score >= threshold)
+        assert 0 < len(ids) < len(assessment_ids)
+
+
+def test_comparison_route_renders_filtered_page(client, assessment_ids):
+    response = client.get(f"/comparison?industry={INDUSTRY}&sort=rpa&per_page=25")
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert all(f"Vergleich {i}" in page for i in range(7))
@@ -0,0 +1,49 @@
+"""Vergleichsmatrix: die Pivot-Abfrage entspricht den Ergebnissen je Assessment"""
+from models.database import Dimension, DimensionResult, EconomicMetric, TotalResult
+from services.archive_service import pack_assessment
+from services.comparison_service import build_comparison_matrix
+
+
+def _expected(assessment_id):
+    total = TotalResult.query.filter_by(assessment_id=assessment_id).one()
+    dimensions = {
+        (code, r.automation_type): (r.mean_score, bool(r.is_excluded))
+        for r, code in DimensionResult.query.join(
+            Dimension, DimensionResult.dimension_id == Dimension.id
+        ).filter(DimensionResult.assessment_id == assessment_id).with_entities(
+            DimensionResult, Dimension.code)
+    }
+    economic = {m.key: m.value for m in EconomicMetric.query.filter_by(assessment_id=assessment_id)}
+    return total, dimensions, economic
+
+
+def test_matrix_matches_per_assessment_results(app, create_assessment):
+    ids = [create_assessment(f"Matrix {i}", option_index=i) for i in range(3)]
+    requested = [ids[2], 999999, ids[0], ids[1]]
+    with app.app_context():
+        matrix = build_comparison_matrix(requested)
+        assert [a["id"] for a in matrix["assessments"]] == [ids[2], ids[0], ids[1]]
+        assert matrix["dimensions"] and matrix["economic_metrics"]
+
+        for column, assessment in enumerate(matrix["assessments"]):
+            total, dimensions, economic = _expected(assessment["id"])
+            assert (assessment["total_rpa"], assessment["total_ipa"],
+                    assessment["recommendation"]) == (total.total_rpa, total.total_ipa,
+                                                      total.recommendation)
+            for dimension in matrix["dimensions"]:
+                for automation_type, cell in dimension["cells"][column].items():
+                    expected = dimensions.get((dimension["code"], automation_type), (None, False))
+                    assert (cell["score"], cell["excluded"]) == expected
+            assert {m["key"]: m["values"][column] for m in matrix["economic_metrics"]
+                    if m["values"][column] is not None} == economic
+
+        for cells in matrix["totals"].values():
+            scores = [c["score"] for c in cells if c["score"] is not None and not c["excluded"]]
+            assert [c["best"] for c in cells] == [
+                len(scores) > 1 and not c["excluded"] and c["score"] == max(scores)
+                for c in cells]
+
+        # Gepackte Antworten erscheinen unverändert in den Antwortunterschieden
+        pack_assessment(ids[0])
+        assert build_comparison_matrix(requested)["answers"] == matrix["answers"]
+        assert any(row["differs"] for row in matrix["answers"])
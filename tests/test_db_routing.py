@@ -0,0 +1,60 @@
+"""Lese-/Schreib-Routing: @read_only-Routen lesen über die schreibgeschützte Engine"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from services.db_routing import READ_BIND_KEY, read_bind_options
+
+
+def test_read_bind_options():
+    options = read_bind_options("sqlite:////srv/data/app db.db", pool_size=3)
+    assert options == {"url": "sqlite:///file:/srv/data/app%20db.db?mode=ro&uri=true",
+                       "pool_size": 3}
+    assert read_bind_options("sqlite://") is None
+    assert read_bind_options("postgresql://db/app") is None
+    assert read_bind_options("postgresql://db/app", "postgresql://replica/app")["url"] == \
+        "postgresql://replica/app"
+
+
+@contextmanager
+def _statements_by_engine(app):
+    with app.app_context():
+        engines = {"primary": db.engine, "read": db.engines[READ_BIND_KEY]}
+    statements = {name: [] for name in engines}
+    listeners = {}
+    for name, engine in engines.items():
+        def listener(conn, cursor, statement, parameters, context, executemany, name=name):
+            statements[name].append(statement)
+        listeners[name] = listener
+        event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        for name, engine in engines.items():
+            event.remove(engine, "before_cursor_execute", listeners[name])
+
+
+def test_read_only_route_reads_through_read_engine(app, client, create_assessment):
+    assessment_id = create_assessment()
+    client.get(f"/assessment/{assessment_id}")  # Snapshot vorhanden
+    with _statements_by_engine(app) as statements:
+        assert client.get(f"/assessment/{assessment_id}").status_code == 200
+    assert statements["read"] and not statements["primary"]
+
+
+def test_writing_route_uses_primary_engine(app, client, create_assessment):
+    assessment_id = create_assessment()
+    with _statements_by_engine(app) as statements:
+        response = client.post(f"/assessment/{assessment_id}/delete")
+    assert response.status_code == 302
+    assert any(s.startswith("DELETE") for s in statements["primary"])
+    assert not statements["read"]
+
+
+def test_read_engine_rejects_writes(app):
+    with app.app_context(), db.engines[READ_BIND_KEY].connect() as connection:
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.exec_driver_sql("DELETE FROM process WHERE id = -1")
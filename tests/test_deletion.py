@@ -0,0 +1,52 @@
+"""Löschen: abhängige Zeilen verschwinden per ON DELETE CASCADE"""
+from extensions import db
+from models.database import ScoringJob
+from services.archive_service import pack_assessment
+
+DEPENDENT_TABLES = ("answer", "answer_archive", "dimension_result", "total_result",
+                    "economic_metric", "result_snapshot", "scoring_job")
+
+
+def _dependent_rows(app, assessment_id):
+    with app.app_context():
+        connection = db.session.connection()
+        return {table: connection.exec_driver_sql(
+            f"SELECT COUNT(*) FROM {table} WHERE assessment_id = ?", (assessment_id,)
+        ).scalar() for table in DEPENDENT_TABLES}
+
+
+def _prepare(app, client, create_assessment, name, packed=False):
+    assessment_id = create_assessment(name)
+    assert client.get(f"/assessment/{assessment_id}").status_code == 200  # Snapshot
+    with app.app_context():
+        db.session.add(ScoringJob(assessment_id=assessment_id, status="done"))
+        db.session.commit()
+        if packed:
+            pack_assessment(assessment_id)
+    return assessment_id
+
+
+def test_delete_cascades_to_dependent_rows(app, client, create_assessment):
+    kept = _prepare(app, client, create_assessment, "Löschtest bleibt")
+    deleted = [_prepare(app, client, create_assessment, "Löschtest weg"),
+               _prepare(app, client, create_assessment, "Löschtest gepackt", packed=True)]
+    before = [_dependent_rows(app, assessment_id) for assessment_id in deleted]
+    assert before[0]["answer"] and before[1]["answer_archive"] and not before[1]["answer"]
+    assert all(rows[table] for rows in before
+               for table in ("dimension_result", "total_result", "result_snapshot", "scoring_job"))
+    kept_rows = _dependent_rows(app, kept)
+
+    response = client.post("/assessments/delete", data={"ids": ",".join(map(str, deleted))})
+    assert response.get_json() == {"success": True, "assessments": 2, "processes": 2,
+                                   "dry_run": False}
+    for assessment_id in deleted:
+        assert not any(_dependent_rows(app, assessment_id).values())
+    assert _dependent_rows(app, kept) == kept_rows
+
+
+def test_dry_run_keeps_everything(app, client, create_assessment):
+    assessment_id = _prepare(app, client, create_assessment, "Löschtest Probelauf")
+    before = _dependent_rows(app, assessment_id)
+    response = client.post("/assessments/delete", data={"ids": assessment_id, "dry_run": "1"})
+    assert response.get_json()["assessments"] == 1
+    assert _dependent_rows(app, assessment_id) == before
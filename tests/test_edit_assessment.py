@@ -0,0 +1,23 @@
+"""Bearbeiten-Formular archivierter bzw. gepackter Assessments"""
+from models.database import Answer, AnswerArchive
+from services.archive_service import pack_assessment
+
+
+def _storage(app, assessment_id):
+    with app.app_context():
+        return (Answer.query.filter_by(assessment_id=assessment_id).count(),
+                AnswerArchive.query.filter_by(assessment_id=assessment_id).count())
+
+
+def test_edit_form_reads_packed_answers_without_unpacking(app, client, create_assessment):
+    assessment_id = create_assessment()
+    form_from_rows = client.get(f"/assessment/{assessment_id}/edit").data
+
+    with app.app_context():
+        pack_assessment(assessment_id)
+    assert _storage(app, assessment_id) == (0, 1)
+
+    response = client.get(f"/assessment/{assessment_id}/edit")
+    assert response.status_code == 200
+    assert response.data == form_from_rows
+    assert _storage(app, assessment_id) == (0, 1)
@@ -0,0 +1,79 @@
+"""Massenexport: gestreamte Datensätze entsprechen der Ergebnisansicht"""
+import csv
+import io
+import json
+
+import pytest
+
+from extensions import db
+from services import export_service
+from services.archive_service import pack_assessment
+from services.result_service import delete_result_snapshot, get_result_view
+
+
+@pytest.fixture(scope="module")
+def export_ids(create_assessment_module):
+    return [create_assessment_module(f"Export {i}", option_index=i) for i in range(3)]
+
+
+def _export(client, ids, **args):
+    query = "&".join(f"{key}={value}" for key, value in {"ids": ",".join(map(str, ids)),
+                                                            **args}.items())
+    response = client.get(f"/export?{query}")
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_jsonl_records_match_result_view(app, client, export_ids):
+    records = [json.loads(line) for line in _export(client, export_ids, format="jsonl")
+               .splitlines()]
+    assert [r["assessment_id"] for r in records] == export_ids
+    with app.app_context():
+        for record in records:
+            view = get_result_view(record["assessment_id"])
+            assert record["total"] == view["total"]
+            assert record["economic_metrics"] == json.loads(json.dumps(view["economic_metrics"]))
+            assert record["dimensions"] == [
+                {field: d[field] for field in export_service.DIMENSION_FIELDS}
+                for d in view["dimensions"]]
+
+
+def test_missing_snapshot_and_small_batches_give_same_export(app, client, export_ids,
+                                                            monkeypatch):
+    expected = _export(client, export_ids, format="csv", answers="1")
+    with app.app_context():
+        delete_result_snapshot(export_ids[1])
+        db.session.commit()
+    monkeypatch.setattr(export_service, "YIELD_PER", 1)
+    monkeypatch.setattr(export_service, "CHUNK_SIZE", 16)
+    assert _export(client, export_ids, format="csv", answers="1") == expected
+
+    rows = list(csv.DictReader(io.StringIO(expected)))
+    assert [int(row["assessment_id"]) for row in rows] == export_ids
+    assert rows[0]["name"] == "Export 0"
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/export?format=xml").status_code == 400
+
+
+def test_answer_export_matches_result_page_answers(app, client, export_ids):
+    records = [json.loads(line) for line in
+               _export(client, export_ids, format="jsonl", level="answers").splitlines()]
+    assert [r["assessment_id"] for r in records] == sorted(r["assessment_id"] for r in records)
+    with app.app_context():
+        for assessment_id in export_ids:
+            view = get_result_view(assessment_id)
+            expected = [(d["code"], a["question_code"], a["answer"], a["is_applicable"])
+                        for d in view["dimensions"] for a in d["answers"]]
+            assert [(r["dimension_code"], r["question_code"], r["answer"], r["is_applicable"])
+                    for r in records if r["assessment_id"] == assessment_id] == expected
+            assert expected
+
+
+def test_answer_export_merges_packed_assessments_in_id_order(app, client, export_ids):
+    expected = _export(client, export_ids, format="csv", level="answers")
+    with app.app_context():
+        pack_assessment(export_ids[1])
+    assert _export(client, export_ids, format="csv", level="answers") == expected
+    assert list(csv.reader(io.StringIO(expected)))[0] == list(export_service.ANSWER_COLUMNS)
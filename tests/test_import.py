@@ -0,0 +1,69 @@
+"""Massenimport: gleiche Ergebnisse wie das Formular, Fehler je Zeile"""
+import io
+import json
+
+import pytest
+
+from models.database import DimensionResult, TotalResult
+from services.import_service import import_assessments
+from services.questionnaire_cache import get_active_questionnaire
+from services.result_service import load_answer_rows
+
+
+def _record(compiled, name):
+    """Datensatz mit denselben Antworten wie create_assessment(option_index=0)"""
+    answers = {}
+    for question in compiled.questions:
+        options = compiled.options_for(question)
+        if question.question_type == "number":
+            answers[question.code] = 100
+        elif question.question_type == "multiple_choice" and options:
+            answers[question.code] = [options[0].code]
+        elif options:
+            answers[question.code] = options[0].code
+    return {"name": name, "description": "Test", "industry": "Handel", "answers": answers}
+
+
+def _results(assessment_id):
+    total = TotalResult.query.filter_by(assessment_id=assessment_id).one()
+    dimensions = sorted(
+        (r.dimension_id, r.automation_type, r.mean_score, r.is_excluded)
+        for r in DimensionResult.query.filter_by(assessment_id=assessment_id)
+    )
+    return (total.total_rpa, total.total_ipa, total.rpa_excluded, total.ipa_excluded,
+            total.recommendation, total.combined_score), dimensions
+
+
+def _import(lines, **kwargs):
+    stream = io.StringIO("\n".join(lines) + "\n")
+    return import_assessments(stream, "jsonl", **kwargs)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_import_matches_form_evaluation(app, create_assessment, packed):
+    form_id = create_assessment()
+    with app.app_context():
+        compiled = get_active_questionnaire()
+        records = [json.dumps(_record(compiled, f"Import {i}")) for i in range(5)]
+        report = _import(records, batch_size=2, packed=packed)
+        assert (report["imported"], report["failed"]) == (5, 0)
+
+        last_id = TotalResult.query.order_by(TotalResult.assessment_id.desc()).first().assessment_id
+        assert _results(last_id) == _results(form_id)
+        assert sorted(load_answer_rows(last_id)) == sorted(load_answer_rows(form_id))
+
+
+def test_invalid_lines_are_reported_and_skipped(app):
+    with app.app_context():
+        compiled = get_active_questionnaire()
+        valid = _record(compiled, "Gültig")
+        report = _import([
+            json.dumps(valid),
+            "{kein json",
+            json.dumps({**valid, "answers": {"gibt-es-nicht": "1"}}),
+            json.dumps({**valid, "name": ["Liste"]}),
+            json.dumps({**valid, "name": " "}),
+        ])
+    assert (report["imported"], report["failed"]) == (1, 4)
+    assert [error["line"] for error in report["errors"]] == [2, 3, 4, 5]
+    assert report["errors"][2]["error"] == "name muss Text sein"
@@ -0,0 +1,83 @@
+"""Persistente Job-Warteschlange: Leasing, Lease-Verlust und Wiederholung"""
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models.database import ScoringJob
+from services.job_queue import ScoringJobQueue
+
+
+@pytest.fixture
+def assessment_id(app, create_assessment):
+    assessment_id = create_assessment()
+    with app.app_context():
+        ScoringJob.query.delete()
+        db.session.commit()
+    return assessment_id
+
+
+def _job(assessment_id):
+    return ScoringJob.query.filter_by(assessment_id=assessment_id).one()
+
+
+def test_enqueue_reuses_pending_job(app, assessment_id):
+    with app.app_context():
+        assert ScoringJobQueue.enqueue(assessment_id) == 1
+        assert ScoringJobQueue.enqueue(assessment_id) == 0
+        db.session.commit()
+        assert _job(assessment_id).status == "pending"
+        assert ScoringJobQueue.status(assessment_id) == ("pending", None)
+
+
+def test_claim_and_complete(app, assessment_id):
+    with app.app_context():
+        ScoringJobQueue.enqueue(assessment_id)
+        db.session.commit()
+        job = ScoringJobQueue.claim("w1")
+        assert job.assessment_id == assessment_id and job.attempts == 1
+        assert ScoringJobQueue.claim("w2") is None
+
+        assert ScoringJobQueue.complete(job.id, job.lease_owner)
+        assert _job(assessment_id).status == "done"
+        assert ScoringJobQueue.status(assessment_id) == (None, None)
+
+
+def test_expired_lease_cannot_complete_or_fail(app, assessment_id):
+    with app.app_context():
+        ScoringJobQueue.enqueue(assessment_id)
+        db.session.commit()
+        first = ScoringJobQueue.claim("w1", lease_seconds=-1)
+        job_id, stale_token = first.id, first.lease_owner
+
+        # Abgelaufene Lease: ein zweiter Worker übernimmt den Job
+        second = ScoringJobQueue.claim("w2")
+        assert second.id == job_id and second.lease_owner != stale_token
+        new_token = second.lease_owner
+
+        assert not ScoringJobQueue.complete(job_id, stale_token)
+        assert not ScoringJobQueue.fail(job_id, stale_token, RuntimeError("zu spät"))
+        db.session.expire_all()
+        job = _job(assessment_id)
+        assert (job.status, job.lease_owner, job.last_error) == ("running", new_token, None)
+
+        assert ScoringJobQueue.complete(job_id, new_token)
+
+
+def test_fail_retries_with_backoff_until_max_attempts(app, assessment_id):
+    with app.app_context():
+        ScoringJobQueue.enqueue(assessment_id)
+        db.session.commit()
+        job = ScoringJobQueue.claim("w1")
+        assert ScoringJobQueue.fail(job.id, job.lease_owner, RuntimeError("Fehler 1"))
+        db.session.expire_all()
+        job = _job(assessment_id)
+        assert job.status == "pending" and job.available_at > datetime.utcnow()
+        assert ScoringJobQueue.claim("w1") is None  # Backoff läuft noch
+
+        job.attempts = job.max_attempts - 1
+        job.available_at = datetime.utcnow()
+        db.session.commit()
+        job = ScoringJobQueue.claim("w1")
+        assert ScoringJobQueue.fail(job.id, job.lease_owner, RuntimeError("Fehler 3"))
+        assert ScoringJobQueue.status(assessment_id) == ("failed", "Fehler 3")
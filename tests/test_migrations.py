@@ -0,0 +1,120 @@
+"""Versionierte Migrationen: Ergebnis entspricht den Modellen, Start ohne Arbeit"""
+import pytest
+from sqlalchemy import create_engine
+
+from extensions import db
+from main import MIGRATIONS, init_database, migrate_indexes
+from services.schema_migrations import apply_migrations, current_version
+
+
+def _schema(connection):
+    """Spalten, Fremdschlüssel und Indizes je Tabelle (ohne FTS- und Verwaltungstabellen)"""
+    schema = {}
+    tables = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type='table' "
+        "AND name NOT LIKE 'process_search%' AND name NOT LIKE 'sqlite_%'"
+    ).scalars().all()
+    for table in tables:
+        indexes = {}
+        for index in connection.exec_driver_sql(f"PRAGMA index_list('{table}')"):
+            columns = [row[2] for row in connection.exec_driver_sql(
+                f"PRAGMA index_info('{index[1]}')")]
+            name = "auto" if index[1].startswith("sqlite_autoindex") else index[1]
+            indexes[(name, tuple(columns))] = index[2]
+        schema[table] = (
+            [tuple(row[1:]) for row in connection.exec_driver_sql(f"PRAGMA table_info('{table}')")],
+            sorted(tuple(row[2:]) for row in connection.exec_driver_sql(
+                f"PRAGMA foreign_key_list('{table}')")),
+            sorted(indexes.items()),
+        )
+    return schema
+
+
+def test_migrated_schema_matches_models(app):
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine)
+    with engine.connect() as connection:
+        expected = _schema(connection)
+    with app.app_context():
+        assert current_version() == MIGRATIONS[-1].version
+        assert _schema(db.session.connection()) == expected
+
+
+def test_startup_on_current_schema_is_one_query(app, count_queries):
+    with count_queries() as statements:
+        init_database()
+    assert len(statements) == 1, statements
+
+
+def test_index_migration_adds_missing_query_indexes(empty_database):
+    assert current_version() == 0
+    apply_migrations(MIGRATIONS)
+    connection = db.session.connection()
+    expected = _schema(connection)
+    indexes = connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'ix_%' "
+        "AND name != 'ix_total_result_combined_score'"
+    ).scalars().all()
+    assert len(indexes) == 9
+    for name in indexes:
+        connection.exec_driver_sql(f"DROP INDEX {name}")
+
+    migrate_indexes()
+    assert _schema(db.session.connection()) == expected
+
+
+def test_upgrade_migrations_are_no_ops_on_fresh_database(empty_database):
+    apply_migrations(MIGRATIONS[:1])
+    baseline = _schema(db.session.connection())
+    assert apply_migrations(MIGRATIONS[:6]) == [2, 3, 4, 5, 6]
+    assert _schema(db.session.connection()) == baseline
+
+
+def _on_delete(connection, table):
+    return {row[6] for row in connection.exec_driver_sql(f"PRAGMA foreign_key_list('{table}')")
+            if row[2] == "assessment"}
+
+
+def test_cascade_migration_keeps_rows_and_drops_orphans(empty_database):
+    apply_migrations(MIGRATIONS[:7])
+    connection = db.session.connection()
+    assert _on_delete(connection, "answer") == {"NO ACTION"}
+    question_id, version_id = connection.exec_driver_sql(
+        "SELECT id, questionnaire_version_id FROM question LIMIT 1").one()
+    connection.exec_driver_sql("INSERT INTO process (id, name) VALUES (1, 'Alt')")
+    connection.exec_driver_sql(
+        "INSERT INTO assessment (id, process_id, questionnaire_version_id) VALUES (1, 1, ?)",
+        (version_id,))
+    db.session.commit()
+    with db.session.get_bind().connect() as legacy:
+        legacy.exec_driver_sql("PRAGMA foreign_keys = OFF")  # Altbestand mit Waisen
+        legacy.exec_driver_sql(
+            "INSERT INTO answer (assessment_id, question_id, is_applicable) "
+            "VALUES (1, ?, 1), (2, ?, 1)", (question_id, question_id))
+        legacy.commit()
+        legacy.exec_driver_sql("PRAGMA foreign_keys = ON")
+    assert db.session.connection().exec_driver_sql("SELECT COUNT(*) FROM answer").scalar() == 2
+
+    assert apply_migrations(MIGRATIONS[:8]) == [8]
+    connection = db.session.connection()
+    for table in ("answer", "dimension_result", "total_result", "economic_metric",
+                  "result_snapshot", "scoring_job"):
+        assert _on_delete(connection, table) == {"CASCADE"}, table
+    assert connection.exec_driver_sql("SELECT assessment_id FROM answer").scalars().all() == [1]
+
+    connection.exec_driver_sql("DELETE FROM assessment WHERE id = 1")
+    assert connection.exec_driver_sql("SELECT COUNT(*) FROM answer").scalar() == 0
+    db.session.rollback()
+
+
+@pytest.mark.parametrize("version, table", [(9, "answer_archive"),
+                                            (11, "questionnaire_snapshot")])
+def test_table_migration_creates_table_like_model(empty_database, version, table):
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine)
+    with engine.connect() as connection:
+        expected = _schema(connection)[table]
+    assert apply_migrations(MIGRATIONS[:version])[-1] == version
+    connection = db.session.connection()
+    assert _schema(connection)[table] == expected
+    assert not connection.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar()
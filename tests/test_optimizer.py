@@ -0,0 +1,73 @@
+"""Budgetoptimierung: Auswahl hält das Budget ein und erreicht das Optimum"""
+import itertools
+import random
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from services import optimizer_service
+from services.optimizer_service import (
+    Candidate, _knapsack, optimize_portfolio, parse_optimizer_args
+)
+
+
+def _candidates(count, seed, automation_types=("RPA", "IPA")):
+    rng = random.Random(seed)
+    return [Candidate(
+        assessment_id=i, process_id=i, process_name=f"P{i}", industry="",
+        automation_type=automation_types[i % len(automation_types)], combined_score=3.0,
+        cost=round(rng.uniform(1_000, 50_000), 2), benefit=round(rng.uniform(0, 80_000), 2),
+        fte=round(rng.uniform(0, 2), 3),
+    ) for i in range(1, count + 1)]
+
+
+def _optimum(candidates, budget):
+    return max(
+        sum(c.benefit for c in subset)
+        for size in range(len(candidates) + 1)
+        for subset in itertools.combinations(candidates, size)
+        if sum(c.cost for c in subset) <= budget
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_knapsack_is_feasible_and_optimal(seed):
+    candidates = _candidates(12, seed)
+    budget = sum(c.cost for c in candidates) * 0.4
+    selected = _knapsack(candidates, budget, "benefit")
+    assert len({c.assessment_id for c in selected}) == len(selected)
+    assert sum(c.cost for c in selected) <= budget
+    assert sum(c.benefit for c in selected) == pytest.approx(_optimum(candidates, budget))
+
+
+def test_core_selection_stays_within_budget(monkeypatch):
+    monkeypatch.setattr(optimizer_service, "CORE_SIZE", 5)
+    candidates = _candidates(300, seed=42)
+    budget = sum(c.cost for c in candidates) * 0.3
+    selected = _knapsack(candidates, budget, "fte")
+    assert sum(c.cost for c in selected) <= budget
+    # Mindestens so gut wie die Greedy-Auswahl nach Nutzen je Euro
+    greedy, spent = 0.0, 0.0
+    for c in sorted(candidates, key=lambda c: -c.fte / c.cost):
+        if spent + c.cost <= budget:
+            greedy, spent = greedy + c.fte, spent + c.cost
+    assert sum(c.fte for c in selected) >= greedy - 1e-9
+
+
+def test_rpa_share_splits_the_budget(monkeypatch):
+    candidates = _candidates(10, seed=7)
+    monkeypatch.setattr(optimizer_service, "load_candidates", lambda *args: candidates)
+    budget = 60_000
+    result = optimize_portfolio(budget, rpa_share=0.25)
+    assert result["totals"]["rpa_cost"] <= budget * 0.25
+    assert result["totals"]["ipa_cost"] <= budget * 0.75
+    benefits = [c["benefit"] for c in result["selected"]]
+    assert benefits == sorted(benefits, reverse=True)
+
+
+@pytest.mark.parametrize("args", [{}, {"budget": "-5"}, {"budget": "inf"},
+                                  {"budget": "100", "rpa_share": "1.5"},
+                                  {"budget": "100", "objective": "roi"}])
+def test_invalid_arguments_are_rejected(args):
+    with pytest.raises(ValueError):
+        parse_optimizer_args(MultiDict(args))
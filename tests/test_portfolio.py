@@ -0,0 +1,56 @@
+"""Portfolio-Kennzahlen: inkrementelle Pflege entspricht dem Neuaufbau"""
+import io
+import json
+
+from extensions import db
+from models.database import PortfolioAggregate
+from services.deletion_service import delete_assessments
+from services.import_service import import_assessments
+from services.portfolio_service import KEY_COLUMNS, SUM_COLUMNS, PortfolioService
+from services.questionnaire_cache import get_active_questionnaire
+
+INDUSTRIES = ("Portfolio A", "Portfolio B")
+
+
+def _aggregates():
+    return sorted(
+        tuple(getattr(row, column) for column in KEY_COLUMNS) +
+        tuple(round(getattr(row, column), 6) for column in SUM_COLUMNS)
+        for row in PortfolioAggregate.query.filter(PortfolioAggregate.industry.in_(INDUSTRIES))
+    )
+
+
+def _rebuilt():
+    """Stand nach einem vollständigen Neuaufbau (wird zurückgerollt)"""
+    PortfolioService.rebuild(commit=False)
+    rows = _aggregates()
+    db.session.rollback()
+    return rows
+
+
+def test_incremental_aggregates_match_rebuild(app, client, create_assessment, answer_form):
+    first, second, third = (create_assessment(f"Portfolio {i}", option_index=i,
+                                              industry=INDUSTRIES[0]) for i in range(3))
+    with app.app_context():
+        compiled = get_active_questionnaire()
+        record = {"name": "Portfolio Import", "industry": INDUSTRIES[1], "answers": {
+            question.code: 100 for question in compiled.questions
+            if question.question_type == "number"}}
+        assert import_assessments(io.StringIO(json.dumps(record)), "jsonl")["imported"] == 1
+        assert _aggregates() == _rebuilt()
+
+    # Neue Antworten und andere Branche: alter Beitrag raus, neuer rein
+    response = client.post(f"/assessment/{second}/update", data=answer_form(
+        name="Portfolio 1", option_index=2, industry=INDUSTRIES[1]))
+    assert response.status_code == 302
+    with app.app_context():
+        assert _aggregates() == _rebuilt()
+
+        delete_assessments([first, third])
+        assert _aggregates() == _rebuilt()
+        assert {row[0] for row in _aggregates()} == {INDUSTRIES[1]}
+
+        summary = PortfolioService.summary()
+        by_industry = {entry["industry"]: entry for entry in summary["by_industry"]}
+        assert by_industry[INDUSTRIES[1]]["assessments"] == 2
+        assert INDUSTRIES[0] not in by_industry
@@ -0,0 +1,136 @@
+"""Aktive Fragebogenversion nach Änderungen aus einem anderen Prozess; Snapshot-Dateien"""
+import os
+import sqlite3
+import time
+
+from extensions import db
+from services import questionnaire_cache
+from services.questionnaire_cache import (
+    get_active_questionnaire, get_compiled_questionnaire, invalidate_compiled_questionnaire
+)
+from services.questionnaire_snapshot import read_snapshot, snapshot_path
+
+
+def _database_path(app):
+    return app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///")
+
+
+def _other_process(app, *statements):
+    """Schreibt wie ein anderer Prozess direkt in die Datenbank (ohne Session-Hooks)"""
+    with sqlite3.connect(_database_path(app)) as conn:
+        for statement, parameters in statements:
+            conn.execute(statement, parameters)
+
+
+def _active(app):
+    with app.app_context():
+        return get_active_questionnaire()
+
+
+def test_activation_in_other_process_is_picked_up(app):
+    original = _active(app)
+    new_id = original.version_id + 1000
+    _other_process(
+        app,
+        ("INSERT INTO questionnaire_version (id, name, version, is_active) VALUES (?, ?, ?, 1)",
+         (new_id, "Neu", "2.0")),
+        ("UPDATE questionnaire_version SET is_active = 0 WHERE id != ?", (new_id,)),
+    )
+    try:
+        assert _active(app).version_id == new_id
+    finally:
+        _other_process(
+            app,
+            ("UPDATE questionnaire_version SET is_active = (id = ?)", (original.version_id,)),
+            ("DELETE FROM questionnaire_version WHERE id = ?", (new_id,)),
+        )
+    assert _active(app) is original
+
+
+def test_changed_snapshot_hash_reloads_version(app):
+    original = _active(app)
+    assert _active(app) is original
+    with sqlite3.connect(_database_path(app)) as conn:
+        digest, = conn.execute(
+            "SELECT content_hash FROM questionnaire_snapshot WHERE questionnaire_version_id = ?",
+            (original.version_id,)).fetchone()
+
+    update = "UPDATE questionnaire_snapshot SET content_hash = ? WHERE questionnaire_version_id = ?"
+    _other_process(app, (update, ("geaendert", original.version_id)))
+    try:
+        reloaded = _active(app)
+        assert reloaded is not original
+        assert reloaded.definition() == original.definition()
+    finally:
+        _other_process(app, (update, (digest, original.version_id)))
+
+
+def _stored(app, version_id):
+    with sqlite3.connect(_database_path(app)) as conn:
+        row = conn.execute(
+            "SELECT content_hash FROM questionnaire_snapshot WHERE questionnaire_version_id = ?",
+            (version_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _snapshot(app, version_id, digest):
+    return snapshot_path(app.config["QUESTIONNAIRE_SNAPSHOT_DIR"], version_id, digest)
+
+
+def _cold_start(app, monkeypatch):
+    """Lädt die aktive Version wie ein neuer Prozess, ohne Zugriff auf die Stammdaten"""
+    def no_master_data(version_id):
+        raise AssertionError("Fragebogen aus den Stammdaten statt aus dem Snapshot geladen")
+    with app.app_context():
+        invalidate_compiled_questionnaire()
+        with monkeypatch.context() as patch:
+            patch.setattr(questionnaire_cache, "_load", no_master_data)
+            return get_active_questionnaire()
+
+
+def test_missing_snapshot_is_rebuilt_on_first_load(app, monkeypatch):
+    original = _active(app)
+    digest = _stored(app, original.version_id)
+    os.remove(_snapshot(app, original.version_id, digest))
+    _other_process(app, ("DELETE FROM questionnaire_snapshot", ()))
+
+    reloaded = _active(app)  # kein Hash mehr: neu aus den Stammdaten
+    assert reloaded is not original and reloaded.definition() == original.definition()
+    assert _stored(app, original.version_id) == digest
+    assert os.path.exists(_snapshot(app, original.version_id, digest))
+    assert _cold_start(app, monkeypatch).definition() == original.definition()
+
+
+def test_snapshot_hash_mismatch_rebuilds_file(app, monkeypatch):
+    original = _active(app)
+    digest = _stored(app, original.version_id)
+    path = _snapshot(app, original.version_id, digest)
+    with open(path, "wb") as f:
+        f.write(b"veraltet")
+    assert read_snapshot(app.config["QUESTIONNAIRE_SNAPSHOT_DIR"], original.version_id,
+                         digest) is None
+
+    with app.app_context():
+        invalidate_compiled_questionnaire()
+        assert get_active_questionnaire().definition() == original.definition()
+    assert read_snapshot(app.config["QUESTIONNAIRE_SNAPSHOT_DIR"], original.version_id,
+                         digest) is not None
+    assert _cold_start(app, monkeypatch).definition() == original.definition()
+
+
+def test_rebuild_does_not_wait_for_own_write_lock(app):
+    version_id = _active(app).version_id
+    _other_process(app, ("DELETE FROM questionnaire_snapshot", ()))
+    with app.app_context():
+        invalidate_compiled_questionnaire()
+        db.session.execute(db.text("UPDATE process SET name = name WHERE id = -1"))
+        started = time.perf_counter()
+        compiled = get_compiled_questionnaire(version_id)
+        assert time.perf_counter() - started < 1
+        db.session.rollback()
+    assert compiled.version_id == version_id
+    assert _stored(app, version_id) is None
+    with app.app_context():
+        invalidate_compiled_questionnaire()  # nächster Kaltstart speichert den Hash
+        get_compiled_questionnaire(version_id)
+    assert _stored(app, version_id)
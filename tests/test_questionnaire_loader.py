@@ -0,0 +1,35 @@
+"""Fragebogen-Definitionen: die mitgelieferte Datei ergibt den bisherigen Seed"""
+import hashlib
+
+from extensions import db
+from main import MIGRATIONS
+from seed_data import SEED_FILE
+from services.questionnaire_cache import get_active_questionnaire, get_compiled_questionnaire
+from services.questionnaire_loader import (
+    export_questionnaire, load_questionnaire, read_definition
+)
+from services.schema_migrations import apply_migrations
+
+# Kompilierter Fragebogen des imperativen Seed-Skripts vor questionnaires/rpa_ipa_v1.json
+# (SHA-256 über repr(CompiledQuestionnaire.definition()) auf einer leeren Datenbank)
+PREVIOUS_SEED_SHA256 = "e4609cfc04ca83f623b42613358a2341ba904b9907fae0b2093fdd84f586f93a"
+PREVIOUS_SEED_COUNTS = {"dimension": 7, "scale": 7, "scale_option": 35, "question": 54,
+                        "question_condition": 13, "option_score": 460, "hint": 52}
+
+
+def test_seed_file_reproduces_previous_seed(empty_database):
+    apply_migrations(MIGRATIONS[:6])  # Schema ohne Seed-Daten
+    report = load_questionnaire(read_definition(SEED_FILE))
+    db.session.commit()
+
+    connection = db.session.connection()
+    for table, count in PREVIOUS_SEED_COUNTS.items():
+        assert connection.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar() == count
+    definition = get_compiled_questionnaire(report["version_id"]).definition()
+    assert hashlib.sha256(repr(definition).encode("utf-8")).hexdigest() == PREVIOUS_SEED_SHA256
+
+
+def test_export_round_trips_seed_file(app):
+    with app.app_context():
+        assert export_questionnaire(get_active_questionnaire().version_id) == \
+            read_definition(SEED_FILE)
@@ -0,0 +1,81 @@
+"""Top-K-Rangliste gegen eine vollständige Sortierung (ORDER BY rank_score DESC, id)"""
+import pytest
+from sqlalchemy import select
+
+from extensions import db
+from models.database import TotalResult, EconomicMetric
+from services import ranking_service
+from services.ranking_service import METRIC_KEYS, top_candidates
+
+
+def _brute_force(weights, automation_type, limit):
+    """Alle Kandidaten bewerten und vollständig sortieren"""
+    weights = {c: w for c, w in weights.items() if w > 0}
+    condition = ranking_service._type_condition(automation_type)
+    values = {}
+    for assessment_id, score in db.session.execute(
+        select(TotalResult.assessment_id, TotalResult.combined_score)
+        .where(condition, TotalResult.combined_score.isnot(None))
+    ):
+        values.setdefault(assessment_id, {})["score"] = score
+    for criterion, key in METRIC_KEYS.items():
+        for assessment_id, value in db.session.execute(
+            select(EconomicMetric.assessment_id, EconomicMetric.value)
+            .join(TotalResult, TotalResult.assessment_id == EconomicMetric.assessment_id)
+            .where(EconomicMetric.key == key, condition)
+        ):
+            values.setdefault(assessment_id, {})[criterion] = value
+    candidates = {a: v for a, v in values.items() if any(c in v for c in weights)}
+    weight_sum = sum(weights.values())
+    maxima = {c: max((v[c] for v in candidates.values() if v.get(c) is not None), default=0)
+              for c in weights}
+    ranked = []
+    for assessment_id, v in candidates.items():
+        score = sum(w / (weight_sum * maxima[c]) * max(v.get(c) or 0.0, 0.0)
+                    for c, w in weights.items() if maxima[c] > 0)
+        ranked.append((-round(score, 9), assessment_id))
+    return [assessment_id for _, assessment_id in sorted(ranked)[:limit]]
+
+
+# Kriterien je Assessment mit vielen Gleichständen (auch über Blockgrenzen hinweg)
+SCORES = [2, 5, 5, 3, 5, 3, 3, 5, 1, 3, 5, 2, 4, 4, 3, 5]
+ROI = [1.5, 0.5, 1.5, 1.5, 0.5, None, 1.5, 0.5, 1.5, 0.5, 1.5, -1.0, 0.5, 1.5, 0.5, 1.5]
+FTE = [0.5, 1.0, 0.0, 1.0, 0.5, 1.0, 0.5, 0.5, None, 1.0, 0.5, 0.5, 1.0, 0.0, 1.0, 0.5]
+
+
+@pytest.fixture(scope="module")
+def tied_assessments(app, create_assessment_module):
+    ids = [create_assessment_module(f"Gleichstand {i}") for i in range(len(SCORES))]
+    with app.app_context():
+        for i, assessment_id in enumerate(ids):
+            db.session.query(TotalResult).filter_by(assessment_id=assessment_id).update({
+                "combined_score": SCORES[i],
+                "rpa_excluded": i % 5 == 0,
+                "ipa_excluded": i % 3 == 0,
+            })
+            for criterion, values in (("roi", ROI), ("fte", FTE)):
+                metric = db.session.query(EconomicMetric).filter_by(
+                    assessment_id=assessment_id, key=METRIC_KEYS[criterion])
+                if values[i] is None:
+                    metric.delete()
+                else:
+                    metric.update({"value": values[i]})
+        db.session.commit()
+    return ids
+
+
+@pytest.mark.parametrize("weights", [
+    {"score": 1.0},
+    {"score": 0.5, "roi": 0.25, "fte": 0.25},
+    {"roi": 1.0, "fte": 1.0},
+])
+@pytest.mark.parametrize("automation_type", ["any", "RPA", "IPA"])
+def test_top_candidates_matches_full_sort_with_ties(app, tied_assessments, monkeypatch,
+                                                   weights, automation_type):
+    # Kleine Blöcke: die Zusammenführung bricht vorzeitig ab und filtert am K-ten Wert
+    monkeypatch.setattr(ranking_service, "BATCH_SIZE", 2)
+    with app.app_context():
+        for limit in (1, 3, 4, 5, 9):
+            ranked = top_candidates(weights, automation_type, limit)
+            assert [c["assessment_id"] for c in ranked] == \
+                _brute_force(weights, automation_type, limit), limit
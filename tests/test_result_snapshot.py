@@ -0,0 +1,28 @@
+"""Ergebnis-Snapshots: veraltete Formate werden beim Anzeigen ersetzt"""
+from extensions import db
+from models.database import ResultSnapshot
+from services import result_service
+
+
+def _snapshot_version(app, assessment_id):
+    with app.app_context():
+        return db.session.query(ResultSnapshot.format_version).filter_by(
+            assessment_id=assessment_id
+        ).scalar()
+
+
+def test_outdated_snapshot_is_rewritten(app, client, create_assessment, monkeypatch):
+    assessment_id = create_assessment()
+    old_version = result_service.SNAPSHOT_FORMAT_VERSION
+    assert _snapshot_version(app, assessment_id) == old_version
+    page = client.get(f"/assessment/{assessment_id}").data
+
+    monkeypatch.setattr(result_service, "SNAPSHOT_FORMAT_VERSION", old_version + 1)
+    assert client.get(f"/assessment/{assessment_id}").data == page
+    assert _snapshot_version(app, assessment_id) == old_version + 1
+
+    # Danach wird wieder der Snapshot gelesen
+    with app.app_context():
+        assert result_service.load_result_snapshot(assessment_id) is not None
+    assert client.get(f"/assessment/{assessment_id}").data == page
+
@@ -0,0 +1,57 @@
+"""Asynchrone Auswertung: begrenzte Warteschlange und synchroner Rückfall"""
+import threading
+
+from flask import Flask
+
+from services.scoring_queue import ScoringQueue
+
+
+def _queue(workers=1, queue_size=0):
+    app = Flask(__name__)
+    app.config.update(SCORING_MODE="async", SCORING_WORKERS=workers,
+                      SCORING_QUEUE_SIZE=queue_size)
+    return ScoringQueue(app)
+
+
+def test_full_queue_rejects_job_and_tracks_status():
+    queue = _queue()
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_job(assessment_id):
+        started.set()
+        release.wait(5)
+
+    try:
+        assert queue.submit(blocking_job, 1)
+        assert started.wait(5)
+        # Ein Worker, keine Warteplätze: der zweite Job wird abgelehnt
+        assert not queue.submit(blocking_job, 2)
+        assert queue.status(1) == ("pending", None)
+        assert queue.status(2) == (None, None)
+    finally:
+        release.set()
+        queue.shutdown()
+    assert queue.status(1) == (None, None)
+
+
+def test_failed_job_reports_error():
+    queue = _queue()
+
+    def failing_job(assessment_id):
+        raise RuntimeError(f"Assessment {assessment_id} kaputt")
+
+    assert queue.submit(failing_job, 7)
+    queue.shutdown()
+    assert queue.status(7) == ("failed", "Assessment 7 kaputt")
+
+
+def test_evaluate_scores_synchronously_when_queue_is_full(app, client, create_assessment,
+                                                          monkeypatch):
+    import main
+    monkeypatch.setitem(app.config, "SCORING_MODE", "async")
+    monkeypatch.setattr(main.scoring_queue, "submit", lambda job, assessment_id: False)
+
+    assessment_id = create_assessment()
+    response = client.get(f"/assessment/{assessment_id}/status")
+    assert response.get_json() == {"status": "done"}
@@ -0,0 +1,45 @@
+"""Volltextsuche über Prozesse: Präfixe, Ranking und Trigger"""
+import pytest
+
+from extensions import db
+from models.database import Assessment, Process
+from services.search_service import build_match_query, search_available, search_processes
+
+
+def test_build_match_query_uses_prefix_terms():
+    assert build_match_query('Rechn* "Prüf"') == '"Rechn"* "Prüf"*'
+    assert build_match_query(" -- ") is None
+
+
+@pytest.fixture(scope="module")
+def processes(app, create_assessment_module):
+    first = create_assessment_module("Kesselbau Rechnungsprüfung")
+    second = create_assessment_module("Kessel Wareneingang", industry="Kesselbau")
+    with app.app_context():
+        assert search_available()
+        return {assessment_id: db.session.get(Assessment, assessment_id).process_id
+                for assessment_id in (first, second)}
+
+
+def _found(query_text):
+    return [row["assessment_id"] for row in search_processes(query_text)]
+
+
+def test_prefix_and_diacritics(app, processes):
+    first, second = processes
+    with app.app_context():
+        assert _found("rechnungsp") == [first]
+        assert _found("rechnungsprufung") == [first]
+        assert _found("kes waren") == [second]
+        # Treffer im Namen vor Treffer nur in der Branche
+        assert _found("kesselbau") == [first, second]
+
+
+def test_index_follows_process_changes(app, processes):
+    first = next(iter(processes))
+    with app.app_context():
+        process = db.session.get(Process, processes[first])
+        process.name = "Kesselbau Mahnwesen"
+        db.session.commit()
+        assert _found("rechnungsp") == []
+        assert _found("mahnw") == [first]
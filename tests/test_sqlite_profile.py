@@ -0,0 +1,65 @@
+"""SQLite-Profil: PRAGMAs je Verbindung, Leser neben Schreibern, WAL-Checkpoint"""
+import pytest
+from sqlalchemy import create_engine
+
+from extensions import db
+from services.sqlite_profile import (
+    checkpoint_wal, configure_sqlite_engine, profile_pragmas, read_only_pragmas
+)
+
+
+def _pragma(connection, name):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_profile_pragmas_merge_and_validate():
+    pragmas = profile_pragmas({"SQLITE_PROFILE": "wal", "SQLITE_PRAGMAS": {"mmap_size": 0}})
+    assert pragmas["foreign_keys"] == "ON" and pragmas["mmap_size"] == 0
+    assert profile_pragmas({"SQLITE_PROFILE": "default"}) == {"foreign_keys": "ON"}
+    assert "journal_mode" not in read_only_pragmas(pragmas)
+    with pytest.raises(ValueError):
+        profile_pragmas({"SQLITE_PROFILE": "schnell"})
+
+
+@pytest.fixture
+def wal_engines(tmp_path):
+    path = tmp_path / "profile.db"
+    pragmas = profile_pragmas({"SQLITE_PROFILE": "wal"})
+    writer = create_engine(f"sqlite:///{path}")
+    configure_sqlite_engine(writer, pragmas)
+    reader = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    configure_sqlite_engine(reader, read_only_pragmas(pragmas))
+    with writer.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+        connection.exec_driver_sql("INSERT INTO item VALUES (1)")
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def test_every_connection_gets_the_profile(wal_engines):
+    writer, reader = wal_engines
+    with writer.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "foreign_keys") == 1
+        assert _pragma(connection, "busy_timeout") == 5000
+    with reader.connect() as connection:
+        assert _pragma(connection, "foreign_keys") == 1
+
+
+def test_reader_is_not_blocked_by_open_write_transaction(wal_engines):
+    writer, reader = wal_engines
+    with writer.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO item VALUES (2)")
+        with reader.connect() as read_connection:
+            # Der Leser sieht den letzten bestätigten Stand, ohne zu warten
+            assert read_connection.exec_driver_sql("SELECT COUNT(*) FROM item").scalar() == 1
+    busy, wal_pages, checkpointed = checkpoint_wal(writer)
+    assert busy == 0 and checkpointed == wal_pages
+
+
+def test_app_engine_uses_wal(app):
+    with app.app_context(), db.engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "foreign_keys") == 1
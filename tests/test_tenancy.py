@@ -0,0 +1,54 @@
+"""Mandantenbetrieb: nur eingerichtete Mandanten, getrennte Datenbanken"""
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def tenant_app(app, tmp_path, monkeypatch):
+    """App im Modus 'header' mit den Mandanten acme und globex in tmp_path"""
+    tenant_engines = app.extensions["tenant_engines"]
+    monkeypatch.setitem(app.config, "TENANT_MODE", "header")
+    monkeypatch.setitem(app.config, "TENANT_DIR", str(tmp_path))
+    monkeypatch.setitem(app.config, "TENANTS", frozenset({"acme", "globex"}))
+    monkeypatch.setattr(tenant_engines, "_ready", set())
+    yield tenant_engines
+    tenant_engines.dispose()
+
+
+def _get(client, tenant, url="/comparison"):
+    return client.get(url, headers={"X-Tenant": tenant})
+
+
+def _process_names(tenant_engines, tenant):
+    with sqlite3.connect(tenant_engines.database_path(tenant)) as conn:
+        return [name for name, in conn.execute("SELECT name FROM process ORDER BY id")]
+
+
+def test_unknown_tenant_is_rejected_without_creating_a_database(tenant_app, client, tmp_path):
+    assert _get(client, "initech").status_code == 404
+    assert _get(client, "Ungültig!").status_code == 400
+    assert list(tmp_path.iterdir()) == []
+    assert not tenant_app._init_locks and not tenant_app._ready
+
+
+def test_existing_database_file_counts_as_provisioned(tenant_app, client, tmp_path):
+    (tmp_path / "initech.db").touch()
+    assert _get(client, "initech").status_code == 200
+    assert tenant_app.is_provisioned("initech")
+
+
+def test_tenants_are_isolated(app, tenant_app, client, answer_form):
+    response = client.post("/evaluate", data=answer_form(name="Nur bei Acme"),
+                           headers={"X-Tenant": "acme"})
+    assert response.status_code == 302
+    assert _get(client, "globex").status_code == 200
+
+    assert _process_names(tenant_app, "acme") == ["Nur bei Acme"]
+    assert _process_names(tenant_app, "globex") == []
+    assert "Nur bei Acme" in _get(client, "acme").get_data(as_text=True)
+    assert "Nur bei Acme" not in _get(client, "globex").get_data(as_text=True)
+    assert not tenant_app._init_locks
+    main_database = app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///")
+    with sqlite3.connect(main_database) as conn:
+        assert not conn.execute("SELECT 1 FROM process WHERE name = 'Nur bei Acme'").fetchone()
@@ -0,0 +1,51 @@
+"""Regressionstest: die Ergebnisseite kommt mit einer festen Zahl von Abfragen aus"""
+from extensions import db
+from models.database import ResultSnapshot
+
+# Obergrenze aus user-029 (ohne N+1 über Dimensionen, Fragen und Optionen)
+MAX_VIEW_QUERIES = 5
+# Ohne Ergebnis-Snapshot: Snapshot-Lookup, Prozess, Gesamt-, Dimensionsergebnisse,
+# Kennzahlen, Antworten (alle Stammdaten aus dem kompilierten Fragebogen) und Snapshot schreiben
+MAX_REBUILD_QUERIES = 7
+
+
+def _drop_result_snapshot(app, assessment_id):
+    with app.app_context():
+        ResultSnapshot.query.filter_by(assessment_id=assessment_id).delete()
+        db.session.commit()
+
+
+def _view_statements(client, count_queries, assessment_id):
+    with count_queries() as statements:
+        response = client.get(f"/assessment/{assessment_id}")
+    assert response.status_code == 200
+    return statements
+
+
+def test_view_assessment_query_count(client, create_assessment, count_queries):
+    assessment_id = create_assessment()
+    # Erster Aufruf lädt ggf. den kompilierten Fragebogen (einmal je Prozess)
+    assert client.get(f"/assessment/{assessment_id}").status_code == 200
+
+    statements = _view_statements(client, count_queries, assessment_id)
+    assert len(statements) <= MAX_VIEW_QUERIES, "\n".join(statements)
+
+
+def test_view_assessment_rebuild_query_count(app, client, create_assessment, count_queries):
+    assessment_id = create_assessment()
+    client.get(f"/assessment/{assessment_id}")
+    _drop_result_snapshot(app, assessment_id)
+
+    statements = _view_statements(client, count_queries, assessment_id)
+    assert len(statements) <= MAX_REBUILD_QUERIES, "\n".join(statements)
+
+
+def test_view_assessment_query_count_independent_of_answers(app, client, create_assessment,
+                                                            count_queries):
+    counts = []
+    for option_index in (0, 1, 2):
+        assessment_id = create_assessment(f"Prozess {option_index}", option_index=option_index)
+        client.get(f"/assessment/{assessment_id}")
+        _drop_result_snapshot(app, assessment_id)
+        counts.append(len(_view_statements(client, count_queries, assessment_id)))
+    assert len(set(counts)) == 1, counts
@@ -0,0 +1,93 @@
+"""
+Scoring-Worker für die persistente Job-Warteschlange (SCORING_MODE=queue)
+
+Start:
+    python -m worker                      # Jobs dauerhaft abarbeiten
+    python -m worker --once               # alle verfügbaren Jobs abarbeiten, dann beenden
+    python -m worker --enqueue-all economic   # alle Assessments neu berechnen lassen
+    python -m worker --tenant acme        # Jobs eines Mandanten (TENANT_MODE, ein Worker je Mandant)
+"""
+import argparse
+import os
+import socket
+import time
+import traceback
+
+from extensions import db
+from main import app, init_database, run_scoring_job, wal_checkpointer
+from services.job_queue import ScoringJobQueue
+from services.tenancy import bind_process_tenant
+
+
+def process_next_job(worker_id, lease_seconds):
+    """
+    Least und verarbeitet einen Job.
+
+    Returns:
+        True wenn ein Job verarbeitet wurde, sonst False
+    """
+    job = ScoringJobQueue.claim(worker_id, lease_seconds)
+    if job is None:
+        return False
+    # Vor der Berechnung merken: nach deren Commit wäre job.lease_owner schon neu geladen
+    job_id, assessment_id, token = job.id, job.assessment_id, job.lease_owner
+
+    try:
+        if ScoringJobQueue.assessment_exists(assessment_id):
+            run_scoring_job(assessment_id)
+        kept_lease = ScoringJobQueue.complete(job_id, token)
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        kept_lease = ScoringJobQueue.fail(job_id, token, e)
+    if not kept_lease:
+        print(f"Job {job_id}: Lease abgelaufen, Status bleibt beim neuen Worker")
+    return True
+
+
+def run_worker(worker_id, poll_interval, lease_seconds, once=False):
+    """Arbeitet Jobs ab, bis keine mehr vorhanden sind (once) oder dauerhaft"""
+    print(f"Worker {worker_id} gestartet")
+    wal_checkpointer.start()
+    while True:
+        with app.app_context():
+            processed = process_next_job(worker_id, lease_seconds)
+        if not processed:
+            if once:
+                return
+            time.sleep(poll_interval)
+
+
+def main():
+    """Kommandozeilen-Einstieg"""
+    parser = argparse.ArgumentParser(description="Automation Fit Scoring-Worker")
+    parser.add_argument("--once", action="store_true",
+                        help="Verfügbare Jobs abarbeiten und danach beenden")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Wartezeit in Sekunden, wenn keine Jobs vorhanden sind")
+    parser.add_argument("--lease", type=int, default=ScoringJobQueue.DEFAULT_LEASE_SECONDS,
+                        help="Sichtbarkeits-Timeout eines geleasten Jobs in Sekunden")
+    parser.add_argument("--enqueue-all", metavar="REASON",
+                        help="Jobs für alle Assessments anlegen (z. B. questionnaire, economic)")
+    parser.add_argument("--tenant", help="Jobs dieses Mandanten abarbeiten (TENANT_MODE)")
+    args = parser.parse_args()
+
+    if args.tenant:
+        try:
+            bind_process_tenant(app, args.tenant)
+        except ValueError as e:
+            parser.error(str(e))
+    init_database()
+    with app.app_context():
+        if args.enqueue_all:
+            count = ScoringJobQueue.enqueue_all(args.enqueue_all)
+            db.session.commit()
+            print(f"{count} Jobs angelegt ({args.enqueue_all})")
+            return
+
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    run_worker(worker_id, args.poll_interval, args.lease, once=args.once)
+
+
+if __name__ == "__main__":
+    main()